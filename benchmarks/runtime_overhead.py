@@ -0,0 +1,627 @@
+"""Measure Lily's own per-turn overhead against a deterministic scripted model.
+
+Builds the real ``AgentRuntime`` (middleware stack, SQLite checkpointer, tool
+registry, skill catalog injection) with chat models supplied through
+``ModelFactory`` builders, so no provider or network is involved. Three sweeps
+are reported:
+
+- conversation history length (messages already in the checkpointed thread)
+- number of tools bound to the agent
+- number of skills in the injected catalog
+
+Each sweep records the median turn time, the part of it not spent inside the
+scripted model or tools (Lily overhead), checkpoint read/write time, and peak
+traced Python allocations for one turn. Checkpoints use ``sync`` durability so
+checkpoint time is serial and attributable to the turn. Results are written as
+JSON and diffed against ``benchmarks/baselines/runtime_overhead.json``.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import platform
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from collections.abc import Callable, Sequence
+from contextlib import closing
+from dataclasses import asdict, dataclass
+from datetime import UTC, datetime
+from pathlib import Path
+from typing import Any
+
+from langchain_core.callbacks import CallbackManagerForLLMRun
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import AIMessage, BaseMessage, ToolMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+from langchain_core.tools import BaseTool, StructuredTool
+from rich.console import Console
+from rich.table import Table
+
+from lily.runtime.agent_run_result import AgentRunResult
+from lily.runtime.agent_runtime import AgentRuntime
+from lily.runtime.config_schema import (
+    ModelProfileConfig,
+    ModelProvider,
+    RuntimeConfig,
+    SkillsConfig,
+)
+from lily.runtime.model_factory import ModelBuilder, ModelFactory
+from lily.runtime.skill_loader import SkillBundle, build_skill_bundle
+
+ROOT = Path(__file__).resolve().parents[1]
+DEFAULT_BASELINE = ROOT / "benchmarks" / "baselines" / "runtime_overhead.json"
+SCHEMA_VERSION = 1
+DEFAULT_HISTORY_LENGTHS = (10, 100, 1000)
+DEFAULT_TOOL_COUNTS = (1, 10, 50)
+DEFAULT_SKILL_COUNTS = (0, 10, 100)
+DEFAULT_SAMPLES = 5
+DEFAULT_REGRESSION_THRESHOLD = 0.25
+MESSAGES_PER_TURN = 2
+KIB = 1024
+MS = 1000.0
+TOOL_CALL_PROMPT_MARKER = "[call-tool]"
+REPLY_TEXT = "Acknowledged. " * 8
+
+
+class ScriptedChatModel(BaseChatModel):
+    """Deterministic chat model: one tool call on request, otherwise fixed text.
+
+    When the latest human turn contains ``[call-tool]`` and no tool result has
+    been seen yet, the model calls the first bound tool; every other call
+    returns ``REPLY_TEXT``. No state is kept between calls.
+    """
+
+    tool_name: str = "bench_tool_000"
+
+    @property
+    def _llm_type(self) -> str:
+        """Return model type identifier for LangChain callbacks."""
+        return "lily-benchmark-scripted"
+
+    def bind_tools(self, *_args: object, **_kwargs: object) -> ScriptedChatModel:
+        """Return self; tool schemas do not change scripted output.
+
+        Returns:
+            This model.
+        """
+        return self
+
+    def _generate(
+        self,
+        messages: list[BaseMessage],
+        stop: list[str] | None = None,
+        run_manager: CallbackManagerForLLMRun | None = None,
+        **kwargs: object,
+    ) -> ChatResult:
+        """Return the scripted reply for the current conversation tail.
+
+        Args:
+            messages: Prompt messages for this call.
+            stop: Unused stop sequences.
+            run_manager: Unused callback manager.
+            **kwargs: Unused provider options.
+
+        Returns:
+            One-generation chat result.
+        """
+        del stop, run_manager, kwargs
+        last = messages[-1] if messages else None
+        wants_tool = (
+            last is not None
+            and not isinstance(last, ToolMessage)
+            and TOOL_CALL_PROMPT_MARKER in str(last.content)
+        )
+        if wants_tool:
+            reply = AIMessage(
+                content="",
+                tool_calls=[
+                    {
+                        "name": self.tool_name,
+                        "args": {"text": "ping"},
+                        "id": f"call-{len(messages)}",
+                    }
+                ],
+            )
+        else:
+            reply = AIMessage(content=REPLY_TEXT)
+        return ChatResult(generations=[ChatGeneration(message=reply)])
+
+
+@dataclass(frozen=True)
+class TurnMeasurement:
+    """Aggregated measurements for one sweep point."""
+
+    sweep: str
+    size: int
+    turn_ms: float
+    overhead_ms: float
+    checkpoint_ms: float
+    peak_kib: float
+
+
+def _runtime_config(
+    tool_names: Sequence[str], *, skills_enabled: bool
+) -> RuntimeConfig:
+    """Return a minimal runtime config bound to the generated tools.
+
+    Args:
+        tool_names: Tool ids for the runtime allowlist.
+        skills_enabled: Whether the skills section is enabled.
+
+    Returns:
+        Validated runtime config.
+    """
+    profile = {
+        "provider": "openai",
+        "model": "scripted",
+        "temperature": 0.0,
+        "timeout_seconds": 30,
+    }
+    return RuntimeConfig.model_validate(
+        {
+            "schema_version": 1,
+            "agent": {"name": "lily-bench", "system_prompt": "You are Lily."},
+            "models": {
+                "profiles": {"default": profile, "long_context": profile},
+                "routing": {
+                    "enabled": True,
+                    "default_profile": "default",
+                    "long_context_profile": "long_context",
+                    "complexity_threshold": 50,
+                },
+            },
+            "tools": {"allowlist": list(tool_names)},
+            "policies": {
+                "max_iterations": 50,
+                "max_model_calls": 20,
+                "max_tool_calls": 20,
+                "checkpoint_durability": "sync",
+            },
+            "skills": {"enabled": skills_enabled},
+            "logging": {"level": "WARNING"},
+        }
+    )
+
+
+def _build_tools(count: int) -> list[BaseTool]:
+    """Create ``count`` distinct echo tools.
+
+    Args:
+        count: Number of tools (at least one).
+
+    Returns:
+        Tools named ``bench_tool_000`` onward.
+    """
+
+    def _echo(text: str) -> str:
+        return f"echo: {text}"
+
+    return [
+        StructuredTool.from_function(
+            func=_echo,
+            name=f"bench_tool_{index:03d}",
+            description=f"Echo text back (benchmark tool {index}).",
+        )
+        for index in range(max(count, 1))
+    ]
+
+
+def _build_skills(count: int, root: Path) -> SkillBundle | None:
+    """Write ``count`` skill packages under ``root`` and build their bundle.
+
+    Args:
+        count: Number of skills; ``0`` disables skills.
+        root: Directory receiving one folder per skill.
+
+    Returns:
+        Skill bundle for catalog injection, or ``None`` when ``count`` is 0.
+    """
+    if count == 0:
+        return None
+    for index in range(count):
+        skill_dir = root / f"bench-skill-{index:03d}"
+        skill_dir.mkdir(parents=True, exist_ok=True)
+        (skill_dir / "SKILL.md").write_text(
+            "---\n"
+            f"name: bench-skill-{index:03d}\n"
+            f"description: Benchmark skill {index}. Use when measuring catalog "
+            "injection cost.\n"
+            "---\n\n"
+            f"# Bench skill {index}\n\nBody text.\n",
+            encoding="utf-8",
+        )
+    return build_skill_bundle(
+        SkillsConfig(enabled=True, roots={"repository": [str(root)]}),
+        root,
+    )
+
+
+def _build_runtime(
+    workdir: Path,
+    *,
+    tool_count: int,
+    skill_count: int,
+) -> AgentRuntime:
+    """Build a real runtime over the scripted model in ``workdir``.
+
+    Args:
+        workdir: Scratch directory for checkpoints and skills.
+        tool_count: Number of tools to bind.
+        skill_count: Number of skills in the catalog.
+
+    Returns:
+        Runtime ready for ``run`` calls.
+    """
+    tools = _build_tools(tool_count)
+    model = ScriptedChatModel(tool_name=tools[0].name)
+
+    def _builder(_profile: ModelProfileConfig) -> BaseChatModel:
+        return model
+
+    builders: dict[ModelProvider, ModelBuilder] = {
+        ModelProvider.OPENAI: _builder,
+        ModelProvider.OLLAMA: _builder,
+    }
+    skill_bundle = _build_skills(skill_count, workdir / "skills")
+    return AgentRuntime(
+        config=_runtime_config(
+            [tool.name for tool in tools],
+            skills_enabled=skill_bundle is not None,
+        ),
+        tools=tools,
+        model_factory=ModelFactory(builders=builders, preloaders={}),
+        checkpoint_db_path=workdir / "checkpoints.sqlite3",
+        skill_bundle=skill_bundle,
+    )
+
+
+def _overhead_seconds(result: AgentRunResult) -> float:
+    """Return turn time not spent in the model or tools.
+
+    Args:
+        result: Finished run result with timings.
+
+    Returns:
+        Lily-attributable seconds for the turn.
+    """
+    timings = result.timings
+    return max(timings.total_seconds - timings.model_seconds - timings.tool_seconds, 0)
+
+
+def _peak_kib(run_turn: Callable[[], AgentRunResult]) -> float:
+    """Return peak traced Python allocations while one turn runs.
+
+    Args:
+        run_turn: Callable executing exactly one turn.
+
+    Returns:
+        Peak allocation in KiB.
+    """
+    tracemalloc.start()
+    try:
+        run_turn()
+        _current, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return peak / KIB
+
+
+def _measure(
+    sweep: str,
+    size: int,
+    run_turn: Callable[[], AgentRunResult],
+    samples: int,
+) -> TurnMeasurement:
+    """Time ``samples`` turns and one traced turn for a sweep point.
+
+    Args:
+        sweep: Sweep name.
+        size: Sweep parameter value.
+        run_turn: Callable executing exactly one turn.
+        samples: Number of timed turns.
+
+    Returns:
+        Median measurements for the point.
+    """
+    results = [run_turn() for _ in range(samples)]
+    return TurnMeasurement(
+        sweep=sweep,
+        size=size,
+        turn_ms=statistics.median(r.timings.total_seconds for r in results) * MS,
+        overhead_ms=statistics.median(_overhead_seconds(r) for r in results) * MS,
+        checkpoint_ms=statistics.median(
+            r.timings.checkpoint_get_seconds + r.timings.checkpoint_put_seconds
+            for r in results
+        )
+        * MS,
+        peak_kib=_peak_kib(run_turn),
+    )
+
+
+def _history_sweep(lengths: Sequence[int], samples: int) -> list[TurnMeasurement]:
+    """Measure turns on one conversation as its history grows.
+
+    Args:
+        lengths: History lengths (messages) at which to measure.
+        samples: Timed turns per point.
+
+    Returns:
+        One measurement per length.
+    """
+    measurements: list[TurnMeasurement] = []
+    with tempfile.TemporaryDirectory() as scratch:
+        runtime = _build_runtime(Path(scratch), tool_count=1, skill_count=0)
+        with closing(runtime):
+            history = 0
+            for target in sorted(lengths):
+                while history < target:
+                    runtime.run("seed turn", conversation_id="bench-history")
+                    history += MESSAGES_PER_TURN
+                measurements.append(
+                    _measure(
+                        "history",
+                        target,
+                        lambda: runtime.run(
+                            "measured turn", conversation_id="bench-history"
+                        ),
+                        samples,
+                    )
+                )
+                history += MESSAGES_PER_TURN * (samples + 1)
+    return measurements
+
+
+def _sized_point(sweep: str, size: int, samples: int) -> TurnMeasurement:
+    """Measure one tool-calling turn per fresh conversation for one size.
+
+    Args:
+        sweep: ``tools`` or ``skills``.
+        size: Tool or skill count.
+        samples: Timed turns.
+
+    Returns:
+        Measurement for the point.
+    """
+    with tempfile.TemporaryDirectory() as scratch:
+        runtime = _build_runtime(
+            Path(scratch),
+            tool_count=size if sweep == "tools" else 1,
+            skill_count=size if sweep == "skills" else 0,
+        )
+        turns = iter(range(sys.maxsize))
+        with closing(runtime):
+            runtime.warmup()
+            return _measure(
+                sweep,
+                size,
+                lambda: runtime.run(
+                    f"measured turn {TOOL_CALL_PROMPT_MARKER}",
+                    conversation_id=f"bench-{sweep}-{next(turns)}",
+                ),
+                samples,
+            )
+
+
+def _report(measurements: Sequence[TurnMeasurement]) -> dict[str, Any]:
+    """Build the JSON report for a benchmark run.
+
+    Args:
+        measurements: All sweep measurements.
+
+    Returns:
+        JSON-serializable report.
+    """
+    return {
+        "schema_version": SCHEMA_VERSION,
+        "created_at": datetime.now(tz=UTC).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "measurements": [asdict(item) for item in measurements],
+    }
+
+
+def _baseline_index(baseline: dict[str, Any]) -> dict[tuple[str, int], dict[str, Any]]:
+    """Index baseline measurements by sweep point.
+
+    Args:
+        baseline: Previously saved report.
+
+    Returns:
+        Mapping of ``(sweep, size)`` to measurement dicts.
+    """
+    return {
+        (str(item["sweep"]), int(item["size"])): item
+        for item in baseline.get("measurements", [])
+    }
+
+
+def _delta(current: float, previous: float | None) -> float | None:
+    """Return relative change against a baseline value.
+
+    Args:
+        current: Current value.
+        previous: Baseline value, if any.
+
+    Returns:
+        Fractional change, or ``None`` without a usable baseline.
+    """
+    if previous is None or previous <= 0:
+        return None
+    return (current - previous) / previous
+
+
+def _format_delta(delta: float | None, threshold: float) -> str:
+    """Render a delta cell, highlighting regressions past ``threshold``.
+
+    Args:
+        delta: Fractional change or ``None``.
+        threshold: Regression threshold as a fraction.
+
+    Returns:
+        Rich markup string.
+    """
+    if delta is None:
+        return "-"
+    text = f"{delta:+.0%}"
+    return f"[red]{text}[/red]" if delta > threshold else text
+
+
+def _render(
+    console: Console,
+    measurements: Sequence[TurnMeasurement],
+    baseline: dict[str, Any] | None,
+    threshold: float,
+) -> list[TurnMeasurement]:
+    """Print results and return points whose overhead regressed.
+
+    Args:
+        console: Output console.
+        measurements: Current measurements.
+        baseline: Optional baseline report.
+        threshold: Regression threshold as a fraction.
+
+    Returns:
+        Measurements whose overhead exceeds the baseline by more than
+        ``threshold``.
+    """
+    index = _baseline_index(baseline) if baseline is not None else {}
+    table = Table(title="Lily runtime overhead (scripted model)")
+    for column in ("Sweep", "Size", "Turn ms", "Overhead ms", "Checkpoint ms"):
+        table.add_column(column, justify="right")
+    table.add_column("Peak KiB", justify="right")
+    table.add_column("vs baseline", justify="right")
+    regressions: list[TurnMeasurement] = []
+    for item in measurements:
+        previous = index.get((item.sweep, item.size))
+        delta = _delta(
+            item.overhead_ms,
+            float(previous["overhead_ms"]) if previous is not None else None,
+        )
+        if delta is not None and delta > threshold:
+            regressions.append(item)
+        table.add_row(
+            item.sweep,
+            str(item.size),
+            f"{item.turn_ms:.2f}",
+            f"{item.overhead_ms:.2f}",
+            f"{item.checkpoint_ms:.2f}",
+            f"{item.peak_kib:.0f}",
+            _format_delta(delta, threshold),
+        )
+    console.print(table)
+    return regressions
+
+
+def _parse_sizes(raw: str) -> tuple[int, ...]:
+    """Parse a comma-separated list of non-negative integers.
+
+    Args:
+        raw: CLI value such as ``"10,100,1000"``.
+
+    Returns:
+        Parsed sizes.
+    """
+    return tuple(int(part) for part in raw.split(",") if part.strip())
+
+
+def parse_args(argv: Sequence[str] | None = None) -> argparse.Namespace:
+    """Parse benchmark CLI arguments.
+
+    Args:
+        argv: Optional argument list (defaults to ``sys.argv``).
+
+    Returns:
+        Parsed namespace.
+    """
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--history",
+        type=_parse_sizes,
+        default=DEFAULT_HISTORY_LENGTHS,
+        help="Comma-separated history lengths in messages (default: 10,100,1000).",
+    )
+    parser.add_argument(
+        "--tools",
+        type=_parse_sizes,
+        default=DEFAULT_TOOL_COUNTS,
+        help="Comma-separated tool counts (default: 1,10,50).",
+    )
+    parser.add_argument(
+        "--skills",
+        type=_parse_sizes,
+        default=DEFAULT_SKILL_COUNTS,
+        help="Comma-separated skill counts (default: 0,10,100).",
+    )
+    parser.add_argument(
+        "--samples",
+        type=int,
+        default=DEFAULT_SAMPLES,
+        help="Timed turns per sweep point; medians are reported.",
+    )
+    parser.add_argument(
+        "--output",
+        type=Path,
+        default=None,
+        help="Write this run's JSON report to the given path.",
+    )
+    parser.add_argument(
+        "--baseline",
+        type=Path,
+        default=DEFAULT_BASELINE,
+        help="Compare overhead against a saved JSON report (default: committed).",
+    )
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=DEFAULT_REGRESSION_THRESHOLD,
+        help="Fractional overhead increase flagged as a regression (default 0.25).",
+    )
+    parser.add_argument(
+        "--fail-on-regression",
+        action="store_true",
+        help="Exit 1 when any point regresses past --threshold.",
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv: Sequence[str] | None = None) -> int:
+    """Run all sweeps, print the table, and handle baseline files.
+
+    Args:
+        argv: Optional argument list (defaults to ``sys.argv``).
+
+    Returns:
+        Process exit code.
+    """
+    args = parse_args(argv)
+    console = Console()
+    started = time.perf_counter()
+    measurements = [
+        *_history_sweep(args.history, args.samples),
+        *(_sized_point("tools", size, args.samples) for size in args.tools),
+        *(_sized_point("skills", size, args.samples) for size in args.skills),
+    ]
+    report = _report(measurements)
+    baseline = None
+    if args.baseline is not None and args.baseline.is_file():
+        baseline = json.loads(args.baseline.read_text(encoding="utf-8"))
+    regressions = _render(console, measurements, baseline, args.threshold)
+    console.print(f"Finished in {time.perf_counter() - started:.1f}s")
+    if args.output is not None:
+        args.output.parent.mkdir(parents=True, exist_ok=True)
+        args.output.write_text(json.dumps(report, indent=2) + "\n", encoding="utf-8")
+        console.print(f"Wrote {args.output}")
+    if regressions:
+        points = ", ".join(f"{item.sweep}={item.size}" for item in regressions)
+        console.print(f"[yellow]Overhead regressions:[/yellow] {points}")
+        if args.fail_on_regression:
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -2,21 +2,29 @@
 
 from __future__ import annotations
 
-from collections.abc import Mapping
+from collections.abc import AsyncIterator, Mapping
 from pathlib import Path
 
 from langchain_core.tools import BaseTool, tool
 
 from lily.runtime.agent_identity_context import load_agent_identity_context
-from lily.runtime.agent_runtime import AgentRunResult, AgentRuntime
+from lily.runtime.agent_run_result import (
+    AgentRunResult,
+    AgentStreamEvent,
+    TokenCallback,
+)
+from lily.runtime.agent_runtime import AgentRuntime
 from lily.runtime.config_loader import ConfigLoadError, load_runtime_config
 from lily.runtime.config_schema import McpServerConfig, RuntimeConfig
 from lily.runtime.logging_setup import (
     clear_skill_telemetry_handlers,
     configure_lily_package_logging,
+    configure_run_timings_handler,
     configure_skill_telemetry_handlers,
+    resolve_run_timings_log_path,
     resolve_skill_telemetry_log_path,
 )
+from lily.runtime.run_cancellation import RunCancellation
 from lily.runtime.skill_loader import SkillBundle, build_skill_bundle
 from lily.runtime.skill_retrieve_tool import SKILL_RETRIEVE_TOOL_ID
 from lily.runtime.tool_catalog import load_tool_catalog
@@ -122,6 +130,12 @@ class LilySupervisor:
             )
         else:
             clear_skill_telemetry_handlers()
+        configure_run_timings_handler(
+            resolve_run_timings_log_path(
+                config_path,
+                relative_override=config.logging.run_timings_log,
+            )
+        )
         resolved_tools = cls._load_tools_from_catalog(
             resolved_tools_config_path,
             mcp_servers=config.mcp_servers,
@@ -274,18 +288,133 @@ class LilySupervisor:
             if cls._resolved_tool_name(tool) != SKILL_RETRIEVE_TOOL_ID
         ]
 
+    def warmup(self, *, preload_models: bool = False) -> None:
+        """Build runtime resources on the runtime loop before the first prompt.
+
+        Args:
+            preload_models: Also preload resident-weight model profiles (Ollama).
+        """
+        self._runtime.warmup(preload_models=preload_models)
+
+    async def awarmup(self, *, preload_models: bool = False) -> None:
+        """Build runtime resources on the caller's event loop.
+
+        Args:
+            preload_models: Also preload resident-weight model profiles (Ollama).
+        """
+        await self._runtime.awarmup(preload_models=preload_models)
+
     def run_prompt(
         self,
         prompt: str,
         conversation_id: str | None = None,
+        *,
+        timeout: float | None = None,
+        cancellation: RunCancellation | None = None,
     ) -> AgentRunResult:
         """Execute one prompt through runtime and return normalized result.
 
         Args:
             prompt: Prompt text to execute.
             conversation_id: Optional conversation/thread id for resume continuity.
+            timeout: Seconds the run may take; interrupted runs return with
+                ``status="timed_out"``.
+            cancellation: Optional handle that interrupts the run when cancelled.
+
+        Returns:
+            Normalized run result contract.
+        """
+        return self._runtime.run(
+            prompt,
+            conversation_id=conversation_id,
+            timeout=timeout,
+            cancellation=cancellation,
+        )
+
+    async def arun_prompt(
+        self,
+        prompt: str,
+        conversation_id: str | None = None,
+        *,
+        timeout: float | None = None,
+        cancellation: RunCancellation | None = None,
+    ) -> AgentRunResult:
+        """Execute one prompt on the caller's event loop without blocking a thread.
+
+        Args:
+            prompt: Prompt text to execute.
+            conversation_id: Optional conversation/thread id for resume continuity.
+            timeout: Seconds the run may take; interrupted runs return with
+                ``status="timed_out"``.
+            cancellation: Optional handle that interrupts the run when cancelled.
+
+        Returns:
+            Normalized run result contract.
+        """
+        return await self._runtime.arun(
+            prompt,
+            conversation_id=conversation_id,
+            timeout=timeout,
+            cancellation=cancellation,
+        )
+
+    def astream_prompt(
+        self,
+        prompt: str,
+        conversation_id: str | None = None,
+        *,
+        timeout: float | None = None,
+        cancellation: RunCancellation | None = None,
+    ) -> AsyncIterator[AgentStreamEvent]:
+        """Stream reply tokens for one prompt on the caller's event loop.
+
+        Args:
+            prompt: Prompt text to execute.
+            conversation_id: Optional conversation/thread id for resume continuity.
+            timeout: Seconds the run may take; interrupted runs return with
+                ``status="timed_out"``.
+            cancellation: Optional handle that interrupts the run when cancelled.
+
+        Returns:
+            Async iterator of token events followed by one result event.
+        """
+        return self._runtime.astream(
+            prompt,
+            conversation_id=conversation_id,
+            timeout=timeout,
+            cancellation=cancellation,
+        )
+
+    def run_prompt_stream(
+        self,
+        prompt: str,
+        conversation_id: str | None = None,
+        *,
+        on_token: TokenCallback,
+        timeout: float | None = None,
+        cancellation: RunCancellation | None = None,
+    ) -> AgentRunResult:
+        """Execute one prompt, forwarding reply tokens as they arrive.
+
+        Args:
+            prompt: Prompt text to execute.
+            conversation_id: Optional conversation/thread id for resume continuity.
+            on_token: Callback receiving each reply token.
+            timeout: Seconds the run may take; interrupted runs return with
+                ``status="timed_out"``.
+            cancellation: Optional handle that interrupts the run when cancelled.
 
         Returns:
             Normalized run result contract.
         """
-        return self._runtime.run(prompt, conversation_id=conversation_id)
+        return self._runtime.run_stream(
+            prompt,
+            conversation_id=conversation_id,
+            on_token=on_token,
+            timeout=timeout,
+            cancellation=cancellation,
+        )
+
+    def close(self) -> None:
+        """Release runtime checkpoint resources and the runtime loop thread."""
+        self._runtime.close()
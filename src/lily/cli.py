@@ -3,33 +3,46 @@
 
 from __future__ import annotations
 
+from functools import partial
 from pathlib import Path
-from typing import Annotated
+from typing import TYPE_CHECKING, Annotated
 
 import typer
 from rich.console import Console
 from rich.panel import Panel
 from rich.table import Table
 
-from lily.agents.lily_supervisor import LilySupervisor
+from lily.cli_maintenance import maintenance_app
 from lily.cli_options import OverrideOption
 from lily.cli_skills import skills_app
+from lily.daemon.client import DaemonClient, DaemonClientError, read_daemon_token
+from lily.daemon.protocol import (
+    DEFAULT_DAEMON_HOST,
+    DEFAULT_DAEMON_PORT,
+    DEFAULT_DAEMON_TOKEN_PATH,
+    DEFAULT_DAEMON_URL,
+    DaemonRunRequest,
+    DaemonSupervisorKey,
+)
 from lily.runtime.agent_locator import AgentLocatorError, resolve_agent_workspace
-from lily.runtime.agent_runtime import AgentRuntimeError
 from lily.runtime.config_loader import ConfigLoadError
 from lily.runtime.conversation_sessions import (
     ConversationSessionStore,
     ConversationSessionStoreError,
     default_sessions_db_path,
 )
-from lily.runtime.model_factory import ModelFactoryError
-from lily.runtime.tool_catalog import ToolCatalogLoadError
-from lily.runtime.tool_registry import ToolRegistryError
-from lily.runtime.tool_resolvers import ToolResolverError
-from lily.ui.app import LilyTuiApp
+
+if TYPE_CHECKING:
+    from lily.runtime.agent_run_result import (
+        AgentRunResult,
+        RunBudgetReport,
+        RunStatus,
+    )
+    from lily.runtime.run_timings import RunTimings
 
 app = typer.Typer(no_args_is_help=True)
 app.add_typer(skills_app, name="skills")
+app.add_typer(maintenance_app, name="maintenance")
 _console = Console()
 PromptOption = Annotated[
     str,
@@ -81,12 +94,113 @@ ShowSkillTelemetryOption = Annotated[
         ),
     ),
 ]
+StreamOption = Annotated[
+    bool,
+    typer.Option(
+        "--stream",
+        help="Print reply tokens as they arrive instead of one final panel.",
+    ),
+]
+ShowTimingsOption = Annotated[
+    bool,
+    typer.Option(
+        "--timings",
+        help="Add the per-run latency breakdown (model, tools, summarization, "
+        "checkpoints) to the Run Summary table.",
+    ),
+]
+ViaDaemonOption = Annotated[
+    bool,
+    typer.Option(
+        "--via-daemon",
+        help="Send the prompt to a running `lily serve` daemon instead of "
+        "building the runtime in this process.",
+    ),
+]
+WarmupOption = Annotated[
+    bool,
+    typer.Option(
+        "--warmup",
+        help="Build models, agent graph and checkpointer in the background at "
+        "launch so the first prompt is not slower than later ones.",
+    ),
+]
+PreloadModelsOption = Annotated[
+    bool,
+    typer.Option(
+        "--preload-models",
+        help="Also ask Ollama to load every configured profile and keep it "
+        "resident; implies --warmup.",
+    ),
+]
+RunTimeoutOption = Annotated[
+    float | None,
+    typer.Option(
+        "--timeout",
+        min=0.001,
+        help="Stop the run after this many seconds; the conversation keeps its "
+        "last checkpoint.",
+    ),
+]
+DaemonUrlOption = Annotated[
+    str,
+    typer.Option("--daemon-url", help="Base URL of the `lily serve` daemon."),
+]
+DaemonTokenFileOption = Annotated[
+    Path,
+    typer.Option(
+        "--daemon-token-file",
+        help="Owner-only file holding the `lily serve` access token.",
+    ),
+]
 
 
 class ConversationResolutionError(ValueError):
     """Raised when attach mode selection or resolution fails."""
 
 
+_SETUP_ERRORS: tuple[type[Exception], ...] = (
+    ConfigLoadError,
+    AgentLocatorError,
+    ConversationResolutionError,
+    ConversationSessionStoreError,
+)
+_RUN_SETUP_ERRORS: tuple[type[Exception], ...] = (*_SETUP_ERRORS, DaemonClientError)
+
+
+def _runtime_build_errors() -> tuple[type[Exception], ...]:
+    """Return error types raised while building or running a local runtime.
+
+    The agent stack (LangChain, LangGraph, MCP adapters) is imported here instead
+    of at module load so commands that never build a runtime start fast.
+
+    Returns:
+        Runtime build/run error types rendered as CLI error panels.
+    """
+    from lily.runtime.agent_runtime import AgentRuntimeError  # noqa: PLC0415
+    from lily.runtime.model_factory import ModelFactoryError  # noqa: PLC0415
+    from lily.runtime.tool_catalog import ToolCatalogLoadError  # noqa: PLC0415
+    from lily.runtime.tool_registry import ToolRegistryError  # noqa: PLC0415
+    from lily.runtime.tool_resolvers import ToolResolverError  # noqa: PLC0415
+
+    return (
+        ToolRegistryError,
+        ToolCatalogLoadError,
+        ToolResolverError,
+        ModelFactoryError,
+        AgentRuntimeError,
+    )
+
+
+def _print_error_panel(exc: Exception) -> None:
+    """Render one CLI error panel.
+
+    Args:
+        exc: Error to render.
+    """
+    _console.print(Panel.fit(str(exc), title="Lily Error", border_style="red"))
+
+
 def _resolve_conversation_id(
     conversation_id: str | None,
     last_conversation: bool,
@@ -156,6 +270,9 @@ def _print_success_panel(
     final_output: str,
     message_count: int,
     conversation_id: str,
+    timings: RunTimings | None = None,
+    budget: RunBudgetReport | None = None,
+    status: RunStatus = "completed",
 ) -> None:
     """Render successful CLI output with rich primitives.
 
@@ -163,18 +280,210 @@ def _print_success_panel(
         final_output: Final assistant text output.
         message_count: Number of messages in the runtime transcript.
         conversation_id: Active conversation id used for this run.
+        timings: Optional latency breakdown to include in the summary.
+        budget: Optional budget spend and remaining budget of the run.
+        status: Run status; interrupted runs get a yellow panel and status row.
+    """
+    border_style = "green" if status == "completed" else "yellow"
+    _console.print(Panel.fit(final_output, title="Lily", border_style=border_style))
+    _print_run_summary(message_count, conversation_id, timings, budget, status)
+
+
+def _print_stream_token(token: str) -> None:
+    """Write one streamed reply token without a trailing newline.
+
+    Args:
+        token: Reply token text.
+    """
+    _console.print(token, end="", markup=False, highlight=False, soft_wrap=True)
+
+
+def _add_timing_rows(table: Table, timings: RunTimings) -> None:
+    """Append latency breakdown rows to the run summary table.
+
+    Args:
+        table: Run summary table.
+        timings: Latency breakdown of the run.
     """
-    _console.print(Panel.fit(final_output, title="Lily", border_style="green"))
+    table.add_row("Total time", f"{timings.total_seconds:.3f}s")
+    per_profile: dict[str, list[float]] = {}
+    unsuccessful: dict[str, int] = {}
+    for call in timings.model_calls:
+        per_profile.setdefault(call.profile, []).append(call.seconds)
+        if call.outcome != "ok":
+            unsuccessful[call.profile] = unsuccessful.get(call.profile, 0) + 1
+    for profile, durations in per_profile.items():
+        summary = f"{sum(durations):.3f}s in {len(durations)} call(s)"
+        if profile in unsuccessful:
+            summary += f", {unsuccessful[profile]} failed or cancelled"
+        table.add_row(f"Model ({profile})", summary)
+    if timings.model_queue_seconds:
+        table.add_row("Model queue wait", f"{timings.model_queue_seconds:.3f}s")
+    lookups = timings.response_cache_hits + timings.response_cache_misses
+    if lookups:
+        table.add_row(
+            "Response cache", f"{timings.response_cache_hits}/{lookups} hit(s)"
+        )
+    if timings.system_prompt_sha256 is not None:
+        table.add_row(
+            "System prompt",
+            f"{timings.system_prompt_tokens} tokens "
+            f"(sha256 {timings.system_prompt_sha256[:12]}), "
+            f"{timings.cached_input_tokens} input tokens from provider cache",
+        )
+    per_tool: dict[str, list[float]] = {}
+    for tool_call in timings.tool_calls:
+        per_tool.setdefault(tool_call.name, []).append(tool_call.seconds)
+    for name, durations in per_tool.items():
+        table.add_row(
+            f"Tool ({name})", f"{sum(durations):.3f}s in {len(durations)} call(s)"
+        )
+    table.add_row("Summarization", f"{timings.summarization_seconds:.3f}s")
+    table.add_row(
+        "Checkpoint reads",
+        f"{timings.checkpoint_get_seconds:.3f}s in {timings.checkpoint_gets} call(s)",
+    )
+    table.add_row(
+        "Checkpoint writes",
+        f"{timings.checkpoint_put_seconds:.3f}s in {timings.checkpoint_puts} call(s)",
+    )
+
 
+def _add_budget_rows(table: Table, budget: RunBudgetReport) -> None:
+    """Append budget spend and remaining rows to the run summary table.
+
+    Args:
+        table: Run summary table.
+        budget: Budget report of the run.
+    """
+    for scope, spent, remaining in (
+        ("Run", budget.run_spent, budget.run_remaining),
+        ("Conversation", budget.conversation_spent, budget.conversation_remaining),
+    ):
+        summary = (
+            f"{spent.input_tokens} in / {spent.output_tokens} out tokens, "
+            f"cost {spent.cost:.4f}"
+        )
+        left = [
+            f"{value:g} {name.replace('_', ' ')}"
+            for name, value in remaining.model_dump().items()
+            if value is not None
+        ]
+        if left:
+            summary += f" ({', '.join(left)} left)"
+        table.add_row(f"{scope} budget", summary)
+    if budget.exhausted:
+        table.add_row("Budget exhausted", ", ".join(budget.exhausted))
+
+
+def _print_run_summary(
+    message_count: int,
+    conversation_id: str,
+    timings: RunTimings | None = None,
+    budget: RunBudgetReport | None = None,
+    status: RunStatus = "completed",
+) -> None:
+    """Render the run summary table and active conversation id.
+
+    Args:
+        message_count: Number of messages in the runtime transcript.
+        conversation_id: Active conversation id used for this run.
+        timings: Optional latency breakdown to include in the table.
+        budget: Optional budget spend and remaining budget of the run.
+        status: Run status; shown when the run was interrupted.
+    """
     table = Table(title="Run Summary")
     table.add_column("Field")
     table.add_column("Value")
+    if status != "completed":
+        table.add_row("Status", status.replace("_", " "))
     table.add_row("Messages", str(message_count))
     table.add_row("Conversation ID", conversation_id)
+    if timings is not None:
+        _add_timing_rows(table, timings)
+    if budget is not None:
+        _add_budget_rows(table, budget)
     _console.print(table)
     _console.print(f"Active conversation id: {conversation_id}")
 
 
+def _daemon_supervisor_key(
+    config_path: Path,
+    override: Path | None,
+    agent_workspace_dir: Path | None,
+) -> DaemonSupervisorKey:
+    """Build the daemon supervisor key from locally resolved runtime paths.
+
+    Args:
+        config_path: Resolved base runtime config path.
+        override: Optional override runtime config path.
+        agent_workspace_dir: Optional named-agent workspace directory.
+
+    Returns:
+        Key with absolute paths so the daemon is independent of the client cwd.
+    """
+    return DaemonSupervisorKey(
+        config_path=str(config_path.resolve()),
+        override_config_path=str(override.resolve()) if override else None,
+        agent_workspace_dir=(
+            str(agent_workspace_dir.resolve()) if agent_workspace_dir else None
+        ),
+    )
+
+
+def _run_local_prompt(
+    prompt: str,
+    *,
+    config_path: Path,
+    override: Path | None,
+    agent_workspace_dir: Path | None,
+    conversation_id: str,
+    show_skill_telemetry: bool,
+    stream: bool,
+    timeout: float | None,
+) -> AgentRunResult:
+    """Build a supervisor in this process and run one prompt.
+
+    Args:
+        prompt: Prompt text to execute.
+        config_path: Resolved base runtime config path.
+        override: Optional override runtime config path.
+        agent_workspace_dir: Optional named-agent workspace directory.
+        conversation_id: Resolved active conversation id.
+        show_skill_telemetry: Mirror skill F7 JSON telemetry to stderr.
+        stream: Print reply tokens as they arrive.
+        timeout: Optional run deadline in seconds.
+
+    Returns:
+        Normalized run result.
+
+    Raises:
+        Exit: Raised with non-zero code when the runtime cannot be built.
+    """
+    from lily.agents.lily_supervisor import LilySupervisor  # noqa: PLC0415
+
+    try:
+        supervisor = LilySupervisor.from_config_paths(
+            config_path,
+            override,
+            skill_telemetry_echo=show_skill_telemetry,
+            agent_workspace_dir=agent_workspace_dir,
+        )
+        if stream:
+            return supervisor.run_prompt_stream(
+                prompt,
+                conversation_id=conversation_id,
+                on_token=_print_stream_token,
+                timeout=timeout,
+            )
+        return supervisor.run_prompt(
+            prompt, conversation_id=conversation_id, timeout=timeout
+        )
+    except _runtime_build_errors() as exc:
+        _print_error_panel(exc)
+        raise typer.Exit(code=1) from exc
+
+
 @app.callback()
 def app_callback() -> None:
     """Root callback to keep explicit subcommand invocation (`lily run`)."""
@@ -189,6 +498,12 @@ def run_command(
     conversation_id: ConversationIdOption = None,
     last_conversation: LastConversationOption = False,
     show_skill_telemetry: ShowSkillTelemetryOption = False,
+    stream: StreamOption = False,
+    show_timings: ShowTimingsOption = False,
+    timeout: RunTimeoutOption = None,
+    via_daemon: ViaDaemonOption = False,
+    daemon_url: DaemonUrlOption = DEFAULT_DAEMON_URL,
+    daemon_token_file: DaemonTokenFileOption = DEFAULT_DAEMON_TOKEN_PATH,
 ) -> None:
     """Run a single prompt using config-driven Lily supervisor runtime.
 
@@ -200,6 +515,12 @@ def run_command(
         conversation_id: Optional explicit conversation id attach target.
         last_conversation: Whether to attach to most-recent conversation.
         show_skill_telemetry: Mirror skill F7 JSON telemetry to stderr.
+        stream: Print reply tokens as they arrive.
+        show_timings: Add the latency breakdown to the run summary.
+        timeout: Optional run deadline in seconds.
+        via_daemon: Execute on a running `lily serve` daemon.
+        daemon_url: Base URL of the daemon used with ``via_daemon``.
+        daemon_token_file: Token file written by the daemon, for ``via_daemon``.
 
     Raises:
         Exit: Raised with non-zero code when runtime/config fails.
@@ -218,34 +539,58 @@ def run_command(
             last_conversation=last_conversation,
             workspace_root=session_workspace_root,
         )
-        supervisor = LilySupervisor.from_config_paths(
-            resolved_config_path,
-            override,
-            skill_telemetry_echo=show_skill_telemetry,
-            agent_workspace_dir=agent_workspace_dir,
-        )
-        result = supervisor.run_prompt(
-            prompt,
-            conversation_id=resolved_conversation_id,
-        )
-    except (
-        ConfigLoadError,
-        AgentLocatorError,
-        ConversationResolutionError,
-        ConversationSessionStoreError,
-        ToolRegistryError,
-        ToolCatalogLoadError,
-        ToolResolverError,
-        ModelFactoryError,
-        AgentRuntimeError,
-    ) as exc:
-        _console.print(Panel.fit(str(exc), title="Lily Error", border_style="red"))
+        if via_daemon:
+            client = DaemonClient(
+                daemon_url,
+                token=read_daemon_token(daemon_token_file),
+            )
+            result = client.run_prompt(
+                DaemonRunRequest(
+                    prompt=prompt,
+                    conversation_id=resolved_conversation_id,
+                    supervisor=_daemon_supervisor_key(
+                        resolved_config_path,
+                        override,
+                        agent_workspace_dir,
+                    ),
+                    stream=stream,
+                    timeout_seconds=timeout,
+                ),
+                on_token=_print_stream_token if stream else None,
+            )
+        else:
+            result = _run_local_prompt(
+                prompt,
+                config_path=resolved_config_path,
+                override=override,
+                agent_workspace_dir=agent_workspace_dir,
+                conversation_id=resolved_conversation_id,
+                show_skill_telemetry=show_skill_telemetry,
+                stream=stream,
+                timeout=timeout,
+            )
+    except _RUN_SETUP_ERRORS as exc:
+        _print_error_panel(exc)
         raise typer.Exit(code=1) from exc
 
+    timings = result.timings if show_timings else None
+    if stream:
+        _console.print()
+        _print_run_summary(
+            result.message_count,
+            resolved_conversation_id,
+            timings,
+            result.budget,
+            result.status,
+        )
+        return
     _print_success_panel(
         final_output=result.final_output,
         message_count=result.message_count,
         conversation_id=resolved_conversation_id,
+        timings=timings,
+        budget=result.budget,
+        status=result.status,
     )
 
 
@@ -257,6 +602,8 @@ def tui_command(
     conversation_id: ConversationIdOption = None,
     last_conversation: LastConversationOption = False,
     show_skill_telemetry: ShowSkillTelemetryOption = False,
+    warmup: WarmupOption = False,
+    preload_models: PreloadModelsOption = False,
 ) -> None:
     """Launch Textual TUI using config-driven Lily supervisor runtime.
 
@@ -267,10 +614,14 @@ def tui_command(
         conversation_id: Optional explicit conversation id attach target.
         last_conversation: Whether to attach to most-recent conversation.
         show_skill_telemetry: Mirror skill F7 JSON telemetry to stderr.
+        warmup: Build the runtime in the background while the TUI starts.
+        preload_models: Also preload Ollama profiles; implies ``warmup``.
 
     Raises:
         Exit: Raised with non-zero code when runtime/config fails.
     """
+    from lily.ui.app import LilyTuiApp  # noqa: PLC0415
+
     try:
         (
             resolved_config_path,
@@ -291,20 +642,127 @@ def tui_command(
             conversation_id=resolved_conversation_id,
             skill_telemetry_echo=show_skill_telemetry,
             agent_workspace_dir=agent_workspace_dir,
+            warmup=warmup,
+            preload_models=preload_models,
         )
         app.run()
-    except (
-        ConfigLoadError,
-        AgentLocatorError,
-        ConversationResolutionError,
-        ConversationSessionStoreError,
-        ToolRegistryError,
-        ToolCatalogLoadError,
-        ToolResolverError,
-        ModelFactoryError,
-        AgentRuntimeError,
-    ) as exc:
-        _console.print(Panel.fit(str(exc), title="Lily Error", border_style="red"))
+    except _SETUP_ERRORS + _runtime_build_errors() as exc:
+        _print_error_panel(exc)
         raise typer.Exit(code=1) from exc
 
     _console.print(f"Active conversation id: {resolved_conversation_id}")
+
+
+@app.command("serve")
+def serve_command(
+    config: RunConfigOption = None,
+    agent: AgentOption = None,
+    override: OverrideOption = None,
+    host: Annotated[
+        str,
+        typer.Option("--host", help="Interface to listen on; keep this on loopback."),
+    ] = DEFAULT_DAEMON_HOST,
+    port: Annotated[
+        int,
+        typer.Option("--port", min=0, max=65535, help="TCP port to listen on."),
+    ] = DEFAULT_DAEMON_PORT,
+    max_in_flight: Annotated[
+        int,
+        typer.Option("--max-in-flight", min=1, help="Prompts executing at once."),
+    ] = 4,
+    max_queue: Annotated[
+        int,
+        typer.Option(
+            "--max-queue",
+            min=0,
+            help="Prompts allowed to wait for a slot before new ones get HTTP 503.",
+        ),
+    ] = 16,
+    allow_config: Annotated[
+        list[Path] | None,
+        typer.Option(
+            "--allow-config",
+            help="Extra runtime config clients may run; repeat for several.",
+        ),
+    ] = None,
+    daemon_token_file: DaemonTokenFileOption = DEFAULT_DAEMON_TOKEN_PATH,
+    show_skill_telemetry: ShowSkillTelemetryOption = False,
+    warmup: WarmupOption = False,
+    preload_models: PreloadModelsOption = False,
+) -> None:
+    """Serve prompts from warm supervisors for `lily run --via-daemon` clients.
+
+    The selected config is built before the server starts listening; configs added
+    with ``--allow-config`` are built on first use and then kept warm. Requests for
+    any other config are refused, and each request must carry the access token
+    written to ``daemon_token_file``.
+
+    Args:
+        config: Optional explicit base runtime config path to preload.
+        agent: Optional named-agent identifier to preload.
+        override: Optional override runtime config path.
+        host: Interface to listen on.
+        port: TCP port to listen on.
+        max_in_flight: Maximum prompts executing concurrently.
+        max_queue: Maximum prompts waiting for an execution slot.
+        allow_config: Extra base runtime configs clients may run.
+        daemon_token_file: Where to write the owner-only client access token.
+        show_skill_telemetry: Mirror skill F7 JSON telemetry to stderr.
+        warmup: Compile the preloaded config's agent in the background at launch.
+        preload_models: Also preload Ollama profiles; implies ``warmup``.
+
+    Raises:
+        Exit: Raised with non-zero code when runtime/config fails.
+    """
+    from lily.daemon.server import (  # noqa: PLC0415
+        LilyDaemon,
+        build_supervisor,
+        create_daemon_server,
+        write_daemon_token,
+    )
+
+    try:
+        resolved_config_path, _, agent_workspace_dir = _resolve_runtime_paths(
+            agent=agent,
+            config=config,
+        )
+    except _SETUP_ERRORS as exc:
+        _print_error_panel(exc)
+        raise typer.Exit(code=1) from exc
+    supervisor_key = _daemon_supervisor_key(
+        resolved_config_path,
+        override,
+        agent_workspace_dir,
+    )
+    daemon = LilyDaemon(
+        allowed_keys=[
+            supervisor_key,
+            *(_daemon_supervisor_key(path, None, None) for path in allow_config or []),
+        ],
+        max_in_flight=max_in_flight,
+        max_queue=max_queue,
+        supervisor_factory=partial(
+            build_supervisor,
+            skill_telemetry_echo=show_skill_telemetry,
+        ),
+    )
+    try:
+        daemon.supervisor_for(supervisor_key)
+        server = create_daemon_server(daemon, host=host, port=port)
+        write_daemon_token(daemon_token_file, server.token)
+    except _SETUP_ERRORS + _runtime_build_errors() + (OSError,) as exc:
+        daemon.close()
+        _print_error_panel(exc)
+        raise typer.Exit(code=1) from exc
+
+    if warmup or preload_models:
+        daemon.start_warmup(supervisor_key, preload_models=preload_models)
+    _console.print(f"Lily daemon listening on {server.url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        _console.print("Lily daemon shutting down")
+    finally:
+        server.server_close()
+        daemon.close()
+        daemon_token_file.unlink(missing_ok=True)
@@ -0,0 +1,162 @@
+"""Typer handlers for ``lily maintenance`` (checkpoint compaction)."""
+# ruff: noqa: PLR0913
+
+from __future__ import annotations
+
+from pathlib import Path
+from typing import Annotated
+
+import typer
+from pydantic import ValidationError
+from rich.console import Console
+from rich.panel import Panel
+from rich.table import Table
+from typer import Exit
+
+from lily.cli_options import OverrideOption
+from lily.runtime.checkpoint_retention import (
+    DEFAULT_CHECKPOINT_DB_PATH,
+    CheckpointRetentionError,
+    compact_checkpoints,
+    discover_session_databases,
+    load_live_thread_ids,
+)
+from lily.runtime.config_loader import ConfigLoadError, load_runtime_config
+from lily.runtime.config_schema import CheckpointRetentionConfig
+
+maintenance_app = typer.Typer(
+    no_args_is_help=True,
+    help="Housekeeping for local runtime state under `.lily/`.",
+)
+_console = Console()
+
+_OptionalConfigOption = Annotated[
+    Path | None,
+    typer.Option(
+        "--config",
+        exists=True,
+        file_okay=True,
+        dir_okay=False,
+        readable=True,
+        resolve_path=False,
+        help=(
+            "Optional runtime config whose `policies.checkpoint_retention` supplies "
+            "defaults for the flags below."
+        ),
+    ),
+]
+
+
+def _resolve_retention_policy(
+    config: Path | None,
+    override: Path | None,
+    updates: dict[str, object],
+) -> CheckpointRetentionConfig:
+    """Build the effective retention policy from config and CLI flags.
+
+    Args:
+        config: Optional base runtime config path.
+        override: Optional override runtime config path.
+        updates: Explicitly passed flag values keyed by policy field.
+
+    Returns:
+        Validated retention policy.
+    """
+    base = (
+        load_runtime_config(config, override).policies.checkpoint_retention
+        if config is not None
+        else CheckpointRetentionConfig()
+    )
+    return CheckpointRetentionConfig.model_validate(base.model_dump() | updates)
+
+
+@maintenance_app.command("compact")
+def maintenance_compact_command(
+    checkpoint_db: Annotated[
+        Path,
+        typer.Option("--checkpoint-db", help="Runtime checkpoint SQLite database."),
+    ] = DEFAULT_CHECKPOINT_DB_PATH,
+    workspace: Annotated[
+        Path,
+        typer.Option(
+            "--workspace",
+            file_okay=False,
+            help="Workspace whose conversation session stores mark threads as live.",
+        ),
+    ] = Path(),
+    config: _OptionalConfigOption = None,
+    override: OverrideOption = None,
+    keep_last: Annotated[
+        int | None,
+        typer.Option("--keep-last", min=1, help="Checkpoints kept per thread."),
+    ] = None,
+    orphan_ttl_hours: Annotated[
+        float | None,
+        typer.Option(
+            "--orphan-ttl-hours",
+            help="Idle hours before threads without a conversation session expire.",
+        ),
+    ] = None,
+    keep_orphans: Annotated[
+        bool,
+        typer.Option("--keep-orphans", help="Never expire orphaned threads."),
+    ] = False,
+    keep_ephemeral: Annotated[
+        bool,
+        typer.Option("--keep-ephemeral", help="Keep finished `ephemeral-*` threads."),
+    ] = False,
+    vacuum_pages: Annotated[
+        int | None,
+        typer.Option(
+            "--vacuum-pages",
+            min=0,
+            help="Free pages returned to the filesystem; 0 skips vacuuming.",
+        ),
+    ] = None,
+) -> None:
+    """Trim, expire, and vacuum the runtime checkpoint database.
+
+    Args:
+        checkpoint_db: Runtime checkpoint SQLite database.
+        workspace: Workspace root holding conversation session stores.
+        config: Optional base runtime config path for policy defaults.
+        override: Optional override runtime config path.
+        keep_last: Optional checkpoints kept per thread.
+        orphan_ttl_hours: Optional idle hours before orphaned threads expire.
+        keep_orphans: Whether to disable orphan expiry.
+        keep_ephemeral: Whether to keep finished ephemeral threads.
+        vacuum_pages: Optional incremental vacuum page budget.
+
+    Raises:
+        Exit: When config loading or compaction fails (exit code 1).
+    """
+    updates: dict[str, object] = {
+        "keep_last": keep_last,
+        "orphan_ttl_hours": orphan_ttl_hours,
+        "vacuum_pages": vacuum_pages,
+    }
+    updates = {key: value for key, value in updates.items() if value is not None}
+    if keep_orphans:
+        updates["orphan_ttl_hours"] = None
+    if keep_ephemeral:
+        updates["drop_ephemeral"] = False
+    try:
+        policy = _resolve_retention_policy(config, override, updates)
+        report = compact_checkpoints(
+            checkpoint_db,
+            policy,
+            live_thread_ids=load_live_thread_ids(discover_session_databases(workspace)),
+        )
+    except (ConfigLoadError, CheckpointRetentionError, ValidationError) as exc:
+        _console.print(Panel.fit(str(exc), title="Lily Error", border_style="red"))
+        raise Exit(code=1) from exc
+
+    table = Table(title="Checkpoint Compaction")
+    table.add_column("Field")
+    table.add_column("Value")
+    table.add_row("Database", str(checkpoint_db))
+    table.add_row("Threads deleted", str(report.threads_deleted))
+    table.add_row("Checkpoints deleted", str(report.checkpoints_deleted))
+    table.add_row("Writes deleted", str(report.writes_deleted))
+    table.add_row("Pages freed", str(report.freed_pages))
+    _console.print(table)
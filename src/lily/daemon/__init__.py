@@ -0,0 +1 @@
+"""Resident Lily daemon serving prompts to thin clients over local HTTP."""
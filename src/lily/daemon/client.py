@@ -0,0 +1,225 @@
+"""Thin blocking client for the resident Lily daemon HTTP API."""
+
+from __future__ import annotations
+
+import json
+from collections.abc import Callable
+from http import HTTPStatus
+from http.client import HTTPConnection, HTTPException, HTTPResponse
+from pathlib import Path
+from urllib.parse import urlsplit
+
+from pydantic import ValidationError
+
+from lily.daemon.protocol import (
+    DEFAULT_DAEMON_URL,
+    HEALTH_PATH,
+    READY_PATH,
+    RUN_PATH,
+    DaemonRunEvent,
+    DaemonRunRequest,
+    DaemonStatus,
+)
+from lily.runtime.agent_run_result import AgentRunResult
+
+
+class DaemonClientError(RuntimeError):
+    """Raised when the daemon is unreachable or returns an error."""
+
+
+class DaemonBusyResponseError(DaemonClientError):
+    """Raised when the daemon rejects a prompt because it is saturated."""
+
+
+class DaemonClient:
+    """Send prompts and probes to one running ``lily serve`` daemon."""
+
+    def __init__(
+        self,
+        base_url: str = DEFAULT_DAEMON_URL,
+        *,
+        token: str | None = None,
+        timeout_seconds: float = 600.0,
+    ) -> None:
+        """Parse the daemon URL.
+
+        Args:
+            base_url: ``http://host:port`` the daemon listens on.
+            token: Daemon access token; required to run prompts.
+            timeout_seconds: Socket timeout for each request.
+
+        Raises:
+            DaemonClientError: If ``base_url`` is not an ``http`` URL with a host.
+        """
+        parts = urlsplit(base_url)
+        if parts.scheme != "http" or not parts.hostname:
+            msg = f"Daemon URL must look like http://host:port, got {base_url!r}."
+            raise DaemonClientError(msg)
+        self._base_url = base_url
+        self._host = parts.hostname
+        self._port = parts.port
+        self._token = token
+        self._timeout_seconds = timeout_seconds
+
+    def _request(
+        self,
+        method: str,
+        path: str,
+        body: str | None = None,
+    ) -> tuple[HTTPConnection, HTTPResponse]:
+        """Open one connection and send one request.
+
+        Args:
+            method: HTTP method.
+            path: Request path.
+            body: Optional JSON request body.
+
+        Returns:
+            Open connection and its response; caller closes the connection.
+
+        Raises:
+            DaemonClientError: If the daemon cannot be reached.
+        """
+        connection = HTTPConnection(
+            self._host,
+            self._port,
+            timeout=self._timeout_seconds,
+        )
+        headers = {"Content-Type": "application/json"} if body is not None else {}
+        if self._token is not None:
+            headers["Authorization"] = f"Bearer {self._token}"
+        try:
+            connection.request(method, path, body=body, headers=headers)
+            return connection, connection.getresponse()
+        except (OSError, HTTPException) as exc:
+            connection.close()
+            msg = f"Lily daemon is not reachable at {self._base_url}: {exc}"
+            raise DaemonClientError(msg) from exc
+
+    def _status(self, path: str) -> tuple[int, DaemonStatus]:
+        """Fetch one status probe.
+
+        Args:
+            path: Probe path.
+
+        Returns:
+            HTTP status code and parsed status body.
+
+        Raises:
+            DaemonClientError: If the body is not a daemon status payload.
+        """
+        connection, response = self._request("GET", path)
+        try:
+            payload = response.read()
+        finally:
+            connection.close()
+        try:
+            return response.status, DaemonStatus.model_validate_json(payload)
+        except ValidationError as exc:
+            msg = f"Unexpected daemon status payload from {path}."
+            raise DaemonClientError(msg) from exc
+
+    def health(self) -> DaemonStatus:
+        """Return daemon liveness and backpressure counters.
+
+        Returns:
+            Daemon status snapshot.
+        """
+        return self._status(HEALTH_PATH)[1]
+
+    def is_ready(self) -> bool:
+        """Return whether the daemon would admit a prompt right now.
+
+        Returns:
+            True when ``/readyz`` answers 200.
+        """
+        code, _ = self._status(READY_PATH)
+        return code == HTTPStatus.OK
+
+    def run_prompt(
+        self,
+        request: DaemonRunRequest,
+        *,
+        on_token: Callable[[str], None] | None = None,
+    ) -> AgentRunResult:
+        """Execute one prompt on the daemon.
+
+        Args:
+            request: Run request with client-resolved config paths.
+            on_token: Callback for streamed tokens when ``request.stream`` is set.
+
+        Returns:
+            Final run result from the daemon.
+
+        Raises:
+            DaemonBusyResponseError: If the daemon queue is full.
+            DaemonClientError: If the daemon rejects or fails the run.
+        """
+        connection, response = self._request(
+            "POST",
+            RUN_PATH,
+            body=request.model_dump_json(),
+        )
+        try:
+            if response.status != HTTPStatus.OK:
+                message = _error_message(response.read())
+                if response.status == HTTPStatus.SERVICE_UNAVAILABLE:
+                    raise DaemonBusyResponseError(message)
+                raise DaemonClientError(message)
+            for line in response:
+                event = DaemonRunEvent.model_validate_json(line)
+                if event.kind == "token":
+                    if on_token is not None:
+                        on_token(event.text)
+                elif event.kind == "error":
+                    raise DaemonClientError(event.text)
+                elif event.result is not None:
+                    return event.result
+        except (OSError, HTTPException, ValidationError) as exc:
+            msg = f"Lily daemon connection failed mid-run: {exc}"
+            raise DaemonClientError(msg) from exc
+        finally:
+            connection.close()
+        msg = "Lily daemon closed the run stream without a result."
+        raise DaemonClientError(msg)
+
+
+def read_daemon_token(path: Path) -> str:
+    """Read the access token a running ``lily serve`` wrote for its clients.
+
+    Args:
+        path: Token file written by the daemon, usually ``.lily/daemon.token``.
+
+    Returns:
+        Token text without surrounding whitespace.
+
+    Raises:
+        DaemonClientError: If the token file cannot be read.
+    """
+    try:
+        return path.read_text(encoding="utf-8").strip()
+    except OSError as exc:
+        msg = (
+            f"Cannot read the Lily daemon token at {path}: {exc.strerror}. "
+            "Start `lily serve` from this workspace or pass --daemon-token-file."
+        )
+        raise DaemonClientError(msg) from exc
+
+
+def _error_message(payload: bytes) -> str:
+    """Extract the error text from one JSON error body.
+
+    Args:
+        payload: Raw response body.
+
+    Returns:
+        Server-provided message, or the raw body when it is not JSON.
+    """
+    try:
+        data = json.loads(payload)
+    except json.JSONDecodeError:
+        return payload.decode("utf-8", errors="replace")
+    message = data.get("error") if isinstance(data, dict) else None
+    if isinstance(message, str):
+        return message
+    return payload.decode("utf-8", errors="replace")
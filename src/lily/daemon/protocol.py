@@ -0,0 +1,78 @@
+"""Wire contracts shared by the Lily daemon server and its thin client."""
+
+from __future__ import annotations
+
+from pathlib import Path
+from typing import Literal
+
+from pydantic import BaseModel, ConfigDict, Field
+
+from lily.runtime.agent_run_result import AgentRunResult
+
+DEFAULT_DAEMON_HOST = "127.0.0.1"
+DEFAULT_DAEMON_PORT = 8765
+DEFAULT_DAEMON_URL = f"http://{DEFAULT_DAEMON_HOST}:{DEFAULT_DAEMON_PORT}"
+
+HEALTH_PATH = "/healthz"
+READY_PATH = "/readyz"
+RUN_PATH = "/v1/run"
+
+DEFAULT_DAEMON_TOKEN_PATH = Path(".lily") / "daemon.token"
+
+
+class DaemonSupervisorKey(BaseModel):
+    """Config inputs identifying one warm supervisor held by the daemon."""
+
+    model_config = ConfigDict(extra="forbid", frozen=True)
+
+    config_path: str = Field(min_length=1)
+    override_config_path: str | None = None
+    agent_workspace_dir: str | None = None
+
+
+class DaemonRunRequest(BaseModel):
+    """One prompt submitted to ``POST /v1/run``.
+
+    Paths are resolved by the client so the daemon can key warm supervisors on
+    absolute config locations regardless of the caller's working directory. The
+    daemon only runs supervisor keys allow-listed when it started.
+    """
+
+    model_config = ConfigDict(extra="forbid", frozen=True)
+
+    prompt: str = Field(min_length=1)
+    conversation_id: str | None = None
+    supervisor: DaemonSupervisorKey
+    stream: bool = False
+    timeout_seconds: float | None = Field(default=None, gt=0)
+
+
+class DaemonRunEvent(BaseModel):
+    """One NDJSON line in a ``/v1/run`` response body.
+
+    ``token`` lines carry reply text as it streams, the last line is either one
+    ``result`` or one ``error``.
+    """
+
+    model_config = ConfigDict(extra="forbid", frozen=True)
+
+    kind: Literal["token", "result", "error"]
+    text: str = ""
+    result: AgentRunResult | None = None
+
+
+class DaemonStatus(BaseModel):
+    """Health, readiness, and backpressure counters reported by the daemon."""
+
+    model_config = ConfigDict(extra="forbid", frozen=True)
+
+    status: Literal["ok", "draining"]
+    ready: bool
+    uptime_seconds: float = Field(ge=0.0)
+    max_in_flight: int = Field(ge=1)
+    max_queue: int = Field(ge=0)
+    in_flight: int = Field(ge=0)
+    queued: int = Field(ge=0)
+    completed: int = Field(ge=0)
+    rejected: int = Field(ge=0)
+    supervisors: int = Field(ge=0)
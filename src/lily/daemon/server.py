@@ -0,0 +1,642 @@
+"""Long-lived Lily daemon keeping warm supervisors behind a local HTTP API."""
+
+from __future__ import annotations
+
+import hmac
+import json
+import logging
+import os
+import queue
+import secrets
+import select
+import socket
+import threading
+import time
+from collections.abc import Callable, Iterable, Iterator
+from contextlib import contextmanager
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+from pydantic import ValidationError
+
+from lily.agents.lily_supervisor import LilySupervisor
+from lily.daemon.protocol import (
+    HEALTH_PATH,
+    READY_PATH,
+    RUN_PATH,
+    DaemonRunEvent,
+    DaemonRunRequest,
+    DaemonStatus,
+    DaemonSupervisorKey,
+)
+from lily.runtime.agent_run_result import AgentRunResult
+from lily.runtime.agent_runtime import AgentRuntimeError
+from lily.runtime.config_loader import ConfigLoadError
+from lily.runtime.model_factory import ModelFactoryError
+from lily.runtime.run_cancellation import RunCancellation
+from lily.runtime.tool_catalog import ToolCatalogLoadError
+from lily.runtime.tool_registry import ToolRegistryError
+from lily.runtime.tool_resolvers import ToolResolverError
+
+_LOGGER = logging.getLogger("lily.daemon")
+_NDJSON_CONTENT_TYPE = "application/x-ndjson"
+_JSON_CONTENT_TYPE = "application/json"
+_DISCONNECT_POLL_SECONDS = 0.5
+_MAX_REQUEST_BYTES = 1024 * 1024
+_RUN_ERRORS = (
+    ConfigLoadError,
+    ToolRegistryError,
+    ToolCatalogLoadError,
+    ToolResolverError,
+    ModelFactoryError,
+    AgentRuntimeError,
+)
+
+type SupervisorFactory = Callable[[DaemonSupervisorKey], LilySupervisor]
+
+
+class DaemonBusyError(RuntimeError):
+    """Raised when the daemon admission queue is full."""
+
+
+class DaemonForbiddenError(RuntimeError):
+    """Raised when a request names a config the daemon was not started with."""
+
+
+def write_daemon_token(path: Path, token: str) -> None:
+    """Write the daemon access token to a fresh owner-only (``0600``) file.
+
+    Any previous file is removed first so the token is never written into a file
+    with looser permissions.
+
+    Args:
+        path: Token file location, usually ``.lily/daemon.token``.
+        token: Secret clients must send as a bearer token.
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.unlink(missing_ok=True)
+    descriptor = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+    with os.fdopen(descriptor, "w", encoding="utf-8") as handle:
+        handle.write(token)
+
+
+def build_supervisor(
+    key: DaemonSupervisorKey,
+    *,
+    skill_telemetry_echo: bool = False,
+) -> LilySupervisor:
+    """Build one supervisor from daemon key config paths.
+
+    Args:
+        key: Absolute config inputs sent by the client.
+        skill_telemetry_echo: Mirror skill telemetry JSON to stderr.
+
+    Returns:
+        Fully configured supervisor.
+    """
+    return LilySupervisor.from_config_paths(
+        Path(key.config_path),
+        Path(key.override_config_path) if key.override_config_path else None,
+        skill_telemetry_echo=skill_telemetry_echo,
+        agent_workspace_dir=key.agent_workspace_dir,
+    )
+
+
+class LilyDaemon:
+    """Warm supervisor cache with bounded admission for daemon requests.
+
+    Supervisors are built once per ``DaemonSupervisorKey`` and reused, so config
+    parsing, tool resolution, skill discovery, and agent compilation happen only on
+    the first prompt for a config. Only keys allow-listed at construction are
+    served, so clients cannot make the daemon load arbitrary config files. At most
+    ``max_in_flight`` prompts run at once and at most ``max_queue`` more wait;
+    further prompts are rejected immediately.
+    """
+
+    def __init__(
+        self,
+        *,
+        allowed_keys: Iterable[DaemonSupervisorKey],
+        max_in_flight: int,
+        max_queue: int,
+        supervisor_factory: SupervisorFactory = build_supervisor,
+    ) -> None:
+        """Initialize the allow-list, admission limits, and the supervisor cache.
+
+        Args:
+            allowed_keys: Config keys clients may run; fixed for the daemon lifetime.
+            max_in_flight: Maximum prompts executing concurrently.
+            max_queue: Maximum prompts waiting for an execution slot.
+            supervisor_factory: Builder used on first use of each config key.
+
+        Raises:
+            ValueError: If limits are out of range.
+        """
+        if max_in_flight < 1 or max_queue < 0:
+            msg = "max_in_flight must be >= 1 and max_queue must be >= 0."
+            raise ValueError(msg)
+        self._allowed_keys = frozenset(allowed_keys)
+        self._max_in_flight = max_in_flight
+        self._max_queue = max_queue
+        self._supervisor_factory = supervisor_factory
+        self._slots = threading.BoundedSemaphore(max_in_flight)
+        self._state_lock = threading.Lock()
+        self._supervisors: dict[DaemonSupervisorKey, LilySupervisor] = {}
+        self._build_locks: dict[DaemonSupervisorKey, threading.Lock] = {}
+        self._started = time.monotonic()
+        self._in_flight = 0
+        self._queued = 0
+        self._completed = 0
+        self._rejected = 0
+        self._draining = False
+
+    def allows(self, key: DaemonSupervisorKey) -> bool:
+        """Return whether ``key`` was allow-listed when the daemon started.
+
+        Args:
+            key: Config inputs identifying the supervisor.
+
+        Returns:
+            True when clients may run prompts on ``key``.
+        """
+        return key in self._allowed_keys
+
+    def supervisor_for(self, key: DaemonSupervisorKey) -> LilySupervisor:
+        """Return the warm supervisor for one config key, building it once.
+
+        Args:
+            key: Config inputs identifying the supervisor.
+
+        Returns:
+            Cached supervisor for ``key``.
+
+        Raises:
+            DaemonForbiddenError: If ``key`` is not allow-listed.
+        """
+        if not self.allows(key):
+            msg = f"Config is not served by this daemon: {key.config_path}"
+            raise DaemonForbiddenError(msg)
+        with self._state_lock:
+            supervisor = self._supervisors.get(key)
+            if supervisor is not None:
+                return supervisor
+            build_lock = self._build_locks.setdefault(key, threading.Lock())
+        with build_lock:
+            with self._state_lock:
+                supervisor = self._supervisors.get(key)
+            if supervisor is None:
+                _LOGGER.info("Building supervisor for %s", key.config_path)
+                supervisor = self._supervisor_factory(key)
+                with self._state_lock:
+                    self._supervisors[key] = supervisor
+        return supervisor
+
+    def start_warmup(
+        self,
+        key: DaemonSupervisorKey,
+        *,
+        preload_models: bool = False,
+    ) -> threading.Thread:
+        """Warm one supervisor's runtime on a background thread.
+
+        Prompts that arrive during warm-up wait for the same agent build.
+
+        Args:
+            key: Config inputs identifying the supervisor.
+            preload_models: Also preload resident-weight model profiles (Ollama).
+
+        Returns:
+            Started daemon thread running the warm-up.
+        """
+
+        def _warm() -> None:
+            try:
+                self.supervisor_for(key).warmup(preload_models=preload_models)
+            except _RUN_ERRORS:
+                _LOGGER.warning("Warm-up failed for %s", key.config_path, exc_info=True)
+                return
+            _LOGGER.info("Warm-up finished for %s", key.config_path)
+
+        thread = threading.Thread(target=_warm, name="lily-warmup", daemon=True)
+        thread.start()
+        return thread
+
+    @contextmanager
+    def admit(self) -> Iterator[None]:
+        """Hold one execution slot, queueing while the daemon is saturated.
+
+        Yields:
+            Control once a slot is held.
+
+        Raises:
+            DaemonBusyError: If the daemon is draining or its queue is full.
+        """
+        with self._state_lock:
+            saturated = self._in_flight >= self._max_in_flight
+            if self._draining or (saturated and self._queued >= self._max_queue):
+                self._rejected += 1
+                msg = (
+                    "Lily daemon is draining."
+                    if self._draining
+                    else (
+                        f"Lily daemon is busy ({self._in_flight} running, "
+                        f"{self._queued} queued)."
+                    )
+                )
+                raise DaemonBusyError(msg)
+            self._queued += 1
+        self._slots.acquire()
+        with self._state_lock:
+            self._queued -= 1
+            self._in_flight += 1
+        try:
+            yield
+        finally:
+            with self._state_lock:
+                self._in_flight -= 1
+                self._completed += 1
+            self._slots.release()
+
+    def run(
+        self,
+        request: DaemonRunRequest,
+        *,
+        on_token: Callable[[str], None] | None = None,
+        cancellation: RunCancellation | None = None,
+    ) -> AgentRunResult:
+        """Execute one prompt on its warm supervisor; callers hold an ``admit`` slot.
+
+        Args:
+            request: Validated run request.
+            on_token: Optional callback receiving streamed reply tokens.
+            cancellation: Optional handle used to stop the run early.
+
+        Returns:
+            Normalized run result.
+        """
+        supervisor = self.supervisor_for(request.supervisor)
+        if on_token is None:
+            return supervisor.run_prompt(
+                request.prompt,
+                conversation_id=request.conversation_id,
+                timeout=request.timeout_seconds,
+                cancellation=cancellation,
+            )
+        return supervisor.run_prompt_stream(
+            request.prompt,
+            conversation_id=request.conversation_id,
+            on_token=on_token,
+            timeout=request.timeout_seconds,
+            cancellation=cancellation,
+        )
+
+    def is_ready(self) -> bool:
+        """Return whether the daemon would admit one more prompt right now.
+
+        Returns:
+            True when not draining and the admission queue has room.
+        """
+        with self._state_lock:
+            return not self._draining and (
+                self._in_flight < self._max_in_flight or self._queued < self._max_queue
+            )
+
+    def status(self) -> DaemonStatus:
+        """Return health, readiness, and backpressure counters.
+
+        Returns:
+            Immutable status snapshot.
+        """
+        ready = self.is_ready()
+        with self._state_lock:
+            return DaemonStatus(
+                status="draining" if self._draining else "ok",
+                ready=ready,
+                uptime_seconds=time.monotonic() - self._started,
+                max_in_flight=self._max_in_flight,
+                max_queue=self._max_queue,
+                in_flight=self._in_flight,
+                queued=self._queued,
+                completed=self._completed,
+                rejected=self._rejected,
+                supervisors=len(self._supervisors),
+            )
+
+    def close(self) -> None:
+        """Stop admitting prompts and release every warm supervisor."""
+        with self._state_lock:
+            self._draining = True
+            supervisors = list(self._supervisors.values())
+            self._supervisors.clear()
+        for supervisor in supervisors:
+            supervisor.close()
+
+
+class LilyDaemonHttpServer(ThreadingHTTPServer):
+    """Threading HTTP server bound to one ``LilyDaemon``.
+
+    ``/v1/run`` requires ``Authorization: Bearer <token>``; share ``token`` with
+    clients through ``write_daemon_token``.
+    """
+
+    daemon_threads = True
+
+    def __init__(
+        self,
+        address: tuple[str, int],
+        daemon: LilyDaemon,
+        token: str,
+    ) -> None:
+        """Bind the listening socket and attach the daemon.
+
+        Args:
+            address: ``(host, port)`` to listen on; port ``0`` picks a free port.
+            daemon: Daemon handling requests.
+            token: Secret clients must send to run prompts.
+        """
+        super().__init__(address, _DaemonRequestHandler)
+        self.lily_daemon = daemon
+        self.token = token
+
+    @property
+    def url(self) -> str:
+        """Base URL clients should use to reach this server.
+
+        Returns:
+            Scheme, host, and port of the bound socket.
+        """
+        host, port = self.server_address[:2]
+        return f"http://{host!s}:{port}"
+
+
+class _DaemonRequestHandler(BaseHTTPRequestHandler):
+    """HTTP routes for health, readiness, and prompt execution."""
+
+    server: LilyDaemonHttpServer
+
+    def log_message(self, format: str, *args: object) -> None:
+        """Route access logs to the package logger instead of stderr.
+
+        Args:
+            format: ``%``-style message template.
+            *args: Template arguments.
+        """
+        _LOGGER.debug(format, *args)
+
+    def _send_json(self, status: HTTPStatus, payload: str) -> None:
+        """Write one complete JSON response.
+
+        Args:
+            status: HTTP status code.
+            payload: Serialized JSON body.
+        """
+        body = payload.encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", _JSON_CONTENT_TYPE)
+        self.send_header("Content-Length", str(len(body)))
+        if status == HTTPStatus.SERVICE_UNAVAILABLE:
+            self.send_header("Retry-After", "1")
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _send_error_json(self, status: HTTPStatus, message: str) -> None:
+        """Write one JSON error body.
+
+        Args:
+            status: HTTP status code.
+            message: Human-readable error message.
+        """
+        self._send_json(status, json.dumps({"error": message}))
+
+    def _begin_stream(self) -> bool:
+        """Send the ``200`` NDJSON response headers.
+
+        Returns:
+            False when the client has already disconnected.
+        """
+        try:
+            self.send_response(HTTPStatus.OK)
+            self.send_header("Content-Type", _NDJSON_CONTENT_TYPE)
+            self.end_headers()
+        except OSError:
+            return False
+        return True
+
+    def _write_event(self, event: DaemonRunEvent) -> bool:
+        """Write and flush one NDJSON run event.
+
+        Args:
+            event: Event to serialize.
+
+        Returns:
+            False when the client has disconnected.
+        """
+        try:
+            self.wfile.write(event.model_dump_json().encode("utf-8") + b"\n")
+            self.wfile.flush()
+        except OSError:
+            return False
+        return True
+
+    def _client_gone(self) -> bool:
+        """Return whether the client closed its end of the connection.
+
+        Clients send nothing after the request body, so a readable socket that
+        yields no bytes means the peer hung up.
+
+        Returns:
+            True when the connection reached end-of-file or failed.
+        """
+        try:
+            readable, _, _ = select.select([self.connection], [], [], 0)
+            return bool(readable) and not self.connection.recv(1, socket.MSG_PEEK)
+        except OSError:
+            return True
+
+    def do_GET(self) -> None:
+        """Serve ``/healthz`` and ``/readyz``."""
+        daemon = self.server.lily_daemon
+        if self.path == HEALTH_PATH:
+            self._send_json(HTTPStatus.OK, daemon.status().model_dump_json())
+            return
+        if self.path == READY_PATH:
+            status = daemon.status()
+            code = HTTPStatus.OK if status.ready else HTTPStatus.SERVICE_UNAVAILABLE
+            self._send_json(code, status.model_dump_json())
+            return
+        self._send_error_json(HTTPStatus.NOT_FOUND, f"Unknown path: {self.path}")
+
+    def _authorized(self) -> bool:
+        """Return whether the request carries this server's bearer token.
+
+        Returns:
+            True when the ``Authorization`` header matches the daemon token.
+        """
+        expected = f"Bearer {self.server.token}".encode()
+        received = self.headers.get("Authorization", "").encode()
+        return hmac.compare_digest(received, expected)
+
+    def _read_request(self) -> DaemonRunRequest | None:
+        """Read and validate the run request body declared by ``Content-Length``.
+
+        Returns:
+            Parsed request, or ``None`` after answering a malformed length or
+            body (``400``) or an oversized one (``413``).
+        """
+        declared = self.headers.get("Content-Length", "0").strip()
+        if not (declared.isascii() and declared.isdigit()):
+            self._send_error_json(
+                HTTPStatus.BAD_REQUEST,
+                "Content-Length must be a non-negative integer.",
+            )
+            return None
+        length = int(declared)
+        if length > _MAX_REQUEST_BYTES:
+            self._send_error_json(
+                HTTPStatus.REQUEST_ENTITY_TOO_LARGE,
+                f"Request body exceeds {_MAX_REQUEST_BYTES} bytes.",
+            )
+            return None
+        try:
+            return DaemonRunRequest.model_validate_json(self.rfile.read(length))
+        except ValidationError as exc:
+            self._send_error_json(HTTPStatus.BAD_REQUEST, str(exc))
+            return None
+
+    def do_POST(self) -> None:
+        """Serve ``/v1/run`` as an NDJSON stream of run events.
+
+        Only ``application/json`` bodies are accepted, so browsers cannot send a
+        cross-origin "simple" request without a CORS preflight, which this server
+        never grants.
+        """
+        if self.path != RUN_PATH:
+            self._send_error_json(HTTPStatus.NOT_FOUND, f"Unknown path: {self.path}")
+            return
+        if self.headers.get_content_type() != _JSON_CONTENT_TYPE:
+            self._send_error_json(
+                HTTPStatus.UNSUPPORTED_MEDIA_TYPE,
+                f"Content-Type must be {_JSON_CONTENT_TYPE}.",
+            )
+            return
+        if not self._authorized():
+            self._send_error_json(
+                HTTPStatus.UNAUTHORIZED,
+                "Missing or invalid daemon token.",
+            )
+            return
+        request = self._read_request()
+        if request is None:
+            return
+        daemon = self.server.lily_daemon
+        if not daemon.allows(request.supervisor):
+            path = request.supervisor.config_path
+            message = f"Config is not served by this daemon: {path}"
+            self._send_error_json(HTTPStatus.FORBIDDEN, message)
+            return
+        try:
+            with daemon.admit():
+                final = self._relay_run(request)
+        except DaemonBusyError as exc:
+            self._send_error_json(HTTPStatus.SERVICE_UNAVAILABLE, str(exc))
+            return
+        if final is not None:
+            self._write_event(final)
+
+    def _relay_run(self, request: DaemonRunRequest) -> DaemonRunEvent | None:
+        """Run one admitted request on a worker thread and relay its tokens.
+
+        The run only enqueues events, so a slow client blocks this handler thread
+        rather than the runtime event loop shared by every run. When the client
+        disconnects the run is cancelled, and its events are drained until it
+        ends so the admission slot is released only once the run has stopped.
+
+        Args:
+            request: Validated run request.
+
+        Returns:
+            Final ``result`` or ``error`` event, or None if the client is gone.
+        """
+        events: queue.SimpleQueue[DaemonRunEvent] = queue.SimpleQueue()
+        cancellation = RunCancellation()
+        worker = threading.Thread(
+            target=self._execute,
+            args=(request, events, cancellation),
+            name="lily-daemon-run",
+            daemon=True,
+        )
+        worker.start()
+        connected = self._begin_stream()
+        while True:
+            if not connected and not cancellation.cancelled:
+                _LOGGER.info("Client disconnected; cancelling its run")
+                cancellation.cancel()
+            try:
+                event = events.get(
+                    timeout=_DISCONNECT_POLL_SECONDS if connected else None
+                )
+            except queue.Empty:
+                connected = not self._client_gone()
+                continue
+            if event.kind != "token":
+                worker.join()
+                return event if connected else None
+            if connected:
+                connected = self._write_event(event)
+
+    def _execute(
+        self,
+        request: DaemonRunRequest,
+        events: queue.SimpleQueue[DaemonRunEvent],
+        cancellation: RunCancellation,
+    ) -> None:
+        """Run one admitted request, queueing tokens and one final event.
+
+        Args:
+            request: Validated run request.
+            events: Queue drained by the handler thread.
+            cancellation: Handle the handler uses to stop the run.
+        """
+        on_token = (
+            (lambda text: events.put(DaemonRunEvent(kind="token", text=text)))
+            if request.stream
+            else None
+        )
+        final = DaemonRunEvent(kind="error", text="Lily daemon run failed.")
+        try:
+            result = self.server.lily_daemon.run(
+                request,
+                on_token=on_token,
+                cancellation=cancellation,
+            )
+            final = DaemonRunEvent(kind="result", result=result)
+        except _RUN_ERRORS as exc:
+            final = DaemonRunEvent(kind="error", text=str(exc))
+        finally:
+            events.put(final)
+
+
+def create_daemon_server(
+    daemon: LilyDaemon,
+    *,
+    host: str,
+    port: int,
+    token: str | None = None,
+) -> LilyDaemonHttpServer:
+    """Bind a daemon HTTP server without starting its request loop.
+
+    Args:
+        daemon: Daemon handling requests.
+        host: Interface to bind; keep this on loopback.
+        port: TCP port, or ``0`` for an ephemeral port.
+        token: Client secret; a random one is generated when omitted.
+
+    Returns:
+        Bound server; call ``serve_forever`` to start handling requests.
+    """
+    return LilyDaemonHttpServer(
+        (host, port),
+        daemon,
+        token if token is not None else secrets.token_urlsafe(32),
+    )
@@ -0,0 +1,86 @@
+"""Runtime result contracts shared by the runtime, daemon client and UI.
+
+Kept free of LangChain/LangGraph imports so thin callers (``lily run --via-daemon``,
+the daemon protocol) can decode results without loading the agent stack.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Callable
+from typing import Literal
+
+from pydantic import BaseModel, ConfigDict, Field
+
+from lily.runtime.run_timings import RunTimings
+from lily.runtime.skill_invoke_trace import SkillInvokeTrace
+
+TokenCallback = Callable[[str], None]
+RunStatus = Literal["completed", "cancelled", "timed_out"]
+
+
+class BudgetSpend(BaseModel):
+    """Resources consumed within one budget scope."""
+
+    model_config = ConfigDict(frozen=True)
+
+    input_tokens: int = Field(default=0, ge=0)
+    output_tokens: int = Field(default=0, ge=0)
+    cost: float = Field(default=0.0, ge=0.0)
+
+
+class BudgetRemaining(BaseModel):
+    """Budget left per dimension; ``None`` where the dimension is unlimited."""
+
+    model_config = ConfigDict(frozen=True)
+
+    input_tokens: int | None = Field(default=None, ge=0)
+    output_tokens: int | None = Field(default=None, ge=0)
+    cost: float | None = Field(default=None, ge=0.0)
+    wall_clock_seconds: float | None = Field(default=None, ge=0.0)
+
+
+class RunBudgetReport(BaseModel):
+    """Spend and remaining budget of one run and its conversation."""
+
+    model_config = ConfigDict(frozen=True)
+
+    run_spent: BudgetSpend = Field(default_factory=BudgetSpend)
+    conversation_spent: BudgetSpend = Field(default_factory=BudgetSpend)
+    run_remaining: BudgetRemaining = Field(default_factory=BudgetRemaining)
+    conversation_remaining: BudgetRemaining = Field(default_factory=BudgetRemaining)
+    exhausted: tuple[str, ...] = Field(
+        default=(),
+        description="Budgets that stopped the run, e.g. ``run.output_tokens``.",
+    )
+
+
+class AgentRunResult(BaseModel):
+    """Deterministic runtime result contract."""
+
+    model_config = ConfigDict(frozen=True)
+
+    final_output: str
+    message_count: int
+    conversation_id: str | None = None
+    status: RunStatus = Field(
+        default="completed",
+        description="`cancelled`/`timed_out` runs stopped early; their "
+        "conversation keeps its last written checkpoint.",
+    )
+    skill_trace: SkillInvokeTrace = Field(default_factory=SkillInvokeTrace)
+    queue_wait_seconds: float = Field(default=0.0, ge=0.0)
+    timings: RunTimings = Field(default_factory=RunTimings)
+    budget: RunBudgetReport | None = Field(
+        default=None,
+        description="Present when `policies.budgets` limits any dimension.",
+    )
+
+
+class AgentStreamEvent(BaseModel):
+    """One incremental event yielded by ``AgentRuntime.astream``."""
+
+    model_config = ConfigDict(frozen=True)
+
+    kind: Literal["token", "result"]
+    text: str = ""
+    result: AgentRunResult | None = None
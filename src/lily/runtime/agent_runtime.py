@@ -4,33 +4,83 @@
 from __future__ import annotations
 
 import asyncio
+import contextvars
+import logging
 import threading
-from collections.abc import Callable, Coroutine, Sequence
+import time
+import warnings
+from collections.abc import AsyncIterator, Callable, Coroutine, Iterator, Sequence
+from contextlib import contextmanager
+from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Protocol, TypeVar, cast
+from typing import Any, Protocol, TypeVar, cast
 from uuid import uuid4
 
 import aiosqlite
 from langchain.agents import create_agent
 from langchain.agents.middleware import (
+    AgentMiddleware,
     ModelCallLimitMiddleware,
     ToolCallLimitMiddleware,
 )
+from langchain_core.language_models import BaseChatModel
 from langchain_core.messages import AIMessage, BaseMessage
 from langgraph.checkpoint.sqlite.aio import AsyncSqliteSaver
-from pydantic import BaseModel, ConfigDict, Field
+from langgraph.pregel import Pregel
 
-from lily.runtime.agent_identity_injection_middleware import (
-    SystemPromptAgentIdentityMiddleware,
+from lily.runtime.agent_run_result import (
+    AgentRunResult,
+    AgentStreamEvent,
+    RunStatus,
+    TokenCallback,
+)
+from lily.runtime.checkpoint_retention import (
+    DEFAULT_CHECKPOINT_DB_PATH,
+    EPHEMERAL_THREAD_PREFIX,
+    CheckpointCompactor,
+    discover_session_databases,
+    load_live_thread_ids,
 )
 from lily.runtime.config_schema import RuntimeConfig
+from lily.runtime.context_budget import ContextBudgetMiddleware
 from lily.runtime.conversation_compression import (
+    BackgroundConversationCompressor,
+    build_background_compressor,
     build_conversation_compression_middleware,
 )
-from lily.runtime.model_factory import ModelFactory
+from lily.runtime.model_call_governor import (
+    ModelCallGovernor,
+    ModelCallPriority,
+    model_call_priority,
+)
+from lily.runtime.model_factory import ModelFactory, resolve_chat_model
 from lily.runtime.model_router import DynamicModelRouter
-from lily.runtime.skill_catalog_injection_middleware import (
-    SystemPromptSkillCatalogMiddleware,
+from lily.runtime.response_cache import (
+    DEFAULT_RESPONSE_CACHE_DB_PATH,
+    ModelResponseCacheMiddleware,
+    ModelResponseStore,
+)
+from lily.runtime.routing_health import hedging_disabled
+from lily.runtime.run_budget import (
+    RunBudgetMiddleware,
+    RunBudgetRecorder,
+    bind_run_budget,
+    build_budget_report,
+    reset_run_budget,
+)
+from lily.runtime.run_cancellation import (
+    RunCancellation,
+    RunInterruption,
+    interruptible,
+)
+from lily.runtime.run_scheduler import RunScheduler, RunSchedulerStats
+from lily.runtime.run_timing_middleware import ToolCallTimingMiddleware
+from lily.runtime.run_timings import (
+    RunTimingRecorder,
+    RunTimings,
+    bind_run_timings,
+    emit_run_timings,
+    reset_run_timings,
 )
 from lily.runtime.skill_events import emit_skill_catalog_injected
 from lily.runtime.skill_invoke_trace import (
@@ -41,6 +91,20 @@ from lily.runtime.skill_invoke_trace import (
 )
 from lily.runtime.skill_loader import SkillBundle
 from lily.runtime.skill_retrieve_tool import bind_skill_loader, reset_skill_loader
+from lily.runtime.system_prompt_prefix import (
+    SystemPromptPrefix,
+    SystemPromptPrefixMiddleware,
+    build_system_prompt_prefix,
+    emit_system_prompt_assembled,
+)
+from lily.runtime.timed_checkpointer import TimedAsyncSqliteSaver
+from lily.runtime.token_accounting import TokenAccountant
+from lily.runtime.tool_output_offload import (
+    DEFAULT_TOOL_OUTPUT_DIR,
+    ToolOutputOffloadMiddleware,
+    ToolOutputStore,
+    build_fetch_tool_output_tool,
+)
 from lily.runtime.tool_registry import ToolLike, ToolRegistry
 
 
@@ -48,19 +112,30 @@ class AgentRuntimeError(RuntimeError):
     """Raised when runtime invocation fails policy or parsing expectations."""
 
 
-class AgentRunResult(BaseModel):
-    """Deterministic runtime result contract."""
+AgentBuilder = Callable[..., object]
+_LOGGER = logging.getLogger(__name__)
+_T = TypeVar("_T")
+_STREAM_MODEL_NODE = "model"
+_STREAM_ITEM_ARITY = 2
 
-    model_config = ConfigDict(frozen=True)
 
-    final_output: str
-    message_count: int
-    conversation_id: str | None = None
-    skill_trace: SkillInvokeTrace = Field(default_factory=SkillInvokeTrace)
+@dataclass(frozen=True)
+class _LoopBinding:
+    """Per-event-loop primitives guarding agent build and run admission."""
 
+    build_lock: asyncio.Lock
+    scheduler: RunScheduler
 
-AgentBuilder = Callable[..., object]
-_T = TypeVar("_T")
+
+@dataclass
+class _StreamedRun:
+    """State of one streamed run, filled in by the task driving its graph."""
+
+    outcome: RunInterruption = field(default_factory=RunInterruption)
+    output: dict[str, object] | None = None
+    trace_entries: list[SkillRetrievalTraceEntry] = field(default_factory=list)
+    waited: float = 0.0
+    budget: RunBudgetRecorder | None = None
 
 
 class _AsyncInvokableAgent(Protocol):
@@ -71,12 +146,35 @@ class _AsyncInvokableAgent(Protocol):
         request: dict[str, object],
         *,
         config: dict[str, object],
+        **options: object,
     ) -> dict[str, object]:
         """Asynchronously invoke one request and return mapping output.
 
         Args:
             request: Structured agent input mapping.
             config: Invocation-level execution configuration.
+            **options: LangGraph run options such as ``durability``.
+        """
+
+
+class _AsyncStreamableAgent(Protocol):
+    """Structural protocol for compiled agent async stream surface."""
+
+    def astream(
+        self,
+        request: dict[str, object],
+        *,
+        config: dict[str, object],
+        stream_mode: list[str],
+        **options: object,
+    ) -> AsyncIterator[tuple[str, object]]:
+        """Stream multi-mode ``(mode, payload)`` items for one request.
+
+        Args:
+            request: Structured agent input mapping.
+            config: Invocation-level execution configuration.
+            stream_mode: LangGraph stream modes to emit.
+            **options: LangGraph run options such as ``durability``.
         """
 
 
@@ -97,6 +195,43 @@ def _coerce_message_text(message: BaseMessage) -> str:
     return str(content)
 
 
+def _without_checkpointer(agent: object) -> object:
+    """Return a view of a compiled graph that runs without checkpointing.
+
+    Args:
+        agent: Compiled agent returned by the agent builder.
+
+    Returns:
+        Checkpointer-free copy for LangGraph graphs; other agents unchanged.
+    """
+    if isinstance(agent, Pregel):
+        return agent.copy(update={"checkpointer": None})
+    return agent
+
+
+def _stream_token_text(payload: object) -> str:
+    """Extract assistant text from one LangGraph ``messages`` stream item.
+
+    Only chunks produced by the agent model node count as reply tokens; tool
+    results and middleware model calls (for example summarization) are skipped.
+
+    Args:
+        payload: ``(message_chunk, metadata)`` tuple from ``messages`` mode.
+
+    Returns:
+        Token text, or an empty string when the item is not reply output.
+    """
+    if not isinstance(payload, tuple) or len(payload) != _STREAM_ITEM_ARITY:
+        return ""
+    chunk, metadata = payload
+    if not isinstance(chunk, AIMessage):
+        return ""
+    node = metadata.get("langgraph_node") if isinstance(metadata, dict) else None
+    if node is not None and node != _STREAM_MODEL_NODE:
+        return ""
+    return _coerce_message_text(chunk)
+
+
 class AgentRuntime:
     """Config-driven wrapper over LangChain's `create_agent` kernel."""
 
@@ -109,6 +244,8 @@ class AgentRuntime:
         agent_builder: AgentBuilder = create_agent,
         skill_bundle: SkillBundle | None = None,
         agent_identity_context_markdown: str = "",
+        response_cache_db_path: Path | None = None,
+        tool_output_dir: Path | None = None,
     ) -> None:
         """Initialize runtime with validated config, tools, and adapters.
 
@@ -122,56 +259,72 @@ class AgentRuntime:
                 ``skill_retrieve`` context binding.
             agent_identity_context_markdown: Optional pre-formatted identity context
                 markdown block injected via middleware before model invocation.
+            response_cache_db_path: Optional SQLite path for cached model responses.
+            tool_output_dir: Optional blob directory for offloaded tool outputs.
         """
         self._config = config
         self._tools = list(tools)
         self._skill_bundle = skill_bundle
         self._agent_identity_context_markdown = agent_identity_context_markdown
         self._model_factory = model_factory or ModelFactory()
-        self._checkpoint_db_path = checkpoint_db_path or (
-            Path(".lily") / "runtime-checkpoints.sqlite3"
+        self._token_accountant = TokenAccountant(config.models.profiles)
+        self._checkpoint_db_path = checkpoint_db_path or DEFAULT_CHECKPOINT_DB_PATH
+        self._response_cache_db_path = (
+            response_cache_db_path or DEFAULT_RESPONSE_CACHE_DB_PATH
         )
+        self._response_store: ModelResponseStore | None = None
+        self._tool_output_dir = tool_output_dir or DEFAULT_TOOL_OUTPUT_DIR
         self._agent_builder = agent_builder
         self._agent: object | None = None
+        self._ephemeral_agent: object | None = None
         self._checkpoint_conn: aiosqlite.Connection | None = None
         self._checkpointer: AsyncSqliteSaver | None = None
+        self._compactor: CheckpointCompactor | None = None
+        self._background_compressor: BackgroundConversationCompressor | None = None
+        self._compression_tasks: dict[str, asyncio.Task[None]] = {}
         self._async_loop: asyncio.AbstractEventLoop | None = None
         self._async_loop_thread: threading.Thread | None = None
+        self._async_loop_lock = threading.Lock()
+        self._resource_loop: asyncio.AbstractEventLoop | None = None
+        self._loop_binding: _LoopBinding | None = None
 
     def _ensure_async_loop(self) -> asyncio.AbstractEventLoop:
         """Create and memoize one dedicated async loop thread.
 
+        Safe to call from several threads; they all share the first loop started.
+
         Returns:
             Running event loop used for async checkpointing/invocation.
         """
-        if self._async_loop is not None and self._async_loop.is_running():
-            return self._async_loop
+        with self._async_loop_lock:
+            if self._async_loop is not None and self._async_loop.is_running():
+                return self._async_loop
 
-        ready = threading.Event()
-        loop_holder: dict[str, asyncio.AbstractEventLoop] = {}
-
-        def _loop_runner() -> None:
-            loop = asyncio.new_event_loop()
-            asyncio.set_event_loop(loop)
-            loop_holder["loop"] = loop
-            ready.set()
-            loop.run_forever()
-            pending = asyncio.all_tasks(loop)
-            for task in pending:
-                task.cancel()
-            if pending:
-                loop.run_until_complete(
-                    asyncio.gather(*pending, return_exceptions=True)
-                )
-            loop.close()
+            ready = threading.Event()
+            loop_holder: dict[str, asyncio.AbstractEventLoop] = {}
+
+            def _loop_runner() -> None:
+                loop = asyncio.new_event_loop()
+                asyncio.set_event_loop(loop)
+                loop_holder["loop"] = loop
+                loop.call_soon(ready.set)
+                loop.run_forever()
+                pending = asyncio.all_tasks(loop)
+                for task in pending:
+                    task.cancel()
+                if pending:
+                    loop.run_until_complete(
+                        asyncio.gather(*pending, return_exceptions=True)
+                    )
+                loop.close()
 
-        loop_thread = threading.Thread(target=_loop_runner, daemon=True)
-        loop_thread.start()
-        ready.wait()
+            loop_thread = threading.Thread(target=_loop_runner, daemon=True)
+            loop_thread.start()
+            ready.wait()
 
-        self._async_loop = loop_holder["loop"]
-        self._async_loop_thread = loop_thread
-        return self._async_loop
+            self._async_loop = loop_holder["loop"]
+            self._async_loop_thread = loop_thread
+            return self._async_loop
 
     def _run_on_async_loop(self, coro: Coroutine[object, object, _T]) -> _T:
         """Run one coroutine on runtime-owned background async loop.
@@ -186,13 +339,54 @@ class AgentRuntime:
         future = asyncio.run_coroutine_threadsafe(coro, loop)
         return future.result()
 
+    def _owns_resource_loop(self) -> bool:
+        """Return whether held resources live on the runtime-owned loop thread.
+
+        Returns:
+            True when the checkpointer can be closed by blocking on the owned loop.
+        """
+        loop = self._async_loop
+        return (
+            loop is not None
+            and loop is self._resource_loop
+            and loop.is_running()
+            and threading.current_thread() is not self._async_loop_thread
+        )
+
     def close(self) -> None:
-        """Close held async checkpoint resources and loop thread."""
-        if self._checkpoint_conn is not None:
-            self._run_on_async_loop(self._checkpoint_conn.close())
+        """Close held async checkpoint resources and loop thread.
+
+        Never starts an event loop. A connection opened by ``arun`` on a caller loop
+        only has its worker thread stopped here; close it with ``aclose`` instead.
+        """
+        if self._compactor is not None:
+            self._compactor.stop()
+            self._compactor = None
+        if self._compression_tasks and self._owns_resource_loop():
+            self._run_on_async_loop(self._cancel_background_compression())
+        conn = self._checkpoint_conn
+        if conn is not None:
             self._checkpoint_conn = None
+            if self._owns_resource_loop():
+                self._run_on_async_loop(conn.close())
+            else:
+                with warnings.catch_warnings():
+                    warnings.simplefilter("ignore", DeprecationWarning)
+                    conn.stop()
+                warnings.warn(
+                    "AgentRuntime checkpoint connection was opened on a caller event "
+                    "loop; await aclose() on that loop instead of close().",
+                    ResourceWarning,
+                    stacklevel=2,
+                )
+        if self._response_store is not None:
+            self._response_store.close()
+            self._response_store = None
         self._checkpointer = None
         self._agent = None
+        self._ephemeral_agent = None
+        self._resource_loop = None
+        self._loop_binding = None
         if self._async_loop is not None:
             self._async_loop.call_soon_threadsafe(self._async_loop.stop)
             if self._async_loop_thread is not None:
@@ -200,6 +394,24 @@ class AgentRuntime:
             self._async_loop = None
             self._async_loop_thread = None
 
+    async def aclose(self) -> None:
+        """Close checkpoint resources from the caller's running event loop."""
+        on_resource_loop = self._resource_loop is asyncio.get_running_loop()
+        if on_resource_loop:
+            await self._cancel_background_compression()
+        conn = self._checkpoint_conn
+        if conn is not None and on_resource_loop:
+            self._checkpoint_conn = None
+            await conn.close()
+        self.close()
+
+    async def _cancel_background_compression(self) -> None:
+        """Cancel pending background compressions and wait for them to unwind."""
+        tasks = list(self._compression_tasks.values())
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
     def __del__(self) -> None:
         """Best-effort cleanup for checkpoint connection."""
         try:
@@ -207,7 +419,47 @@ class AgentRuntime:
         except Exception:
             return
 
-    def _build_checkpointer(self) -> AsyncSqliteSaver:
+    async def _bind_resources_to_running_loop(self) -> _LoopBinding:
+        """Ensure checkpointer and agent state belong to the running event loop.
+
+        Resources opened on a loop that is no longer running (for example after a
+        finished ``asyncio.run``) are discarded and rebuilt on the running loop.
+
+        Returns:
+            Build lock and run scheduler owned by the running loop.
+
+        Raises:
+            AgentRuntimeError: If resources are held by another loop that is still
+                running.
+        """
+        loop = asyncio.get_running_loop()
+        if self._resource_loop is loop and self._loop_binding is not None:
+            return self._loop_binding
+        owner = self._resource_loop
+        if owner is not None and owner.is_running():
+            msg = (
+                "AgentRuntime resources are bound to another running event loop; "
+                "drive one runtime from one loop or close() it before switching."
+            )
+            raise AgentRuntimeError(msg)
+        stale_conn = self._checkpoint_conn
+        self._checkpoint_conn = None
+        self._checkpointer = None
+        self._agent = None
+        self._ephemeral_agent = None
+        self._resource_loop = loop
+        binding = _LoopBinding(
+            build_lock=asyncio.Lock(),
+            scheduler=RunScheduler(self._config.policies.max_concurrent_runs),
+        )
+        self._loop_binding = binding
+        if stale_conn is not None:
+            # aiosqlite resolves each call on the awaiting loop, so the stale
+            # connection can be closed from here.
+            await stale_conn.close()
+        return binding
+
+    async def _build_checkpointer(self) -> AsyncSqliteSaver:
         """Create and memoize async SQLite checkpointer for thread persistence.
 
         Returns:
@@ -217,21 +469,66 @@ class AgentRuntime:
             return self._checkpointer
 
         self._checkpoint_db_path.parent.mkdir(parents=True, exist_ok=True)
-        db_path = str(self._checkpoint_db_path)
-
-        async def _create_async_checkpointer() -> tuple[
-            aiosqlite.Connection, AsyncSqliteSaver
-        ]:
-            conn = await aiosqlite.connect(db_path)
-            return conn, AsyncSqliteSaver(conn)
-
-        conn, checkpointer = self._run_on_async_loop(_create_async_checkpointer())
+        conn = await aiosqlite.connect(str(self._checkpoint_db_path))
         self._checkpoint_conn = conn
-        self._checkpointer = checkpointer
+        self._checkpointer = TimedAsyncSqliteSaver(conn)
+        self._start_compactor()
         return self._checkpointer
 
-    def _build_agent(self) -> object:
-        """Create and memoize the compiled LangChain agent graph.
+    def _start_compactor(self) -> None:
+        """Start background checkpoint compaction when the policy enables it.
+
+        Live thread ids come from the session stores under the working directory,
+        the same workspace the CLI resolves conversations from.
+        """
+        retention = self._config.policies.checkpoint_retention
+        if self._compactor is not None or retention.compact_interval_minutes is None:
+            return
+        self._compactor = CheckpointCompactor(
+            self._checkpoint_db_path,
+            retention,
+            interval_seconds=retention.compact_interval_minutes * 60.0,
+            live_thread_ids=lambda: load_live_thread_ids(
+                discover_session_databases(Path())
+            ),
+        )
+        self._compactor.start()
+
+    async def _build_agent(self) -> object:
+        """Create and memoize the compiled agent for the running event loop.
+
+        Concurrent first callers share one build: the lock guarantees a single
+        checkpointer connection and a single compiled graph per loop.
+
+        Returns:
+            Compiled agent with invoke capability.
+        """
+        binding = await self._bind_resources_to_running_loop()
+        async with binding.build_lock:
+            if self._agent is None:
+                self._agent = await self._compile_agent()
+                self._ephemeral_agent = _without_checkpointer(self._agent)
+        return self._agent
+
+    async def _agent_for_run(self, conversation_id: str | None) -> object:
+        """Return the compiled agent variant for one run.
+
+        Ephemeral runs can never be resumed, so they skip the SQLite checkpointer
+        and do no checkpoint I/O; attached conversations keep it.
+
+        Args:
+            conversation_id: Conversation id of the run, or ``None`` when ephemeral.
+
+        Returns:
+            Compiled agent with invoke capability.
+        """
+        agent = await self._build_agent()
+        if conversation_id is None and self._ephemeral_agent is not None:
+            return self._ephemeral_agent
+        return agent
+
+    async def _compile_agent(self) -> object:
+        """Compile the LangChain agent graph with middleware and checkpointer.
 
         Returns:
             Compiled agent with invoke capability.
@@ -239,39 +536,51 @@ class AgentRuntime:
         Raises:
             AgentRuntimeError: If builder output does not expose invoke method.
         """
-        if self._agent is not None:
-            return self._agent
-
-        model_map = self._model_factory.create_models(self._config.models.profiles)
+        models_cfg = self._config.models
+        model_map = self._model_factory.create_models(models_cfg.profiles)
         router = DynamicModelRouter(
             models=model_map,
-            routing=self._config.models.routing,
+            routing=models_cfg.routing,
+            token_accountant=self._token_accountant,
+            governor=ModelCallGovernor(
+                models_cfg.scheduling,
+                {
+                    name: profile.provider
+                    for name, profile in models_cfg.profiles.items()
+                },
+                shared=True,
+            ),
         )
         registry = ToolRegistry.from_tools(self._tools)
         allowlisted_tools = registry.allowlisted(self._config.tools.allowlist)
+        middleware = self._middleware_stack(router, model_map, allowlisted_tools)
 
-        system_prompt = self._config.agent.system_prompt
-        middleware = [router.build_middleware()]
-
-        if self._agent_identity_context_markdown.strip():
-            middleware.append(
-                SystemPromptAgentIdentityMiddleware(
-                    identity_markdown=self._agent_identity_context_markdown,
-                )
+        built = self._agent_builder(
+            model=model_map[self._config.models.routing.default_profile],
+            tools=allowlisted_tools,
+            system_prompt=self._config.agent.system_prompt,
+            middleware=middleware,
+            checkpointer=await self._build_checkpointer(),
+            name=self._config.agent.name,
+        )
+        if not hasattr(built, "invoke") and not hasattr(built, "ainvoke"):
+            msg = (
+                "Agent builder must return an object with invoke(...) or "
+                "ainvoke(...) method."
             )
+            raise AgentRuntimeError(msg)
+        return cast(object, built)
 
-        compression_cfg = self._config.policies.conversation_compression
-        if compression_cfg.enabled:
-            # Use the default-profile model for summarization to keep
-            # middleware initialization deterministic.
-            compression_model = model_map[self._config.models.routing.default_profile]
-            middleware.append(
-                build_conversation_compression_middleware(
-                    compression_cfg,
-                    model=compression_model,
-                ),
-            )
+    def _system_prompt_prefix(self) -> tuple[SystemPromptPrefix, str, str]:
+        """Assemble the system prompt prefix shared by every model call.
 
+        Returns:
+            Prefix plus the identity and skill catalog markdown it contains
+            (empty when absent).
+        """
+        identity = self._agent_identity_context_markdown
+        identity = identity if identity.strip() else ""
+        catalog = ""
         if (
             self._skill_bundle is not None
             and self._skill_bundle.catalog_markdown.strip()
@@ -281,102 +590,407 @@ class AgentRuntime:
                 skills_count=len(self._skill_bundle.registry.canonical_keys()),
                 catalog_char_count=len(catalog),
             )
-            # Middleware strategy: do not mutate build-time system_prompt; instead
-            # rewrite the model request system_message right before invocation.
+        default_profile = self._config.models.routing.default_profile
+        # Do not mutate the build-time system_prompt; the prefix stage replaces the
+        # request system message with one object assembled once per build, so the
+        # prompt prefix stays byte-identical across calls for provider caching.
+        prefix = build_system_prompt_prefix(
+            self._config.agent.system_prompt,
+            identity_markdown=identity,
+            catalog_markdown=catalog,
+            count_tokens=lambda message: self._token_accountant.count_tokens(
+                default_profile, [message]
+            ),
+        )
+        emit_system_prompt_assembled(
+            prefix,
+            identity_char_count=len(identity),
+            catalog_char_count=len(catalog),
+        )
+        return prefix, identity, catalog
+
+    def _middleware_stack(
+        self,
+        router: DynamicModelRouter,
+        model_map: dict[str, BaseChatModel],
+        tools: list[ToolLike],
+    ) -> list[AgentMiddleware[Any, Any]]:
+        """Assemble the agent middleware, outermost first.
+
+        Args:
+            router: Router selecting the profile of each model call.
+            model_map: Profile models by name.
+            tools: Allowlisted tools; extended with tools a middleware needs.
+
+        Returns:
+            Middleware list for the agent builder.
+        """
+        prefix, identity, catalog = self._system_prompt_prefix()
+        middleware: list[AgentMiddleware[Any, Any]] = [
+            ToolCallTimingMiddleware(),
+            router.build_middleware(),
+            SystemPromptPrefixMiddleware(prefix),
+        ]
+        context_cfg = self._config.policies.context_budget
+        if context_cfg.enabled:
+            # After the prefix so cuts start from it; inside the router so each
+            # call is planned against the window of the profile that serves it.
             middleware.append(
-                SystemPromptSkillCatalogMiddleware(catalog_markdown=catalog)
+                ContextBudgetMiddleware(
+                    context_cfg,
+                    system_prompt=self._config.agent.system_prompt,
+                    identity_markdown=identity,
+                    catalog_markdown=catalog,
+                    default_profile=self._config.models.routing.default_profile,
+                    token_accountant=self._token_accountant,
+                )
             )
-
+        offload_cfg = self._config.tools.output_offload
+        if offload_cfg.enabled:
+            # Offloaded before results enter state, so checkpoints stay bounded too.
+            store = ToolOutputStore(self._tool_output_dir)
+            middleware.insert(1, ToolOutputOffloadMiddleware(store, offload_cfg))
+            tools.append(
+                build_fetch_tool_output_tool(
+                    store, max_length=offload_cfg.threshold_chars
+                )
+            )
+        budgets = self._config.policies.budgets
+        if budgets.enabled:
+            # Inside the router so each call is priced by the profile that served it.
+            middleware.append(
+                RunBudgetMiddleware(budgets, self._config.models.profiles)
+            )
+        inline = self._configure_compression(model_map)
+        if inline is not None:
+            middleware.append(inline)
+        cache = self._response_cache_middleware()
+        if cache is not None:
+            middleware.append(cache)
         middleware.extend(
             [
+                # Permits are taken here, so response cache hits never queue.
+                router.build_admission_middleware(),
                 ModelCallLimitMiddleware(
                     run_limit=self._config.policies.max_model_calls
                 ),
                 ToolCallLimitMiddleware(run_limit=self._config.policies.max_tool_calls),
             ]
         )
+        return middleware
 
-        built = self._agent_builder(
-            model=model_map[self._config.models.routing.default_profile],
-            tools=allowlisted_tools,
-            system_prompt=system_prompt,
-            middleware=middleware,
-            checkpointer=self._build_checkpointer(),
-            name=self._config.agent.name,
+    def _configure_compression(
+        self,
+        model_map: dict[str, BaseChatModel],
+    ) -> AgentMiddleware[Any, Any] | None:
+        """Set up conversation compression for this build.
+
+        Builds the between-turn compressor and returns the inline middleware
+        for the configured mode.
+
+        Args:
+            model_map: Profile models by name.
+
+        Returns:
+            Inline compression middleware, or ``None`` when compression is off
+            or runs between turns only.
+        """
+        compression_cfg = self._config.policies.conversation_compression
+        self._background_compressor = None
+        if not compression_cfg.enabled:
+            return None
+        models_cfg = self._config.models
+        # Summaries use one fixed profile, not the router. Its model is built
+        # now: fractional triggers and chunk sizes read its provider profile.
+        summary_profile = compression_cfg.profile or models_cfg.routing.default_profile
+        summary_model = resolve_chat_model(model_map[summary_profile])
+        token_counter = self._token_accountant.summarization_counter(summary_profile)
+        pricing = (
+            models_cfg.profiles[summary_profile].pricing
+            if self._config.policies.budgets.enabled
+            else None
         )
-        if not hasattr(built, "invoke") and not hasattr(built, "ainvoke"):
-            msg = (
-                "Agent builder must return an object with invoke(...) or "
-                "ainvoke(...) method."
+        self._background_compressor = build_background_compressor(
+            compression_cfg,
+            model=summary_model,
+            token_counter=token_counter,
+            pricing=pricing,
+        )
+        return build_conversation_compression_middleware(
+            compression_cfg,
+            model=summary_model,
+            token_counter=token_counter,
+            pricing=pricing,
+        )
+
+    def _response_cache_middleware(self) -> ModelResponseCacheMiddleware | None:
+        """Return the response cache stage when any profile is cached.
+
+        Returns:
+            Cache middleware over the runtime's shared store, or ``None``.
+        """
+        models_cfg = self._config.models
+        cache_cfg = models_cfg.response_cache
+        if not any(
+            cache_cfg.caches_profile(name, profile)
+            for name, profile in models_cfg.profiles.items()
+        ):
+            return None
+        # Innermost model-call wrapper: keys must cover the final request.
+        if self._response_store is None:
+            self._response_store = ModelResponseStore(
+                self._response_cache_db_path, cache_cfg
             )
-            raise AgentRuntimeError(msg)
-        self._agent = cast(object, built)
-        return self._agent
+        return ModelResponseCacheMiddleware(
+            self._response_store, models_cfg.profiles, cache_cfg
+        )
 
-    def _invoke(
+    def _invoke_inputs(
         self,
         user_prompt: str,
-        conversation_id: str | None = None,
-    ) -> tuple[dict[str, object], list[SkillRetrievalTraceEntry]]:
-        """Invoke the underlying agent with configured recursion limit.
+        conversation_id: str | None,
+    ) -> tuple[dict[str, object], dict[str, object]]:
+        """Build agent input payload and invocation config for one prompt.
 
         Args:
             user_prompt: Raw user prompt text.
             conversation_id: Optional conversation/thread id for resume continuity.
 
         Returns:
-            Raw mapping output from compiled LangChain agent and skill retrieval trace
-            entries recorded during this invoke.
-
-        Raises:
-            AgentRuntimeError: If invocation output is not a dict payload.
+            Tuple of ``(payload, invoke_config)``.
         """
-        agent = self._build_agent()
         payload: dict[str, object] = {
             "messages": [{"role": "user", "content": user_prompt}]
         }
         invoke_config: dict[str, object] = {
             "recursion_limit": self._config.policies.max_iterations
         }
-        thread_id = conversation_id or f"ephemeral-{uuid4()}"
+        thread_id = conversation_id or f"{EPHEMERAL_THREAD_PREFIX}{uuid4()}"
         invoke_config["configurable"] = {"thread_id": thread_id}
+        return payload, invoke_config
+
+    def _run_options(
+        self,
+        agent: object,
+        conversation_id: str | None,
+    ) -> dict[str, object]:
+        """Build LangGraph run options for one invoke or stream call.
+
+        Checkpoint durability only applies to attached conversations, the runs
+        that execute with the SQLite checkpointer.
+
+        Args:
+            agent: Compiled agent selected for the run.
+            conversation_id: Conversation id of the run, or ``None`` when ephemeral.
+
+        Returns:
+            Keyword options forwarded to ``ainvoke``/``astream``.
+        """
+        if conversation_id is None or not isinstance(agent, Pregel):
+            return {}
+        return {"durability": self._config.policies.checkpoint_durability.value}
 
+    @contextmanager
+    def _bound_skill_context(self) -> Iterator[list[SkillRetrievalTraceEntry]]:
+        """Bind skill loader and trace buffer for the duration of one invoke.
+
+        Yields:
+            Mutable trace entry list appended by ``skill_retrieve``.
+        """
         loader_token = None
         if self._skill_bundle is not None:
             loader_token = bind_skill_loader(self._skill_bundle.loader)
 
         trace_token, trace_entries = bind_skill_trace()
         try:
+            yield trace_entries
+        finally:
+            if loader_token is not None:
+                reset_skill_loader(loader_token)
+            reset_skill_trace(trace_token)
+
+    @contextmanager
+    def _bound_run_timings(self) -> Iterator[RunTimingRecorder]:
+        """Bind a timing recorder for the duration of one run.
+
+        Yields:
+            Recorder filled by router, tool, summarization and checkpoint hooks.
+        """
+        token, recorder = bind_run_timings()
+        try:
+            yield recorder
+        finally:
+            reset_run_timings(token)
+
+    @contextmanager
+    def _bound_run_budget(self) -> Iterator[RunBudgetRecorder | None]:
+        """Bind a budget recorder when any budget is configured.
+
+        The run's wall-clock budget starts here, after scheduler admission.
+
+        Yields:
+            Recorder charged by ``RunBudgetMiddleware``, or ``None`` without budgets.
+        """
+        if not self._config.policies.budgets.enabled:
+            yield None
+            return
+        token, recorder = bind_run_budget()
+        try:
+            yield recorder
+        finally:
+            reset_run_budget(token)
+
+    def _finish_run_result(
+        self,
+        result: AgentRunResult,
+        *,
+        waited: float,
+        timings: RunTimings,
+        budget: RunBudgetRecorder | None,
+    ) -> AgentRunResult:
+        """Attach queue wait, timings, and budget report to a run result.
+
+        Args:
+            result: Normalized run result.
+            waited: Seconds the run queued for a scheduler slot.
+            timings: Frozen run timings.
+            budget: Run budget recorder, when budgets are configured.
+
+        Returns:
+            Completed run result.
+        """
+        report = (
+            build_budget_report(self._config.policies.budgets, budget)
+            if budget is not None
+            else None
+        )
+        return result.model_copy(
+            update={"queue_wait_seconds": waited, "timings": timings, "budget": report}
+        )
+
+    def _schedule_background_compression(
+        self,
+        conversation_id: str | None,
+        output: dict[str, object],
+    ) -> None:
+        """Compact a finished turn's thread off the caller's critical path.
+
+        The task runs on the running loop in a fresh context, so it does not
+        record into the finished run's timings or budgets.
+
+        Args:
+            conversation_id: Conversation of the finished turn, if any.
+            output: Final agent state of the turn.
+        """
+        compressor = self._background_compressor
+        messages = output.get("messages")
+        if (
+            compressor is None
+            or conversation_id is None
+            or conversation_id in self._compression_tasks
+            or not isinstance(messages, list)
+            or not compressor.should_compress(messages)
+        ):
+            return
+        task = asyncio.get_running_loop().create_task(
+            self._compress_in_background(compressor, conversation_id),
+            context=contextvars.Context(),
+        )
+        self._compression_tasks[conversation_id] = task
+        task.add_done_callback(
+            lambda _task: self._compression_tasks.pop(conversation_id, None)
+        )
+
+    async def _compress_in_background(
+        self,
+        compressor: BackgroundConversationCompressor,
+        conversation_id: str,
+    ) -> None:
+        """Compact one thread while holding its scheduler slot.
+
+        Holding the slot orders compaction with the conversation's turns: a turn
+        submitted meanwhile waits for the compacted history. Failures are logged;
+        the thread then keeps its uncompacted checkpoint.
+
+        Args:
+            compressor: Between-turn compressor of the current agent build.
+            conversation_id: Thread to compact.
+        """
+        binding = await self._bind_resources_to_running_loop()
+        async with binding.scheduler.slot(conversation_id):
+            agent = self._agent
+            if not isinstance(agent, Pregel):
+                return
+            try:
+                await compressor.acompact(agent, conversation_id)
+            except Exception:
+                _LOGGER.warning(
+                    "Background compression failed for conversation %s.",
+                    conversation_id,
+                    exc_info=True,
+                )
+
+    async def adrain_background_compression(self) -> None:
+        """Wait for scheduled background compressions to finish."""
+        while self._compression_tasks:
+            await asyncio.gather(
+                *self._compression_tasks.values(), return_exceptions=True
+            )
+
+    async def _invoke(
+        self,
+        user_prompt: str,
+        conversation_id: str | None = None,
+    ) -> tuple[dict[str, object], list[SkillRetrievalTraceEntry]]:
+        """Invoke the underlying agent with configured recursion limit.
+
+        Args:
+            user_prompt: Raw user prompt text.
+            conversation_id: Optional conversation/thread id for resume continuity.
+
+        Returns:
+            Raw mapping output from compiled LangChain agent and skill retrieval trace
+            entries recorded during this invoke.
+
+        Raises:
+            AgentRuntimeError: If invocation output is not a dict payload.
+        """
+        agent = await self._agent_for_run(conversation_id)
+        payload, invoke_config = self._invoke_inputs(user_prompt, conversation_id)
+        options = self._run_options(agent, conversation_id)
+
+        with self._bound_skill_context() as trace_entries:
             if hasattr(agent, "ainvoke"):
                 async_agent = cast(_AsyncInvokableAgent, agent)
-                result = self._run_on_async_loop(
-                    async_agent.ainvoke(payload, config=invoke_config)
+                result = await async_agent.ainvoke(
+                    payload, config=invoke_config, **options
                 )
             elif hasattr(agent, "invoke"):
-                result = agent.invoke(payload, config=invoke_config)
+                # Sync-only builders run off-loop; to_thread carries context vars.
+                result = await asyncio.to_thread(
+                    agent.invoke, payload, config=invoke_config, **options
+                )
             else:
                 msg = "Built agent exposes neither invoke(...) nor ainvoke(...)."
                 raise AgentRuntimeError(msg)
-        finally:
-            if loader_token is not None:
-                reset_skill_loader(loader_token)
-            reset_skill_trace(trace_token)
 
         if not isinstance(result, dict):
             msg = "Agent invocation returned non-dict output."
             raise AgentRuntimeError(msg)
         return result, trace_entries
 
-    def run(
+    def _build_run_result(
         self,
-        user_prompt: str,
-        conversation_id: str | None = None,
+        output: dict[str, object],
+        trace_entries: list[SkillRetrievalTraceEntry],
+        conversation_id: str | None,
     ) -> AgentRunResult:
-        """Run one user prompt through the configured LangChain agent.
+        """Normalize raw agent output into the runtime result contract.
 
         Args:
-            user_prompt: Prompt text to execute.
-            conversation_id: Optional conversation/thread id for resume continuity.
+            output: Raw mapping output from the compiled agent.
+            trace_entries: Skill retrieval trace entries recorded during invoke.
+            conversation_id: Conversation id used for this run, if any.
 
         Returns:
             Deterministic final output + message count contract.
@@ -384,9 +998,6 @@ class AgentRuntime:
         Raises:
             AgentRuntimeError: If agent output is missing expected messages.
         """
-        output, trace_entries = self._invoke(
-            user_prompt, conversation_id=conversation_id
-        )
         raw_messages = output.get("messages")
         if not isinstance(raw_messages, list) or not raw_messages:
             msg = "Agent output missing non-empty 'messages' list."
@@ -399,21 +1010,408 @@ class AgentRuntime:
             msg = "Agent output did not include any AI message."
             raise AgentRuntimeError(msg)
 
-        final_output = _coerce_message_text(ai_messages[-1])
+        return AgentRunResult(
+            final_output=_coerce_message_text(ai_messages[-1]),
+            message_count=len(raw_messages),
+            conversation_id=conversation_id,
+            skill_trace=self._skill_trace(trace_entries),
+        )
+
+    def _skill_trace(
+        self,
+        trace_entries: list[SkillRetrievalTraceEntry],
+    ) -> SkillInvokeTrace:
+        """Summarize skill catalog injection and retrievals of one run.
+
+        Args:
+            trace_entries: Skill retrieval trace entries recorded during the run.
+
+        Returns:
+            Skill trace for the run result.
+        """
         skills_enabled = self._skill_bundle is not None
         catalog_injected = bool(
             skills_enabled
             and self._skill_bundle is not None
             and self._skill_bundle.catalog_markdown.strip()
         )
-        skill_trace = SkillInvokeTrace(
+        return SkillInvokeTrace(
             skills_enabled=skills_enabled,
             catalog_injected=catalog_injected,
             retrievals=tuple(trace_entries),
         )
+
+    async def _interrupted_run_result(
+        self,
+        status: RunStatus,
+        *,
+        partial_output: str,
+        trace_entries: list[SkillRetrievalTraceEntry],
+        conversation_id: str | None,
+    ) -> AgentRunResult:
+        """Describe a run cut short by its deadline or a cancellation handle.
+
+        The message count comes from the conversation's last written checkpoint,
+        which is what the next prompt on the conversation resumes from.
+
+        Args:
+            status: ``cancelled`` or ``timed_out``.
+            partial_output: Reply text streamed before the interruption.
+            trace_entries: Skill retrieval trace entries recorded before it.
+            conversation_id: Conversation id used for this run, if any.
+
+        Returns:
+            Run result flagged with ``status``.
+        """
+        message_count = 0
+        if conversation_id is not None and isinstance(self._agent, Pregel):
+            snapshot = await self._agent.aget_state(
+                {"configurable": {"thread_id": conversation_id}}
+            )
+            messages = snapshot.values.get("messages")
+            message_count = len(messages) if isinstance(messages, list) else 0
         return AgentRunResult(
-            final_output=final_output,
-            message_count=len(raw_messages),
+            final_output=partial_output,
+            message_count=message_count,
             conversation_id=conversation_id,
-            skill_trace=skill_trace,
+            status=status,
+            skill_trace=self._skill_trace(trace_entries),
+        )
+
+    async def awarmup(self, *, preload_models: bool = False) -> None:
+        """Build middleware, checkpointer and agent on the caller's loop.
+
+        Resources bind to the running loop exactly as on the first ``arun``, so a
+        prompt issued during warm-up waits for the same build instead of starting
+        another one.
+
+        Args:
+            preload_models: Also ask model servers that keep weights resident
+                (Ollama) to load every configured profile.
+        """
+        await self._build_agent()
+        if preload_models:
+            await self._model_factory.apreload_models(self._config.models.profiles)
+
+    def warmup(self, *, preload_models: bool = False) -> None:
+        """Build runtime resources ahead of the first prompt.
+
+        Blocking wrapper over ``awarmup`` executed on the runtime-owned loop thread,
+        the loop later used by ``run`` and ``run_stream``.
+
+        Args:
+            preload_models: Also preload resident-weight model profiles (Ollama).
+        """
+        self._run_on_async_loop(self.awarmup(preload_models=preload_models))
+
+    async def arun(
+        self,
+        user_prompt: str,
+        conversation_id: str | None = None,
+        *,
+        timeout: float | None = None,
+        cancellation: RunCancellation | None = None,
+    ) -> AgentRunResult:
+        """Run one user prompt on the caller's event loop.
+
+        Checkpointer and compiled agent are bound to the first loop that runs them
+        and rebuilt when that loop has stopped; use ``aclose`` on the same loop.
+        Concurrent calls are admitted through the runtime's run scheduler.
+
+        Args:
+            user_prompt: Prompt text to execute.
+            conversation_id: Optional conversation/thread id for resume continuity.
+            timeout: Seconds the run may take, queueing included; ``None`` waits
+                indefinitely.
+            cancellation: Optional handle that interrupts the run when cancelled.
+
+        Returns:
+            Deterministic final output + message count contract; ``status`` is
+            ``timed_out`` or ``cancelled`` when the run was interrupted.
+        """
+        started = time.perf_counter()
+        output: dict[str, object] | None = None
+        trace_entries: list[SkillRetrievalTraceEntry] = []
+        waited = 0.0
+        budget: RunBudgetRecorder | None = None
+        with self._bound_run_timings() as recorder:
+            async with interruptible(timeout, cancellation) as outcome:
+                binding = await self._bind_resources_to_running_loop()
+                async with binding.scheduler.slot(conversation_id) as waited:
+                    with self._bound_run_budget() as budget:
+                        output, trace_entries = await self._invoke(
+                            user_prompt, conversation_id=conversation_id
+                        )
+        if output is None:
+            result = await self._interrupted_run_result(
+                outcome.status,
+                partial_output="",
+                trace_entries=trace_entries,
+                conversation_id=conversation_id,
+            )
+        else:
+            result = self._build_run_result(output, trace_entries, conversation_id)
+            self._schedule_background_compression(conversation_id, output)
+        timings = recorder.snapshot(total_seconds=time.perf_counter() - started)
+        emit_run_timings(timings, conversation_id=conversation_id)
+        return self._finish_run_result(
+            result, waited=waited, timings=timings, budget=budget
+        )
+
+    def scheduler_stats(self) -> RunSchedulerStats:
+        """Return queue depth and wait metrics for the active event loop binding.
+
+        Returns:
+            Scheduler snapshot; all-zero counters before the first run.
+        """
+        binding = self._loop_binding
+        if binding is None:
+            return RunSchedulerStats(
+                max_concurrent_runs=self._config.policies.max_concurrent_runs
+            )
+        return binding.scheduler.stats()
+
+    def run(
+        self,
+        user_prompt: str,
+        conversation_id: str | None = None,
+        *,
+        timeout: float | None = None,
+        cancellation: RunCancellation | None = None,
+    ) -> AgentRunResult:
+        """Run one user prompt through the configured LangChain agent.
+
+        Blocking wrapper over ``arun`` executed on the runtime-owned loop thread.
+        ``cancellation.cancel()`` may be called from any thread.
+
+        Args:
+            user_prompt: Prompt text to execute.
+            conversation_id: Optional conversation/thread id for resume continuity.
+            timeout: Seconds the run may take, queueing included.
+            cancellation: Optional handle that interrupts the run when cancelled.
+
+        Returns:
+            Deterministic final output + message count contract.
+        """
+        return self._run_on_async_loop(
+            self.arun(
+                user_prompt,
+                conversation_id=conversation_id,
+                timeout=timeout,
+                cancellation=cancellation,
+            )
+        )
+
+    async def _stream_graph(
+        self,
+        agent: object,
+        user_prompt: str,
+        conversation_id: str | None,
+        tokens: asyncio.Queue[str | None],
+        run: _StreamedRun,
+        *,
+        timeout: float | None,
+        cancellation: RunCancellation | None,
+    ) -> None:
+        """Drive the graph of one streamed run, queueing its reply tokens.
+
+        Runs as its own task so ``interruptible`` cancels only the graph. The
+        queue always ends with ``None``, also when the run fails.
+
+        Args:
+            agent: Compiled agent exposing ``astream``.
+            user_prompt: Prompt text to execute.
+            conversation_id: Optional conversation/thread id for resume continuity.
+            tokens: Queue receiving reply tokens, then ``None``.
+            run: Run state filled in as the graph progresses.
+            timeout: Seconds the run may take, queueing included.
+            cancellation: Optional handle that interrupts the run when cancelled.
+        """
+        try:
+            binding = await self._bind_resources_to_running_loop()
+            payload, invoke_config = self._invoke_inputs(user_prompt, conversation_id)
+            streamable = cast(_AsyncStreamableAgent, agent)
+            async with (
+                interruptible(timeout, cancellation) as run.outcome,
+                binding.scheduler.slot(conversation_id) as run.waited,
+            ):
+                with (
+                    self._bound_run_budget() as run.budget,
+                    self._bound_skill_context() as run.trace_entries,
+                ):
+                    async for mode, data in streamable.astream(
+                        payload,
+                        config=invoke_config,
+                        stream_mode=["messages", "values"],
+                        **self._run_options(agent, conversation_id),
+                    ):
+                        if mode == "values":
+                            if isinstance(data, dict):
+                                run.output = data
+                            continue
+                        text = _stream_token_text(data)
+                        if text:
+                            tokens.put_nowait(text)
+        finally:
+            tokens.put_nowait(None)
+
+    async def astream(
+        self,
+        user_prompt: str,
+        conversation_id: str | None = None,
+        *,
+        timeout: float | None = None,
+        cancellation: RunCancellation | None = None,
+    ) -> AsyncIterator[AgentStreamEvent]:
+        """Run one prompt and yield reply tokens as the model produces them.
+
+        Agents without an ``astream`` surface fall back to one token carrying the
+        whole reply. An interrupted run's result carries the tokens streamed
+        before the interruption as its ``final_output``.
+
+        Args:
+            user_prompt: Prompt text to execute.
+            conversation_id: Optional conversation/thread id for resume continuity.
+            timeout: Seconds the run may take, queueing included.
+            cancellation: Optional handle that interrupts the run when cancelled.
+
+        Yields:
+            ``token`` events in arrival order, then exactly one ``result`` event.
+
+        Raises:
+            AgentRuntimeError: If the stream ends without a final agent state.
+        """
+        started = time.perf_counter()
+        agent = await self._agent_for_run(conversation_id)
+        if not hasattr(agent, "astream"):
+            result = await self.arun(
+                user_prompt,
+                conversation_id=conversation_id,
+                timeout=timeout,
+                cancellation=cancellation,
+            )
+            yield AgentStreamEvent(kind="token", text=result.final_output)
+            yield AgentStreamEvent(kind="result", result=result)
+            return
+
+        tokens: asyncio.Queue[str | None] = asyncio.Queue()
+        run = _StreamedRun()
+        # The graph runs in its own task so the deadline and cancellation
+        # interrupt it, never the consumer while it handles a token. Hedged
+        # model calls would interleave tokens from two models; a user is
+        # watching this run, so its model calls are admitted first.
+        with (
+            self._bound_run_timings() as recorder,
+            hedging_disabled(),
+            model_call_priority(ModelCallPriority.INTERACTIVE),
+        ):
+            producer = asyncio.create_task(
+                self._stream_graph(
+                    agent,
+                    user_prompt,
+                    conversation_id,
+                    tokens,
+                    run,
+                    timeout=timeout,
+                    cancellation=cancellation,
+                )
+            )
+        streamed: list[str] = []
+        try:
+            while (text := await tokens.get()) is not None:
+                streamed.append(text)
+                yield AgentStreamEvent(kind="token", text=text)
+            await producer
+        finally:
+            if not producer.done():
+                producer.cancel()
+                await asyncio.gather(producer, return_exceptions=True)
+
+        if run.outcome.status != "completed":
+            result = await self._interrupted_run_result(
+                run.outcome.status,
+                partial_output="".join(streamed),
+                trace_entries=run.trace_entries,
+                conversation_id=conversation_id,
+            )
+        elif run.output is None:
+            msg = "Agent stream ended without a final state."
+            raise AgentRuntimeError(msg)
+        else:
+            result = self._build_run_result(
+                run.output, run.trace_entries, conversation_id
+            )
+            self._schedule_background_compression(conversation_id, run.output)
+        timings = recorder.snapshot(total_seconds=time.perf_counter() - started)
+        emit_run_timings(timings, conversation_id=conversation_id)
+        yield AgentStreamEvent(
+            kind="result",
+            result=self._finish_run_result(
+                result, waited=run.waited, timings=timings, budget=run.budget
+            ),
         )
+
+    def run_stream(
+        self,
+        user_prompt: str,
+        conversation_id: str | None = None,
+        *,
+        on_token: TokenCallback,
+        timeout: float | None = None,
+        cancellation: RunCancellation | None = None,
+    ) -> AgentRunResult:
+        """Run one prompt, forwarding reply tokens to ``on_token`` as they arrive.
+
+        Blocking wrapper over ``astream``; ``on_token`` is called from the
+        runtime-owned loop thread.
+
+        Args:
+            user_prompt: Prompt text to execute.
+            conversation_id: Optional conversation/thread id for resume continuity.
+            on_token: Callback receiving each reply token.
+            timeout: Seconds the run may take, queueing included.
+            cancellation: Optional handle that interrupts the run when cancelled.
+
+        Returns:
+            Final run result once the stream completes or is interrupted.
+        """
+        return self._run_on_async_loop(
+            collect_stream(
+                self.astream(
+                    user_prompt,
+                    conversation_id=conversation_id,
+                    timeout=timeout,
+                    cancellation=cancellation,
+                ),
+                on_token=on_token,
+            )
+        )
+
+
+async def collect_stream(
+    events: AsyncIterator[AgentStreamEvent],
+    *,
+    on_token: TokenCallback,
+) -> AgentRunResult:
+    """Drain one runtime event stream into a final result.
+
+    Args:
+        events: Event stream from ``AgentRuntime.astream``.
+        on_token: Callback receiving each reply token.
+
+    Returns:
+        The stream's final run result.
+
+    Raises:
+        AgentRuntimeError: If the stream ends without a ``result`` event.
+    """
+    result: AgentRunResult | None = None
+    async for event in events:
+        if event.kind == "token":
+            on_token(event.text)
+        elif event.result is not None:
+            result = event.result
+    if result is None:
+        msg = "Agent stream ended without a result event."
+        raise AgentRuntimeError(msg)
+    return result
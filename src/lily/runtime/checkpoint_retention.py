@@ -0,0 +1,360 @@
+"""Retention and compaction for the runtime SQLite checkpoint database."""
+
+from __future__ import annotations
+
+import logging
+import sqlite3
+import threading
+from collections.abc import Callable, Iterable
+from contextlib import closing
+from datetime import UTC, datetime, timedelta
+from pathlib import Path
+from uuid import UUID
+
+from pydantic import BaseModel, ConfigDict, Field
+
+from lily.runtime.agent_locator import default_agents_root
+from lily.runtime.config_schema import CheckpointRetentionConfig
+from lily.runtime.conversation_sessions import (
+    ConversationSessionStore,
+    ConversationSessionStoreError,
+    default_sessions_db_path,
+)
+
+EPHEMERAL_THREAD_PREFIX = "ephemeral-"
+DEFAULT_CHECKPOINT_DB_PATH = Path(".lily") / "runtime-checkpoints.sqlite3"
+
+_LOGGER = logging.getLogger("lily.checkpoints")
+# Ephemeral threads younger than this may still belong to a run in flight.
+_EPHEMERAL_GRACE = timedelta(minutes=10)
+_BUSY_TIMEOUT_SECONDS = 5.0
+_AUTO_VACUUM_INCREMENTAL = 2
+_CHECKPOINT_ID_UUID_VERSION = 6
+_UUID_GREGORIAN_EPOCH_OFFSET = 0x01B21DD213814000
+_UUID_TICKS_PER_SECOND = 10_000_000
+_CHECKPOINT_TABLES = frozenset({"checkpoints", "writes"})
+
+
+class CheckpointRetentionError(RuntimeError):
+    """Raised when checkpoint compaction cannot read or rewrite the database."""
+
+
+class CheckpointCompactionReport(BaseModel):
+    """Row and page counts removed by one compaction pass."""
+
+    model_config = ConfigDict(frozen=True)
+
+    threads_deleted: int = Field(default=0, ge=0)
+    checkpoints_deleted: int = Field(default=0, ge=0)
+    writes_deleted: int = Field(default=0, ge=0)
+    freed_pages: int = Field(default=0, ge=0)
+
+
+def checkpoint_created_at(checkpoint_id: str) -> datetime | None:
+    """Return the creation time encoded in a LangGraph checkpoint id.
+
+    Args:
+        checkpoint_id: Checkpoint id written by the LangGraph saver (UUIDv6).
+
+    Returns:
+        UTC creation time, or ``None`` when the id is not a UUIDv6.
+    """
+    try:
+        parsed = UUID(checkpoint_id)
+    except ValueError:
+        return None
+    if parsed.version != _CHECKPOINT_ID_UUID_VERSION:
+        return None
+    value = parsed.int
+    ticks = ((value >> 80) << 12) | ((value >> 64) & 0x0FFF)
+    seconds = (ticks - _UUID_GREGORIAN_EPOCH_OFFSET) / _UUID_TICKS_PER_SECOND
+    return datetime.fromtimestamp(seconds, tz=UTC)
+
+
+def discover_session_databases(workspace_root: Path) -> list[Path]:
+    """Find conversation session stores for a workspace and its named agents.
+
+    Args:
+        workspace_root: Directory holding the shared `.lily/` folder.
+
+    Returns:
+        Existing session database paths, workspace store first.
+    """
+    candidates = [default_sessions_db_path(workspace_root)]
+    agents_root = default_agents_root(workspace_root)
+    if agents_root.is_dir():
+        candidates.extend(
+            default_sessions_db_path(agent_dir)
+            for agent_dir in sorted(agents_root.iterdir())
+            if agent_dir.is_dir()
+        )
+    return [path for path in candidates if path.is_file()]
+
+
+def load_live_thread_ids(session_db_paths: Iterable[Path]) -> frozenset[str]:
+    """Collect conversation ids referenced by conversation session stores.
+
+    Args:
+        session_db_paths: Session database files to read.
+
+    Returns:
+        Conversation ids that must keep their checkpoint threads.
+
+    Raises:
+        CheckpointRetentionError: If a session store cannot be read.
+    """
+    live: set[str] = set()
+    for path in session_db_paths:
+        try:
+            snapshot = ConversationSessionStore(path).snapshot()
+        except (ConversationSessionStoreError, sqlite3.Error) as exc:
+            msg = f"Failed to read conversation sessions from '{path}': {exc}"
+            raise CheckpointRetentionError(msg) from exc
+        live.update(record.conversation_id for record in snapshot.sessions)
+    return frozenset(live)
+
+
+def _expired_thread_ids(
+    conn: sqlite3.Connection,
+    policy: CheckpointRetentionConfig,
+    live_thread_ids: frozenset[str],
+    now: datetime,
+) -> list[str]:
+    """Select threads removed by the ephemeral and orphan-TTL rules.
+
+    Args:
+        conn: Open checkpoint database connection.
+        policy: Retention policy to apply.
+        live_thread_ids: Conversation ids referenced by session stores.
+        now: Reference time for idle checks.
+
+    Returns:
+        Thread ids whose checkpoints and writes should be deleted.
+    """
+    orphan_ttl = (
+        timedelta(hours=policy.orphan_ttl_hours)
+        if policy.orphan_ttl_hours is not None
+        else None
+    )
+    expired: list[str] = []
+    rows = conn.execute(
+        "SELECT thread_id, MAX(checkpoint_id) FROM checkpoints GROUP BY thread_id"
+    ).fetchall()
+    for thread_id, last_checkpoint_id in rows:
+        last_activity = checkpoint_created_at(str(last_checkpoint_id))
+        if last_activity is None:
+            continue
+        idle = now - last_activity
+        if policy.drop_ephemeral and str(thread_id).startswith(EPHEMERAL_THREAD_PREFIX):
+            if idle >= _EPHEMERAL_GRACE:
+                expired.append(str(thread_id))
+            continue
+        if (
+            orphan_ttl is not None
+            and thread_id not in live_thread_ids
+            and idle >= orphan_ttl
+        ):
+            expired.append(str(thread_id))
+    return expired
+
+
+def _reclaim_free_pages(conn: sqlite3.Connection, pages: int) -> int:
+    """Return free pages to the filesystem, switching to incremental vacuum once.
+
+    The first pass on a database created without ``auto_vacuum`` rebuilds it with
+    a full ``VACUUM``; later passes release at most ``pages`` pages each.
+
+    Args:
+        conn: Open autocommit checkpoint database connection.
+        pages: Page budget for one incremental pass; ``0`` skips vacuuming.
+
+    Returns:
+        Number of pages released, ``0`` when the database was busy.
+    """
+    if pages == 0:
+        return 0
+    before = int(conn.execute("PRAGMA freelist_count").fetchone()[0])
+    try:
+        mode = int(conn.execute("PRAGMA auto_vacuum").fetchone()[0])
+        if mode != _AUTO_VACUUM_INCREMENTAL:
+            conn.execute("PRAGMA auto_vacuum = INCREMENTAL")
+            conn.execute("VACUUM")
+        else:
+            conn.execute(f"PRAGMA incremental_vacuum({int(pages)})").fetchall()
+    except sqlite3.OperationalError:
+        _LOGGER.info("Checkpoint database busy; vacuum deferred", exc_info=True)
+        return 0
+    after = int(conn.execute("PRAGMA freelist_count").fetchone()[0])
+    return max(before - after, 0)
+
+
+def compact_checkpoints(
+    db_path: Path,
+    policy: CheckpointRetentionConfig,
+    *,
+    live_thread_ids: frozenset[str],
+    now: datetime | None = None,
+) -> CheckpointCompactionReport:
+    """Apply one retention pass to a LangGraph SQLite checkpoint database.
+
+    Deletes expired ephemeral and orphaned threads, trims every remaining thread
+    namespace to its newest ``keep_last`` checkpoints, drops writes left without
+    a checkpoint, and then vacuums incrementally.
+
+    Args:
+        db_path: Checkpoint database file.
+        policy: Retention policy to apply.
+        live_thread_ids: Conversation ids referenced by session stores.
+        now: Optional reference time (defaults to the current UTC time).
+
+    Returns:
+        Counts of deleted threads, rows, and released pages.
+
+    Raises:
+        CheckpointRetentionError: If the database cannot be read or rewritten.
+        BaseException: Any other failure inside the transaction, re-raised
+            after rolling the pass back.
+    """
+    if not db_path.is_file():
+        return CheckpointCompactionReport()
+    reference_time = now or datetime.now(tz=UTC)
+    try:
+        with closing(
+            sqlite3.connect(
+                db_path, timeout=_BUSY_TIMEOUT_SECONDS, isolation_level=None
+            )
+        ) as conn:
+            tables = {
+                str(row[0])
+                for row in conn.execute(
+                    "SELECT name FROM sqlite_master WHERE type = 'table'"
+                )
+            }
+            if not _CHECKPOINT_TABLES.issubset(tables):
+                return CheckpointCompactionReport()
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                expired = _expired_thread_ids(
+                    conn, policy, live_thread_ids, reference_time
+                )
+                deleted_checkpoints = 0
+                for thread_id in expired:
+                    deleted_checkpoints += conn.execute(
+                        "DELETE FROM checkpoints WHERE thread_id = ?", (thread_id,)
+                    ).rowcount
+                deleted_checkpoints += conn.execute(
+                    """
+                    DELETE FROM checkpoints
+                    WHERE (thread_id, checkpoint_ns, checkpoint_id) IN (
+                        SELECT thread_id, checkpoint_ns, checkpoint_id
+                        FROM (
+                            SELECT
+                                thread_id,
+                                checkpoint_ns,
+                                checkpoint_id,
+                                ROW_NUMBER() OVER (
+                                    PARTITION BY thread_id, checkpoint_ns
+                                    ORDER BY checkpoint_id DESC
+                                ) AS newest_rank
+                            FROM checkpoints
+                        )
+                        WHERE newest_rank > ?
+                    )
+                    """,
+                    (policy.keep_last,),
+                ).rowcount
+                deleted_writes = conn.execute(
+                    """
+                    DELETE FROM writes
+                    WHERE NOT EXISTS (
+                        SELECT 1 FROM checkpoints
+                        WHERE checkpoints.thread_id = writes.thread_id
+                          AND checkpoints.checkpoint_ns = writes.checkpoint_ns
+                          AND checkpoints.checkpoint_id = writes.checkpoint_id
+                    )
+                    """
+                ).rowcount
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+            freed_pages = _reclaim_free_pages(conn, policy.vacuum_pages)
+    except sqlite3.Error as exc:
+        msg = f"Failed to compact checkpoint database '{db_path}': {exc}"
+        raise CheckpointRetentionError(msg) from exc
+    return CheckpointCompactionReport(
+        threads_deleted=len(expired),
+        checkpoints_deleted=deleted_checkpoints,
+        writes_deleted=deleted_writes,
+        freed_pages=freed_pages,
+    )
+
+
+class CheckpointCompactor:
+    """Background thread running ``compact_checkpoints`` on a fixed interval."""
+
+    def __init__(
+        self,
+        db_path: Path,
+        policy: CheckpointRetentionConfig,
+        *,
+        interval_seconds: float,
+        live_thread_ids: Callable[[], frozenset[str]],
+    ) -> None:
+        """Initialize compactor inputs; call ``start`` to begin compacting.
+
+        Args:
+            db_path: Checkpoint database file.
+            policy: Retention policy to apply on every pass.
+            interval_seconds: Delay between the end of one pass and the next.
+            live_thread_ids: Callable returning conversation ids to keep, read
+                again before every pass.
+        """
+        self._db_path = db_path
+        self._policy = policy
+        self._interval_seconds = interval_seconds
+        self._live_thread_ids = live_thread_ids
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def compact_once(self) -> CheckpointCompactionReport:
+        """Run one compaction pass with freshly loaded live thread ids.
+
+        Returns:
+            Counts removed by the pass.
+        """
+        return compact_checkpoints(
+            self._db_path,
+            self._policy,
+            live_thread_ids=self._live_thread_ids(),
+        )
+
+    def _run(self) -> None:
+        """Compact until stopped, logging failed passes instead of raising."""
+        while not self._stop.wait(self._interval_seconds):
+            try:
+                report = self.compact_once()
+            except CheckpointRetentionError:
+                _LOGGER.warning("Checkpoint compaction failed", exc_info=True)
+                continue
+            _LOGGER.info("Checkpoint compaction finished: %s", report)
+
+    def start(self) -> None:
+        """Start the background thread once; later calls are no-ops."""
+        if self._thread is not None:
+            return
+        self._thread = threading.Thread(
+            target=self._run, name="lily-checkpoint-compactor", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self, timeout: float = 2.0) -> None:
+        """Signal the background thread to exit and wait for it.
+
+        Args:
+            timeout: Seconds to wait for an in-progress pass to finish.
+        """
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=timeout)
+            self._thread = None
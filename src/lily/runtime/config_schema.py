@@ -42,6 +42,30 @@ class AgentConfig(BaseModel):
     system_prompt: str = Field(min_length=1)
 
 
+class ModelPricingConfig(BaseModel):
+    """Provider list price of one model profile, used for cost budgets."""
+
+    model_config = ConfigDict(extra="forbid")
+
+    input_per_million_tokens: float = Field(default=0.0, ge=0.0)
+    output_per_million_tokens: float = Field(default=0.0, ge=0.0)
+
+    def cost(self, input_tokens: int, output_tokens: int) -> float:
+        """Return the estimated cost of one model call.
+
+        Args:
+            input_tokens: Prompt tokens reported by the provider.
+            output_tokens: Completion tokens reported by the provider.
+
+        Returns:
+            Cost in the configured currency unit.
+        """
+        return (
+            input_tokens * self.input_per_million_tokens
+            + output_tokens * self.output_per_million_tokens
+        ) / 1_000_000
+
+
 class ModelProfileConfig(BaseModel):
     """One concrete model definition for a provider."""
 
@@ -51,6 +75,40 @@ class ModelProfileConfig(BaseModel):
     model: str = Field(min_length=1)
     temperature: float = Field(ge=0.0, le=2.0)
     timeout_seconds: float = Field(gt=0.0)
+    tokenizer: str | None = Field(
+        default=None,
+        pattern=r"^[a-z0-9_]+$",
+        description=(
+            "tiktoken encoding name or 'approximate' used to count this profile's "
+            "tokens. Defaults to the model's tiktoken encoding for OpenAI and "
+            "'approximate' otherwise."
+        ),
+    )
+    pricing: ModelPricingConfig = Field(default_factory=ModelPricingConfig)
+
+
+class ModelHedgeConfig(BaseModel):
+    """Hedged requests: race a fallback profile when the primary is slow."""
+
+    model_config = ConfigDict(extra="forbid")
+
+    enabled: bool = False
+    quantile: float = Field(
+        default=0.95,
+        gt=0.0,
+        lt=1.0,
+        description="Latency quantile of the primary profile used as hedge delay.",
+    )
+    min_delay_seconds: float = Field(
+        default=0.5,
+        gt=0.0,
+        description="Lower bound (and cold-start value) for the hedge delay.",
+    )
+    min_samples: int = Field(
+        default=20,
+        ge=1,
+        description="Primary latency samples needed before the quantile is used.",
+    )
 
 
 class DynamicModelRoutingConfig(BaseModel):
@@ -62,6 +120,107 @@ class DynamicModelRoutingConfig(BaseModel):
     default_profile: str = Field(min_length=1)
     long_context_profile: str = Field(min_length=1)
     complexity_threshold: int = Field(ge=1)
+    complexity_unit: Literal["characters", "tokens"] = Field(
+        default="characters",
+        description=(
+            "Unit of complexity_threshold: history content characters, or tokens "
+            "counted with the default profile's tokenizer."
+        ),
+    )
+    fallbacks: dict[str, list[str]] = Field(
+        default_factory=dict,
+        description=(
+            "Ordered profiles tried after a timeout or connection error, keyed by "
+            "the selected profile."
+        ),
+    )
+    unhealthy_error_rate: float = Field(
+        default=0.5,
+        gt=0.0,
+        le=1.0,
+        description=(
+            "EWMA error rate at which a profile with fallbacks is tried last until "
+            "unhealthy_cooldown_seconds pass without a new failure."
+        ),
+    )
+    unhealthy_cooldown_seconds: float = Field(default=30.0, ge=0.0)
+    hedge: ModelHedgeConfig = Field(default_factory=ModelHedgeConfig)
+
+
+class ModelCallLimitConfig(BaseModel):
+    """Admission limits for model calls on one profile or provider."""
+
+    model_config = ConfigDict(extra="forbid")
+
+    max_in_flight: int | None = Field(default=None, ge=1)
+    requests_per_minute: float | None = Field(default=None, gt=0.0)
+    tokens_per_minute: int | None = Field(
+        default=None,
+        ge=1,
+        description=(
+            "Prompt tokens admitted per minute; settled with reported usage after "
+            "each call."
+        ),
+    )
+
+
+class ModelCallSchedulingConfig(BaseModel):
+    """Concurrency, rate limits, and rate-limit retries for model calls."""
+
+    model_config = ConfigDict(extra="forbid")
+
+    providers: dict[ModelProvider, ModelCallLimitConfig] = Field(
+        default_factory=dict,
+        description="Limits shared by every profile of a provider.",
+    )
+    profiles: dict[str, ModelCallLimitConfig] = Field(default_factory=dict)
+    queue: Literal["fifo", "priority"] = Field(
+        default="fifo",
+        description=(
+            "Admission order of waiting calls; ``priority`` admits streamed runs "
+            "before blocking runs, in arrival order within each."
+        ),
+    )
+    rate_limit_retries: int = Field(default=3, ge=0)
+    backoff_base_seconds: float = Field(default=1.0, gt=0.0)
+    backoff_max_seconds: float = Field(default=30.0, gt=0.0)
+
+
+class ModelResponseCacheConfig(BaseModel):
+    """Opt-in exact-match cache of model responses."""
+
+    model_config = ConfigDict(extra="forbid")
+
+    enabled: bool = False
+    profiles: list[str] | None = Field(
+        default=None,
+        description=(
+            "Profiles whose responses are cached; defaults to every profile with "
+            "temperature 0."
+        ),
+    )
+    max_entries: int = Field(default=10_000, ge=1)
+    ttl_seconds: float | None = Field(
+        default=7 * 24 * 3600.0,
+        gt=0.0,
+        description="Entry lifetime; ``None`` keeps entries until evicted by size.",
+    )
+
+    def caches_profile(self, name: str, profile: ModelProfileConfig) -> bool:
+        """Return whether responses of one profile are cached.
+
+        Args:
+            name: Profile name.
+            profile: Profile settings.
+
+        Returns:
+            ``True`` when the cache is enabled for this profile.
+        """
+        if not self.enabled:
+            return False
+        if self.profiles is None:
+            return profile.temperature == 0.0
+        return name in self.profiles
 
 
 class ModelsConfig(BaseModel):
@@ -71,16 +230,22 @@ class ModelsConfig(BaseModel):
 
     profiles: dict[str, ModelProfileConfig] = Field(min_length=1)
     routing: DynamicModelRoutingConfig
+    scheduling: ModelCallSchedulingConfig = Field(
+        default_factory=ModelCallSchedulingConfig
+    )
+    response_cache: ModelResponseCacheConfig = Field(
+        default_factory=ModelResponseCacheConfig
+    )
 
     @model_validator(mode="after")
     def _validate_profile_references(self) -> ModelsConfig:
-        """Ensure routing references only known model profiles.
+        """Ensure routing, scheduling, and caching reference known model profiles.
 
         Returns:
             Self after successful post-validation checks.
 
         Raises:
-            ValueError: If routing references unknown profile keys.
+            ValueError: If a model policy references unknown profile keys.
         """
         profile_names = set(self.profiles)
         if self.routing.default_profile not in profile_names:
@@ -91,6 +256,62 @@ class ModelsConfig(BaseModel):
                 "routing.long_context_profile must reference a key from models.profiles"
             )
             raise ValueError(msg)
+        for primary, fallbacks in self.routing.fallbacks.items():
+            unknown = [
+                name for name in (primary, *fallbacks) if name not in profile_names
+            ]
+            if unknown:
+                msg = (
+                    f"routing.fallbacks['{primary}'] references unknown profiles: "
+                    f"{', '.join(unknown)}"
+                )
+                raise ValueError(msg)
+        unknown_limited = sorted(
+            (set(self.scheduling.profiles) | set(self.response_cache.profiles or ()))
+            - profile_names
+        )
+        if unknown_limited:
+            msg = (
+                "scheduling/response_cache profiles reference unknown profiles: "
+                f"{', '.join(unknown_limited)}"
+            )
+            raise ValueError(msg)
+        return self
+
+
+class ToolOutputOffloadConfig(BaseModel):
+    """Offloading of oversized tool results to the local blob store."""
+
+    model_config = ConfigDict(extra="forbid")
+
+    enabled: bool = False
+    threshold_chars: int = Field(
+        default=20_000,
+        ge=1,
+        description=(
+            "Tool results longer than this are stored under `.lily/blobs/` and "
+            "replaced in the conversation by a preview and a handle."
+        ),
+    )
+    preview_chars: int = Field(
+        default=2_000,
+        ge=0,
+        description="Leading characters of an offloaded result kept in the history.",
+    )
+
+    @model_validator(mode="after")
+    def _validate_preview_size(self) -> Self:
+        """Ensure previews are shorter than the offload threshold.
+
+        Returns:
+            Self after successful post-validation checks.
+
+        Raises:
+            ValueError: If ``preview_chars`` is not below ``threshold_chars``.
+        """
+        if self.preview_chars >= self.threshold_chars:
+            msg = "tools.output_offload.preview_chars must be below threshold_chars"
+            raise ValueError(msg)
         return self
 
 
@@ -100,6 +321,9 @@ class ToolsConfig(BaseModel):
     model_config = ConfigDict(extra="forbid")
 
     allowlist: list[str] = Field(min_length=1)
+    output_offload: ToolOutputOffloadConfig = Field(
+        default_factory=ToolOutputOffloadConfig
+    )
 
 
 class McpServerConfig(BaseModel):
@@ -240,6 +464,182 @@ class ConversationCompressionConfig(BaseModel):
     keep: ConversationCompressionKeepConfig = Field(
         default_factory=ConversationCompressionKeepConfig
     )
+    mode: Literal["inline", "background"] = Field(
+        default="inline",
+        description=(
+            "`inline` summarizes before the model call that crosses `trigger`; "
+            "`background` compacts the checkpoint after the turn instead."
+        ),
+    )
+    hard_limit: ConversationCompressionTriggerConfig | None = Field(
+        default=None,
+        description=(
+            "Background mode: history size at which a turn still compresses "
+            "inline. Unset uses 95% of the summarization model's context window "
+            "when its profile reports one."
+        ),
+    )
+    profile: str | None = Field(
+        default=None,
+        description=(
+            "Model profile writing summaries; defaults to `routing.default_profile`."
+        ),
+    )
+    chunk_tokens: int | None = Field(
+        default=None,
+        ge=1,
+        description=(
+            "Largest span, in summarization-profile tokens, summarized in one call; "
+            "longer spans are summarized in chunks concurrently, then merged, and a "
+            "single larger message is truncated. Unset keeps LangChain's trimming "
+            "of spans to their most recent messages."
+        ),
+    )
+
+
+class BudgetLimitsConfig(BaseModel):
+    """Token and cost ceilings; ``None`` leaves a dimension unlimited."""
+
+    model_config = ConfigDict(extra="forbid")
+
+    input_tokens: int | None = Field(default=None, ge=1)
+    output_tokens: int | None = Field(default=None, ge=1)
+    cost: float | None = Field(
+        default=None,
+        gt=0.0,
+        description="Estimated spend from per-profile `pricing`.",
+    )
+
+
+class RunBudgetLimitsConfig(BudgetLimitsConfig):
+    """Ceilings for one run, including its wall time."""
+
+    wall_clock_seconds: float | None = Field(default=None, gt=0.0)
+
+
+class ResourceBudgetsConfig(BaseModel):
+    """Per-run and per-conversation resource budgets."""
+
+    model_config = ConfigDict(extra="forbid")
+
+    run: RunBudgetLimitsConfig = Field(default_factory=RunBudgetLimitsConfig)
+    conversation: BudgetLimitsConfig = Field(default_factory=BudgetLimitsConfig)
+
+    @property
+    def enabled(self) -> bool:
+        """Return whether any budget dimension is limited.
+
+        Returns:
+            ``True`` when a run or conversation limit is set.
+        """
+        return any(
+            value is not None
+            for limits in (self.run, self.conversation)
+            for value in limits.model_dump().values()
+        )
+
+
+ContextComponent = Literal["identity", "catalog", "history"]
+
+
+def _default_shrink_order() -> list[ContextComponent]:
+    """Return default context shrink order (first shrunk first).
+
+    Returns:
+        Component names from oldest history through catalog to identity.
+    """
+    return ["history", "catalog", "identity"]
+
+
+class ContextBudgetConfig(BaseModel):
+    """Per-call context-window planning across prompt components."""
+
+    model_config = ConfigDict(extra="forbid")
+
+    enabled: bool = False
+    context_window_tokens: int | None = Field(
+        default=None,
+        ge=1,
+        description=(
+            "Input tokens the planner fits each call into. Unset uses the routed "
+            "model's reported `max_input_tokens`; caps still apply without one."
+        ),
+    )
+    reserve_output_tokens: int = Field(
+        default=4096,
+        ge=0,
+        description="Tokens held back from the window for the model's reply.",
+    )
+    identity_max_tokens: int | None = Field(default=None, ge=0)
+    catalog_max_tokens: int | None = Field(default=None, ge=0)
+    history_max_tokens: int | None = Field(default=None, ge=1)
+    shrink_order: list[ContextComponent] = Field(
+        default_factory=_default_shrink_order,
+        description=(
+            "Components cut, first to last, while a call exceeds the window. "
+            "History loses its oldest messages; identity and catalog lose lines."
+        ),
+    )
+
+    @model_validator(mode="after")
+    def _validate_shrink_order(self) -> Self:
+        """Reject duplicate shrink order entries.
+
+        Returns:
+            Validated context budget config.
+
+        Raises:
+            ValueError: If a component is listed more than once.
+        """
+        if len(set(self.shrink_order)) != len(self.shrink_order):
+            msg = "policies.context_budget.shrink_order must not repeat components"
+            raise ValueError(msg)
+        return self
+
+
+class CheckpointRetentionConfig(BaseModel):
+    """Retention and compaction policy for the runtime checkpoint database."""
+
+    model_config = ConfigDict(extra="forbid")
+
+    keep_last: int = Field(
+        default=20,
+        ge=1,
+        description="Newest checkpoints kept per thread and namespace.",
+    )
+    drop_ephemeral: bool = Field(
+        default=True,
+        description="Delete leftover `ephemeral-*` threads during compaction.",
+    )
+    orphan_ttl_hours: float | None = Field(
+        default=720.0,
+        gt=0.0,
+        description=(
+            "Idle hours after which threads unknown to every conversation session "
+            "store are deleted; null keeps them forever."
+        ),
+    )
+    vacuum_pages: int = Field(
+        default=2000,
+        ge=0,
+        description="Free pages returned to the filesystem per compaction pass.",
+    )
+    compact_interval_minutes: float | None = Field(
+        default=None,
+        gt=0.0,
+        description=(
+            "Run compaction in the background at this interval while a runtime "
+            "is open; null disables it."
+        ),
+    )
+
+
+class CheckpointDurability(StrEnum):
+    """When LangGraph persists checkpoints of attached conversations."""
+
+    SYNC = "sync"
+    ASYNC = "async"
+    EXIT = "exit"
 
 
 class PoliciesConfig(BaseModel):
@@ -250,9 +650,31 @@ class PoliciesConfig(BaseModel):
     max_iterations: int = Field(ge=1, le=100)
     max_model_calls: int = Field(ge=1, le=1000)
     max_tool_calls: int = Field(ge=1, le=1000)
+    max_concurrent_runs: int = Field(
+        default=8,
+        ge=1,
+        le=1000,
+        description=(
+            "Runs one runtime executes at once across different conversations; "
+            "prompts sharing a conversation id always run one at a time in order."
+        ),
+    )
     conversation_compression: ConversationCompressionConfig = Field(
         default_factory=ConversationCompressionConfig
     )
+    budgets: ResourceBudgetsConfig = Field(default_factory=ResourceBudgetsConfig)
+    context_budget: ContextBudgetConfig = Field(default_factory=ContextBudgetConfig)
+    checkpoint_retention: CheckpointRetentionConfig = Field(
+        default_factory=CheckpointRetentionConfig
+    )
+    checkpoint_durability: CheckpointDurability = Field(
+        default=CheckpointDurability.ASYNC,
+        description=(
+            "`sync` writes each step's checkpoint before the next step starts, "
+            "`async` writes it while the next step runs, `exit` writes only "
+            "when the run ends."
+        ),
+    )
 
 
 class LoggingConfig(BaseModel):
@@ -276,6 +698,14 @@ class LoggingConfig(BaseModel):
             "from that directory."
         ),
     )
+    run_timings_log: str | None = Field(
+        default=None,
+        description=(
+            "Optional path for per-run latency breakdowns (JSONL, one line per run). "
+            "Relative paths resolve against the runtime config file directory. "
+            "When omitted, run timings are not logged."
+        ),
+    )
 
 
 def _validate_skills_tools_packs_entries(packs: dict[str, list[str]]) -> None:
@@ -480,3 +910,22 @@ class RuntimeConfig(BaseModel):
     policies: PoliciesConfig
     logging: LoggingConfig
     skills: SkillsConfig | None = None
+
+    @model_validator(mode="after")
+    def _validate_compression_profile(self) -> RuntimeConfig:
+        """Ensure conversation compression names a known model profile.
+
+        Returns:
+            Self after successful post-validation checks.
+
+        Raises:
+            ValueError: If the summarization profile is not a configured profile.
+        """
+        profile = self.policies.conversation_compression.profile
+        if profile is not None and profile not in self.models.profiles:
+            msg = (
+                "policies.conversation_compression.profile must reference a key "
+                "from models.profiles"
+            )
+            raise ValueError(msg)
+        return self
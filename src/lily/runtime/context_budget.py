@@ -0,0 +1,643 @@
+"""Context-window budget planner run before every model call.
+
+Each model request is measured with the routed profile's tokenizer as five
+components: base system prompt, agent identity, skill catalog, tool schemas,
+and message history. Identity, catalog, and history are held to their
+configured caps, then cut in ``shrink_order`` until the request fits the
+model's input window minus the reply reserve. History is trimmed, not
+summarized; summarizing stored history is left to conversation compression.
+A request that cannot fit even after every cut is answered with a notice
+instead of being sent, so an oversize call is not paid for only to fail at
+the provider.
+"""
+# ruff: noqa: PLR0913
+
+from __future__ import annotations
+
+import json
+import logging
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable, Mapping, Sequence
+from dataclasses import dataclass, replace
+from typing import Any
+
+from langchain.agents.middleware import (
+    AgentMiddleware,
+    ModelRequest,
+    ModelResponse,
+)
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import (
+    AIMessage,
+    AnyMessage,
+    HumanMessage,
+    SystemMessage,
+    ToolMessage,
+)
+from langchain_core.utils.function_calling import convert_to_openai_tool
+
+from lily.runtime.config_schema import ContextBudgetConfig, ContextComponent
+from lily.runtime.model_factory import resolve_chat_model
+from lily.runtime.model_router import routed_model, routed_profile_name
+from lily.runtime.run_timings import record_context_reduction
+from lily.runtime.system_prompt_prefix import build_system_prompt_prefix
+from lily.runtime.token_accounting import TokenAccountant
+
+_LOGGER = logging.getLogger("lily.context")
+_IDENTITY_SECTION_PREFIX = "### "
+_TRUNCATION_MARKER = "[... truncated to fit the model context window]"
+# Prompt sections shrink in whole steps so nearby calls share one prefix.
+_SHRINK_STEP_TOKENS = 256
+_PREFIX_CACHE_MAX_ENTRIES = 64
+_CAPPED_FIELDS: dict[ContextComponent, str] = {
+    "identity": "identity_max_tokens",
+    "catalog": "catalog_max_tokens",
+    "history": "history_max_tokens",
+}
+
+
+@dataclass(frozen=True, slots=True)
+class ContextPlan:
+    """Token sizes of one model request before and after planning."""
+
+    budget: int | None
+    measured: Mapping[str, int]
+    planned: Mapping[str, int]
+    fits: bool
+
+    @property
+    def reduced(self) -> tuple[str, ...]:
+        """Return the components cut below their measured size.
+
+        Returns:
+            Names of the reduced components, in ``planned`` order.
+        """
+        planned, measured = self.planned, self.measured
+        return tuple(name for name, size in planned.items() if size < measured[name])
+
+
+def plan_context(
+    measured: Mapping[str, int],
+    config: ContextBudgetConfig,
+    *,
+    window: int | None,
+    history_floor: int,
+) -> ContextPlan:
+    """Choose token targets for the reducible components of one request.
+
+    Args:
+        measured: Tokens per component: ``system``, ``identity``, ``catalog``,
+            ``tools``, and ``history``.
+        config: Caps, reply reserve, and shrink order.
+        window: Input token window of the routed model, or ``None`` if unknown.
+        history_floor: Tokens of the ``pinned_history`` messages, which are
+            never dropped.
+
+    Returns:
+        Plan whose ``planned`` sizes respect the caps and, when possible, the
+        window minus the reply reserve.
+    """
+    floors: dict[str, int] = {"identity": 0, "catalog": 0, "history": history_floor}
+    planned = dict(measured)
+    for name, field in _CAPPED_FIELDS.items():
+        cap = getattr(config, field)
+        if cap is not None:
+            planned[name] = min(planned[name], max(cap, floors[name]))
+    budget = None if window is None else max(window - config.reserve_output_tokens, 0)
+    if budget is not None:
+        overflow = sum(planned.values()) - budget
+        for name in config.shrink_order:
+            if overflow <= 0:
+                break
+            room = planned[name] - floors[name]
+            cut = min(overflow, room)
+            if name != "history":
+                cut = min(-(-cut // _SHRINK_STEP_TOKENS) * _SHRINK_STEP_TOKENS, room)
+            planned[name] -= cut
+            overflow -= cut
+    return ContextPlan(
+        budget=budget,
+        measured=dict(measured),
+        planned=planned,
+        fits=budget is None or sum(planned.values()) <= budget,
+    )
+
+
+def truncate_lines(text: str, max_tokens: int, count: Callable[[str], int]) -> str:
+    """Keep the longest run of leading lines that fits ``max_tokens``.
+
+    Args:
+        text: Markdown text.
+        max_tokens: Token ceiling for the result, truncation marker included.
+        count: Token counter for text.
+
+    Returns:
+        ``text`` when it fits; otherwise its leading lines plus a marker, or an
+        empty string when not even the marker fits.
+    """
+    if count(text) <= max_tokens:
+        return text
+    lines = text.splitlines()
+    low, high = 0, len(lines) - 1
+    while low < high:
+        # Largest line count whose truncation fits; counts grow with lines.
+        middle = (low + high + 1) // 2
+        kept = "\n".join([*lines[:middle], _TRUNCATION_MARKER])
+        if count(kept) <= max_tokens:
+            low = middle
+        else:
+            high = middle - 1
+    kept = "\n".join([*lines[:low], _TRUNCATION_MARKER])
+    return kept if count(kept) <= max_tokens else ""
+
+
+def truncate_identity(text: str, max_tokens: int, count: Callable[[str], int]) -> str:
+    """Truncate every identity file section to an equal share of ``max_tokens``.
+
+    Each ``### FILE`` section keeps its heading and leading lines, so no file of
+    the identity context disappears while others stay whole.
+
+    Args:
+        text: Identity markdown from ``load_agent_identity_context``.
+        max_tokens: Token ceiling for the result.
+        count: Token counter for text.
+
+    Returns:
+        Truncated identity markdown.
+    """
+    if count(text) <= max_tokens:
+        return text
+    header: list[str] = []
+    sections: list[list[str]] = []
+    for line in text.splitlines():
+        if line.startswith(_IDENTITY_SECTION_PREFIX):
+            sections.append([line])
+        elif sections:
+            sections[-1].append(line)
+        else:
+            header.append(line)
+    heading = "\n".join(header).strip()
+    share = (max_tokens - count(heading)) // max(len(sections), 1)
+    if not sections or share <= 0:
+        return truncate_lines(text, max_tokens, count)
+    kept = [heading] if heading else []
+    for section in sections:
+        body = truncate_lines("\n".join(section).strip(), share, count)
+        if body:
+            kept.append(body)
+    # Section counts overlap by per-message overhead; guard the joined text.
+    return truncate_lines("\n\n".join(kept), max_tokens, count)
+
+
+def pinned_history(messages: Sequence[AnyMessage]) -> set[int]:
+    """Return indices of messages history trimming never drops.
+
+    These are the latest human message, which carries the current task, and
+    the trailing group of an AI tool call with its results (or the newest
+    message when history does not end in tool results).
+
+    Args:
+        messages: Request history, oldest first.
+
+    Returns:
+        Indices of the protected messages; empty for an empty history.
+    """
+    if not messages:
+        return set()
+    tail = len(messages) - 1
+    while tail > 0 and isinstance(messages[tail], ToolMessage):
+        tail -= 1
+    pinned = set(range(tail, len(messages)))
+    human = next(
+        (
+            index
+            for index in range(len(messages) - 1, -1, -1)
+            if isinstance(messages[index], HumanMessage)
+        ),
+        None,
+    )
+    if human is not None:
+        pinned.add(human)
+    return pinned
+
+
+def _drop_count(order: Sequence[int], counts: Sequence[int], max_tokens: int) -> int:
+    """Return how many of the oldest droppable messages must go.
+
+    Args:
+        order: Indices of droppable messages, oldest first.
+        counts: Tokens of each message in the history.
+        max_tokens: Token ceiling for the kept messages.
+
+    Returns:
+        Length of the ``order`` prefix to drop; all of it when still too large.
+    """
+    total, cut = sum(counts), 0
+    while total > max_tokens and cut < len(order):
+        total -= counts[order[cut]]
+        cut += 1
+    return cut
+
+
+def _restart_at_human(messages: Sequence[AnyMessage], kept: list[int]) -> list[int]:
+    """Drop kept indices that precede the first kept human message.
+
+    Args:
+        messages: Request history, oldest first.
+        kept: Kept indices before the latest human message, ascending.
+
+    Returns:
+        Indices starting at a human turn; empty when none is kept.
+    """
+    for position, index in enumerate(kept):
+        if isinstance(messages[index], HumanMessage):
+            return kept[position:]
+    return []
+
+
+def _drop_orphaned_results(
+    messages: Sequence[AnyMessage], kept: list[int]
+) -> list[int]:
+    """Drop leading tool results whose calling AI message was cut.
+
+    Args:
+        messages: Request history, oldest first.
+        kept: Kept indices after the latest human message, ascending.
+
+    Returns:
+        Indices without leading ``ToolMessage`` entries.
+    """
+    start = 0
+    while start < len(kept) and isinstance(messages[kept[start]], ToolMessage):
+        start += 1
+    return kept[start:]
+
+
+def _kept_indices(
+    messages: Sequence[AnyMessage], pinned: set[int], remaining: list[int]
+) -> list[int]:
+    """Return the indices kept around the pinned messages after a cut.
+
+    Args:
+        messages: Request history, oldest first.
+        pinned: Indices from ``pinned_history``.
+        remaining: Droppable indices that survived the cut, ascending.
+
+    Returns:
+        Kept indices in ascending order.
+    """
+    human = max(
+        (index for index in pinned if isinstance(messages[index], HumanMessage)),
+        default=-1,
+    )
+    before = _restart_at_human(messages, [i for i in remaining if i < human])
+    after = _drop_orphaned_results(messages, [i for i in remaining if i > human])
+    return sorted({*before, *after, *pinned})
+
+
+def trim_history(
+    messages: Sequence[AnyMessage],
+    counts: Sequence[int],
+    max_tokens: int,
+) -> list[AnyMessage]:
+    """Drop the oldest unpinned messages until the rest fit ``max_tokens``.
+
+    Messages from ``pinned_history`` are always kept, even past the ceiling.
+    Kept history before the latest human message restarts at a human message,
+    and no kept tool result loses the AI message that called it.
+
+    Args:
+        messages: Request history, oldest first.
+        counts: Tokens of each message.
+        max_tokens: Token ceiling for the kept messages.
+
+    Returns:
+        Kept messages in their original order.
+    """
+    pinned = pinned_history(messages)
+    order = [index for index in range(len(messages)) if index not in pinned]
+    cut = _drop_count(order, counts, max_tokens)
+    if cut == 0:
+        return list(messages)
+    kept = _kept_indices(messages, pinned, order[cut:])
+    return [messages[index] for index in kept]
+
+
+def _trimmed(
+    messages: Sequence[AnyMessage], counts: Sequence[int], max_tokens: int
+) -> tuple[list[AnyMessage], int]:
+    """Trim history to ``max_tokens`` and total the tokens actually kept.
+
+    Args:
+        messages: Request history, oldest first.
+        counts: Tokens of each message.
+        max_tokens: Token target for the kept messages.
+
+    Returns:
+        Kept messages and their tokens, which may exceed the target when
+        pinned messages alone do.
+    """
+    kept = trim_history(messages, counts, max_tokens)
+    kept_ids = {id(message) for message in kept}
+    tokens = sum(
+        count
+        for message, count in zip(messages, counts, strict=True)
+        if id(message) in kept_ids
+    )
+    return kept, tokens
+
+
+def _tool_name(tool: object) -> str:
+    """Return the name of a request tool or provider tool dict.
+
+    Args:
+        tool: ``BaseTool`` or tool schema dict.
+
+    Returns:
+        Tool name used as a cache key.
+    """
+    if isinstance(tool, dict):
+        function = tool.get("function")
+        name = function.get("name") if isinstance(function, dict) else tool.get("name")
+        return str(name)
+    return str(getattr(tool, "name", repr(tool)))
+
+
+def emit_context_planned(plan: ContextPlan, *, profile: str) -> None:
+    """Log one JSON ``context_planned`` event on logger ``lily.context``.
+
+    Calls sent unchanged log at debug level; cut or refused calls at warning.
+
+    Args:
+        plan: Plan applied to the request.
+        profile: Routed model profile.
+    """
+    reduced = plan.reduced
+    level = logging.DEBUG if plan.fits and not reduced else logging.WARNING
+    _LOGGER.log(
+        level,
+        json.dumps(
+            {
+                "event": "context_planned",
+                "profile": profile,
+                "budget": plan.budget,
+                "measured": dict(plan.measured),
+                "planned": dict(plan.planned),
+                "reduced": list(reduced),
+                "fits": plan.fits,
+            }
+        ),
+    )
+
+
+class ContextBudgetMiddleware(AgentMiddleware[Any, Any]):
+    """Fit each model request into its routed model's context window.
+
+    Runs inside the router, after the system prompt prefix is set, so every
+    call is planned against the profile that serves it. Cuts apply to the
+    request only: history in agent state is left for compression to manage.
+    """
+
+    def __init__(
+        self,
+        config: ContextBudgetConfig,
+        *,
+        system_prompt: str,
+        identity_markdown: str,
+        catalog_markdown: str,
+        default_profile: str,
+        token_accountant: TokenAccountant,
+    ) -> None:
+        """Initialize the planner with the prompt sections of one agent build.
+
+        Args:
+            config: Context budget policy.
+            system_prompt: Base system prompt from agent config.
+            identity_markdown: Identity markdown, or empty when absent.
+            catalog_markdown: Skill catalog markdown, or empty when absent.
+            default_profile: Profile assumed for requests the router did not set.
+            token_accountant: Shared per-profile token counter.
+        """
+        super().__init__()
+        self._config = config
+        self._system_prompt = system_prompt
+        self._identity = identity_markdown
+        self._catalog = catalog_markdown
+        self._default_profile = default_profile
+        self._accountant = token_accountant
+        self._section_tokens: dict[str, dict[str, int]] = {}
+        self._tool_tokens: dict[tuple[str, tuple[str, ...]], int] = {}
+        self._windows: dict[str, int | None] = {}
+        self._prefixes: OrderedDict[
+            tuple[str, int, int], tuple[SystemMessage, int, int]
+        ] = OrderedDict()
+
+    def _count(self, profile: str, text: str) -> int:
+        """Count tokens of prompt text as one system message.
+
+        Args:
+            profile: Model profile whose tokenizer counts.
+            text: Prompt text.
+
+        Returns:
+            Token count, zero for blank text.
+        """
+        if not text.strip():
+            return 0
+        return self._accountant.count_tokens(profile, [SystemMessage(content=text)])
+
+    def _sections(self, profile: str) -> dict[str, int]:
+        """Return token sizes of the fixed prompt sections for one profile.
+
+        Args:
+            profile: Model profile name.
+
+        Returns:
+            Tokens of ``system``, ``identity``, and ``catalog``.
+        """
+        sections = self._section_tokens.get(profile)
+        if sections is None:
+            sections = {
+                "system": self._count(profile, self._system_prompt),
+                "identity": self._count(profile, self._identity),
+                "catalog": self._count(profile, self._catalog),
+            }
+            self._section_tokens[profile] = sections
+        return sections
+
+    def _tools(self, profile: str, tools: Sequence[object]) -> int:
+        """Return tokens of the request's tool schemas, memoized per toolset.
+
+        Args:
+            profile: Model profile name.
+            tools: Request tools.
+
+        Returns:
+            Tokens of the serialized tool schemas.
+        """
+        key = (profile, tuple(_tool_name(tool) for tool in tools))
+        tokens = self._tool_tokens.get(key)
+        if tokens is None:
+            schemas = [convert_to_openai_tool(tool) for tool in tools]  # type: ignore[arg-type]
+            tokens = self._count(profile, json.dumps(schemas)) if schemas else 0
+            self._tool_tokens[key] = tokens
+        return tokens
+
+    def _window(self, profile: str, model: BaseChatModel) -> int | None:
+        """Return the input token window planned against for one profile.
+
+        Args:
+            profile: Model profile name.
+            model: Routed request model.
+
+        Returns:
+            Configured window, else the model's ``max_input_tokens``, else ``None``.
+        """
+        if self._config.context_window_tokens is not None:
+            return self._config.context_window_tokens
+        if profile not in self._windows:
+            reported = (resolve_chat_model(routed_model(model)).profile or {}).get(
+                "max_input_tokens"
+            )
+            self._windows[profile] = reported if isinstance(reported, int) else None
+        return self._windows[profile]
+
+    def _prefix(
+        self, profile: str, identity_tokens: int, catalog_tokens: int
+    ) -> tuple[SystemMessage, int, int]:
+        """Return the system message with identity and catalog cut to size.
+
+        Args:
+            profile: Model profile whose tokenizer counts.
+            identity_tokens: Identity token target.
+            catalog_tokens: Catalog token target.
+
+        Returns:
+            System message and the identity and catalog tokens it holds.
+        """
+        key = (profile, identity_tokens, catalog_tokens)
+        cached = self._prefixes.get(key)
+        if cached is not None:
+            self._prefixes.move_to_end(key)
+            return cached
+
+        def _count(text: str) -> int:
+            return self._count(profile, text)
+
+        identity = truncate_identity(self._identity, identity_tokens, _count)
+        catalog = truncate_lines(self._catalog, catalog_tokens, _count)
+        prefix = build_system_prompt_prefix(
+            self._system_prompt,
+            identity_markdown=identity,
+            catalog_markdown=catalog,
+            count_tokens=lambda message: _count(str(message.content)),
+        )
+        built = (prefix.message, _count(identity), _count(catalog))
+        self._prefixes[key] = built
+        if len(self._prefixes) > _PREFIX_CACHE_MAX_ENTRIES:
+            self._prefixes.popitem(last=False)
+        return built
+
+    def _planned(
+        self, request: ModelRequest[Any]
+    ) -> tuple[ModelRequest[Any], ContextPlan, str]:
+        """Measure one request and apply its plan.
+
+        Args:
+            request: Routed model request carrying the system prompt prefix.
+
+        Returns:
+            Request to send, the plan with the sizes actually sent, and the
+            routed profile name.
+        """
+        profile = routed_profile_name(request.model) or self._default_profile
+        messages = request.messages
+        counts = [self._accountant.count_tokens(profile, [m]) for m in messages]
+        measured = {
+            **self._sections(profile),
+            "tools": self._tools(profile, request.tools),
+            "history": sum(counts),
+        }
+        plan = plan_context(
+            measured,
+            self._config,
+            window=self._window(profile, request.model),
+            history_floor=sum(counts[index] for index in pinned_history(messages)),
+        )
+        if not plan.fits or not plan.reduced:
+            return request, plan, profile
+        sent = dict(plan.planned)
+        overrides: dict[str, Any] = {}
+        if "identity" in plan.reduced or "catalog" in plan.reduced:
+            message, sent["identity"], sent["catalog"] = self._prefix(
+                profile, sent["identity"], sent["catalog"]
+            )
+            overrides["system_message"] = message
+        if "history" in plan.reduced:
+            overrides["messages"], sent["history"] = _trimmed(
+                messages, counts, sent["history"]
+            )
+        return request.override(**overrides), replace(plan, planned=sent), profile
+
+    def _refusal(self, plan: ContextPlan, profile: str) -> ModelResponse[Any]:
+        """Return the notice sent instead of a request that cannot fit.
+
+        Args:
+            plan: Plan that does not fit its budget.
+            profile: Routed model profile.
+
+        Returns:
+            Model response ending the run without calling the model.
+        """
+        notice = AIMessage(
+            content=(
+                "Run stopped: context window exceeded (the request needs "
+                f"{sum(plan.planned.values())} input tokens after every cut; "
+                f"profile '{profile}' allows {plan.budget})."
+            )
+        )
+        return ModelResponse(result=[notice])
+
+    def wrap_model_call(
+        self,
+        request: ModelRequest[Any],
+        handler: Callable[[ModelRequest[Any]], ModelResponse[Any]],
+    ) -> ModelResponse[Any]:
+        """Plan the request, then send it or refuse it.
+
+        Args:
+            request: Current model request.
+            handler: Downstream handler to call with the planned request.
+
+        Returns:
+            Downstream model response, or a notice when the request cannot fit.
+        """
+        planned, plan, profile = self._planned(request)
+        emit_context_planned(plan, profile=profile)
+        if not plan.fits:
+            return self._refusal(plan, profile)
+        if plan.reduced:
+            record_context_reduction()
+        return handler(planned)
+
+    async def awrap_model_call(
+        self,
+        request: ModelRequest[Any],
+        handler: Callable[[ModelRequest[Any]], Awaitable[ModelResponse[Any]]],
+    ) -> ModelResponse[Any]:
+        """Async variant of ``wrap_model_call``.
+
+        Args:
+            request: Current model request.
+            handler: Downstream async handler to call with the planned request.
+
+        Returns:
+            Downstream model response, or a notice when the request cannot fit.
+        """
+        planned, plan, profile = self._planned(request)
+        emit_context_planned(plan, profile=profile)
+        if not plan.fits:
+            return self._refusal(plan, profile)
+        if plan.reduced:
+            record_context_reduction()
+        return await handler(planned)
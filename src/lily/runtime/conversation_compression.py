@@ -1,13 +1,58 @@
-"""Conversation compression middleware wiring helpers."""
+"""Conversation compression middleware wiring helpers.
+
+Inline mode summarizes older history inside the turn whose model call crosses
+the trigger. Background mode moves that work between turns: after a turn the
+runtime asks ``BackgroundConversationCompressor`` to rewrite the thread
+checkpoint, and the in-turn middleware only fires at the hard limit.
+"""
+# ruff: noqa: PLR0913
 
 from __future__ import annotations
 
-from typing import Literal, cast
+import asyncio
+import hashlib
+import json
+import logging
+import time
+from collections import OrderedDict
+from collections.abc import Iterator, Mapping
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Any, Literal, cast
 
 from langchain.agents.middleware.summarization import SummarizationMiddleware
+from langchain.agents.middleware.types import AgentState
 from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import (
+    AnyMessage,
+    BaseMessage,
+    HumanMessage,
+    RemoveMessage,
+)
+from langchain_core.runnables import RunnableConfig
+from langgraph.graph.message import REMOVE_ALL_MESSAGES
+from langgraph.pregel import Pregel
+from langgraph.runtime import Runtime
+
+from lily.runtime.config_schema import (
+    ConversationCompressionConfig,
+    ConversationCompressionTriggerConfig,
+    ModelPricingConfig,
+)
+from lily.runtime.run_budget import BudgetSpend, charge_budgets, collect_model_usage
+from lily.runtime.run_timings import record_summarization
+from lily.runtime.token_accounting import SummarizationTokenCounter
 
-from lily.runtime.config_schema import ConversationCompressionConfig
+_LOGGER = logging.getLogger("lily.compression")
+# Background mode compresses inline only this close to the context window.
+_DEFAULT_HARD_LIMIT_FRACTION = 0.95
+# Summary message keys holding the running summary and the last id it covers.
+_SUMMARY_KEY = "lily_summary"
+_WATERMARK_KEY = "lily_summary_watermark"
+_SUMMARY_MEMO_SIZE = 256
+# Shrink passes bounding one oversize message to ``chunk_tokens``.
+_TRUNCATE_ATTEMPTS = 8
+_TRUNCATION_NOTE = "\n[... truncated for summarization]"
 
 type _TriggerContextSize = (
     tuple[Literal["fraction"], float]
@@ -18,34 +63,598 @@ type _TriggerContextSize = (
 type _KeepContextSize = _TriggerContextSize
 
 
+@dataclass(frozen=True, slots=True)
+class _FoldPlan:
+    """Older span to fold into the running summary, and the tail kept verbatim."""
+
+    running: str | None
+    evicted: list[AnyMessage]
+    preserved: list[AnyMessage]
+    key: str
+
+
+def _running_summary(older: list[AnyMessage]) -> tuple[str | None, list[AnyMessage]]:
+    """Split the running summary off an older span.
+
+    Args:
+        older: Messages before the keep window.
+
+    Returns:
+        Running summary text, if the span starts with a Lily summary message,
+        and the messages after its watermark.
+    """
+    if not older or not isinstance(older[0].additional_kwargs.get(_SUMMARY_KEY), str):
+        return None, older
+    head, rest = older[0], older[1:]
+    ids = [message.id for message in rest]
+    watermark = head.additional_kwargs.get(_WATERMARK_KEY)
+    if watermark in ids:
+        rest = rest[ids.index(watermark) + 1 :]
+    return cast(str, head.additional_kwargs[_SUMMARY_KEY]), rest
+
+
+def _span_key(running: str | None, evicted: list[AnyMessage]) -> str:
+    """Hash a fold's inputs by content; message ids and metadata are ignored.
+
+    Args:
+        running: Running summary being extended, if any.
+        evicted: Messages folded into it.
+
+    Returns:
+        SHA-256 hex digest.
+    """
+    payload = [
+        running,
+        [
+            [
+                message.type,
+                message.content,
+                getattr(message, "tool_calls", None),
+                getattr(message, "tool_call_id", None),
+            ]
+            for message in evicted
+        ],
+    ]
+    encoded = json.dumps(payload, sort_keys=True, default=str).encode("utf-8")
+    return hashlib.sha256(encoded).hexdigest()
+
+
+class TimedSummarizationMiddleware(SummarizationMiddleware):
+    """Incremental ``SummarizationMiddleware`` timed on the active run timings.
+
+    The summary message carries the running summary text and the id of the last
+    message it covers, so later passes fold only messages evicted since then.
+    Summaries are memoized by the content hash of their inputs. With
+    ``chunk_tokens`` set, larger inputs are map-reduced instead of trimmed.
+    With ``pricing`` set, summary model usage is charged to the run and
+    conversation budgets.
+    """
+
+    def __init__(
+        self,
+        model: BaseChatModel,
+        *,
+        trigger: _TriggerContextSize,
+        keep: _KeepContextSize,
+        token_counter: SummarizationTokenCounter | None = None,
+        chunk_tokens: int | None = None,
+        pricing: ModelPricingConfig | None = None,
+    ) -> None:
+        """Initialize the middleware with an empty summary memo.
+
+        Args:
+            model: Chat model generating summaries.
+            trigger: Threshold that starts summarization.
+            keep: Verbatim tail kept after summarization.
+            token_counter: Optional token counter; defaults to LangChain's
+                approximate counter.
+            chunk_tokens: Largest input summarized in one call, or ``None`` to
+                keep LangChain's trimming to the most recent messages.
+            pricing: Pricing of the summary profile when budgets are enabled;
+                ``None`` leaves summary calls uncharged.
+        """
+        options: dict[str, Any] = {}
+        if token_counter is not None:
+            options["token_counter"] = token_counter
+        if chunk_tokens is not None:
+            options["trim_tokens_to_summarize"] = None
+        super().__init__(model=model, trigger=trigger, keep=keep, **options)
+        self._chunk_tokens = chunk_tokens
+        self._pricing = pricing
+        self._summary_memo: OrderedDict[str, str] = OrderedDict()
+
+    @property
+    def name(self) -> str:
+        """Keep the upstream middleware name for graph node ids.
+
+        Returns:
+            Middleware name used by ``create_agent``.
+        """
+        return SummarizationMiddleware.__name__
+
+    def _plan(
+        self, messages: list[AnyMessage], *, check_trigger: bool
+    ) -> _FoldPlan | None:
+        """Select the messages a summarization pass would fold.
+
+        Args:
+            messages: Thread history.
+            check_trigger: Return ``None`` unless the history crosses the trigger.
+
+        Returns:
+            Fold plan, or ``None`` when nothing new falls before the keep window.
+        """
+        self._ensure_message_ids(messages)
+        if check_trigger and not self.should_compress(messages):
+            return None
+        cutoff_index = self._determine_cutoff_index(messages)
+        if cutoff_index <= 0:
+            return None
+        older, preserved = self._partition_messages(messages, cutoff_index)
+        running, evicted = _running_summary(older)
+        if not evicted:
+            return None
+        return _FoldPlan(
+            running=running,
+            evicted=evicted,
+            preserved=preserved,
+            key=_span_key(running, evicted),
+        )
+
+    @staticmethod
+    def _fold_inputs(plan: _FoldPlan) -> list[AnyMessage]:
+        """Return the messages sent to the summary model for one fold.
+
+        Args:
+            plan: Fold plan.
+
+        Returns:
+            Running summary (if any) followed by the newly evicted messages.
+        """
+        if plan.running is None:
+            return plan.evicted
+        running = HumanMessage(
+            content=f"Summary of the conversation so far:\n\n{plan.running}"
+        )
+        return [running, *plan.evicted]
+
+    def _truncated(self, message: AnyMessage, limit: int) -> AnyMessage:
+        """Cut one message's text so it counts at most ``limit`` tokens.
+
+        Args:
+            message: Summary input message.
+            limit: Token ceiling.
+
+        Returns:
+            ``message`` when it fits, else a copy with its text shortened.
+        """
+        tokens = self.token_counter([message])
+        text = str(message.text)
+        for _ in range(_TRUNCATE_ATTEMPTS):
+            if tokens <= limit or not text:
+                break
+            # Shrink in proportion to the overshoot, a little past it.
+            text = text[: int(len(text) * limit / tokens * 0.9)]
+            message = message.model_copy(
+                update={"content": f"{text}{_TRUNCATION_NOTE}"}
+            )
+            tokens = self.token_counter([message])
+        return message
+
+    def _chunks(self, messages: list[AnyMessage]) -> list[list[AnyMessage]]:
+        """Split summary inputs into consecutive chunks within ``chunk_tokens``.
+
+        Args:
+            messages: Messages to summarize.
+
+        Returns:
+            One chunk per summary call; a message larger than the limit is
+            truncated to it and stands alone.
+        """
+        if self._chunk_tokens is None:
+            return [messages]
+        chunks: list[list[AnyMessage]] = [[]]
+        size = 0
+        for original in messages:
+            message = self._truncated(original, self._chunk_tokens)
+            tokens = self.token_counter([message])
+            if chunks[-1] and size + tokens > self._chunk_tokens:
+                chunks.append([])
+                size = 0
+            chunks[-1].append(message)
+            size += tokens
+        return chunks
+
+    @staticmethod
+    def _partial_summaries(partials: list[str]) -> list[AnyMessage]:
+        """Return chunk summaries as inputs of the merging summary call.
+
+        Args:
+            partials: Chunk summaries in conversation order.
+
+        Returns:
+            One message per chunk summary.
+        """
+        return [
+            HumanMessage(
+                content=(
+                    f"Summary of part {index} of {len(partials)} of the "
+                    f"conversation:\n\n{partial}"
+                )
+            )
+            for index, partial in enumerate(partials, start=1)
+        ]
+
+    def _fitted(self, partials: list[AnyMessage]) -> list[AnyMessage]:
+        """Truncate chunk summaries to equal shares of one chunk.
+
+        Used when merging would not reduce the chunk count, so the final
+        merging call still stays within ``chunk_tokens``.
+
+        Args:
+            partials: Chunk summary messages.
+
+        Returns:
+            Chunk summaries that together fit one summary call.
+        """
+        share = max((self._chunk_tokens or 0) // max(len(partials), 1), 1)
+        return [self._truncated(partial, share) for partial in partials]
+
+    def _create_summary(self, messages_to_summarize: list[AnyMessage]) -> str:
+        """Summarize, map-reducing inputs larger than ``chunk_tokens``.
+
+        Args:
+            messages_to_summarize: Messages to summarize.
+
+        Returns:
+            Summary text.
+        """
+        summarize = super()._create_summary
+        chunks = self._chunks(messages_to_summarize)
+        if len(chunks) == 1:
+            return summarize(messages_to_summarize)
+        merged = self._partial_summaries([summarize(chunk) for chunk in chunks])
+        if len(self._chunks(merged)) < len(chunks):
+            return self._create_summary(merged)
+        return summarize(self._fitted(merged))
+
+    async def _acreate_summary(self, messages_to_summarize: list[AnyMessage]) -> str:
+        """Async variant summarizing chunks concurrently.
+
+        Args:
+            messages_to_summarize: Messages to summarize.
+
+        Returns:
+            Summary text.
+        """
+        summarize = super()._acreate_summary
+        chunks = self._chunks(messages_to_summarize)
+        if len(chunks) == 1:
+            return await summarize(messages_to_summarize)
+        partials = await asyncio.gather(*(summarize(chunk) for chunk in chunks))
+        merged = self._partial_summaries(list(partials))
+        if len(self._chunks(merged)) < len(chunks):
+            return await self._acreate_summary(merged)
+        return await summarize(self._fitted(merged))
+
+    @contextmanager
+    def charged(self, state: Mapping[str, Any]) -> Iterator[dict[str, Any]]:
+        """Charge summary calls made inside the block to the budgets.
+
+        Args:
+            state: Agent state (or checkpoint values) of the conversation.
+
+        Yields:
+            State update, filled on exit with the new conversation spend when
+            budgets are charged and a summary call reported usage.
+        """
+        update: dict[str, Any] = {}
+        if self._pricing is None:
+            yield update
+            return
+        with collect_model_usage() as usage:
+            yield update
+        spend = usage.spend(self._pricing)
+        if spend != BudgetSpend():
+            update.update(charge_budgets(state, spend))
+
+    def _memoized(self, key: str) -> str | None:
+        """Return a memoized summary and mark it recently used.
+
+        Args:
+            key: Content hash of the fold inputs.
+
+        Returns:
+            Summary text, or ``None`` on a miss.
+        """
+        summary = self._summary_memo.get(key)
+        if summary is not None:
+            self._summary_memo.move_to_end(key)
+        return summary
+
+    def _rewrite(self, plan: _FoldPlan, summary: str) -> list[BaseMessage]:
+        """Memoize a fold's summary and build the history replacing the thread.
+
+        Args:
+            plan: Fold plan.
+            summary: Updated running summary.
+
+        Returns:
+            Messages update: remove-all marker, summary message, kept tail.
+        """
+        self._summary_memo[plan.key] = summary
+        self._summary_memo.move_to_end(plan.key)
+        while len(self._summary_memo) > _SUMMARY_MEMO_SIZE:
+            self._summary_memo.popitem(last=False)
+        [message] = self._build_new_messages(summary)
+        message.additional_kwargs[_SUMMARY_KEY] = summary
+        message.additional_kwargs[_WATERMARK_KEY] = plan.evicted[-1].id
+        return [RemoveMessage(id=REMOVE_ALL_MESSAGES), message, *plan.preserved]
+
+    async def _afold(self, plan: _FoldPlan) -> list[BaseMessage]:
+        """Summarize one fold unless memoized and build the rewritten history.
+
+        Args:
+            plan: Fold plan.
+
+        Returns:
+            Messages update replacing the thread history.
+        """
+        summary = self._memoized(plan.key)
+        if summary is None:
+            summary = await self._acreate_summary(self._fold_inputs(plan))
+        return self._rewrite(plan, summary)
+
+    def before_model(
+        self,
+        state: AgentState[Any],
+        runtime: Runtime[Any],
+    ) -> dict[str, Any] | None:
+        """Fold newly evicted history when triggered and record the hook duration.
+
+        Args:
+            state: Current agent state.
+            runtime: LangGraph runtime for the model node.
+
+        Returns:
+            State update replacing summarized messages, or ``None``.
+        """
+        del runtime
+        started = time.perf_counter()
+        try:
+            plan = self._plan(state["messages"], check_trigger=True)
+            if plan is None:
+                return None
+            with self.charged(state) as update:
+                summary = self._memoized(plan.key)
+                if summary is None:
+                    summary = self._create_summary(self._fold_inputs(plan))
+            return {**update, "messages": self._rewrite(plan, summary)}
+        finally:
+            record_summarization(time.perf_counter() - started)
+
+    async def abefore_model(
+        self,
+        state: AgentState[Any],
+        runtime: Runtime[Any],
+    ) -> dict[str, Any] | None:
+        """Async variant recording the hook duration.
+
+        Args:
+            state: Current agent state.
+            runtime: LangGraph runtime for the model node.
+
+        Returns:
+            State update replacing summarized messages, or ``None``.
+        """
+        del runtime
+        started = time.perf_counter()
+        try:
+            plan = self._plan(state["messages"], check_trigger=True)
+            if plan is None:
+                return None
+            with self.charged(state) as update:
+                messages = await self._afold(plan)
+            return {**update, "messages": messages}
+        finally:
+            record_summarization(time.perf_counter() - started)
+
+    def should_compress(self, messages: list[AnyMessage]) -> bool:
+        """Return whether ``messages`` cross this middleware's trigger.
+
+        Args:
+            messages: Thread history.
+
+        Returns:
+            True when summarizing now would follow the configured policy.
+        """
+        return self._should_summarize(messages, self.token_counter(messages))
+
+    async def acompressed(self, messages: list[AnyMessage]) -> list[BaseMessage] | None:
+        """Fold the older span of ``messages`` regardless of the trigger.
+
+        Args:
+            messages: Thread history.
+
+        Returns:
+            Messages update replacing the history with summary plus kept tail, or
+            ``None`` when nothing new falls before the keep window.
+        """
+        plan = self._plan(messages, check_trigger=False)
+        if plan is None:
+            return None
+        return await self._afold(plan)
+
+
+class BackgroundConversationCompressor:
+    """Compact a conversation checkpoint between turns.
+
+    The caller must hold the conversation's scheduler slot, so no turn of the
+    same thread writes checkpoints while the compacted history is written.
+    """
+
+    def __init__(self, summarizer: TimedSummarizationMiddleware) -> None:
+        """Initialize with the summarizer configured for the soft trigger.
+
+        Args:
+            summarizer: Summarization policy and model; never added to the graph.
+        """
+        self._summarizer = summarizer
+
+    def should_compress(self, messages: list[AnyMessage]) -> bool:
+        """Return whether a finished turn's history crosses the trigger.
+
+        Args:
+            messages: Final messages of the turn.
+
+        Returns:
+            True when the thread should be compacted before its next turn.
+        """
+        return self._summarizer.should_compress(messages)
+
+    async def acompact(
+        self, agent: Pregel[Any, Any, Any, Any], conversation_id: str
+    ) -> bool:
+        """Summarize the thread's older span and checkpoint the compacted history.
+
+        Threads stopped mid-turn (pending graph tasks) are left untouched.
+
+        Args:
+            agent: Compiled agent with a checkpointer.
+            conversation_id: Thread to compact.
+
+        Returns:
+            True when a compacted history was written.
+        """
+        config: RunnableConfig = {"configurable": {"thread_id": conversation_id}}
+        snapshot = await agent.aget_state(config)
+        messages = snapshot.values.get("messages")
+        if snapshot.next or not isinstance(messages, list):
+            return False
+        if not self.should_compress(messages):
+            return False
+        started = time.perf_counter()
+        with self._summarizer.charged(snapshot.values) as spend:
+            update = await self._summarizer.acompressed(messages)
+        if update is None:
+            return False
+        await agent.aupdate_state(config, {**spend, "messages": update})
+        _LOGGER.info(
+            json.dumps(
+                {
+                    "event": "conversation_compressed",
+                    "mode": "background",
+                    "conversation_id": conversation_id,
+                    "messages_before": len(messages),
+                    "messages_after": len(update) - 1,
+                    "seconds": round(time.perf_counter() - started, 6),
+                }
+            )
+        )
+        return True
+
+
+def _trigger_size(trigger: ConversationCompressionTriggerConfig) -> _TriggerContextSize:
+    """Convert a trigger config into a ``SummarizationMiddleware`` context size.
+
+    Args:
+        trigger: Validated trigger threshold.
+
+    Returns:
+        ``(kind, threshold)`` tuple.
+    """
+    if trigger.kind == "fraction":
+        return ("fraction", cast(float, trigger.threshold))
+    if trigger.kind == "tokens":
+        return ("tokens", cast(int, trigger.threshold))
+    return ("messages", cast(int, trigger.threshold))
+
+
+def _keep_size(config: ConversationCompressionConfig) -> _KeepContextSize:
+    """Convert the keep config into a ``SummarizationMiddleware`` context size.
+
+    Args:
+        config: Validated conversation compression configuration.
+
+    Returns:
+        ``(kind, value)`` tuple.
+    """
+    if config.keep.kind == "fraction":
+        return ("fraction", cast(float, config.keep.value))
+    if config.keep.kind == "tokens":
+        return ("tokens", cast(int, config.keep.value))
+    return ("messages", cast(int, config.keep.value))
+
+
 def build_conversation_compression_middleware(
     config: ConversationCompressionConfig,
     *,
     model: BaseChatModel,
-) -> SummarizationMiddleware:
-    """Build a SummarizationMiddleware from Lily compression config.
+    token_counter: SummarizationTokenCounter | None = None,
+    pricing: ModelPricingConfig | None = None,
+) -> SummarizationMiddleware | None:
+    """Build the in-turn SummarizationMiddleware from Lily compression config.
+
+    In background mode the middleware fires only at ``hard_limit``; without a
+    configured limit or a model profile reporting its context window there is
+    no in-turn fallback.
 
     Args:
         config: Validated conversation compression configuration.
         model: Chat model used by SummarizationMiddleware to generate summaries.
+        token_counter: Optional token counter for ``tokens`` triggers and keeps;
+            defaults to LangChain's approximate counter.
+        pricing: Summary profile pricing charging summaries to budgets, if any.
 
     Returns:
-        A configured `SummarizationMiddleware` instance.
+        A configured `SummarizationMiddleware` instance, or ``None`` when a
+        background-mode config has no hard limit.
     """
-    trigger: _TriggerContextSize
-    if config.trigger.kind == "fraction":
-        trigger = ("fraction", cast(float, config.trigger.threshold))
-    elif config.trigger.kind == "tokens":
-        trigger = ("tokens", cast(int, config.trigger.threshold))
-    else:
-        trigger = ("messages", cast(int, config.trigger.threshold))
+    trigger = _trigger_size(config.trigger)
+    if config.mode == "background":
+        if config.hard_limit is not None:
+            trigger = _trigger_size(config.hard_limit)
+        elif isinstance((model.profile or {}).get("max_input_tokens"), int):
+            trigger = ("fraction", _DEFAULT_HARD_LIMIT_FRACTION)
+        else:
+            return None
+    return TimedSummarizationMiddleware(
+        model,
+        trigger=trigger,
+        keep=_keep_size(config),
+        token_counter=token_counter,
+        chunk_tokens=config.chunk_tokens,
+        pricing=pricing,
+    )
 
-    keep: _KeepContextSize
-    if config.keep.kind == "fraction":
-        keep = ("fraction", cast(float, config.keep.value))
-    elif config.keep.kind == "tokens":
-        keep = ("tokens", cast(int, config.keep.value))
-    else:
-        keep = ("messages", cast(int, config.keep.value))
 
-    return SummarizationMiddleware(model=model, trigger=trigger, keep=keep)
+def build_background_compressor(
+    config: ConversationCompressionConfig,
+    *,
+    model: BaseChatModel,
+    token_counter: SummarizationTokenCounter | None = None,
+    pricing: ModelPricingConfig | None = None,
+) -> BackgroundConversationCompressor | None:
+    """Build the between-turn compressor for background-mode configs.
+
+    Args:
+        config: Validated conversation compression configuration.
+        model: Chat model used to generate summaries.
+        token_counter: Optional token counter for ``tokens`` triggers and keeps.
+        pricing: Summary profile pricing charging summaries to the
+            conversation budget, if any.
+
+    Returns:
+        Compressor using the soft ``trigger``, or ``None`` in inline mode.
+    """
+    if config.mode != "background":
+        return None
+    summarizer = TimedSummarizationMiddleware(
+        model,
+        trigger=_trigger_size(config.trigger),
+        keep=_keep_size(config),
+        token_counter=token_counter,
+        chunk_tokens=config.chunk_tokens,
+        pricing=pricing,
+    )
+    return BackgroundConversationCompressor(summarizer)
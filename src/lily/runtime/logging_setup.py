@@ -1,4 +1,4 @@
-"""Runtime logging: Lily package log levels, Rich console, and skill telemetry."""
+"""Runtime logging: Lily package log levels, Rich console, and JSONL telemetry."""
 
 from __future__ import annotations
 
@@ -11,6 +11,8 @@ from rich.logging import RichHandler
 _LILY_ROOT_LOGGER = "lily"
 _SKILL_LOG = logging.getLogger("lily.skill.telemetry")
 _HANDLER_MARKER = "lily_skill_telemetry_handler"
+_RUN_TIMINGS_LOG = logging.getLogger("lily.run.timings")
+_RUN_TIMINGS_HANDLER_MARKER = "lily_run_timings_handler"
 _LILY_RICH_HANDLER_MARKER = "lily_rich_stderr_handler"
 
 
@@ -125,3 +127,51 @@ def configure_skill_telemetry_handlers(
         )
         setattr(rich_echo, _HANDLER_MARKER, True)
         _SKILL_LOG.addHandler(rich_echo)
+
+
+def resolve_run_timings_log_path(
+    config_path: str | Path,
+    *,
+    relative_override: str | None,
+) -> Path | None:
+    """Pick the log file path for per-run timing JSON lines.
+
+    Args:
+        config_path: Path to the runtime config file (``agent.toml`` / ``agent.yaml``).
+        relative_override: Configured ``[logging].run_timings_log``; relative paths
+            resolve against the config file's directory.
+
+    Returns:
+        Absolute JSONL path, or ``None`` when run timings logging is off.
+    """
+    if relative_override is None or not relative_override.strip():
+        return None
+    candidate = Path(relative_override.strip())
+    if candidate.is_absolute():
+        return candidate.resolve()
+    return (Path(config_path).resolve().parent / candidate).resolve()
+
+
+def configure_run_timings_handler(log_path: Path | None) -> None:
+    """Attach or remove the plain JSONL file handler on ``lily.run.timings``.
+
+    Idempotent for repeated calls in-process: replaces prior Lily-managed handlers.
+    Run timings never propagate to the parent ``lily`` console logger.
+
+    Args:
+        log_path: Append-only JSONL destination, or ``None`` to stop logging.
+    """
+    for handler in list(_RUN_TIMINGS_LOG.handlers):
+        if getattr(handler, _RUN_TIMINGS_HANDLER_MARKER, False):
+            _RUN_TIMINGS_LOG.removeHandler(handler)
+            handler.close()
+    _RUN_TIMINGS_LOG.propagate = False
+    if log_path is None:
+        return
+    log_path.parent.mkdir(parents=True, exist_ok=True)
+    file_handler = logging.FileHandler(log_path, encoding="utf-8")
+    file_handler.setLevel(logging.INFO)
+    file_handler.setFormatter(logging.Formatter("%(message)s"))
+    setattr(file_handler, _RUN_TIMINGS_HANDLER_MARKER, True)
+    _RUN_TIMINGS_LOG.addHandler(file_handler)
+    _RUN_TIMINGS_LOG.setLevel(logging.INFO)
@@ -0,0 +1,557 @@
+"""Concurrency limits, token-bucket rate limits, and backoff for model calls.
+
+Provider limits describe a provider account, so runtimes share them: governors
+built with ``shared=True`` take one process-wide limiter per provider endpoint
+and limits, the way model clients share connection pools. Limiters are
+thread-safe and grant each queued call on its own event loop, so runtimes on
+different loops queue for the same budget. Profile limits stay per governor.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import heapq
+import itertools
+import random
+import threading
+import time
+from collections.abc import AsyncIterator, Callable, Iterator, Mapping
+from contextlib import asynccontextmanager, contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from enum import IntEnum
+from functools import cache
+from typing import Literal
+
+from lily.runtime.config_schema import (
+    ModelCallLimitConfig,
+    ModelCallSchedulingConfig,
+    ModelProvider,
+)
+from lily.runtime.model_clients import provider_endpoint
+
+_RATE_LIMIT_STATUS = 429
+
+
+class ModelCallPriority(IntEnum):
+    """Admission priority of model calls under ``queue: priority``."""
+
+    INTERACTIVE = 0
+    NORMAL = 1
+
+
+_model_call_priority: ContextVar[ModelCallPriority] = ContextVar(
+    "model_call_priority", default=ModelCallPriority.NORMAL
+)
+
+
+@contextmanager
+def model_call_priority(priority: ModelCallPriority) -> Iterator[None]:
+    """Set the admission priority of model calls made inside the block.
+
+    Args:
+        priority: Priority for queued admission.
+
+    Yields:
+        Nothing; the previous priority is restored on exit.
+    """
+    token = _model_call_priority.set(priority)
+    try:
+        yield
+    finally:
+        _model_call_priority.reset(token)
+
+
+def is_rate_limit_error(exc: BaseException) -> bool:
+    """Return whether a model call failed because the provider rate-limited it.
+
+    Args:
+        exc: Exception raised by the model call.
+
+    Returns:
+        ``True`` for HTTP 429 responses and ``RateLimitError`` client errors.
+    """
+    if any(cls.__name__ == "RateLimitError" for cls in type(exc).__mro__):
+        return True
+    response = getattr(exc, "response", None)
+    return _RATE_LIMIT_STATUS in (
+        getattr(exc, "status_code", None),
+        getattr(response, "status_code", None),
+    )
+
+
+def _retry_after_seconds(exc: BaseException) -> float | None:
+    """Return the provider's ``retry-after`` hint in seconds, when present.
+
+    Args:
+        exc: Rate-limit exception, possibly carrying an HTTP response.
+
+    Returns:
+        Hinted delay, or ``None`` when absent or not numeric.
+    """
+    headers = getattr(getattr(exc, "response", None), "headers", None)
+    if headers is None:
+        return None
+    try:
+        return max(float(headers.get("retry-after")), 0.0)
+    except (TypeError, ValueError):
+        return None
+
+
+class _TokenBucket:
+    """Continuously refilled bucket holding at most one minute of budget."""
+
+    def __init__(self, per_minute: float, clock: Callable[[], float]) -> None:
+        """Start with a full bucket.
+
+        Args:
+            per_minute: Budget refilled per minute, also the bucket capacity.
+            clock: Monotonic clock.
+        """
+        self._capacity = per_minute
+        self._rate = per_minute / 60.0
+        self._clock = clock
+        self._level = per_minute
+        self._updated = clock()
+
+    def _refill(self) -> None:
+        """Add budget accrued since the last update."""
+        now = self._clock()
+        self._level = min(
+            self._capacity, self._level + (now - self._updated) * self._rate
+        )
+        self._updated = now
+
+    def wait_seconds(self, amount: float) -> float:
+        """Return how long until ``amount`` can be taken.
+
+        Args:
+            amount: Budget needed; clamped to the capacity.
+
+        Returns:
+            Zero when available now.
+        """
+        self._refill()
+        deficit = min(amount, self._capacity) - self._level
+        return max(deficit / self._rate, 0.0)
+
+    def take(self, amount: float) -> None:
+        """Consume budget; the level may go negative after settlement.
+
+        Args:
+            amount: Budget consumed; clamped to the capacity.
+        """
+        self._refill()
+        self._level -= min(amount, self._capacity)
+
+    def adjust(self, delta: float) -> None:
+        """Charge (positive) or refund (negative) budget after the fact.
+
+        Args:
+            delta: Extra budget used beyond what was taken.
+        """
+        self._refill()
+        self._level = min(self._capacity, self._level - delta)
+
+
+@dataclass(order=True)
+class _Waiter:
+    """One queued admission, ordered by priority then arrival."""
+
+    priority: int
+    sequence: int
+    tokens: int = field(compare=False)
+    loop: asyncio.AbstractEventLoop = field(compare=False)
+    future: asyncio.Future[None] = field(compare=False)
+    state: Literal["queued", "granted", "abandoned"] = field(
+        default="queued", compare=False
+    )
+
+
+def _resolve(future: asyncio.Future[None]) -> None:
+    """Wake a granted waiter unless it was cancelled meanwhile.
+
+    Args:
+        future: Waiter future, resolved on its own loop.
+    """
+    if not future.done():
+        future.set_result(None)
+
+
+class _CallLimiter:
+    """In-flight slots plus RPM/TPM buckets for one profile or provider.
+
+    Thread-safe; waiters may come from several event loops and are woken on
+    their own loop.
+    """
+
+    def __init__(
+        self,
+        limits: ModelCallLimitConfig,
+        *,
+        prioritized: bool,
+        clock: Callable[[], float],
+    ) -> None:
+        """Initialize limiter state from configured limits.
+
+        Args:
+            limits: Configured admission limits.
+            prioritized: Whether waiters are ordered by priority before arrival.
+            clock: Monotonic clock.
+        """
+        self._max_in_flight = limits.max_in_flight
+        self._requests = (
+            _TokenBucket(limits.requests_per_minute, clock)
+            if limits.requests_per_minute is not None
+            else None
+        )
+        self._tokens = (
+            _TokenBucket(limits.tokens_per_minute, clock)
+            if limits.tokens_per_minute is not None
+            else None
+        )
+        self._prioritized = prioritized
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self._waiters: list[_Waiter] = []
+        self._sequence = itertools.count()
+        # Due time of the pending refill timer on each waiter loop.
+        self._timers: dict[asyncio.AbstractEventLoop, float] = {}
+
+    @property
+    def limits_tokens(self) -> bool:
+        """Return whether admission depends on token estimates.
+
+        Returns:
+            ``True`` when a tokens-per-minute bucket is configured.
+        """
+        return self._tokens is not None
+
+    def _admission_delay(self, tokens: int) -> float | None:
+        """Return the bucket wait for one call, or ``None`` when slots are full.
+
+        Args:
+            tokens: Estimated prompt tokens of the call.
+
+        Returns:
+            Seconds until both buckets have budget; ``None`` at the slot limit.
+        """
+        if self._max_in_flight is not None and self._in_flight >= self._max_in_flight:
+            return None
+        delay = 0.0
+        if self._requests is not None:
+            delay = self._requests.wait_seconds(1)
+        if self._tokens is not None:
+            delay = max(delay, self._tokens.wait_seconds(tokens))
+        return delay
+
+    def _admit(self, tokens: int) -> None:
+        """Take a slot and bucket budget for one call.
+
+        Args:
+            tokens: Estimated prompt tokens of the call.
+        """
+        self._in_flight += 1
+        if self._requests is not None:
+            self._requests.take(1)
+        if self._tokens is not None:
+            self._tokens.take(tokens)
+
+    def _wake_after(self, loop: asyncio.AbstractEventLoop, delay: float) -> None:
+        """Dispatch again on ``loop`` once ``delay`` seconds have passed.
+
+        An earlier pending timer on the same loop already covers the wait.
+        Called with the lock held.
+
+        Args:
+            loop: Loop of the waiter at the head of the queue.
+            delay: Seconds until the head can be admitted.
+        """
+        due = self._clock() + delay
+        if self._timers.get(loop, float("inf")) <= due:
+            return
+        for closed in [other for other in self._timers if other.is_closed()]:
+            del self._timers[closed]
+        self._timers[loop] = due
+        loop.call_soon_threadsafe(loop.call_later, delay, self._on_timer, loop, due)
+
+    def _on_timer(self, loop: asyncio.AbstractEventLoop, due: float) -> None:
+        """Forget a fired refill timer and admit whoever can go now.
+
+        Args:
+            loop: Loop the timer ran on.
+            due: Due time the timer was scheduled for.
+        """
+        with self._lock:
+            if self._timers.get(loop) == due:
+                del self._timers[loop]
+            self._dispatch()
+
+    def _dispatch(self) -> None:
+        """Admit queued calls in order until the head has to wait.
+
+        Called with the lock held. Waiters whose loop has closed are dropped.
+        """
+        while self._waiters:
+            head = self._waiters[0]
+            if head.state == "abandoned" or head.loop.is_closed():
+                heapq.heappop(self._waiters)
+                continue
+            delay = self._admission_delay(head.tokens)
+            if delay is None:
+                return
+            if delay > 0.0:
+                self._wake_after(head.loop, delay)
+                return
+            heapq.heappop(self._waiters)
+            self._admit(head.tokens)
+            head.state = "granted"
+            head.loop.call_soon_threadsafe(_resolve, head.future)
+
+    async def acquire(self, priority: ModelCallPriority, tokens: int) -> None:
+        """Wait for admission of one call.
+
+        Args:
+            priority: Caller priority; ignored for FIFO limiters.
+            tokens: Estimated prompt tokens of the call.
+
+        Raises:
+            asyncio.CancelledError: If cancelled while queued; a slot granted
+                meanwhile is released first.
+        """
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            if not self._waiters and self._admission_delay(tokens) == 0.0:
+                self._admit(tokens)
+                return
+            waiter = _Waiter(
+                priority=priority if self._prioritized else 0,
+                sequence=next(self._sequence),
+                tokens=tokens,
+                loop=loop,
+                future=loop.create_future(),
+            )
+            heapq.heappush(self._waiters, waiter)
+            self._dispatch()
+        try:
+            await waiter.future
+        except asyncio.CancelledError:
+            with self._lock:
+                if waiter.state == "granted":
+                    self._release(0)
+                else:
+                    waiter.state = "abandoned"
+                    self._dispatch()
+            raise
+
+    def _release(self, extra_tokens: int) -> None:
+        """Free one slot and settle its tokens; called with the lock held.
+
+        Args:
+            extra_tokens: Tokens used beyond the estimate (negative refunds).
+        """
+        self._in_flight -= 1
+        if self._tokens is not None and extra_tokens:
+            self._tokens.adjust(extra_tokens)
+        self._dispatch()
+
+    def release(self, extra_tokens: int) -> None:
+        """Free one slot and settle the token estimate with actual usage.
+
+        Args:
+            extra_tokens: Tokens used beyond the estimate (negative refunds).
+        """
+        with self._lock:
+            self._release(extra_tokens)
+
+
+@cache
+def _shared_provider_limiter(
+    provider: ModelProvider,
+    endpoint: str,
+    limits: tuple[int | None, float | None, int | None],
+    *,
+    prioritized: bool,
+) -> _CallLimiter:
+    """Return the process-wide limiter of one provider endpoint and its limits.
+
+    Args:
+        provider: Model provider.
+        endpoint: Endpoint key from ``provider_endpoint``.
+        limits: ``max_in_flight``, ``requests_per_minute``, ``tokens_per_minute``.
+        prioritized: Whether waiters are ordered by priority before arrival.
+
+    Returns:
+        Limiter shared by every governor with the same key.
+    """
+    del provider, endpoint
+    max_in_flight, requests_per_minute, tokens_per_minute = limits
+    return _CallLimiter(
+        ModelCallLimitConfig(
+            max_in_flight=max_in_flight,
+            requests_per_minute=requests_per_minute,
+            tokens_per_minute=tokens_per_minute,
+        ),
+        prioritized=prioritized,
+        clock=time.monotonic,
+    )
+
+
+class ModelCallPermit:
+    """Admission of one model call across its profile and provider limiters."""
+
+    def __init__(self, waited_seconds: float, estimated_tokens: int) -> None:
+        """Initialize an unsettled permit.
+
+        Args:
+            waited_seconds: Time spent queued for admission.
+            estimated_tokens: Prompt tokens charged at admission.
+        """
+        self.waited_seconds = waited_seconds
+        self._estimated_tokens = estimated_tokens
+        self.extra_tokens = 0
+
+    def settle(self, used_tokens: int | None) -> None:
+        """Record provider-reported token usage for the call.
+
+        Args:
+            used_tokens: Total tokens reported by the provider, if any.
+        """
+        if used_tokens is not None:
+            self.extra_tokens = used_tokens - self._estimated_tokens
+
+
+class ModelCallGovernor:
+    """Admission control for model calls per profile and per provider.
+
+    A call holds a slot on its profile's limiter and on its provider's limiter
+    (acquired in that order) until it finishes. Unconfigured profiles and
+    providers are admitted immediately.
+    """
+
+    def __init__(
+        self,
+        scheduling: ModelCallSchedulingConfig,
+        providers: Mapping[str, ModelProvider],
+        *,
+        clock: Callable[[], float] = time.monotonic,
+        shared: bool = False,
+    ) -> None:
+        """Build limiters for every configured profile and provider.
+
+        Args:
+            scheduling: Model call scheduling policy.
+            providers: Provider of each model profile.
+            clock: Monotonic clock for private limiters, injectable for tests.
+            shared: Take provider limiters from the process-wide registry, so
+                governors with the same provider endpoint and limits share one
+                budget.
+        """
+        self._scheduling = scheduling
+        prioritized = scheduling.queue == "priority"
+        provider_limiters = {
+            provider: (
+                _shared_provider_limiter(
+                    provider,
+                    provider_endpoint(provider),
+                    (
+                        limits.max_in_flight,
+                        limits.requests_per_minute,
+                        limits.tokens_per_minute,
+                    ),
+                    prioritized=prioritized,
+                )
+                if shared
+                else _CallLimiter(limits, prioritized=prioritized, clock=clock)
+            )
+            for provider, limits in scheduling.providers.items()
+        }
+        self._limiters: dict[str, list[_CallLimiter]] = {}
+        for profile, provider in providers.items():
+            chain: list[_CallLimiter] = []
+            if profile in scheduling.profiles:
+                chain.append(
+                    _CallLimiter(
+                        scheduling.profiles[profile],
+                        prioritized=prioritized,
+                        clock=clock,
+                    )
+                )
+            if provider in provider_limiters:
+                chain.append(provider_limiters[provider])
+            self._limiters[profile] = chain
+
+    def limits_tokens(self, profile: str) -> bool:
+        """Return whether admission on a profile needs a prompt token estimate.
+
+        Args:
+            profile: Model profile name.
+
+        Returns:
+            ``True`` when a tokens-per-minute limit applies.
+        """
+        return any(limiter.limits_tokens for limiter in self._limiters.get(profile, ()))
+
+    @asynccontextmanager
+    async def permit(
+        self,
+        profile: str,
+        *,
+        estimated_tokens: int = 0,
+    ) -> AsyncIterator[ModelCallPermit]:
+        """Hold admission for one model call on ``profile``.
+
+        Args:
+            profile: Model profile name.
+            estimated_tokens: Prompt tokens charged to token buckets.
+
+        Yields:
+            Permit reporting queue wait; settle it with the call's token usage.
+
+        Raises:
+            BaseException: Re-raised after releasing the limiters already
+                acquired when admission is interrupted.
+        """
+        started = time.perf_counter()
+        priority = _model_call_priority.get()
+        acquired: list[_CallLimiter] = []
+        try:
+            for limiter in self._limiters.get(profile, ()):
+                await limiter.acquire(priority, estimated_tokens)
+                acquired.append(limiter)
+        except BaseException:
+            for limiter in acquired:
+                limiter.release(0)
+            raise
+        permit = ModelCallPermit(time.perf_counter() - started, estimated_tokens)
+        try:
+            yield permit
+        finally:
+            for limiter in acquired:
+                limiter.release(permit.extra_tokens)
+
+    def backoff_seconds(self, exc: BaseException, attempt: int) -> float | None:
+        """Return the delay before retrying a rate-limited call.
+
+        Uses the provider's ``retry-after`` hint when present, otherwise
+        exponential backoff with jitter over the upper half of the window.
+
+        Args:
+            exc: Exception raised by the call.
+            attempt: Zero-based count of retries already made.
+
+        Returns:
+            Seconds to wait, or ``None`` when the call should not be retried.
+        """
+        scheduling = self._scheduling
+        if attempt >= scheduling.rate_limit_retries or not is_rate_limit_error(exc):
+            return None
+        hinted = _retry_after_seconds(exc)
+        if hinted is not None:
+            return min(hinted, scheduling.backoff_max_seconds)
+        window = min(
+            scheduling.backoff_base_seconds * 2.0**attempt,
+            scheduling.backoff_max_seconds,
+        )
+        return window / 2 + random.uniform(0.0, window / 2)
@@ -0,0 +1,124 @@
+"""Process-wide HTTP connection pools shared by model provider clients.
+
+Profiles that point at the same provider endpoint send requests through one
+transport (connection pool), while each SDK client keeps its own timeout and
+headers. Async pools are kept per event loop because asyncio connections cannot
+move between loops.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import os
+import threading
+import weakref
+from dataclasses import dataclass
+from functools import cache
+
+import httpx
+
+from lily.runtime.config_schema import ModelProvider
+
+# Mirrors the OpenAI SDK defaults; Ollama uses the same pool sizing.
+_POOL_LIMITS = httpx.Limits(
+    max_connections=1000,
+    max_keepalive_connections=100,
+    keepalive_expiry=5.0,
+)
+_ENDPOINT_ENV = {
+    ModelProvider.OPENAI: "OPENAI_BASE_URL",
+    ModelProvider.OLLAMA: "OLLAMA_HOST",
+}
+
+
+class _SharedTransport(httpx.BaseTransport):
+    """Sync pool whose ``close`` from one client leaves the others working."""
+
+    def __init__(self) -> None:
+        """Create the underlying pooled transport."""
+        self._transport = httpx.HTTPTransport(limits=_POOL_LIMITS)
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        """Send one request through the shared pool.
+
+        Args:
+            request: Outgoing request.
+
+        Returns:
+            Response from the pool.
+        """
+        return self._transport.handle_request(request)
+
+    def close(self) -> None:
+        """Keep the pool open; it lives as long as the process."""
+
+
+class _LoopLocalAsyncTransport(httpx.AsyncBaseTransport):
+    """Async pool per running event loop, dropped with its loop."""
+
+    def __init__(self) -> None:
+        """Initialize an empty loop-to-pool map."""
+        self._lock = threading.Lock()
+        self._transports: weakref.WeakKeyDictionary[
+            asyncio.AbstractEventLoop, httpx.AsyncHTTPTransport
+        ] = weakref.WeakKeyDictionary()
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        """Send one request through the running loop's pool.
+
+        Args:
+            request: Outgoing request.
+
+        Returns:
+            Response from the pool.
+        """
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            transport = self._transports.get(loop)
+            if transport is None:
+                transport = httpx.AsyncHTTPTransport(limits=_POOL_LIMITS)
+                self._transports[loop] = transport
+        return await transport.handle_async_request(request)
+
+    async def aclose(self) -> None:
+        """Keep the pools open; each lives as long as its loop."""
+
+
+@dataclass(frozen=True, slots=True)
+class SharedHttpTransports:
+    """Sync and async transports shared by every client of one endpoint."""
+
+    sync: httpx.BaseTransport
+    async_: httpx.AsyncBaseTransport
+
+
+def provider_endpoint(provider: ModelProvider) -> str:
+    """Return the endpoint a provider's clients connect to.
+
+    Args:
+        provider: Model provider.
+
+    Returns:
+        Base URL from the provider's environment variable, or ``default``.
+    """
+    return os.environ.get(_ENDPOINT_ENV[provider]) or "default"
+
+
+@cache
+def shared_http_transports(
+    provider: ModelProvider,
+    endpoint: str,
+) -> SharedHttpTransports:
+    """Return the process-wide transports for one provider endpoint.
+
+    Args:
+        provider: Model provider.
+        endpoint: Endpoint key from ``provider_endpoint``.
+
+    Returns:
+        Transports to pass to SDK-built httpx clients.
+    """
+    del provider, endpoint  # cache key only
+    return SharedHttpTransports(
+        sync=_SharedTransport(), async_=_LoopLocalAsyncTransport()
+    )
@@ -2,14 +2,42 @@
 
 from __future__ import annotations
 
-from collections.abc import Callable
+import threading
+from collections.abc import (
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    Iterator,
+    Mapping,
+    Sequence,
+)
+from typing import Any
 
+import httpx
 from langchain.chat_models import init_chat_model
-from langchain_core.language_models import BaseChatModel
+from langchain_core.callbacks import (
+    AsyncCallbackManagerForLLMRun,
+    CallbackManagerForLLMRun,
+)
+from langchain_core.language_models import BaseChatModel, LanguageModelInput
+from langchain_core.messages import AIMessage, BaseMessage
+from langchain_core.outputs import ChatGenerationChunk, ChatResult
+from langchain_core.runnables import Runnable
+from langchain_core.tools import BaseTool
+from pydantic import ConfigDict, PrivateAttr
 
 from lily.runtime.config_schema import ModelProfileConfig, ModelProvider
+from lily.runtime.model_clients import provider_endpoint, shared_http_transports
 
 type ModelBuilder = Callable[[ModelProfileConfig], BaseChatModel]
+type ModelPreloader = Callable[[ModelProfileConfig], Awaitable[None]]
+
+OLLAMA_PRELOAD_KEEP_ALIVE = "30m"
+
+# Built-in provider models by profile settings, shared by every runtime in the
+# process. Chat model instances hold no per-conversation state.
+_shared_models: dict[str, BaseChatModel] = {}
+_shared_models_lock = threading.Lock()
 
 
 class ModelFactoryError(ValueError):
@@ -19,53 +47,302 @@ class ModelFactoryError(ValueError):
 def _build_openai_model(profile: ModelProfileConfig) -> BaseChatModel:
     """Build an OpenAI model from profile settings.
 
+    Requests go through the endpoint's shared connection pool.
+
     Args:
         profile: Validated model profile settings.
 
     Returns:
         Initialized LangChain chat model.
     """
+    transports = shared_http_transports(
+        profile.provider, provider_endpoint(profile.provider)
+    )
     return init_chat_model(
         model=profile.model,
         model_provider=profile.provider.value,
         temperature=profile.temperature,
         timeout=profile.timeout_seconds,
+        http_client=httpx.Client(transport=transports.sync),
+        http_async_client=httpx.AsyncClient(transport=transports.async_),
     )
 
 
 def _build_ollama_model(profile: ModelProfileConfig) -> BaseChatModel:
     """Build an Ollama model from profile settings.
 
+    Requests go through the endpoint's shared connection pool.
+
     Args:
         profile: Validated model profile settings.
 
     Returns:
         Initialized LangChain chat model.
     """
+    transports = shared_http_transports(
+        profile.provider, provider_endpoint(profile.provider)
+    )
     return init_chat_model(
         model=profile.model,
         model_provider=profile.provider.value,
         temperature=profile.temperature,
         timeout=profile.timeout_seconds,
+        sync_client_kwargs={"transport": transports.sync},
+        async_client_kwargs={"transport": transports.async_},
     )
 
 
+def _process_shared(builder: ModelBuilder) -> ModelBuilder:
+    """Wrap a builder so equal profiles reuse one model across the process.
+
+    Args:
+        builder: Provider model builder.
+
+    Returns:
+        Builder returning the cached model for already-built profile settings.
+    """
+
+    def _build(profile: ModelProfileConfig) -> BaseChatModel:
+        key = profile.model_dump_json(exclude={"tokenizer", "pricing"})
+        with _shared_models_lock:
+            model = _shared_models.get(key)
+            if model is None:
+                model = builder(profile)
+                _shared_models[key] = model
+        return model
+
+    return _build
+
+
+class LazyChatModel(BaseChatModel):
+    """Chat model proxy that builds its profile's client on first use.
+
+    Tool binding and generation resolve the real model; ``resolve`` exposes it
+    for callers that need provider attributes such as ``profile``.
+    """
+
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
+    profile_name: str
+    loader: Callable[[], BaseChatModel]
+    _model: BaseChatModel | None = PrivateAttr(default=None)
+    _lock: threading.Lock = PrivateAttr(default_factory=threading.Lock)
+
+    @property
+    def _llm_type(self) -> str:
+        """Return the LangChain model type identifier.
+
+        Returns:
+            Constant identifier of the lazy proxy.
+        """
+        return "lily-lazy"
+
+    @property
+    def is_loaded(self) -> bool:
+        """Return whether the real model has been built.
+
+        Returns:
+            ``True`` once ``resolve`` has built the profile model.
+        """
+        return self._model is not None
+
+    def resolve(self) -> BaseChatModel:
+        """Return the real model, building it once.
+
+        Returns:
+            Profile chat model.
+        """
+        model = self._model
+        if model is None:
+            with self._lock:
+                if self._model is None:
+                    self._model = self.loader()
+                model = self._model
+        return model
+
+    def bind_tools(
+        self,
+        tools: Sequence[dict[str, Any] | type | Callable[..., Any] | BaseTool],
+        *,
+        tool_choice: str | None = None,
+        **kwargs: object,
+    ) -> Runnable[LanguageModelInput, AIMessage]:
+        """Bind tools on the real model.
+
+        Args:
+            tools: Tools to bind.
+            tool_choice: Optional tool choice constraint.
+            **kwargs: Provider-specific binding options.
+
+        Returns:
+            Tool-bound runnable of the real model.
+        """
+        return self.resolve().bind_tools(tools, tool_choice=tool_choice, **kwargs)
+
+    def _generate(
+        self,
+        messages: list[BaseMessage],
+        stop: list[str] | None = None,
+        run_manager: CallbackManagerForLLMRun | None = None,
+        **kwargs: object,
+    ) -> ChatResult:
+        """Delegate generation to the real model.
+
+        Args:
+            messages: Prompt messages.
+            stop: Optional stop sequences.
+            run_manager: Optional callback manager.
+            **kwargs: Provider options.
+
+        Returns:
+            Real model chat result.
+        """
+        return self.resolve()._generate(
+            messages, stop=stop, run_manager=run_manager, **kwargs
+        )
+
+    async def _agenerate(
+        self,
+        messages: list[BaseMessage],
+        stop: list[str] | None = None,
+        run_manager: AsyncCallbackManagerForLLMRun | None = None,
+        **kwargs: object,
+    ) -> ChatResult:
+        """Delegate async generation to the real model.
+
+        Args:
+            messages: Prompt messages.
+            stop: Optional stop sequences.
+            run_manager: Optional async callback manager.
+            **kwargs: Provider options.
+
+        Returns:
+            Real model chat result.
+        """
+        return await self.resolve()._agenerate(
+            messages, stop=stop, run_manager=run_manager, **kwargs
+        )
+
+    def _should_stream(
+        self,
+        *,
+        async_api: bool,
+        run_manager: CallbackManagerForLLMRun
+        | AsyncCallbackManagerForLLMRun
+        | None = None,
+        **kwargs: object,
+    ) -> bool:
+        """Stream exactly when the real model would.
+
+        Args:
+            async_api: Whether the caller uses the async API.
+            run_manager: Optional callback manager of the call.
+            **kwargs: Call options such as ``stream``.
+
+        Returns:
+            Whether the call should use the streaming path.
+        """
+        return self.resolve()._should_stream(
+            async_api=async_api, run_manager=run_manager, **kwargs
+        )
+
+    def _stream(
+        self,
+        messages: list[BaseMessage],
+        stop: list[str] | None = None,
+        run_manager: CallbackManagerForLLMRun | None = None,
+        **kwargs: object,
+    ) -> Iterator[ChatGenerationChunk]:
+        """Delegate streaming to the real model.
+
+        Args:
+            messages: Prompt messages.
+            stop: Optional stop sequences.
+            run_manager: Optional callback manager.
+            **kwargs: Provider options.
+
+        Yields:
+            Real model chunks.
+        """
+        yield from self.resolve()._stream(
+            messages, stop=stop, run_manager=run_manager, **kwargs
+        )
+
+    async def _astream(
+        self,
+        messages: list[BaseMessage],
+        stop: list[str] | None = None,
+        run_manager: AsyncCallbackManagerForLLMRun | None = None,
+        **kwargs: object,
+    ) -> AsyncIterator[ChatGenerationChunk]:
+        """Delegate async streaming to the real model.
+
+        Args:
+            messages: Prompt messages.
+            stop: Optional stop sequences.
+            run_manager: Optional async callback manager.
+            **kwargs: Provider options.
+
+        Yields:
+            Real model chunks.
+        """
+        async for chunk in self.resolve()._astream(
+            messages, stop=stop, run_manager=run_manager, **kwargs
+        ):
+            yield chunk
+
+
+async def _preload_ollama_model(profile: ModelProfileConfig) -> None:
+    """Ask the Ollama server to load one model and keep it resident.
+
+    Sends an empty generate request, which Ollama treats as a load request.
+
+    Args:
+        profile: Validated Ollama model profile settings.
+    """
+    from ollama import AsyncClient  # noqa: PLC0415
+
+    async with AsyncClient(timeout=profile.timeout_seconds) as client:
+        await client.generate(model=profile.model, keep_alive=OLLAMA_PRELOAD_KEEP_ALIVE)
+
+
+def resolve_chat_model(model: BaseChatModel) -> BaseChatModel:
+    """Return the real model behind a lazy proxy.
+
+    Args:
+        model: Chat model, possibly a ``LazyChatModel``.
+
+    Returns:
+        Built model with provider attributes populated.
+    """
+    return model.resolve() if isinstance(model, LazyChatModel) else model
+
+
 class ModelFactory:
     """Build configured chat model instances via provider registry dispatch."""
 
     def __init__(
         self,
         builders: dict[ModelProvider, ModelBuilder] | None = None,
+        preloaders: dict[ModelProvider, ModelPreloader] | None = None,
     ) -> None:
-        """Initialize provider->builder dispatch registry.
+        """Initialize provider->builder and provider->preloader dispatch registries.
 
         Args:
-            builders: Optional provider-to-builder override mapping.
+            builders: Optional provider-to-builder override mapping. Built-in
+                builders share one model per profile settings across the process.
+            preloaders: Optional provider-to-preloader override mapping. Providers
+                without a preloader are skipped by ``apreload_models``.
         """
         self._builders: dict[ModelProvider, ModelBuilder] = builders or {
-            ModelProvider.OPENAI: _build_openai_model,
-            ModelProvider.OLLAMA: _build_ollama_model,
+            ModelProvider.OPENAI: _process_shared(_build_openai_model),
+            ModelProvider.OLLAMA: _process_shared(_build_ollama_model),
         }
+        self._preloaders: dict[ModelProvider, ModelPreloader] = (
+            preloaders
+            if preloaders is not None
+            else {ModelProvider.OLLAMA: _preload_ollama_model}
+        )
 
     def create_model(self, profile: ModelProfileConfig) -> BaseChatModel:
         """Create one model instance from profile config.
@@ -99,15 +376,48 @@ class ModelFactory:
         self,
         profiles: dict[str, ModelProfileConfig],
     ) -> dict[str, BaseChatModel]:
-        """Create all named profile models.
+        """Create all named profile models, each built on first use.
 
         Args:
             profiles: Mapping of profile name to profile config.
 
         Returns:
-            Mapping of profile name to initialized chat model.
+            Mapping of profile name to lazy chat model.
         """
         return {
-            profile_name: self.create_model(profile_config)
+            profile_name: LazyChatModel(
+                profile_name=profile_name,
+                loader=lambda profile=profile_config: self.create_model(profile),
+            )
             for profile_name, profile_config in profiles.items()
         }
+
+    async def apreload_models(
+        self,
+        profiles: Mapping[str, ModelProfileConfig],
+    ) -> None:
+        """Load models server-side for providers that keep weights resident.
+
+        Each distinct ``(provider, model)`` pair is preloaded once, in profile order.
+
+        Args:
+            profiles: Mapping of profile name to profile config.
+
+        Raises:
+            ModelFactoryError: If a preload request fails.
+        """
+        seen: set[tuple[ModelProvider, str]] = set()
+        for profile in profiles.values():
+            preloader = self._preloaders.get(profile.provider)
+            target = (profile.provider, profile.model)
+            if preloader is None or target in seen:
+                continue
+            seen.add(target)
+            try:
+                await preloader(profile)
+            except Exception as exc:
+                msg = (
+                    f"Failed to preload model '{profile.model}' for provider "
+                    f"'{profile.provider.value}': {exc}"
+                )
+                raise ModelFactoryError(msg) from exc
@@ -2,7 +2,14 @@
 
 from __future__ import annotations
 
-from collections.abc import Awaitable, Callable
+import asyncio
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import AsyncIterator, Awaitable, Callable, Iterator, Sequence
+from contextvars import ContextVar
 from typing import Any
 
 from langchain.agents.middleware import (
@@ -10,36 +17,744 @@ from langchain.agents.middleware import (
     ModelRequest,
     ModelResponse,
 )
-from langchain_core.language_models import BaseChatModel
-from pydantic import BaseModel, ConfigDict
+from langchain_core.callbacks import (
+    AsyncCallbackManagerForLLMRun,
+    CallbackManagerForLLMRun,
+)
+from langchain_core.language_models import BaseChatModel, LanguageModelInput
+from langchain_core.messages import AIMessage, BaseMessage
+from langchain_core.outputs import ChatGenerationChunk, ChatResult
+from langchain_core.runnables import Runnable
+from langchain_core.tools import BaseTool
+from langchain_core.utils.function_calling import convert_to_openai_tool
+from langgraph.config import get_config
+from pydantic import BaseModel, ConfigDict, Field, PrivateAttr
+
+from lily.runtime.config_schema import (
+    DynamicModelRoutingConfig,
+    ModelCallSchedulingConfig,
+)
+from lily.runtime.model_call_governor import ModelCallGovernor
+from lily.runtime.routing_health import (
+    AttemptOutcome,
+    ProfileHealthSnapshot,
+    ProfileHealthTracker,
+    RoutingAttempt,
+    RoutingReason,
+    emit_routing_decision,
+    hedging_allowed,
+    is_retryable_model_error,
+)
+from lily.runtime.run_timings import record_model_call, record_model_queue_wait
+from lily.runtime.token_accounting import TokenAccountant
+
+_BINDING_CACHE_MAX_ENTRIES = 64
+_TOOL_KEY_MEMO_MAX_ENTRIES = 1024
+RESPONSE_CACHE_METADATA_KEY = "lily_response_cache"
+
+
+def _current_thread_id() -> str | None:
+    """Return the LangGraph thread id of the running graph, if any.
+
+    Returns:
+        Configured ``thread_id`` or ``None`` outside a graph run.
+    """
+    try:
+        config = get_config()
+    except RuntimeError:
+        return None
+    thread_id = config.get("configurable", {}).get("thread_id")
+    return str(thread_id) if thread_id is not None else None
+
+
+def routed_profile_name(model: BaseChatModel) -> str | None:
+    """Return the profile of a model swapped in by ``DynamicModelRouter``.
+
+    Args:
+        model: ``request.model`` seen by middleware inside the router.
+
+    Returns:
+        Profile name, or ``None`` for models the router did not select.
+    """
+    return model.profile_name if isinstance(model, _BindingCachedChatModel) else None
+
+
+def routed_model(model: BaseChatModel) -> BaseChatModel:
+    """Return the profile model behind a ``DynamicModelRouter`` proxy.
+
+    Args:
+        model: ``request.model`` seen by middleware inside the router.
+
+    Returns:
+        Wrapped profile model, or ``model`` itself when the router did not
+        select it.
+    """
+    return model.inner if isinstance(model, _BindingCachedChatModel) else model
+
+
+type _ToolKey = tuple[str, str]
+type _BindingKey = tuple[str, tuple[_ToolKey, ...], tuple[tuple[str, str], ...]]
+
+
+class _ToolBindingCache:
+    """LRU of tool-bound runnables of one profile model.
+
+    Bindings are keyed by profile, tool names with a hash of each tool's
+    schema, and binding options, so a rebuilt toolset with the same schemas
+    reuses its binding and a changed schema binds again. Thread-safe.
+    """
+
+    def __init__(self, profile: str) -> None:
+        """Initialize an empty cache.
+
+        Args:
+            profile: Profile whose model the cached bindings wrap.
+        """
+        self._profile = profile
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[
+            _BindingKey, Runnable[LanguageModelInput, AIMessage]
+        ] = OrderedDict()
+        # Values hold the tool itself, so its ``id`` cannot be reused meanwhile.
+        self._tool_keys: OrderedDict[int, tuple[object, _ToolKey]] = OrderedDict()
+
+    def _tool_key(self, tool: object) -> _ToolKey:
+        """Return a tool's name and schema hash, memoized per live tool object.
+
+        Args:
+            tool: Tool passed to ``bind_tools``.
+
+        Returns:
+            ``(name, sha256 of the OpenAI-format schema)``.
+        """
+        with self._lock:
+            memo = self._tool_keys.get(id(tool))
+            if memo is not None and memo[0] is tool:
+                self._tool_keys.move_to_end(id(tool))
+                return memo[1]
+        schema = convert_to_openai_tool(tool)  # type: ignore[arg-type]
+        encoded = json.dumps(schema, sort_keys=True, default=str).encode("utf-8")
+        key = (
+            str(schema.get("function", schema).get("name", "")),
+            hashlib.sha256(encoded).hexdigest(),
+        )
+        with self._lock:
+            self._tool_keys[id(tool)] = (tool, key)
+            self._tool_keys.move_to_end(id(tool))
+            while len(self._tool_keys) > _TOOL_KEY_MEMO_MAX_ENTRIES:
+                self._tool_keys.popitem(last=False)
+        return key
+
+    def get_or_bind(
+        self,
+        tools: Sequence[object],
+        options: dict[str, object],
+        bind: Callable[[], Runnable[LanguageModelInput, AIMessage]],
+    ) -> Runnable[LanguageModelInput, AIMessage]:
+        """Return the cached binding for ``tools`` and ``options``, binding once.
+
+        Concurrent misses may bind twice; the last binding wins and both are
+        equivalent.
+
+        Args:
+            tools: Tools passed to ``bind_tools``.
+            options: Keyword options such as ``tool_choice``.
+            bind: Callable performing the uncached binding.
+
+        Returns:
+            Tool-bound runnable for the profile model.
+        """
+        key: _BindingKey = (
+            self._profile,
+            tuple(self._tool_key(tool) for tool in tools),
+            tuple(sorted((name, repr(value)) for name, value in options.items())),
+        )
+        with self._lock:
+            cached = self._entries.get(key)
+            if cached is not None:
+                self._entries.move_to_end(key)
+                return cached
+        bound = bind()
+        with self._lock:
+            self._entries[key] = bound
+            self._entries.move_to_end(key)
+            while len(self._entries) > _BINDING_CACHE_MAX_ENTRIES:
+                self._entries.popitem(last=False)
+        return bound
+
+
+class _BindingCachedChatModel(BaseChatModel):
+    """Profile model proxy whose ``bind_tools`` reuses earlier bindings.
+
+    LangChain's agent rebinds ``request.model`` to the request tools on every
+    model call, converting every tool schema each time. Routing requests to
+    this proxy turns repeated binds for the same toolset into cache hits.
+    """
+
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
+    profile_name: str
+    inner: BaseChatModel
+    binding_cache: _ToolBindingCache
+
+    @property
+    def _llm_type(self) -> str:
+        """Return the wrapped model type identifier.
+
+        Returns:
+            Type identifier of the profile model.
+        """
+        return self.inner._llm_type
+
+    def bind_tools(
+        self,
+        tools: Sequence[dict[str, Any] | type | Callable[..., Any] | BaseTool],
+        *,
+        tool_choice: str | None = None,
+        **kwargs: object,
+    ) -> Runnable[LanguageModelInput, AIMessage]:
+        """Bind tools on the wrapped model, reusing a cached binding when present.
+
+        Args:
+            tools: Tools to bind.
+            tool_choice: Tool choice forwarded to the wrapped model.
+            **kwargs: Further binding options forwarded to the wrapped model.
+
+        Returns:
+            Tool-bound runnable over the wrapped model.
+        """
+        return self.binding_cache.get_or_bind(
+            tools,
+            {"tool_choice": tool_choice, **kwargs},
+            lambda: self.inner.bind_tools(tools, tool_choice=tool_choice, **kwargs),
+        )
+
+    def _generate(
+        self,
+        messages: list[BaseMessage],
+        stop: list[str] | None = None,
+        run_manager: CallbackManagerForLLMRun | None = None,
+        **kwargs: object,
+    ) -> ChatResult:
+        """Delegate generation to the wrapped model.
+
+        Args:
+            messages: Prompt messages.
+            stop: Optional stop sequences.
+            run_manager: Optional callback manager.
+            **kwargs: Provider options.
+
+        Returns:
+            Wrapped model chat result.
+        """
+        return self.inner._generate(
+            messages, stop=stop, run_manager=run_manager, **kwargs
+        )
+
+    async def _agenerate(
+        self,
+        messages: list[BaseMessage],
+        stop: list[str] | None = None,
+        run_manager: AsyncCallbackManagerForLLMRun | None = None,
+        **kwargs: object,
+    ) -> ChatResult:
+        """Delegate async generation to the wrapped model.
+
+        Args:
+            messages: Prompt messages.
+            stop: Optional stop sequences.
+            run_manager: Optional async callback manager.
+            **kwargs: Provider options.
+
+        Returns:
+            Wrapped model chat result.
+        """
+        return await self.inner._agenerate(
+            messages, stop=stop, run_manager=run_manager, **kwargs
+        )
+
+    def _should_stream(
+        self,
+        *,
+        async_api: bool,
+        run_manager: CallbackManagerForLLMRun
+        | AsyncCallbackManagerForLLMRun
+        | None = None,
+        **kwargs: object,
+    ) -> bool:
+        """Stream exactly when the wrapped model would.
+
+        Args:
+            async_api: Whether the caller uses the async API.
+            run_manager: Optional callback manager of the call.
+            **kwargs: Call options such as ``stream``.
+
+        Returns:
+            Whether the call should use the streaming path.
+        """
+        return self.inner._should_stream(
+            async_api=async_api, run_manager=run_manager, **kwargs
+        )
+
+    def _stream(
+        self,
+        messages: list[BaseMessage],
+        stop: list[str] | None = None,
+        run_manager: CallbackManagerForLLMRun | None = None,
+        **kwargs: object,
+    ) -> Iterator[ChatGenerationChunk]:
+        """Delegate streaming to the wrapped model.
+
+        Args:
+            messages: Prompt messages.
+            stop: Optional stop sequences.
+            run_manager: Optional callback manager.
+            **kwargs: Provider options.
+
+        Yields:
+            Wrapped model chunks.
+        """
+        yield from self.inner._stream(
+            messages, stop=stop, run_manager=run_manager, **kwargs
+        )
+
+    async def _astream(
+        self,
+        messages: list[BaseMessage],
+        stop: list[str] | None = None,
+        run_manager: AsyncCallbackManagerForLLMRun | None = None,
+        **kwargs: object,
+    ) -> AsyncIterator[ChatGenerationChunk]:
+        """Delegate async streaming to the wrapped model.
+
+        Args:
+            messages: Prompt messages.
+            stop: Optional stop sequences.
+            run_manager: Optional async callback manager.
+            **kwargs: Provider options.
+
+        Yields:
+            Wrapped model chunks.
+        """
+        async for chunk in self.inner._astream(
+            messages, stop=stop, run_manager=run_manager, **kwargs
+        ):
+            yield chunk
+
+
+def _response_tokens(response: ModelResponse[Any]) -> int | None:
+    """Return provider-reported total tokens of a model response.
+
+    Args:
+        response: Downstream model response.
+
+    Returns:
+        Total tokens from usage metadata, or ``None`` when unreported.
+    """
+    for message in response.result:
+        if isinstance(message, AIMessage) and message.usage_metadata:
+            return message.usage_metadata["total_tokens"]
+    return None
+
+
+def _served_from_cache(response: ModelResponse[Any]) -> bool:
+    """Return whether a model response was replayed by the response cache.
+
+    Args:
+        response: Downstream model response.
+
+    Returns:
+        ``True`` when the reply carries the response-cache hit marker.
+    """
+    return any(
+        isinstance(message, AIMessage)
+        and message.response_metadata.get(RESPONSE_CACHE_METADATA_KEY) == "hit"
+        for message in response.result
+    )
+
+
+class _Admission:
+    """Governor admission of one attempt, taken around its provider call."""
+
+    def __init__(
+        self,
+        governor: ModelCallGovernor,
+        profile: str,
+        estimated_tokens: int,
+    ) -> None:
+        """Initialize an admission that has not queued yet.
+
+        Args:
+            governor: Governor admitting the call.
+            profile: Profile the attempt calls.
+            estimated_tokens: Prompt tokens charged to token buckets.
+        """
+        self._governor = governor
+        self._profile = profile
+        self._estimated_tokens = estimated_tokens
+        self.waited_seconds = 0.0
+
+    async def call(
+        self,
+        request: ModelRequest[None],
+        handler: Callable[[ModelRequest[None]], Awaitable[ModelResponse[Any]]],
+    ) -> ModelResponse[Any]:
+        """Await the handler while holding a governor permit.
+
+        Args:
+            request: Model request for the admitted profile.
+            handler: Downstream async model-call handler.
+
+        Returns:
+            Model response from downstream handler.
+        """
+        async with self._governor.permit(
+            self._profile, estimated_tokens=self._estimated_tokens
+        ) as permit:
+            self.waited_seconds = permit.waited_seconds
+            record_model_queue_wait(permit.waited_seconds)
+            response = await handler(request)
+            permit.settle(_response_tokens(response))
+            return response
+
+
+_pending_admission: ContextVar[_Admission | None] = ContextVar(
+    "pending_model_call_admission", default=None
+)
+
+
+class _RoutedCall:
+    """Attempts made for one routed model call, in start order."""
+
+    def __init__(
+        self,
+        router: DynamicModelRouter,
+        request: ModelRequest[None],
+    ) -> None:
+        """Resolve the ordered candidate profiles for one request.
+
+        Args:
+            router: Router owning models and health state.
+            request: Current model call request.
+        """
+        self.router = router
+        self.request = request
+        self.selected = router._select_profile_name(request)
+        self.candidates, self.reason = router._candidates(self.selected)
+        self.attempts: list[RoutingAttempt] = []
+        self.hedged = False
+
+    def _finish(
+        self,
+        profile: str,
+        started: float,
+        outcome: AttemptOutcome,
+        error: BaseException | None = None,
+        *,
+        cached: bool = False,
+    ) -> None:
+        """Record one finished attempt on health state and run timings.
+
+        Cancelled attempts and response-cache hits never reached a provider
+        to completion, so they are kept out of the health EWMAs and the
+        latency samples behind the hedge delay.
+
+        Args:
+            profile: Profile that served the attempt.
+            started: ``perf_counter`` value at attempt start.
+            outcome: How the attempt ended.
+            error: Failure raised by the attempt, if any.
+            cached: Whether the reply was served by the response cache.
+        """
+        seconds = time.perf_counter() - started
+        if outcome != "cancelled" and not cached:
+            self.router._health.record(profile, seconds, ok=outcome == "ok")
+        record_model_call(profile, seconds, outcome=outcome)
+        self.attempts.append(
+            RoutingAttempt(
+                profile=profile,
+                outcome=outcome,
+                seconds=seconds,
+                error=type(error).__name__ if error is not None else None,
+            )
+        )
+
+    def run(
+        self,
+        profile: str,
+        handler: Callable[[ModelRequest[None]], ModelResponse[Any]],
+    ) -> ModelResponse[Any]:
+        """Call the downstream handler with one profile's model.
+
+        Args:
+            profile: Profile to call.
+            handler: Downstream sync model-call handler.
+
+        Returns:
+            Model response from downstream handler.
+
+        Raises:
+            Exception: The attempt's failure, re-raised once it is recorded.
+        """
+        started = time.perf_counter()
+        try:
+            response = handler(
+                self.request.override(model=self.router._routed_models[profile])
+            )
+        except Exception as exc:
+            self._finish(profile, started, "error", exc)
+            raise
+        self._finish(profile, started, "ok", cached=_served_from_cache(response))
+        return response
+
+    async def _arun_once(
+        self,
+        profile: str,
+        handler: Callable[[ModelRequest[None]], Awaitable[ModelResponse[Any]]],
+    ) -> ModelResponse[Any]:
+        """Await one admitted downstream call with one profile's model.
+
+        When the router's admission middleware is installed, the permit is
+        taken there, around the provider call; otherwise it is taken here.
+        Attempt latency excludes the time spent queued for admission.
+
+        Args:
+            profile: Profile to call.
+            handler: Downstream async model-call handler.
+
+        Returns:
+            Model response from downstream handler.
+
+        Raises:
+            asyncio.CancelledError: If the attempt is cancelled, once recorded.
+        """
+        router = self.router
+        estimated = (
+            router.token_accountant.thread_tokens(
+                profile, self.request.messages, thread_id=_current_thread_id()
+            )
+            if router.governor.limits_tokens(profile)
+            else 0
+        )
+        admission = _Admission(router.governor, profile, estimated)
+        request = self.request.override(model=router._routed_models[profile])
+        started = time.perf_counter()
+        token = _pending_admission.set(admission if router._admits_inside else None)
+        try:
+            if router._admits_inside:
+                response = await handler(request)
+            else:
+                response = await admission.call(request, handler)
+        except asyncio.CancelledError:
+            self._finish(profile, started + admission.waited_seconds, "cancelled")
+            raise
+        except Exception as exc:
+            self._finish(profile, started + admission.waited_seconds, "error", exc)
+            raise
+        finally:
+            _pending_admission.reset(token)
+        self._finish(
+            profile,
+            started + admission.waited_seconds,
+            "ok",
+            cached=_served_from_cache(response),
+        )
+        return response
+
+    async def arun(
+        self,
+        profile: str,
+        handler: Callable[[ModelRequest[None]], Awaitable[ModelResponse[Any]]],
+    ) -> ModelResponse[Any]:
+        """Call one profile, retrying rate-limited attempts with backoff.
+
+        Args:
+            profile: Profile to call.
+            handler: Downstream async model-call handler.
 
-from lily.runtime.config_schema import DynamicModelRoutingConfig
+        Returns:
+            Model response from downstream handler.
+
+        Raises:
+            Exception: The attempt's failure when it is not rate-limited or
+                its retries are used up.
+        """
+        attempt = 0
+        while True:
+            try:
+                return await self._arun_once(profile, handler)
+            except Exception as exc:
+                delay = self.router.governor.backoff_seconds(exc, attempt)
+                if delay is None:
+                    raise
+            record_model_queue_wait(delay)
+            await asyncio.sleep(delay)
+            attempt += 1
 
+    def invoke(
+        self,
+        handler: Callable[[ModelRequest[None]], ModelResponse[Any]],
+    ) -> ModelResponse[Any]:
+        """Try candidates in order until one answers; never hedged.
 
-def _message_text_size(message: object) -> int:
-    """Estimate message complexity as text length.
+        Args:
+            handler: Downstream sync model-call handler.
+
+        Returns:
+            Model response of the first successful candidate.
+
+        Raises:
+            Exception: The first non-retryable failure, or the last candidate's.
+        """
+        try:
+            for profile in self.candidates[:-1]:
+                try:
+                    return self.run(profile, handler)
+                except Exception as exc:
+                    if not is_retryable_model_error(exc):
+                        raise
+            return self.run(self.candidates[-1], handler)
+        finally:
+            self.emit()
+
+    async def ainvoke(
+        self,
+        handler: Callable[[ModelRequest[None]], Awaitable[ModelResponse[Any]]],
+    ) -> ModelResponse[Any]:
+        """Try candidates in order until one answers, hedging the first.
+
+        With hedging enabled, the first candidate gets the hedge delay to answer
+        before the second is started; the first success wins and the other
+        attempt is cancelled.
+
+        Args:
+            handler: Downstream async model-call handler.
+
+        Returns:
+            Model response of the first successful candidate.
+
+        Raises:
+            Exception: The first non-retryable failure, or the last candidate's.
+        """
+        queue = list(self.candidates)
+        hedge_delay = self.router._hedge_delay(self)
+        try:
+            while True:
+                tasks = [asyncio.ensure_future(self.arun(queue.pop(0), handler))]
+                try:
+                    if hedge_delay is not None:
+                        done, _ = await asyncio.wait(tasks, timeout=hedge_delay)
+                        hedge_delay = None
+                        if not done:
+                            self.hedged = True
+                            tasks.append(
+                                asyncio.ensure_future(self.arun(queue.pop(0), handler))
+                            )
+                    return await _first_success(tasks)
+                except Exception as exc:
+                    if not queue or not is_retryable_model_error(exc):
+                        raise
+                finally:
+                    for task in tasks:
+                        task.cancel()
+                    await asyncio.gather(*tasks, return_exceptions=True)
+        finally:
+            self.emit()
+
+    def emit(self) -> None:
+        """Log the routing decision and its attempts."""
+        emit_routing_decision(
+            selected=self.selected,
+            reason=self.reason,
+            candidates=self.candidates,
+            attempts=self.attempts,
+            hedged=self.hedged,
+        )
+
+
+async def _first_success(
+    tasks: list[asyncio.Task[ModelResponse[Any]]],
+) -> ModelResponse[Any]:
+    """Return the first successful result among racing attempts.
 
     Args:
-        message: Message-like object from LangChain request state.
+        tasks: Running attempts, primary first.
 
     Returns:
-        Integer complexity estimate based on content length.
+        Response of the first attempt to succeed. When every attempt fails,
+        reading the primary's result raises its failure instead.
     """
-    content = getattr(message, "content", "")
-    if isinstance(content, str):
-        return len(content)
-    if isinstance(content, list):
-        return len("".join(str(item) for item in content))
-    return len(str(content))
+    pending = set(tasks)
+    while pending:
+        done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+        for task in done:
+            if task.exception() is None:
+                return task.result()
+    return tasks[0].result()
 
 
 class DynamicModelRouter(BaseModel):
-    """Selects an appropriate model profile per request."""
+    """Selects an appropriate model profile per request.
+
+    Tool bindings are memoized per profile, tool schemas, and binding options in
+    a bounded LRU, so repeated calls and runs skip rebinding the profile model.
+    A changed allowlist yields a different toolset key, and a changed profile
+    means a new runtime and router.
+
+    History complexity comes from the token accountant's per-thread running
+    totals, so each call measures only messages added since the previous call.
+
+    Timeouts and connection errors fail over along ``routing.fallbacks``; a
+    profile whose EWMA error rate crosses ``routing.unhealthy_error_rate`` is
+    tried after its fallbacks until its cooldown passes.
+
+    Async attempts are admitted by the model call governor (concurrency and
+    rate limits per profile and provider) and retried with backoff when
+    rate-limited; sync calls bypass the governor. With the admission middleware
+    installed, calls answered before reaching a profile model (response cache
+    hits) never queue for a permit.
+    """
 
     model_config = ConfigDict(frozen=True, arbitrary_types_allowed=True)
 
     models: dict[str, BaseChatModel]
     routing: DynamicModelRoutingConfig
+    token_accountant: TokenAccountant = Field(
+        default_factory=lambda: TokenAccountant({})
+    )
+    governor: ModelCallGovernor = Field(
+        default_factory=lambda: ModelCallGovernor(ModelCallSchedulingConfig(), {})
+    )
+    _routed_models: dict[str, BaseChatModel] = PrivateAttr(default_factory=dict)
+    _health: ProfileHealthTracker = PrivateAttr()
+    _admits_inside: bool = PrivateAttr(default=False)
+
+    def model_post_init(self, context: object, /) -> None:
+        """Wrap every profile model in a tool-binding cache.
+
+        Args:
+            context: Pydantic validation context (unused).
+        """
+        del context
+        self._routed_models.update(
+            {
+                name: _BindingCachedChatModel(
+                    profile_name=name,
+                    inner=model,
+                    binding_cache=_ToolBindingCache(name),
+                )
+                for name, model in self.models.items()
+            }
+        )
+        self._health = ProfileHealthTracker(self.routing)
+
+    def health_snapshot(self) -> dict[str, ProfileHealthSnapshot]:
+        """Return EWMA latency and error rate per profile called so far.
+
+        Returns:
+            Mapping of profile name to health snapshot.
+        """
+        return self._health.snapshot()
 
     def _select_profile_name(self, request: ModelRequest[None]) -> str:
         """Pick the configured model profile name for one model call.
@@ -53,14 +768,64 @@ class DynamicModelRouter(BaseModel):
         if not self.routing.enabled:
             return self.routing.default_profile
 
-        complexity = sum(_message_text_size(message) for message in request.messages)
+        accountant = self.token_accountant
+        thread_id = _current_thread_id()
+        if self.routing.complexity_unit == "tokens":
+            complexity = accountant.thread_tokens(
+                self.routing.default_profile, request.messages, thread_id=thread_id
+            )
+        else:
+            complexity = accountant.thread_characters(
+                request.messages, thread_id=thread_id
+            )
         if complexity >= self.routing.complexity_threshold:
             return self.routing.long_context_profile
         return self.routing.default_profile
 
+    def _candidates(self, selected: str) -> tuple[list[str], RoutingReason]:
+        """Order the profiles to try for one call.
+
+        Args:
+            selected: Profile chosen by size-based routing.
+
+        Returns:
+            Selected profile and its fallbacks without duplicates, the selected
+            profile moved last while unhealthy, plus the ordering reason.
+        """
+        fallbacks = [
+            name
+            for name in dict.fromkeys(self.routing.fallbacks.get(selected, ()))
+            if name != selected
+        ]
+        if fallbacks and self._health.is_unhealthy(selected):
+            return [*fallbacks, selected], "unhealthy_primary"
+        return [selected, *fallbacks], "size"
+
+    def _hedge_delay(self, call: _RoutedCall) -> float | None:
+        """Return the hedge delay for a call, or ``None`` when it is not hedged.
+
+        Args:
+            call: Routed call about to start its first attempt.
+
+        Returns:
+            Seconds to wait on the first candidate before racing the second.
+        """
+        if (
+            not self.routing.hedge.enabled
+            or len(call.candidates) == 1
+            or not hedging_allowed()
+        ):
+            return None
+        return self._health.hedge_delay(call.candidates[0])
+
     def build_middleware(self) -> AgentMiddleware[Any, Any]:
         """Create LangChain middleware that rewrites request.model.
 
+        The selected profile model is swapped in behind its tool-binding cache.
+        Each downstream attempt is timed and recorded with its profile and
+        outcome on the active run timings, and every routed call logs one
+        decision event on ``lily.routing``.
+
         Returns:
             Agent middleware that swaps request model based on routing policy.
         """
@@ -83,9 +848,7 @@ class DynamicModelRouter(BaseModel):
                 Returns:
                     Model response from downstream handler.
                 """
-                selected_profile = router._select_profile_name(request)
-                selected_model = router.models[selected_profile]
-                return handler(request.override(model=selected_model))
+                return _RoutedCall(router, request).invoke(handler)
 
             async def awrap_model_call(
                 self,
@@ -104,8 +867,62 @@ class DynamicModelRouter(BaseModel):
                 Returns:
                     Model response from downstream handler.
                 """
-                selected_profile = router._select_profile_name(request)
-                selected_model = router.models[selected_profile]
-                return await handler(request.override(model=selected_model))
+                return await _RoutedCall(router, request).ainvoke(handler)
 
         return _DynamicModelRoutingMiddleware()
+
+    def build_admission_middleware(self) -> AgentMiddleware[Any, Any]:
+        """Create middleware that admits async provider calls with the governor.
+
+        Install it inside every middleware that may answer a call without the
+        provider, such as the response cache. Once built, the routing
+        middleware leaves admission to it; requests whose model is not a
+        routed profile model (cache replays) pass through without a permit.
+
+        Returns:
+            Agent middleware holding a governor permit around provider calls.
+        """
+        self._admits_inside = True
+
+        class _ModelCallAdmissionMiddleware(AgentMiddleware[Any, Any]):
+            """Governor admission at the innermost model-call wrapper."""
+
+            def wrap_model_call(
+                self,
+                request: ModelRequest[None],
+                handler: Callable[[ModelRequest[None]], ModelResponse[Any]],
+            ) -> ModelResponse[Any]:
+                """Pass sync calls through; they bypass the governor.
+
+                Args:
+                    request: Current model call request.
+                    handler: Downstream sync model-call handler.
+
+                Returns:
+                    Model response from downstream handler.
+                """
+                return handler(request)
+
+            async def awrap_model_call(
+                self,
+                request: ModelRequest[None],
+                handler: Callable[
+                    [ModelRequest[None]],
+                    Awaitable[ModelResponse[Any]],
+                ],
+            ) -> ModelResponse[Any]:
+                """Hold the routed attempt's permit around the provider call.
+
+                Args:
+                    request: Current model call request.
+                    handler: Downstream async model-call handler.
+
+                Returns:
+                    Model response from downstream handler.
+                """
+                admission = _pending_admission.get()
+                if admission is None or routed_profile_name(request.model) is None:
+                    return await handler(request)
+                return await admission.call(request, handler)
+
+        return _ModelCallAdmissionMiddleware()
@@ -0,0 +1,463 @@
+"""Exact-match model response cache backed by SQLite.
+
+Entries are keyed on the routed profile, its model settings, the final request
+(system message, normalized messages, bound tool schemas, and binding options)
+and expire by TTL and least-recent use. Hits replay the stored reply through the
+normal model-call path so callbacks, streaming, and call limits still apply;
+the replay model is not a routed profile model, so hits skip the model call
+governor's admission queue.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable, Mapping, Sequence
+from contextlib import closing
+from pathlib import Path
+from typing import Any
+from uuid import uuid4
+
+from langchain.agents.middleware import AgentMiddleware, ModelRequest, ModelResponse
+from langchain_core.callbacks import CallbackManagerForLLMRun
+from langchain_core.language_models import BaseChatModel, LanguageModelInput
+from langchain_core.messages import (
+    AIMessage,
+    BaseMessage,
+    ToolMessage,
+    message_to_dict,
+    messages_from_dict,
+)
+from langchain_core.outputs import ChatGeneration, ChatResult
+from langchain_core.runnables import Runnable
+from langchain_core.tools import BaseTool
+from langchain_core.utils.function_calling import convert_to_openai_tool
+
+from lily.runtime.config_schema import ModelProfileConfig, ModelResponseCacheConfig
+from lily.runtime.model_router import RESPONSE_CACHE_METADATA_KEY, routed_profile_name
+from lily.runtime.run_timings import record_response_cache
+
+DEFAULT_RESPONSE_CACHE_DB_PATH = Path(".lily") / "model-responses.sqlite3"
+_TOOL_SCHEMA_MEMO_MAX_ENTRIES = 1024
+
+
+class ModelResponseStore:
+    """SQLite table of cached replies with TTL expiry and an LRU size bound.
+
+    Thread-safe; one connection is shared behind a lock.
+    """
+
+    def __init__(
+        self,
+        database_path: Path,
+        config: ModelResponseCacheConfig,
+        *,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        """Open (and create) the cache database.
+
+        Args:
+            database_path: SQLite database file path.
+            config: Cache size and TTL policy.
+            clock: Wall clock in seconds, injectable for tests.
+        """
+        database_path.parent.mkdir(parents=True, exist_ok=True)
+        self._config = config
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(database_path, check_same_thread=False)
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS responses (
+                    key TEXT PRIMARY KEY,
+                    profile TEXT NOT NULL,
+                    message TEXT NOT NULL,
+                    created_at REAL NOT NULL,
+                    accessed_at REAL NOT NULL
+                )
+                """
+            )
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS responses_accessed_at "
+                "ON responses(accessed_at)"
+            )
+            self._conn.commit()
+
+    def get(self, key: str) -> AIMessage | None:
+        """Return a live entry and mark it recently used.
+
+        Args:
+            key: Request cache key.
+
+        Returns:
+            Cached reply, or ``None`` when absent or expired.
+        """
+        now = self._clock()
+        ttl = self._config.ttl_seconds
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT message, created_at FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            if ttl is not None and row[1] + ttl <= now:
+                self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                self._conn.commit()
+                return None
+            self._conn.execute(
+                "UPDATE responses SET accessed_at = ? WHERE key = ?", (now, key)
+            )
+            self._conn.commit()
+        [message] = messages_from_dict([json.loads(row[0])])
+        return message if isinstance(message, AIMessage) else None
+
+    def put(self, key: str, profile: str, message: AIMessage) -> None:
+        """Store a reply, then drop expired and least recently used entries.
+
+        Args:
+            key: Request cache key.
+            profile: Profile that produced the reply.
+            message: Reply to cache.
+        """
+        now = self._clock()
+        payload = json.dumps(message_to_dict(message))
+        ttl = self._config.ttl_seconds
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?)",
+                (key, profile, payload, now, now),
+            )
+            if ttl is not None:
+                self._conn.execute(
+                    "DELETE FROM responses WHERE created_at <= ?", (now - ttl,)
+                )
+            self._conn.execute(
+                """
+                DELETE FROM responses WHERE key IN (
+                    SELECT key FROM responses
+                    ORDER BY accessed_at DESC LIMIT -1 OFFSET ?
+                )
+                """,
+                (self._config.max_entries,),
+            )
+            self._conn.commit()
+
+    def __len__(self) -> int:
+        """Return the number of stored entries.
+
+        Returns:
+            Count of rows, including expired ones not yet pruned.
+        """
+        with self._lock, closing(self._conn.cursor()) as cursor:
+            return int(cursor.execute("SELECT COUNT(*) FROM responses").fetchone()[0])
+
+    def close(self) -> None:
+        """Close the database connection."""
+        with self._lock:
+            self._conn.close()
+
+
+def _normalized_message(
+    message: BaseMessage,
+    tool_call_ordinals: dict[str, int],
+) -> dict[str, object]:
+    """Return the cache-relevant fields of one message.
+
+    Message ids and provider metadata are dropped; tool call ids become their
+    ordinal in the conversation so replayed turns with fresh ids still match.
+
+    Args:
+        message: Request message.
+        tool_call_ordinals: Tool call id to ordinal map, extended in place.
+
+    Returns:
+        JSON-serializable message fields.
+    """
+    entry: dict[str, object] = {
+        "type": message.type,
+        "name": message.name,
+        "content": message.content,
+    }
+    if isinstance(message, AIMessage):
+        entry["tool_calls"] = [
+            {
+                "name": call["name"],
+                "args": call["args"],
+                "id": tool_call_ordinals.setdefault(
+                    call.get("id") or "", len(tool_call_ordinals)
+                ),
+            }
+            for call in message.tool_calls
+        ]
+    if isinstance(message, ToolMessage):
+        entry["tool_call_id"] = tool_call_ordinals.get(
+            message.tool_call_id, message.tool_call_id
+        )
+        entry["status"] = message.status
+    return entry
+
+
+def _fresh_reply(message: AIMessage) -> AIMessage:
+    """Return a cached reply with new message and tool call ids.
+
+    Args:
+        message: Stored reply.
+
+    Returns:
+        Copy safe to append to any thread, marked as a cache hit.
+    """
+    return message.model_copy(
+        update={
+            "id": None,
+            "tool_calls": [
+                {**call, "id": f"call_{uuid4().hex[:24]}"}
+                for call in message.tool_calls
+            ],
+            "usage_metadata": None,
+            "response_metadata": {
+                **message.response_metadata,
+                RESPONSE_CACHE_METADATA_KEY: "hit",
+            },
+        }
+    )
+
+
+def _storable_reply(response: ModelResponse[Any]) -> AIMessage | None:
+    """Return the reply of a plain model response, if it can be cached.
+
+    Args:
+        response: Downstream model response.
+
+    Returns:
+        Sole AI message without raw provider tool-call payloads, or ``None``.
+    """
+    if response.structured_response is not None or len(response.result) != 1:
+        return None
+    [message] = response.result
+    if not isinstance(message, AIMessage) or message.invalid_tool_calls:
+        return None
+    extra = {
+        key: value
+        for key, value in message.additional_kwargs.items()
+        if key not in {"tool_calls", "function_call"}
+    }
+    return message.model_copy(update={"additional_kwargs": extra})
+
+
+class _ReplayChatModel(BaseChatModel):
+    """Chat model answering every call with one cached reply."""
+
+    reply: AIMessage
+
+    @property
+    def _llm_type(self) -> str:
+        """Return the LangChain model type identifier.
+
+        Returns:
+            Constant identifier of the replay model.
+        """
+        return "lily-response-cache"
+
+    def bind_tools(
+        self,
+        tools: Sequence[dict[str, Any] | type | Callable[..., Any] | BaseTool],
+        **kwargs: object,
+    ) -> Runnable[LanguageModelInput, AIMessage]:
+        """Ignore tool binding; the reply is already decided.
+
+        Args:
+            tools: Tools the agent binds.
+            **kwargs: Binding options.
+
+        Returns:
+            This model.
+        """
+        del tools, kwargs
+        return self
+
+    def _generate(
+        self,
+        messages: list[BaseMessage],
+        stop: list[str] | None = None,
+        run_manager: CallbackManagerForLLMRun | None = None,
+        **kwargs: object,
+    ) -> ChatResult:
+        """Return the cached reply.
+
+        Args:
+            messages: Prompt messages (ignored).
+            stop: Stop sequences (ignored).
+            run_manager: Callback manager (ignored).
+            **kwargs: Provider options (ignored).
+
+        Returns:
+            Chat result holding the cached reply.
+        """
+        del messages, stop, run_manager, kwargs
+        return ChatResult(generations=[ChatGeneration(message=self.reply)])
+
+
+class ModelResponseCacheMiddleware(AgentMiddleware[Any, Any]):
+    """Serve repeated model requests from the response store.
+
+    Must run inside ``DynamicModelRouter``'s middleware and after every
+    middleware that rewrites the request, so keys cover the final request, and
+    outside the router's admission middleware, so hits take no permit.
+    """
+
+    def __init__(
+        self,
+        store: ModelResponseStore,
+        profiles: Mapping[str, ModelProfileConfig],
+        config: ModelResponseCacheConfig,
+    ) -> None:
+        """Initialize the middleware for the cached profiles.
+
+        Args:
+            store: Response store.
+            profiles: Configured model profiles by name.
+            config: Cache policy selecting cached profiles.
+        """
+        super().__init__()
+        self._store = store
+        self._profiles = {
+            name: profile
+            for name, profile in profiles.items()
+            if config.caches_profile(name, profile)
+        }
+        self._lock = threading.Lock()
+        # Values hold the tool itself, so its ``id`` cannot be reused meanwhile.
+        self._tool_schemas: OrderedDict[int, tuple[object, object]] = OrderedDict()
+
+    def _tool_schema(self, tool: object) -> object:
+        """Return a tool's JSON schema, memoized per live tool object in an LRU.
+
+        Args:
+            tool: Bound tool (``BaseTool`` or provider dict).
+
+        Returns:
+            OpenAI-format tool schema.
+        """
+        with self._lock:
+            memo = self._tool_schemas.get(id(tool))
+            if memo is not None and memo[0] is tool:
+                self._tool_schemas.move_to_end(id(tool))
+                return memo[1]
+        schema = tool if isinstance(tool, dict) else convert_to_openai_tool(tool)  # type: ignore[arg-type]
+        with self._lock:
+            self._tool_schemas[id(tool)] = (tool, schema)
+            self._tool_schemas.move_to_end(id(tool))
+            while len(self._tool_schemas) > _TOOL_SCHEMA_MEMO_MAX_ENTRIES:
+                self._tool_schemas.popitem(last=False)
+        return schema
+
+    def _cache_key(self, profile: str, request: ModelRequest[None]) -> str | None:
+        """Return the cache key of a request, or ``None`` when it is not cached.
+
+        Args:
+            profile: Routed profile name.
+            request: Final model request.
+
+        Returns:
+            SHA-256 hex digest of the normalized request.
+        """
+        settings = self._profiles.get(profile)
+        if settings is None or request.response_format is not None:
+            return None
+        ordinals: dict[str, int] = {}
+        system = request.system_message
+        document = {
+            "profile": profile,
+            "provider": settings.provider.value,
+            "model": settings.model,
+            "temperature": settings.temperature,
+            "system": system.content if system is not None else None,
+            "messages": [
+                _normalized_message(message, ordinals) for message in request.messages
+            ],
+            "tools": [self._tool_schema(tool) for tool in request.tools],
+            "tool_choice": request.tool_choice,
+            "model_settings": request.model_settings,
+        }
+        canonical = json.dumps(document, sort_keys=True, default=repr)
+        return hashlib.sha256(canonical.encode()).hexdigest()
+
+    def _lookup(self, request: ModelRequest[None]) -> tuple[str, str] | None:
+        """Return the routed profile and key for a cacheable request.
+
+        Args:
+            request: Final model request.
+
+        Returns:
+            Profile and cache key, or ``None`` when the request is not cached.
+        """
+        profile = routed_profile_name(request.model)
+        if profile is None:
+            return None
+        key = self._cache_key(profile, request)
+        return (profile, key) if key is not None else None
+
+    def wrap_model_call(
+        self,
+        request: ModelRequest[None],
+        handler: Callable[[ModelRequest[None]], ModelResponse[Any]],
+    ) -> ModelResponse[Any]:
+        """Replay a cached reply or call the model and store its reply.
+
+        Args:
+            request: Current model call request.
+            handler: Downstream sync model-call handler.
+
+        Returns:
+            Model response, replayed on a hit.
+        """
+        lookup = self._lookup(request)
+        if lookup is None:
+            return handler(request)
+        profile, key = lookup
+        cached = self._store.get(key)
+        record_response_cache(hit=cached is not None)
+        if cached is not None:
+            replay = _ReplayChatModel(reply=_fresh_reply(cached))
+            return handler(request.override(model=replay))
+        response = handler(request)
+        reply = _storable_reply(response)
+        if reply is not None:
+            self._store.put(key, profile, reply)
+        return response
+
+    async def awrap_model_call(
+        self,
+        request: ModelRequest[None],
+        handler: Callable[[ModelRequest[None]], Awaitable[ModelResponse[Any]]],
+    ) -> ModelResponse[Any]:
+        """Async variant; SQLite access runs in a worker thread.
+
+        Args:
+            request: Current model call request.
+            handler: Downstream async model-call handler.
+
+        Returns:
+            Model response, replayed on a hit.
+        """
+        lookup = self._lookup(request)
+        if lookup is None:
+            return await handler(request)
+        profile, key = lookup
+        cached = await asyncio.to_thread(self._store.get, key)
+        record_response_cache(hit=cached is not None)
+        if cached is not None:
+            replay = _ReplayChatModel(reply=_fresh_reply(cached))
+            return await handler(request.override(model=replay))
+        response = await handler(request)
+        reply = _storable_reply(response)
+        if reply is not None:
+            await asyncio.to_thread(self._store.put, key, profile, reply)
+        return response
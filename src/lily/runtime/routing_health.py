@@ -0,0 +1,256 @@
+"""Per-profile model health tracking and routing telemetry."""
+
+from __future__ import annotations
+
+import json
+import logging
+import math
+import threading
+import time
+from collections import deque
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Literal
+
+from pydantic import BaseModel, ConfigDict, Field
+
+from lily.runtime.config_schema import DynamicModelRoutingConfig
+
+AttemptOutcome = Literal["ok", "error", "cancelled"]
+RoutingReason = Literal["size", "unhealthy_primary"]
+
+_ROUTING_LOG = logging.getLogger("lily.routing")
+_EWMA_ALPHA = 0.2
+_LATENCY_WINDOW = 128
+# Exception class names (anywhere in the MRO) treated as transient transport
+# failures: openai/httpx clients and Ollama's httpx transport.
+_RETRYABLE_ERROR_NAMES = frozenset(
+    {"APIConnectionError", "APITimeoutError", "TimeoutException", "TransportError"}
+)
+_hedging_allowed: ContextVar[bool] = ContextVar("hedging_allowed", default=True)
+
+
+@contextmanager
+def hedging_disabled() -> Iterator[None]:
+    """Disable hedged requests for model calls made inside the block.
+
+    Streamed runs use this: both racing models would emit tokens.
+
+    Yields:
+        Nothing; hedging is restored on exit.
+    """
+    token = _hedging_allowed.set(False)
+    try:
+        yield
+    finally:
+        _hedging_allowed.reset(token)
+
+
+def hedging_allowed() -> bool:
+    """Return whether the current context permits hedged requests.
+
+    Returns:
+        ``False`` inside ``hedging_disabled``.
+    """
+    return _hedging_allowed.get()
+
+
+def is_retryable_model_error(exc: BaseException) -> bool:
+    """Return whether a model call failure should move on to a fallback profile.
+
+    Args:
+        exc: Exception raised by the model call.
+
+    Returns:
+        ``True`` for timeouts and connection errors.
+    """
+    if isinstance(exc, TimeoutError | ConnectionError):
+        return True
+    return any(cls.__name__ in _RETRYABLE_ERROR_NAMES for cls in type(exc).__mro__)
+
+
+@dataclass
+class _ProfileHealth:
+    """Mutable EWMA state of one profile."""
+
+    latency_seconds: float | None = None
+    error_rate: float = 0.0
+    last_failure: float | None = None
+    recent_latencies: deque[float] = field(
+        default_factory=lambda: deque(maxlen=_LATENCY_WINDOW)
+    )
+
+
+class ProfileHealthSnapshot(BaseModel):
+    """Read-only health view of one model profile."""
+
+    model_config = ConfigDict(frozen=True)
+
+    latency_ewma_seconds: float | None = Field(default=None, ge=0.0)
+    error_rate_ewma: float = Field(default=0.0, ge=0.0, le=1.0)
+    samples: int = Field(default=0, ge=0)
+
+
+class ProfileHealthTracker:
+    """EWMA latency and error-rate tracking for routed model profiles.
+
+    Thread-safe; one tracker lives as long as its router.
+    """
+
+    def __init__(
+        self,
+        routing: DynamicModelRoutingConfig,
+        *,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        """Initialize empty health state.
+
+        Args:
+            routing: Routing policy with health thresholds.
+            clock: Monotonic clock, injectable for tests.
+        """
+        self._routing = routing
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._profiles: dict[str, _ProfileHealth] = {}
+
+    def _health(self, profile: str) -> _ProfileHealth:
+        """Return mutable state for a profile; caller holds the lock.
+
+        Args:
+            profile: Model profile name.
+
+        Returns:
+            Health state, created on first use.
+        """
+        return self._profiles.setdefault(profile, _ProfileHealth())
+
+    def record(self, profile: str, seconds: float, *, ok: bool) -> None:
+        """Fold one finished attempt into the profile's EWMA state.
+
+        Args:
+            profile: Model profile name.
+            seconds: Attempt duration.
+            ok: Whether the attempt returned a response.
+        """
+        with self._lock:
+            health = self._health(profile)
+            health.error_rate += _EWMA_ALPHA * (
+                (0.0 if ok else 1.0) - health.error_rate
+            )
+            if not ok:
+                health.last_failure = self._clock()
+                return
+            health.recent_latencies.append(seconds)
+            previous = health.latency_seconds
+            health.latency_seconds = (
+                seconds
+                if previous is None
+                else previous + _EWMA_ALPHA * (seconds - previous)
+            )
+
+    def is_unhealthy(self, profile: str) -> bool:
+        """Return whether a profile should be tried after its fallbacks.
+
+        Args:
+            profile: Model profile name.
+
+        Returns:
+            ``True`` while the error rate is at or above the threshold and the
+            last failure is within the cooldown.
+        """
+        with self._lock:
+            health = self._profiles.get(profile)
+            if health is None or health.last_failure is None:
+                return False
+            cooling = (
+                self._clock() - health.last_failure
+                < self._routing.unhealthy_cooldown_seconds
+            )
+            return cooling and health.error_rate >= self._routing.unhealthy_error_rate
+
+    def hedge_delay(self, profile: str) -> float:
+        """Return how long to wait on ``profile`` before racing a fallback.
+
+        Args:
+            profile: Primary model profile name.
+
+        Returns:
+            Configured latency quantile of recent successes, never below
+            ``hedge.min_delay_seconds``.
+        """
+        hedge = self._routing.hedge
+        with self._lock:
+            health = self._profiles.get(profile)
+            samples = sorted(health.recent_latencies) if health is not None else []
+        if len(samples) < hedge.min_samples:
+            return hedge.min_delay_seconds
+        index = min(math.ceil(hedge.quantile * len(samples)) - 1, len(samples) - 1)
+        return max(samples[index], hedge.min_delay_seconds)
+
+    def snapshot(self) -> dict[str, ProfileHealthSnapshot]:
+        """Return health for every profile seen so far.
+
+        Returns:
+            Mapping of profile name to health snapshot.
+        """
+        with self._lock:
+            return {
+                name: ProfileHealthSnapshot(
+                    latency_ewma_seconds=health.latency_seconds,
+                    error_rate_ewma=health.error_rate,
+                    samples=len(health.recent_latencies),
+                )
+                for name, health in self._profiles.items()
+            }
+
+
+class RoutingAttempt(BaseModel):
+    """One model call attempt made for a routed request."""
+
+    model_config = ConfigDict(frozen=True)
+
+    profile: str
+    outcome: AttemptOutcome
+    seconds: float = Field(ge=0.0)
+    error: str | None = None
+
+
+def emit_routing_decision(
+    *,
+    selected: str,
+    reason: RoutingReason,
+    candidates: list[str],
+    attempts: list[RoutingAttempt],
+    hedged: bool,
+) -> None:
+    """Log one routed model call as a single JSON line on ``lily.routing``.
+
+    Calls with a failed attempt (failovers and failures) log at WARNING. The
+    rest log at DEBUG: calls served by the first candidate, hedge races whose
+    loser was cancelled, and calls cancelled because the run was interrupted.
+
+    Args:
+        selected: Profile chosen by size-based routing.
+        reason: Why ``candidates[0]`` was tried first.
+        candidates: Ordered profiles eligible for this call.
+        attempts: Attempts made, in start order.
+        hedged: Whether a hedge request was started.
+    """
+    winner = next((a.profile for a in attempts if a.outcome == "ok"), None)
+    failed = any(attempt.outcome == "error" for attempt in attempts)
+    level = logging.WARNING if failed else logging.DEBUG
+    if not _ROUTING_LOG.isEnabledFor(level):
+        return
+    event = {
+        "event": "model_routed",
+        "selected": selected,
+        "reason": reason,
+        "candidates": candidates,
+        "winner": winner,
+        "hedged": hedged,
+        "attempts": [attempt.model_dump(mode="json") for attempt in attempts],
+    }
+    _ROUTING_LOG.log(level, "%s", json.dumps(event, sort_keys=True))
@@ -0,0 +1,542 @@
+"""Per-run and per-conversation token, cost, and wall-clock budgets.
+
+Run spend is tracked by a recorder bound for one run (like run timings);
+conversation spend lives in private agent state, so it is checkpointed with the
+thread. Budgets are checked before every model call: once one is exhausted the
+run jumps to its end with a notice, keeping the work done so far. The run's
+wall-clock budget is also a deadline on each async model and tool call.
+Summary model calls outside the routed call are charged with
+``collect_model_usage`` and ``charge_budgets``.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import threading
+import time
+from collections.abc import Awaitable, Callable, Iterator, Mapping
+from contextlib import contextmanager
+from contextvars import ContextVar, Token
+from typing import Annotated, Any, NotRequired, cast
+
+from langchain.agents.middleware import (
+    AgentMiddleware,
+    AgentState,
+    ExtendedModelResponse,
+    ModelRequest,
+    ModelResponse,
+    ToolCallRequest,
+    hook_config,
+)
+from langchain.agents.middleware.types import PrivateStateAttr
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.messages import AIMessage, ToolMessage
+from langchain_core.outputs import ChatGeneration, LLMResult
+from langchain_core.tracers.context import register_configure_hook
+from langgraph.runtime import Runtime
+from langgraph.types import Command
+
+from lily.runtime.agent_run_result import (
+    BudgetRemaining,
+    BudgetSpend,
+    RunBudgetReport,
+)
+from lily.runtime.config_schema import (
+    BudgetLimitsConfig,
+    ModelPricingConfig,
+    ModelProfileConfig,
+    ResourceBudgetsConfig,
+)
+from lily.runtime.model_router import routed_profile_name
+
+
+class RunBudgetState(AgentState[Any]):
+    """Agent state with conversation spend persisted per thread."""
+
+    thread_input_tokens: NotRequired[Annotated[int, PrivateStateAttr]]
+    thread_output_tokens: NotRequired[Annotated[int, PrivateStateAttr]]
+    thread_cost: NotRequired[Annotated[float, PrivateStateAttr]]
+
+
+class RunBudgetRecorder:
+    """Mutable spend of one run and the latest spend of its conversation."""
+
+    def __init__(self, *, clock: Callable[[], float] = time.monotonic) -> None:
+        """Start the run clock with nothing spent.
+
+        Args:
+            clock: Monotonic clock, injectable for tests.
+        """
+        self._clock = clock
+        self._started = clock()
+        self.run = BudgetSpend()
+        self.conversation = BudgetSpend()
+        self.exhausted: tuple[str, ...] = ()
+
+    @property
+    def elapsed_seconds(self) -> float:
+        """Return wall time since the run started.
+
+        Returns:
+            Seconds elapsed on the recorder clock.
+        """
+        return self._clock() - self._started
+
+
+class ModelUsageCollector(BaseCallbackHandler):
+    """Callback summing provider-reported usage of chat model calls."""
+
+    run_inline = True
+
+    def __init__(self) -> None:
+        """Start with no usage collected."""
+        super().__init__()
+        self._lock = threading.Lock()
+        self.input_tokens = 0
+        self.output_tokens = 0
+
+    def on_llm_end(self, response: LLMResult, **kwargs: object) -> None:
+        """Add the usage metadata of every generated message.
+
+        Args:
+            response: Finished model call.
+            **kwargs: Callback context, unused.
+        """
+        del kwargs
+        for generations in response.generations:
+            for generation in generations:
+                if not isinstance(generation, ChatGeneration):
+                    continue
+                usage = getattr(generation.message, "usage_metadata", None)
+                if usage is None:
+                    continue
+                with self._lock:
+                    self.input_tokens += usage["input_tokens"]
+                    self.output_tokens += usage["output_tokens"]
+
+    def spend(self, pricing: ModelPricingConfig) -> BudgetSpend:
+        """Return the collected usage priced at ``pricing``.
+
+        Args:
+            pricing: Pricing of the profile that made the calls.
+
+        Returns:
+            Spend of every call collected so far.
+        """
+        with self._lock:
+            input_tokens, output_tokens = self.input_tokens, self.output_tokens
+        return BudgetSpend(
+            input_tokens=input_tokens,
+            output_tokens=output_tokens,
+            cost=pricing.cost(input_tokens, output_tokens),
+        )
+
+
+_model_usage_collector: ContextVar[ModelUsageCollector | None] = ContextVar(
+    "model_usage_collector", default=None
+)
+register_configure_hook(_model_usage_collector, inheritable=True)
+
+
+@contextmanager
+def collect_model_usage() -> Iterator[ModelUsageCollector]:
+    """Collect usage of every chat model call made inside the block.
+
+    Yields:
+        Collector filled as calls finish.
+    """
+    collector = ModelUsageCollector()
+    token = _model_usage_collector.set(collector)
+    try:
+        yield collector
+    finally:
+        _model_usage_collector.reset(token)
+
+
+_run_budget_recorder: ContextVar[RunBudgetRecorder | None] = ContextVar(
+    "run_budget_recorder", default=None
+)
+
+
+def bind_run_budget() -> tuple[Token[RunBudgetRecorder | None], RunBudgetRecorder]:
+    """Start a budget recorder for the current run; pair with ``reset_run_budget``.
+
+    Returns:
+        Token for reset and the recorder charged by ``RunBudgetMiddleware``.
+    """
+    recorder = RunBudgetRecorder()
+    token = _run_budget_recorder.set(recorder)
+    return token, recorder
+
+
+def reset_run_budget(token: Token[RunBudgetRecorder | None]) -> None:
+    """Restore the previous recorder binding.
+
+    Args:
+        token: Value returned from ``bind_run_budget``.
+    """
+    _run_budget_recorder.reset(token)
+
+
+def _added(spend: BudgetSpend, delta: BudgetSpend) -> BudgetSpend:
+    """Return the sum of two spends.
+
+    Args:
+        spend: Running spend.
+        delta: Spend of one model call.
+
+    Returns:
+        Combined spend.
+    """
+    return BudgetSpend(
+        input_tokens=spend.input_tokens + delta.input_tokens,
+        output_tokens=spend.output_tokens + delta.output_tokens,
+        cost=spend.cost + delta.cost,
+    )
+
+
+def _exhausted(scope: str, limits: BudgetLimitsConfig, spend: BudgetSpend) -> list[str]:
+    """Return the dimensions of one scope whose budget is used up.
+
+    Args:
+        scope: ``run`` or ``conversation``.
+        limits: Configured ceilings of the scope.
+        spend: Spend so far in the scope.
+
+    Returns:
+        Names like ``run.output_tokens``.
+    """
+    checks = (
+        ("input_tokens", limits.input_tokens, spend.input_tokens),
+        ("output_tokens", limits.output_tokens, spend.output_tokens),
+        ("cost", limits.cost, spend.cost),
+    )
+    return [
+        f"{scope}.{name}"
+        for name, limit, used in checks
+        if limit is not None and used >= limit
+    ]
+
+
+def _remaining(
+    limits: BudgetLimitsConfig,
+    spend: BudgetSpend,
+    *,
+    wall_clock: tuple[float | None, float] = (None, 0.0),
+) -> BudgetRemaining:
+    """Return what is left of each limited dimension, never below zero.
+
+    Args:
+        limits: Configured ceilings of the scope.
+        spend: Spend so far in the scope.
+        wall_clock: Wall-clock ceiling and elapsed seconds, for run scopes.
+
+    Returns:
+        Remaining budget per dimension.
+    """
+    ceiling, elapsed = wall_clock
+    return BudgetRemaining(
+        input_tokens=(
+            None
+            if limits.input_tokens is None
+            else max(limits.input_tokens - spend.input_tokens, 0)
+        ),
+        output_tokens=(
+            None
+            if limits.output_tokens is None
+            else max(limits.output_tokens - spend.output_tokens, 0)
+        ),
+        cost=None if limits.cost is None else max(limits.cost - spend.cost, 0.0),
+        wall_clock_seconds=None if ceiling is None else max(ceiling - elapsed, 0.0),
+    )
+
+
+def build_budget_report(
+    budgets: ResourceBudgetsConfig,
+    recorder: RunBudgetRecorder,
+) -> RunBudgetReport:
+    """Freeze a run's spend and remaining budget into the result contract.
+
+    Args:
+        budgets: Configured budgets.
+        recorder: Recorder bound for the run.
+
+    Returns:
+        Report for ``AgentRunResult.budget``.
+    """
+    return RunBudgetReport(
+        run_spent=recorder.run,
+        conversation_spent=recorder.conversation,
+        run_remaining=_remaining(
+            budgets.run,
+            recorder.run,
+            wall_clock=(budgets.run.wall_clock_seconds, recorder.elapsed_seconds),
+        ),
+        conversation_remaining=_remaining(budgets.conversation, recorder.conversation),
+        exhausted=recorder.exhausted,
+    )
+
+
+def _conversation_spend(state: Mapping[str, Any]) -> BudgetSpend:
+    """Return conversation spend persisted in agent state.
+
+    Args:
+        state: Current agent state.
+
+    Returns:
+        Spend of earlier model calls in the thread.
+    """
+    return BudgetSpend(
+        input_tokens=state.get("thread_input_tokens", 0),
+        output_tokens=state.get("thread_output_tokens", 0),
+        cost=state.get("thread_cost", 0.0),
+    )
+
+
+def charge_budgets(state: Mapping[str, Any], delta: BudgetSpend) -> dict[str, Any]:
+    """Charge spend to the bound run and to the conversation in ``state``.
+
+    Args:
+        state: Current agent state (or checkpoint values) of the conversation.
+        delta: Spend to charge.
+
+    Returns:
+        State update carrying the new conversation spend.
+    """
+    conversation = _added(_conversation_spend(state), delta)
+    recorder = _run_budget_recorder.get()
+    if recorder is not None:
+        recorder.run = _added(recorder.run, delta)
+        recorder.conversation = conversation
+    return {
+        "thread_input_tokens": conversation.input_tokens,
+        "thread_output_tokens": conversation.output_tokens,
+        "thread_cost": conversation.cost,
+    }
+
+
+def _budget_notice(exhausted: tuple[str, ...]) -> AIMessage:
+    """Return the reply ending a run whose budgets are used up.
+
+    Args:
+        exhausted: Exhausted budget names.
+
+    Returns:
+        Notice message naming the budgets.
+    """
+    return AIMessage(content=f"Run stopped: budget exhausted ({', '.join(exhausted)}).")
+
+
+class RunBudgetMiddleware(AgentMiddleware[RunBudgetState, Any]):
+    """Charge model usage to budgets and stop runs that exhaust one.
+
+    Must run inside ``DynamicModelRouter``'s middleware so it can price calls
+    by the profile that served them. Run budgets apply only while a recorder is
+    bound with ``bind_run_budget``. Async model and tool calls still running
+    when the run's wall-clock budget ends are cancelled.
+    """
+
+    state_schema = RunBudgetState
+
+    def __init__(
+        self,
+        budgets: ResourceBudgetsConfig,
+        profiles: Mapping[str, ModelProfileConfig],
+    ) -> None:
+        """Initialize the middleware.
+
+        Args:
+            budgets: Configured budgets.
+            profiles: Configured model profiles by name, for pricing.
+        """
+        super().__init__()
+        self._budgets = budgets
+        self._profiles = profiles
+
+    def _exhausted_budgets(self, state: RunBudgetState) -> tuple[str, ...]:
+        """Return budgets used up before the next model call.
+
+        Args:
+            state: Current agent state.
+
+        Returns:
+            Exhausted budget names; empty when the call may proceed.
+        """
+        conversation = _conversation_spend(state)
+        exhausted = _exhausted("conversation", self._budgets.conversation, conversation)
+        recorder = _run_budget_recorder.get()
+        if recorder is not None:
+            recorder.conversation = conversation
+            ceiling = self._budgets.run.wall_clock_seconds
+            exhausted = _exhausted("run", self._budgets.run, recorder.run) + exhausted
+            if ceiling is not None and recorder.elapsed_seconds >= ceiling:
+                exhausted.insert(0, "run.wall_clock_seconds")
+            recorder.exhausted = tuple(exhausted)
+        return tuple(exhausted)
+
+    @hook_config(can_jump_to=["end"])
+    def before_model(
+        self,
+        state: RunBudgetState,
+        runtime: Runtime[Any],
+    ) -> dict[str, Any] | None:
+        """End the run before a model call that no budget can pay for.
+
+        Args:
+            state: Current agent state.
+            runtime: LangGraph runtime.
+
+        Returns:
+            Jump to the end with a notice message, or ``None`` to proceed.
+        """
+        del runtime
+        exhausted = self._exhausted_budgets(state)
+        if not exhausted:
+            return None
+        return {"jump_to": "end", "messages": [_budget_notice(exhausted)]}
+
+    @hook_config(can_jump_to=["end"])
+    async def abefore_model(
+        self,
+        state: RunBudgetState,
+        runtime: Runtime[Any],
+    ) -> dict[str, Any] | None:
+        """Async variant of ``before_model``.
+
+        Args:
+            state: Current agent state.
+            runtime: LangGraph runtime.
+
+        Returns:
+            Jump to the end with a notice message, or ``None`` to proceed.
+        """
+        return self.before_model(state, runtime)
+
+    def _charge(
+        self,
+        request: ModelRequest[Any],
+        response: ModelResponse[Any],
+    ) -> ExtendedModelResponse[Any]:
+        """Charge one model response to the run and conversation budgets.
+
+        Args:
+            request: Routed model request.
+            response: Model response carrying provider usage metadata.
+
+        Returns:
+            Response with a state update for the conversation spend.
+        """
+        input_tokens = output_tokens = 0
+        for message in response.result:
+            if isinstance(message, AIMessage) and message.usage_metadata is not None:
+                input_tokens += message.usage_metadata["input_tokens"]
+                output_tokens += message.usage_metadata["output_tokens"]
+        profile = self._profiles.get(routed_profile_name(request.model) or "")
+        delta = BudgetSpend(
+            input_tokens=input_tokens,
+            output_tokens=output_tokens,
+            cost=(
+                profile.pricing.cost(input_tokens, output_tokens)
+                if profile is not None
+                else 0.0
+            ),
+        )
+        update = charge_budgets(request.state, delta)
+        return ExtendedModelResponse(
+            model_response=response, command=Command(update=update)
+        )
+
+    def _seconds_left(self) -> float | None:
+        """Return wall time left in the run, or ``None`` when unlimited.
+
+        Returns:
+            Seconds until the run's wall-clock budget ends, never below zero.
+        """
+        ceiling = self._budgets.run.wall_clock_seconds
+        recorder = _run_budget_recorder.get()
+        if ceiling is None or recorder is None:
+            return None
+        return max(ceiling - recorder.elapsed_seconds, 0.0)
+
+    def wrap_model_call(
+        self,
+        request: ModelRequest[Any],
+        handler: Callable[[ModelRequest[Any]], ModelResponse[Any]],
+    ) -> ExtendedModelResponse[Any]:
+        """Run the model call and charge its usage.
+
+        Args:
+            request: Current model request.
+            handler: Downstream sync model-call handler.
+
+        Returns:
+            Model response with the conversation spend update.
+        """
+        return self._charge(request, handler(request))
+
+    async def awrap_model_call(
+        self,
+        request: ModelRequest[Any],
+        handler: Callable[[ModelRequest[Any]], Awaitable[ModelResponse[Any]]],
+    ) -> ExtendedModelResponse[Any]:
+        """Async variant of ``wrap_model_call``.
+
+        Args:
+            request: Current model request.
+            handler: Downstream async model-call handler.
+
+        Returns:
+            Model response with the conversation spend update, or a budget
+            notice when the call outlived the run's wall-clock budget.
+
+        Raises:
+            TimeoutError: A provider timeout, left for the router to fail over.
+        """
+        seconds_left = self._seconds_left()
+        if seconds_left is None:
+            return self._charge(request, await handler(request))
+        deadline = asyncio.timeout(seconds_left)
+        try:
+            async with deadline:
+                response = await handler(request)
+        except TimeoutError:
+            if not deadline.expired():
+                raise
+            exhausted = self._exhausted_budgets(cast(RunBudgetState, request.state))
+            response = ModelResponse(result=[_budget_notice(exhausted)])
+        return self._charge(request, response)
+
+    async def awrap_tool_call(
+        self,
+        request: ToolCallRequest,
+        handler: Callable[[ToolCallRequest], Awaitable[ToolMessage | Command[Any]]],
+    ) -> ToolMessage | Command[Any]:
+        """Cancel a tool call that outlives the run's wall-clock budget.
+
+        Args:
+            request: Current tool call request.
+            handler: Downstream async tool-call handler.
+
+        Returns:
+            Tool result, or an error result when the budget ran out first; the
+            next model call is then refused.
+
+        Raises:
+            TimeoutError: A timeout raised by the tool itself.
+        """
+        seconds_left = self._seconds_left()
+        if seconds_left is None:
+            return await handler(request)
+        deadline = asyncio.timeout(seconds_left)
+        try:
+            async with deadline:
+                return await handler(request)
+        except TimeoutError:
+            if not deadline.expired():
+                raise
+            return ToolMessage(
+                content="Tool call stopped: budget exhausted (run.wall_clock_seconds).",
+                tool_call_id=request.tool_call["id"],
+                name=request.tool_call["name"],
+                status="error",
+            )
@@ -0,0 +1,135 @@
+"""Cancellation handles and deadlines for runs on a runtime event loop.
+
+A run may be interrupted by its deadline or by ``RunCancellation.cancel`` from
+any thread. Either way the run's task is cancelled where it is waiting, so
+scheduler slots and conversation locks unwind through their ``async with``
+blocks and the thread keeps its last written checkpoint.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import threading
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+
+from lily.runtime.agent_run_result import RunStatus
+
+
+class RunCancellation:
+    """Thread-safe handle that cancels one in-flight run.
+
+    Pass the handle to ``AgentRuntime.run``/``arun``/``astream``/``run_stream``
+    and call ``cancel`` from any thread. Cancelling before the run starts
+    interrupts it as soon as it is attached; a handle serves one run.
+    """
+
+    def __init__(self) -> None:
+        """Create a handle with no run attached."""
+        self._lock = threading.Lock()
+        self._cancelled = False
+        self._task: asyncio.Task[object] | None = None
+        self._loop: asyncio.AbstractEventLoop | None = None
+
+    @property
+    def cancelled(self) -> bool:
+        """Return whether ``cancel`` has been called.
+
+        Returns:
+            True once ``cancel`` was called on this handle.
+        """
+        return self._cancelled
+
+    def cancel(self) -> None:
+        """Request cancellation of the attached run, now or once it attaches."""
+        with self._lock:
+            self._cancelled = True
+            task, loop = self._task, self._loop
+        if task is not None and loop is not None and not loop.is_closed():
+            loop.call_soon_threadsafe(self._cancel_if_attached, task)
+
+    def _cancel_if_attached(self, task: asyncio.Task[object]) -> None:
+        """Cancel ``task`` on its loop unless the run has detached meanwhile.
+
+        Args:
+            task: Task that was attached when ``cancel`` was called.
+        """
+        with self._lock:
+            attached = self._task is task
+        if attached:
+            task.cancel()
+
+    def attach(self, task: asyncio.Task[object]) -> None:
+        """Bind the handle to the task executing the run.
+
+        A handle cancelled before it is attached cancels ``task`` right away.
+
+        Args:
+            task: Task running on the runtime's event loop.
+        """
+        with self._lock:
+            self._task, self._loop = task, task.get_loop()
+            cancelled = self._cancelled
+        if cancelled:
+            task.cancel()
+
+    def detach(self) -> None:
+        """Forget the run so late ``cancel`` calls do not hit unrelated work."""
+        with self._lock:
+            self._task = self._loop = None
+
+
+@dataclass(slots=True)
+class RunInterruption:
+    """Outcome of an ``interruptible`` block; ``completed`` unless interrupted."""
+
+    status: RunStatus = "completed"
+
+
+@asynccontextmanager
+async def interruptible(
+    timeout: float | None,
+    cancellation: RunCancellation | None,
+) -> AsyncIterator[RunInterruption]:
+    """Bound a block by a deadline and a cancellation handle.
+
+    Interruptions are absorbed: the block ends early and the yielded outcome
+    says why. Cancellation from anything other than ``cancellation`` (for
+    example the caller's own task being cancelled) still propagates.
+
+    Args:
+        timeout: Seconds before the block is cancelled, or ``None`` for no limit.
+        cancellation: Optional handle whose ``cancel`` interrupts the block.
+
+    Yields:
+        Outcome updated when the block is interrupted.
+
+    Raises:
+        RuntimeError: If called outside a running task.
+        TimeoutError: A timeout raised by the block itself, not its deadline.
+        asyncio.CancelledError: If the task is cancelled by anything else.
+    """
+    task = asyncio.current_task()
+    if task is None:
+        msg = "interruptible() must run inside an asyncio task."
+        raise RuntimeError(msg)
+    outcome = RunInterruption()
+    deadline = asyncio.timeout(timeout)
+    if cancellation is not None:
+        cancellation.attach(task)
+    try:
+        async with deadline:
+            yield outcome
+    except TimeoutError:
+        if not deadline.expired():
+            raise
+        outcome.status = "timed_out"
+    except asyncio.CancelledError:
+        if cancellation is None or not cancellation.cancelled:
+            raise
+        task.uncancel()
+        outcome.status = "cancelled"
+    finally:
+        if cancellation is not None:
+            cancellation.detach()
@@ -0,0 +1,164 @@
+"""Bounded-concurrency admission for runs that share one runtime event loop."""
+
+from __future__ import annotations
+
+import asyncio
+import time
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+
+from pydantic import BaseModel, ConfigDict, Field
+
+
+class RunSchedulerStats(BaseModel):
+    """Point-in-time queue and wait metrics for one run scheduler."""
+
+    model_config = ConfigDict(frozen=True)
+
+    max_concurrent_runs: int = Field(ge=1)
+    in_flight: int = Field(default=0, ge=0)
+    queued: int = Field(default=0, ge=0)
+    queued_by_conversation: dict[str, int] = Field(default_factory=dict)
+    completed: int = Field(default=0, ge=0)
+    total_wait_seconds: float = Field(default=0.0, ge=0.0)
+    max_wait_seconds: float = Field(default=0.0, ge=0.0)
+
+
+class RunScheduler:
+    """Admit runs up to a global limit while serializing each conversation.
+
+    Prompts for different conversations run in parallel up to
+    ``max_concurrent_runs``. Prompts sharing a conversation id wait on that
+    conversation's FIFO lock before they take a global slot, so they run one at a
+    time in arrival order and never occupy slots while queued. Runs without a
+    conversation id only compete for global slots.
+
+    Instances hold asyncio primitives and must be used from one event loop.
+    """
+
+    def __init__(self, max_concurrent_runs: int) -> None:
+        """Initialize scheduler state.
+
+        Args:
+            max_concurrent_runs: Maximum number of runs executing at once.
+        """
+        self._max_concurrent_runs = max_concurrent_runs
+        self._semaphore = asyncio.Semaphore(max_concurrent_runs)
+        self._conversation_locks: dict[str, asyncio.Lock] = {}
+        self._conversation_refs: dict[str, int] = {}
+        self._in_flight = 0
+        self._queued = 0
+        self._completed = 0
+        self._total_wait_seconds = 0.0
+        self._max_wait_seconds = 0.0
+
+    def _retain_conversation_lock(self, conversation_id: str) -> asyncio.Lock:
+        """Return the conversation lock and count one more holder or waiter.
+
+        Args:
+            conversation_id: Conversation id being scheduled.
+
+        Returns:
+            FIFO lock serializing runs for this conversation.
+        """
+        lock = self._conversation_locks.setdefault(conversation_id, asyncio.Lock())
+        self._conversation_refs[conversation_id] = (
+            self._conversation_refs.get(conversation_id, 0) + 1
+        )
+        return lock
+
+    def _release_conversation_lock(self, conversation_id: str) -> None:
+        """Drop one holder or waiter and forget idle conversation locks.
+
+        Args:
+            conversation_id: Conversation id whose run left the scheduler.
+        """
+        remaining = self._conversation_refs[conversation_id] - 1
+        if remaining:
+            self._conversation_refs[conversation_id] = remaining
+            return
+        del self._conversation_refs[conversation_id]
+        del self._conversation_locks[conversation_id]
+
+    async def _admit(self, conversation_lock: asyncio.Lock | None) -> None:
+        """Wait for the conversation turn, then for a global slot.
+
+        Args:
+            conversation_lock: Conversation lock, or ``None`` for ephemeral runs.
+
+        Raises:
+            BaseException: Re-raised after releasing the conversation turn when
+                the wait is interrupted, usually ``asyncio.CancelledError``.
+        """
+        if conversation_lock is not None:
+            await conversation_lock.acquire()
+        try:
+            await self._semaphore.acquire()
+        except BaseException:
+            if conversation_lock is not None:
+                conversation_lock.release()
+            raise
+
+    @asynccontextmanager
+    async def slot(self, conversation_id: str | None) -> AsyncIterator[float]:
+        """Hold one execution slot for the duration of a run.
+
+        Args:
+            conversation_id: Conversation id, or ``None`` for ephemeral runs.
+
+        Yields:
+            Seconds spent queued before the run was admitted.
+
+        Raises:
+            BaseException: Re-raised after dropping the conversation lock
+                reference when admission is interrupted.
+        """
+        started = time.perf_counter()
+        conversation_lock = (
+            self._retain_conversation_lock(conversation_id)
+            if conversation_id is not None
+            else None
+        )
+        self._queued += 1
+        try:
+            await self._admit(conversation_lock)
+        except BaseException:
+            if conversation_id is not None:
+                self._release_conversation_lock(conversation_id)
+            raise
+        finally:
+            self._queued -= 1
+
+        waited = time.perf_counter() - started
+        self._total_wait_seconds += waited
+        self._max_wait_seconds = max(self._max_wait_seconds, waited)
+        self._in_flight += 1
+        try:
+            yield waited
+        finally:
+            self._in_flight -= 1
+            self._completed += 1
+            self._semaphore.release()
+            if conversation_lock is not None and conversation_id is not None:
+                conversation_lock.release()
+                self._release_conversation_lock(conversation_id)
+
+    def stats(self) -> RunSchedulerStats:
+        """Return a snapshot of current queue depth and cumulative wait times.
+
+        Returns:
+            Immutable scheduler metrics snapshot.
+        """
+        return RunSchedulerStats(
+            max_concurrent_runs=self._max_concurrent_runs,
+            in_flight=self._in_flight,
+            queued=self._queued,
+            queued_by_conversation={
+                conversation_id: refs - 1
+                for conversation_id, refs in self._conversation_refs.items()
+                if refs > 1
+            },
+            completed=self._completed,
+            total_wait_seconds=self._total_wait_seconds,
+            max_wait_seconds=self._max_wait_seconds,
+        )
@@ -0,0 +1,57 @@
+"""Middleware recording tool-call latency into the active run timings."""
+
+from __future__ import annotations
+
+import time
+from collections.abc import Awaitable, Callable
+from typing import Any
+
+from langchain.agents.middleware import AgentMiddleware, ToolCallRequest
+from langchain_core.messages import ToolMessage
+from langgraph.types import Command
+
+from lily.runtime.run_timings import record_tool_call
+
+
+class ToolCallTimingMiddleware(AgentMiddleware[Any, Any]):
+    """Time every tool execution, including inner tool middleware."""
+
+    def wrap_tool_call(
+        self,
+        request: ToolCallRequest,
+        handler: Callable[[ToolCallRequest], ToolMessage | Command[Any]],
+    ) -> ToolMessage | Command[Any]:
+        """Run one tool call and record its duration.
+
+        Args:
+            request: Current tool call request.
+            handler: Downstream tool-call handler.
+
+        Returns:
+            Tool result from the downstream handler.
+        """
+        started = time.perf_counter()
+        try:
+            return handler(request)
+        finally:
+            record_tool_call(request.tool_call["name"], time.perf_counter() - started)
+
+    async def awrap_tool_call(
+        self,
+        request: ToolCallRequest,
+        handler: Callable[[ToolCallRequest], Awaitable[ToolMessage | Command[Any]]],
+    ) -> ToolMessage | Command[Any]:
+        """Async variant recording one tool call duration.
+
+        Args:
+            request: Current tool call request.
+            handler: Downstream async tool-call handler.
+
+        Returns:
+            Tool result from the downstream handler.
+        """
+        started = time.perf_counter()
+        try:
+            return await handler(request)
+        finally:
+            record_tool_call(request.tool_call["name"], time.perf_counter() - started)
@@ -0,0 +1,301 @@
+"""Per-run latency breakdown recorded across runtime middleware and checkpointing.
+
+Kept free of LangChain/LangGraph imports: ``RunTimings`` travels on
+``AgentRunResult`` through the daemon protocol and thin CLI callers.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+from contextvars import ContextVar, Token
+from typing import Literal
+
+from pydantic import BaseModel, ConfigDict, Field
+
+_RUN_TIMINGS_LOG = logging.getLogger("lily.run.timings")
+
+
+class ModelCallTiming(BaseModel):
+    """One routed model call attempt and the profile that served it."""
+
+    model_config = ConfigDict(frozen=True)
+
+    profile: str
+    seconds: float = Field(ge=0.0)
+    outcome: Literal["ok", "error", "cancelled"] = Field(
+        default="ok",
+        description="``error`` before failover; ``cancelled`` for a lost hedge race.",
+    )
+
+
+class ToolCallTiming(BaseModel):
+    """One tool execution observed by the timing middleware."""
+
+    model_config = ConfigDict(frozen=True)
+
+    name: str
+    seconds: float = Field(ge=0.0)
+
+
+class RunTimings(BaseModel):
+    """Where one run spent its wall time."""
+
+    model_config = ConfigDict(frozen=True)
+
+    total_seconds: float = Field(
+        default=0.0,
+        ge=0.0,
+        description="Wall time of the whole run, including queue wait.",
+    )
+    model_calls: tuple[ModelCallTiming, ...] = ()
+    model_queue_seconds: float = Field(
+        default=0.0,
+        ge=0.0,
+        description="Model call admission waits and rate-limit backoff.",
+    )
+    response_cache_hits: int = Field(default=0, ge=0)
+    response_cache_misses: int = Field(default=0, ge=0)
+    system_prompt_sha256: str | None = Field(
+        default=None,
+        description="SHA-256 of the system prompt prefix sent on every model call.",
+    )
+    system_prompt_tokens: int = Field(default=0, ge=0)
+    cached_input_tokens: int = Field(
+        default=0,
+        ge=0,
+        description="Input tokens providers reported as read from prompt caches.",
+    )
+    context_reduced_calls: int = Field(
+        default=0,
+        ge=0,
+        description="Model calls whose prompt components were cut to fit the window.",
+    )
+    tool_calls: tuple[ToolCallTiming, ...] = ()
+    summarization_seconds: float = Field(
+        default=0.0,
+        ge=0.0,
+        description="Time in the compression hook, summary model calls included.",
+    )
+    checkpoint_get_seconds: float = Field(default=0.0, ge=0.0)
+    checkpoint_gets: int = Field(default=0, ge=0)
+    checkpoint_put_seconds: float = Field(default=0.0, ge=0.0)
+    checkpoint_puts: int = Field(default=0, ge=0)
+
+    @property
+    def model_seconds(self) -> float:
+        """Return total time spent in model calls.
+
+        Returns:
+            Sum of model call durations.
+        """
+        return sum(call.seconds for call in self.model_calls)
+
+    @property
+    def tool_seconds(self) -> float:
+        """Return total time spent in tool calls.
+
+        Returns:
+            Sum of tool call durations.
+        """
+        return sum(call.seconds for call in self.tool_calls)
+
+
+class RunTimingRecorder:
+    """Mutable accumulator shared by every task of one run."""
+
+    def __init__(self) -> None:
+        """Initialize empty timing buckets."""
+        self.model_calls: list[ModelCallTiming] = []
+        self.model_queue_seconds = 0.0
+        self.response_cache_hits = 0
+        self.response_cache_misses = 0
+        self.system_prompt_sha256: str | None = None
+        self.system_prompt_tokens = 0
+        self.cached_input_tokens = 0
+        self.context_reduced_calls = 0
+        self.tool_calls: list[ToolCallTiming] = []
+        self.summarization_seconds = 0.0
+        self.checkpoint_get_seconds = 0.0
+        self.checkpoint_gets = 0
+        self.checkpoint_put_seconds = 0.0
+        self.checkpoint_puts = 0
+
+    def snapshot(self, *, total_seconds: float) -> RunTimings:
+        """Freeze recorded timings into the result contract.
+
+        Args:
+            total_seconds: Wall time of the whole run.
+
+        Returns:
+            Immutable timings for ``AgentRunResult.timings``.
+        """
+        return RunTimings(
+            total_seconds=total_seconds,
+            model_calls=tuple(self.model_calls),
+            model_queue_seconds=self.model_queue_seconds,
+            response_cache_hits=self.response_cache_hits,
+            response_cache_misses=self.response_cache_misses,
+            system_prompt_sha256=self.system_prompt_sha256,
+            system_prompt_tokens=self.system_prompt_tokens,
+            cached_input_tokens=self.cached_input_tokens,
+            context_reduced_calls=self.context_reduced_calls,
+            tool_calls=tuple(self.tool_calls),
+            summarization_seconds=self.summarization_seconds,
+            checkpoint_get_seconds=self.checkpoint_get_seconds,
+            checkpoint_gets=self.checkpoint_gets,
+            checkpoint_put_seconds=self.checkpoint_put_seconds,
+            checkpoint_puts=self.checkpoint_puts,
+        )
+
+
+_run_timing_recorder: ContextVar[RunTimingRecorder | None] = ContextVar(
+    "run_timing_recorder", default=None
+)
+
+
+def bind_run_timings() -> tuple[Token[RunTimingRecorder | None], RunTimingRecorder]:
+    """Start a recorder for the current run; pair with ``reset_run_timings``.
+
+    Returns:
+        Token for reset and the recorder appended to by instrumentation.
+    """
+    recorder = RunTimingRecorder()
+    token = _run_timing_recorder.set(recorder)
+    return token, recorder
+
+
+def reset_run_timings(token: Token[RunTimingRecorder | None]) -> None:
+    """Restore the previous recorder binding.
+
+    Args:
+        token: Value returned from ``bind_run_timings``.
+    """
+    _run_timing_recorder.reset(token)
+
+
+def record_model_call(
+    profile: str,
+    seconds: float,
+    *,
+    outcome: Literal["ok", "error", "cancelled"] = "ok",
+) -> None:
+    """Record one model call attempt when a run recorder is bound.
+
+    Args:
+        profile: Model profile that served the attempt.
+        seconds: Call duration.
+        outcome: How the attempt ended.
+    """
+    recorder = _run_timing_recorder.get()
+    if recorder is not None:
+        recorder.model_calls.append(
+            ModelCallTiming(profile=profile, seconds=seconds, outcome=outcome)
+        )
+
+
+def record_model_queue_wait(seconds: float) -> None:
+    """Record time a model call waited for admission or rate-limit backoff.
+
+    Args:
+        seconds: Wait duration.
+    """
+    recorder = _run_timing_recorder.get()
+    if recorder is not None:
+        recorder.model_queue_seconds += seconds
+
+
+def record_response_cache(*, hit: bool) -> None:
+    """Record one response cache lookup for a cached profile.
+
+    Args:
+        hit: Whether the reply was served from the cache.
+    """
+    recorder = _run_timing_recorder.get()
+    if recorder is None:
+        return
+    if hit:
+        recorder.response_cache_hits += 1
+    else:
+        recorder.response_cache_misses += 1
+
+
+def record_system_prompt(*, sha256: str, tokens: int, cached_input_tokens: int) -> None:
+    """Record the system prompt prefix of one model call and its cache reads.
+
+    Args:
+        sha256: Hash of the system prompt prefix.
+        tokens: Prefix token length.
+        cached_input_tokens: Input tokens the provider served from its cache.
+    """
+    recorder = _run_timing_recorder.get()
+    if recorder is not None:
+        recorder.system_prompt_sha256 = sha256
+        recorder.system_prompt_tokens = tokens
+        recorder.cached_input_tokens += cached_input_tokens
+
+
+def record_context_reduction() -> None:
+    """Record one model call whose context was cut to fit its budget."""
+    recorder = _run_timing_recorder.get()
+    if recorder is not None:
+        recorder.context_reduced_calls += 1
+
+
+def record_tool_call(name: str, seconds: float) -> None:
+    """Record one tool call when a run recorder is bound.
+
+    Args:
+        name: Tool name.
+        seconds: Call duration.
+    """
+    recorder = _run_timing_recorder.get()
+    if recorder is not None:
+        recorder.tool_calls.append(ToolCallTiming(name=name, seconds=seconds))
+
+
+def record_summarization(seconds: float) -> None:
+    """Record time spent in the conversation compression hook.
+
+    Args:
+        seconds: Hook duration.
+    """
+    recorder = _run_timing_recorder.get()
+    if recorder is not None:
+        recorder.summarization_seconds += seconds
+
+
+def record_checkpoint(kind: Literal["get", "put"], seconds: float) -> None:
+    """Record one checkpointer read or write.
+
+    Args:
+        kind: ``get`` for checkpoint loads, ``put`` for checkpoint and write saves.
+        seconds: Operation duration.
+    """
+    recorder = _run_timing_recorder.get()
+    if recorder is None:
+        return
+    if kind == "get":
+        recorder.checkpoint_get_seconds += seconds
+        recorder.checkpoint_gets += 1
+    else:
+        recorder.checkpoint_put_seconds += seconds
+        recorder.checkpoint_puts += 1
+
+
+def emit_run_timings(timings: RunTimings, *, conversation_id: str | None) -> None:
+    """Append one JSON line to the run timings log when it is configured.
+
+    Args:
+        timings: Timings of the finished run.
+        conversation_id: Conversation id of the run, or ``None`` when ephemeral.
+    """
+    if not _RUN_TIMINGS_LOG.handlers:
+        return
+    envelope = {
+        "conversation_id": conversation_id,
+        **timings.model_dump(mode="json"),
+        "model_seconds": timings.model_seconds,
+        "tool_seconds": timings.tool_seconds,
+    }
+    _RUN_TIMINGS_LOG.info("%s", json.dumps(envelope, sort_keys=True))
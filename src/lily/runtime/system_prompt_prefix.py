@@ -0,0 +1,178 @@
+"""Precomputed system prompt shared by every model call of one agent build.
+
+The base system prompt, agent identity markdown, and skill catalog are joined
+once, in that order, into one ``SystemMessage``. Every model call sends that
+same object, so the prompt prefix stays byte-identical across turns and
+providers can serve it from their prompt caches.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass
+from typing import Any
+
+from langchain.agents.middleware import (
+    AgentMiddleware,
+    ModelRequest,
+    ModelResponse,
+)
+from langchain_core.messages import AIMessage, SystemMessage
+
+from lily.runtime.run_timings import record_system_prompt
+
+_LOGGER = logging.getLogger("lily.prompt")
+
+
+@dataclass(frozen=True, slots=True)
+class SystemPromptPrefix:
+    """Assembled system message with its content hash and token length."""
+
+    message: SystemMessage
+    sha256: str
+    tokens: int
+
+
+def build_system_prompt_prefix(
+    system_prompt: str,
+    *,
+    identity_markdown: str = "",
+    catalog_markdown: str = "",
+    count_tokens: Callable[[SystemMessage], int],
+) -> SystemPromptPrefix:
+    """Join prompt sections in fixed order and measure the result.
+
+    Empty sections are skipped; each present section follows the previous one
+    after a blank line.
+
+    Args:
+        system_prompt: Base system prompt from agent config.
+        identity_markdown: Pre-formatted identity/personality markdown context.
+        catalog_markdown: Skill catalog markdown block.
+        count_tokens: Token counter for the default profile.
+
+    Returns:
+        Prefix to send on every model call.
+    """
+    content = system_prompt
+    for section in (identity_markdown, catalog_markdown):
+        if section.strip():
+            content = f"{content.rstrip()}\n\n{section}"
+    message = SystemMessage(content=content)
+    return SystemPromptPrefix(
+        message=message,
+        sha256=hashlib.sha256(content.encode("utf-8")).hexdigest(),
+        tokens=count_tokens(message),
+    )
+
+
+def emit_system_prompt_assembled(
+    prefix: SystemPromptPrefix,
+    *,
+    identity_char_count: int,
+    catalog_char_count: int,
+) -> None:
+    """Log one JSON ``system_prompt_assembled`` event on logger ``lily.prompt``.
+
+    Args:
+        prefix: Assembled prefix.
+        identity_char_count: Length of the identity section (not its content).
+        catalog_char_count: Length of the catalog section (not its content).
+    """
+    _LOGGER.info(
+        json.dumps(
+            {
+                "event": "system_prompt_assembled",
+                "sha256": prefix.sha256,
+                "tokens": prefix.tokens,
+                "char_count": len(str(prefix.message.content)),
+                "identity_char_count": identity_char_count,
+                "catalog_char_count": catalog_char_count,
+            }
+        )
+    )
+
+
+def _cached_input_tokens(response: ModelResponse[Any]) -> int:
+    """Return provider-reported prompt-cache reads of one model response.
+
+    Args:
+        response: Model response.
+
+    Returns:
+        ``input_token_details.cache_read`` of the reply, or zero.
+    """
+    for message in response.result:
+        if isinstance(message, AIMessage) and message.usage_metadata is not None:
+            details = message.usage_metadata.get("input_token_details") or {}
+            return int(details.get("cache_read") or 0)
+    return 0
+
+
+class SystemPromptPrefixMiddleware(AgentMiddleware[Any, Any]):
+    """Send the precomputed system message on every model call.
+
+    Owns the request system message: whatever earlier stages set is replaced.
+    """
+
+    def __init__(self, prefix: SystemPromptPrefix) -> None:
+        """Initialize middleware with the assembled prefix.
+
+        Args:
+            prefix: Prefix built once per agent build.
+        """
+        super().__init__()
+        self.prefix = prefix
+
+    def _record(self, response: ModelResponse[Any]) -> ModelResponse[Any]:
+        """Record prefix telemetry for one finished model call.
+
+        Args:
+            response: Downstream model response.
+
+        Returns:
+            The same response.
+        """
+        record_system_prompt(
+            sha256=self.prefix.sha256,
+            tokens=self.prefix.tokens,
+            cached_input_tokens=_cached_input_tokens(response),
+        )
+        return response
+
+    def wrap_model_call(
+        self,
+        request: ModelRequest[Any],
+        handler: Callable[[ModelRequest[Any]], ModelResponse[Any]],
+    ) -> ModelResponse[Any]:
+        """Replace the system message with the precomputed prefix.
+
+        Args:
+            request: Current model request.
+            handler: Downstream handler to call with the rewritten request.
+
+        Returns:
+            The downstream model response.
+        """
+        updated = request.override(system_message=self.prefix.message)
+        return self._record(handler(updated))
+
+    async def awrap_model_call(
+        self,
+        request: ModelRequest[Any],
+        handler: Callable[[ModelRequest[Any]], Awaitable[ModelResponse[Any]]],
+    ) -> ModelResponse[Any]:
+        """Async variant of ``wrap_model_call``.
+
+        Args:
+            request: Current model request.
+            handler: Downstream async handler to call with the rewritten request.
+
+        Returns:
+            The downstream model response.
+        """
+        updated = request.override(system_message=self.prefix.message)
+        return self._record(await handler(updated))
@@ -0,0 +1,82 @@
+"""SQLite checkpointer that reports read/write latency to the run timings."""
+
+from __future__ import annotations
+
+import time
+from collections.abc import Sequence
+from typing import Any
+
+from langchain_core.runnables import RunnableConfig
+from langgraph.checkpoint.base import (
+    ChannelVersions,
+    Checkpoint,
+    CheckpointMetadata,
+    CheckpointTuple,
+)
+from langgraph.checkpoint.sqlite.aio import AsyncSqliteSaver
+
+from lily.runtime.run_timings import record_checkpoint
+
+
+class TimedAsyncSqliteSaver(AsyncSqliteSaver):
+    """``AsyncSqliteSaver`` recording each load and save on the bound run."""
+
+    async def aget_tuple(self, config: RunnableConfig) -> CheckpointTuple | None:
+        """Load one checkpoint tuple and record the read latency.
+
+        Args:
+            config: Config identifying the thread and optional checkpoint id.
+
+        Returns:
+            Stored checkpoint tuple, or ``None`` when the thread is empty.
+        """
+        started = time.perf_counter()
+        try:
+            return await super().aget_tuple(config)
+        finally:
+            record_checkpoint("get", time.perf_counter() - started)
+
+    async def aput(
+        self,
+        config: RunnableConfig,
+        checkpoint: Checkpoint,
+        metadata: CheckpointMetadata,
+        new_versions: ChannelVersions,
+    ) -> RunnableConfig:
+        """Save one checkpoint and record the write latency.
+
+        Args:
+            config: Config of the checkpoint's thread.
+            checkpoint: Checkpoint to save.
+            metadata: Metadata stored with the checkpoint.
+            new_versions: Channel versions written by this step.
+
+        Returns:
+            Config pointing at the saved checkpoint.
+        """
+        started = time.perf_counter()
+        try:
+            return await super().aput(config, checkpoint, metadata, new_versions)
+        finally:
+            record_checkpoint("put", time.perf_counter() - started)
+
+    async def aput_writes(
+        self,
+        config: RunnableConfig,
+        writes: Sequence[tuple[str, Any]],
+        task_id: str,
+        task_path: str = "",
+    ) -> None:
+        """Save pending task writes and record the write latency.
+
+        Args:
+            config: Config of the checkpoint the writes belong to.
+            writes: ``(channel, value)`` pairs to store.
+            task_id: Id of the task that produced the writes.
+            task_path: Path of the task that produced the writes.
+        """
+        started = time.perf_counter()
+        try:
+            await super().aput_writes(config, writes, task_id, task_path)
+        finally:
+            record_checkpoint("put", time.perf_counter() - started)
@@ -0,0 +1,343 @@
+"""Token accounting shared by model routing, compression, and run budgets.
+
+Counts are memoized per message id and kept as running totals per thread, so a
+model call only tokenizes messages added since the previous call on that thread.
+"""
+
+from __future__ import annotations
+
+import logging
+import threading
+from collections import OrderedDict
+from collections.abc import Callable, Iterable, Mapping, Sequence
+from dataclasses import dataclass
+from functools import cache
+from typing import TYPE_CHECKING, Any
+
+from langchain_core.messages import AIMessage, BaseMessage, ToolMessage
+from langchain_core.messages.utils import (
+    convert_to_messages,
+    count_tokens_approximately,
+)
+
+from lily.runtime.config_schema import ModelProfileConfig, ModelProvider
+
+if TYPE_CHECKING:
+    from tiktoken import Encoding
+
+APPROXIMATE_TOKENIZER = "approximate"
+DEFAULT_OPENAI_ENCODING = "o200k_base"
+
+type SummarizationTokenCounter = Callable[[Iterable[Any]], int]
+
+_LOGGER = logging.getLogger("lily.tokens")
+# Role and framing tokens chat APIs add around each message.
+_MESSAGE_OVERHEAD_TOKENS = 3
+_MEMO_MAX_ENTRIES = 65_536
+_LEDGER_MAX_THREADS = 1_024
+_CHARACTERS_METRIC = "characters"
+
+
+def message_characters(message: BaseMessage) -> int:
+    """Return the text length of a message's content.
+
+    Args:
+        message: Chat message.
+
+    Returns:
+        Character count of the content (list blocks are concatenated).
+    """
+    content = message.content
+    if isinstance(content, str):
+        return len(content)
+    if isinstance(content, list):
+        return len("".join(str(item) for item in content))
+    return len(str(content))
+
+
+def _message_token_text(message: BaseMessage) -> str:
+    """Return the text a chat API tokenizes for one message.
+
+    Args:
+        message: Chat message.
+
+    Returns:
+        Role, name, content, and tool-call payload text.
+    """
+    content = message.content
+    parts = [message.type, message.name or ""]
+    if isinstance(content, str):
+        parts.append(content)
+    else:
+        parts.extend(str(item) for item in content)
+    if isinstance(message, AIMessage) and message.tool_calls:
+        parts.append(repr(message.tool_calls))
+    if isinstance(message, ToolMessage):
+        parts.append(message.tool_call_id)
+    return "".join(parts)
+
+
+@cache
+def _load_encoding(name: str) -> Encoding | None:
+    """Load a tiktoken encoding once per process.
+
+    Args:
+        name: tiktoken encoding name.
+
+    Returns:
+        Encoding, or ``None`` when it is unknown or cannot be fetched (offline).
+    """
+    import tiktoken  # noqa: PLC0415
+
+    try:
+        return tiktoken.get_encoding(name)
+    except Exception:
+        _LOGGER.warning(
+            "Tokenizer '%s' unavailable; using approximate token counts",
+            name,
+            exc_info=True,
+        )
+        return None
+
+
+def tokenizer_name_for_profile(profile: ModelProfileConfig) -> str:
+    """Choose the tokenizer used to count tokens for one model profile.
+
+    Args:
+        profile: Model profile settings.
+
+    Returns:
+        Explicit ``profile.tokenizer``; otherwise the tiktoken encoding for
+        OpenAI models and ``approximate`` for other providers.
+    """
+    if profile.tokenizer is not None:
+        return profile.tokenizer
+    if profile.provider != ModelProvider.OPENAI:
+        return APPROXIMATE_TOKENIZER
+    import tiktoken  # noqa: PLC0415
+
+    try:
+        return tiktoken.encoding_name_for_model(profile.model)
+    except KeyError:
+        return DEFAULT_OPENAI_ENCODING
+
+
+def count_message_tokens(tokenizer: str, message: BaseMessage) -> int:
+    """Count tokens of one message with a named tokenizer.
+
+    Args:
+        tokenizer: tiktoken encoding name or ``approximate``.
+        message: Chat message.
+
+    Returns:
+        Token count including per-message overhead.
+    """
+    encoding = None if tokenizer == APPROXIMATE_TOKENIZER else _load_encoding(tokenizer)
+    if encoding is None:
+        return count_tokens_approximately([message])
+    text = _message_token_text(message)
+    return len(encoding.encode(text, disallowed_special=())) + _MESSAGE_OVERHEAD_TOKENS
+
+
+@dataclass(frozen=True, slots=True)
+class _ThreadLedger:
+    """Running total for the counted prefix of one thread's messages."""
+
+    ids: tuple[str | None, ...]
+    total: int
+
+    def extends(self, messages: Sequence[BaseMessage]) -> bool:
+        """Return whether ``messages`` still start with the counted prefix.
+
+        Comparing every id, not just the last, catches an earlier message that
+        was removed or replaced while the tail stayed the same.
+
+        Args:
+            messages: Full thread history for this call.
+
+        Returns:
+            True when the running total can be extended instead of recounted.
+        """
+        counted = len(self.ids)
+        return counted <= len(messages) and self.ids == tuple(
+            message.id for message in messages[:counted]
+        )
+
+
+class TokenAccountant:
+    """Per-profile token counts with message memoization and thread totals.
+
+    Thread-safe; one instance is shared by every run of an ``AgentRuntime``.
+    Messages are identified by ``id``; LangGraph state messages keep their
+    content for the lifetime of an id.
+    """
+
+    def __init__(self, profiles: Mapping[str, ModelProfileConfig]) -> None:
+        """Resolve tokenizer names per profile; tokenizers load on first use.
+
+        Args:
+            profiles: Configured model profiles by name.
+        """
+        self._tokenizers = {
+            name: tokenizer_name_for_profile(profile)
+            for name, profile in profiles.items()
+        }
+        self._lock = threading.Lock()
+        self._memo: OrderedDict[tuple[str, str], int] = OrderedDict()
+        self._ledgers: OrderedDict[tuple[str, str], _ThreadLedger] = OrderedDict()
+
+    def tokenizer_name(self, profile: str) -> str:
+        """Return the tokenizer used for a profile.
+
+        Args:
+            profile: Model profile name.
+
+        Returns:
+            tiktoken encoding name, or ``approximate`` for unknown profiles.
+        """
+        return self._tokenizers.get(profile, APPROXIMATE_TOKENIZER)
+
+    def _measure(self, metric: str, message: BaseMessage) -> int:
+        """Measure one message, memoized by metric and message id.
+
+        Args:
+            metric: Tokenizer name or the character metric.
+            message: Chat message.
+
+        Returns:
+            Token or character count.
+        """
+        key = (metric, message.id) if message.id else None
+        if key is not None:
+            with self._lock:
+                cached = self._memo.get(key)
+                if cached is not None:
+                    self._memo.move_to_end(key)
+                    return cached
+        if metric == _CHARACTERS_METRIC:
+            value = message_characters(message)
+        else:
+            value = count_message_tokens(metric, message)
+        if key is not None:
+            with self._lock:
+                self._memo[key] = value
+                if len(self._memo) > _MEMO_MAX_ENTRIES:
+                    self._memo.popitem(last=False)
+        return value
+
+    def _running_total(
+        self,
+        metric: str,
+        messages: Sequence[BaseMessage],
+        thread_id: str | None,
+    ) -> int:
+        """Extend a thread's running total with messages added since last call.
+
+        Falls back to a full (memoized) recount when any counted message was
+        removed or replaced, for example by summarization.
+
+        Args:
+            metric: Tokenizer name or the character metric.
+            messages: Full thread history for this call.
+            thread_id: Thread id, or ``None`` to skip the ledger.
+
+        Returns:
+            Total over ``messages``.
+        """
+        if thread_id is None:
+            return sum(self._measure(metric, message) for message in messages)
+        ledger_key = (metric, thread_id)
+        with self._lock:
+            ledger = self._ledgers.get(ledger_key)
+        start, total = 0, 0
+        if ledger is not None and ledger.extends(messages):
+            start, total = len(ledger.ids), ledger.total
+        total += sum(self._measure(metric, message) for message in messages[start:])
+        self._record_ledger(ledger_key, messages, total)
+        return total
+
+    def _record_ledger(
+        self,
+        ledger_key: tuple[str, str],
+        messages: Sequence[BaseMessage],
+        total: int,
+    ) -> None:
+        """Store a thread's running total, unless a message lacks an id.
+
+        Args:
+            ledger_key: Metric and thread id.
+            messages: Full thread history that was counted.
+            total: Total over ``messages``.
+        """
+        ids = tuple(message.id for message in messages)
+        if None in ids:
+            return
+        with self._lock:
+            self._ledgers[ledger_key] = _ThreadLedger(ids, total)
+            self._ledgers.move_to_end(ledger_key)
+            if len(self._ledgers) > _LEDGER_MAX_THREADS:
+                self._ledgers.popitem(last=False)
+
+    def count_tokens(self, profile: str, messages: Iterable[BaseMessage]) -> int:
+        """Count tokens of messages for a profile's tokenizer.
+
+        Args:
+            profile: Model profile name.
+            messages: Messages to count.
+
+        Returns:
+            Token total.
+        """
+        metric = self.tokenizer_name(profile)
+        return sum(self._measure(metric, message) for message in messages)
+
+    def thread_tokens(
+        self,
+        profile: str,
+        messages: Sequence[BaseMessage],
+        *,
+        thread_id: str | None,
+    ) -> int:
+        """Return a thread's token total, tokenizing only new messages.
+
+        Args:
+            profile: Model profile name.
+            messages: Full thread history for this call.
+            thread_id: Thread id, or ``None`` to count without a ledger.
+
+        Returns:
+            Token total over ``messages``.
+        """
+        return self._running_total(self.tokenizer_name(profile), messages, thread_id)
+
+    def thread_characters(
+        self,
+        messages: Sequence[BaseMessage],
+        *,
+        thread_id: str | None,
+    ) -> int:
+        """Return a thread's content character total, measuring only new messages.
+
+        Args:
+            messages: Full thread history for this call.
+            thread_id: Thread id, or ``None`` to count without a ledger.
+
+        Returns:
+            Character total over ``messages``.
+        """
+        return self._running_total(_CHARACTERS_METRIC, messages, thread_id)
+
+    def summarization_counter(self, profile: str) -> SummarizationTokenCounter:
+        """Return a memoized ``token_counter`` for ``SummarizationMiddleware``.
+
+        Args:
+            profile: Model profile whose tokenizer counts the history.
+
+        Returns:
+            Callable counting tokens of message-like inputs.
+        """
+
+        def _count(messages: Iterable[Any]) -> int:
+            return self.count_tokens(profile, convert_to_messages(messages))
+
+        return _count
@@ -0,0 +1,284 @@
+"""Offload large tool results to a local content-addressed blob store.
+
+Tool results longer than ``tools.output_offload.threshold_chars`` are written
+once under ``.lily/blobs/`` by their SHA-256 and replaced in the conversation by
+a preview and a handle. The built-in ``fetch_tool_output`` tool pages through
+stored outputs, so model context and checkpoints stay bounded however much the
+tools return.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import re
+import tempfile
+from collections.abc import Awaitable, Callable
+from pathlib import Path
+from typing import Any
+
+from langchain.agents.middleware import AgentMiddleware, ToolCallRequest
+from langchain_core.messages import ToolMessage
+from langchain_core.tools import BaseTool, tool
+from langgraph.types import Command
+
+from lily.runtime.config_schema import ToolOutputOffloadConfig
+
+DEFAULT_TOOL_OUTPUT_DIR = Path(".lily") / "blobs"
+FETCH_TOOL_OUTPUT_TOOL_ID = "fetch_tool_output"
+
+_LOGGER = logging.getLogger("lily.tools")
+_HANDLE_PATTERN = re.compile(r"sha256:([0-9a-f]{64})")
+
+
+class ToolOutputStoreError(ValueError):
+    """Raised when a tool output handle is malformed or not in the store."""
+
+
+class ToolOutputStore:
+    """Content-addressed UTF-8 text blobs on the local filesystem."""
+
+    def __init__(self, root: Path) -> None:
+        """Initialize a store rooted at ``root`` (created on first write).
+
+        Args:
+            root: Blob directory, usually ``.lily/blobs``.
+        """
+        self._root = root
+
+    def _path(self, digest: str) -> Path:
+        """Return the blob path of one SHA-256 hex digest.
+
+        Args:
+            digest: SHA-256 of the blob's UTF-8 bytes.
+
+        Returns:
+            Path fanned out by the digest's first two characters.
+        """
+        return self._root / digest[:2] / f"{digest}.txt"
+
+    def put(self, text: str) -> str:
+        """Store ``text`` unless an identical blob exists.
+
+        Args:
+            text: Tool output.
+
+        Returns:
+            Blob handle, ``sha256`` and the hex digest joined by a colon.
+        """
+        data = text.encode("utf-8")
+        digest = hashlib.sha256(data).hexdigest()
+        path = self._path(digest)
+        if not path.exists():
+            path.parent.mkdir(parents=True, exist_ok=True)
+            # Write then rename so concurrent readers never see a partial blob.
+            with tempfile.NamedTemporaryFile(
+                dir=path.parent, suffix=".tmp", delete=False
+            ) as handle:
+                handle.write(data)
+            os.replace(handle.name, path)
+        return f"sha256:{digest}"
+
+    def read(self, handle: str, offset: int, length: int) -> tuple[str, int]:
+        """Return one page of a stored blob.
+
+        Args:
+            handle: Handle returned by ``put``.
+            offset: First character of the page.
+            length: Maximum characters in the page.
+
+        Returns:
+            Page text and the blob's total length in characters.
+
+        Raises:
+            ToolOutputStoreError: If the handle is malformed or unknown.
+        """
+        match = _HANDLE_PATTERN.fullmatch(handle.strip())
+        if match is None:
+            msg = f"Malformed tool output handle: {handle!r}."
+            raise ToolOutputStoreError(msg)
+        path = self._path(match.group(1))
+        if not path.is_file():
+            msg = f"Unknown tool output handle: {handle}."
+            raise ToolOutputStoreError(msg)
+        text = path.read_text(encoding="utf-8")
+        return text[offset : offset + length], len(text)
+
+
+def build_fetch_tool_output_tool(
+    store: ToolOutputStore, *, max_length: int
+) -> BaseTool:
+    """Build the ``fetch_tool_output`` tool reading from ``store``.
+
+    Args:
+        store: Store holding offloaded tool outputs.
+        max_length: Largest page returned, kept below the offload threshold.
+
+    Returns:
+        LangChain tool bound into the agent when offloading is enabled.
+    """
+
+    @tool(FETCH_TOOL_OUTPUT_TOOL_ID)
+    def fetch_tool_output(handle: str, offset: int = 0, length: int = 4000) -> str:
+        """Read part of a tool output that was too large to keep in the conversation.
+
+        Args:
+            handle: Handle from the truncated tool result (``sha256:...``).
+            offset: First character to return.
+            length: Number of characters to return.
+
+        Returns:
+            The requested characters and where the next page starts.
+        """
+        start = max(offset, 0)
+        try:
+            page, total = store.read(handle, start, min(max(length, 1), max_length))
+        except ToolOutputStoreError as exc:
+            return str(exc)
+        end = start + len(page)
+        footer = f"Characters {start}-{end} of {total}"
+        if end < total:
+            footer = f"{footer}; call again with offset={end} for more"
+        return f"{page}\n\n[{footer}.]"
+
+    return fetch_tool_output
+
+
+def _text_content(message: ToolMessage) -> str | None:
+    """Return a tool result's text when it is made only of text.
+
+    Args:
+        message: Tool result.
+
+    Returns:
+        Text content, or ``None`` for results with non-text blocks.
+    """
+    if isinstance(message.content, str):
+        return message.content
+    if all(
+        isinstance(block, str) or block.get("type") == "text"
+        for block in message.content
+    ):
+        return message.text
+    return None
+
+
+class ToolOutputOffloadMiddleware(AgentMiddleware[Any, Any]):
+    """Replace oversized tool results with a preview and a blob handle.
+
+    ``fetch_tool_output`` results are never offloaded: their pages are already
+    bounded by the threshold.
+    """
+
+    def __init__(self, store: ToolOutputStore, config: ToolOutputOffloadConfig) -> None:
+        """Initialize the middleware.
+
+        Args:
+            store: Store receiving offloaded outputs.
+            config: Offload threshold and preview size.
+        """
+        super().__init__()
+        self._store = store
+        self._config = config
+
+    def _oversized_text(
+        self,
+        request: ToolCallRequest,
+        result: ToolMessage | Command[Any],
+    ) -> str | None:
+        """Return a result's text when it must be offloaded.
+
+        Args:
+            request: Tool call that produced ``result``.
+            result: Downstream tool result.
+
+        Returns:
+            Text longer than the threshold, or ``None`` to keep ``result``.
+        """
+        if (
+            not isinstance(result, ToolMessage)
+            or request.tool_call["name"] == FETCH_TOOL_OUTPUT_TOOL_ID
+        ):
+            return None
+        text = _text_content(result)
+        if text is None or len(text) <= self._config.threshold_chars:
+            return None
+        return text
+
+    def _offloaded(self, name: str, result: ToolMessage, text: str) -> ToolMessage:
+        """Store ``text`` and return ``result`` with preview plus handle content.
+
+        Args:
+            name: Tool name, for telemetry.
+            result: Oversized tool result.
+            text: Its text content.
+
+        Returns:
+            Copy of ``result`` carrying the preview.
+        """
+        handle = self._store.put(text)
+        preview_chars = self._config.preview_chars
+        _LOGGER.info(
+            json.dumps(
+                {
+                    "event": "tool_output_offloaded",
+                    "tool": name,
+                    "handle": handle,
+                    "char_count": len(text),
+                    "preview_chars": preview_chars,
+                }
+            )
+        )
+        notice = (
+            f"[Tool output truncated: showing {preview_chars} of {len(text)} "
+            f"characters. Call {FETCH_TOOL_OUTPUT_TOOL_ID} with "
+            f'handle="{handle}" and offset={preview_chars} to read more.]'
+        )
+        preview = text[:preview_chars]
+        content = f"{preview}\n\n{notice}" if preview else notice
+        return result.model_copy(update={"content": content})
+
+    def wrap_tool_call(
+        self,
+        request: ToolCallRequest,
+        handler: Callable[[ToolCallRequest], ToolMessage | Command[Any]],
+    ) -> ToolMessage | Command[Any]:
+        """Run one tool call and offload its result when oversized.
+
+        Args:
+            request: Current tool call request.
+            handler: Downstream tool-call handler.
+
+        Returns:
+            Tool result, possibly replaced by its preview.
+        """
+        result = handler(request)
+        text = self._oversized_text(request, result)
+        if text is None or not isinstance(result, ToolMessage):
+            return result
+        return self._offloaded(request.tool_call["name"], result, text)
+
+    async def awrap_tool_call(
+        self,
+        request: ToolCallRequest,
+        handler: Callable[[ToolCallRequest], Awaitable[ToolMessage | Command[Any]]],
+    ) -> ToolMessage | Command[Any]:
+        """Async variant writing blobs off the event loop.
+
+        Args:
+            request: Current tool call request.
+            handler: Downstream async tool-call handler.
+
+        Returns:
+            Tool result, possibly replaced by its preview.
+        """
+        result = await handler(request)
+        text = self._oversized_text(request, result)
+        if text is None or not isinstance(result, ToolMessage):
+            return result
+        return await asyncio.to_thread(
+            self._offloaded, request.tool_call["name"], result, text
+        )
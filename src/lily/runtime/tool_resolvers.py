@@ -7,16 +7,9 @@ import threading
 from collections.abc import Callable, Coroutine, Mapping
 from datetime import timedelta
 from importlib import import_module
-from typing import Any, Protocol, cast
+from typing import TYPE_CHECKING, Any, Protocol, cast
 
 from langchain_core.tools import BaseTool
-from langchain_mcp_adapters.client import MultiServerMCPClient
-from langchain_mcp_adapters.sessions import (
-    SSEConnection,
-    StdioConnection,
-    StreamableHttpConnection,
-    WebsocketConnection,
-)
 from pydantic import PrivateAttr
 
 from lily.runtime.config_schema import (
@@ -36,6 +29,18 @@ from lily.runtime.tool_catalog import (
 )
 from lily.runtime.tool_registry import ToolLike, ToolRegistry
 
+if TYPE_CHECKING:
+    # MCP adapters pull in every transport stack; load them only when a real
+    # (non-test) MCP server is configured.
+    from langchain_mcp_adapters.client import MultiServerMCPClient
+    from langchain_mcp_adapters.sessions import (
+        Connection,
+        SSEConnection,
+        StdioConnection,
+        StreamableHttpConnection,
+        WebsocketConnection,
+    )
+
 type _ResolverCallable = Callable[[ToolDefinition], ToolLike]
 
 
@@ -520,6 +525,27 @@ class _AdapterMcpServerProvider:
 type _McpProviderBuilder = Callable[[str, McpServerConfig], McpServerToolProvider]
 
 
+def _build_adapter_server_provider(
+    server_name: str,
+    connection: Connection,
+) -> McpServerToolProvider:
+    """Build an adapter-backed provider, importing MCP adapters on first use.
+
+    Args:
+        server_name: Configured MCP server name.
+        connection: Transport-specific adapter connection mapping.
+
+    Returns:
+        Adapter-backed provider bound to ``connection``.
+    """
+    from langchain_mcp_adapters.client import (  # noqa: PLC0415
+        MultiServerMCPClient,
+    )
+
+    client = MultiServerMCPClient({server_name: connection})
+    return _AdapterMcpServerProvider(server_name, client)
+
+
 def _build_test_server_provider(
     server_name: str,
     server_config: McpServerConfig,
@@ -578,8 +604,7 @@ def _build_streamable_http_server_provider(
         streamable_connection["timeout"] = timeout
         streamable_connection["sse_read_timeout"] = timeout
 
-    client = MultiServerMCPClient({server_name: streamable_connection})
-    return _AdapterMcpServerProvider(server_name, client)
+    return _build_adapter_server_provider(server_name, streamable_connection)
 
 
 def _build_sse_server_provider(
@@ -614,8 +639,7 @@ def _build_sse_server_provider(
         sse_connection["timeout"] = server_config.timeout_seconds
         sse_connection["sse_read_timeout"] = server_config.timeout_seconds
 
-    client = MultiServerMCPClient({server_name: sse_connection})
-    return _AdapterMcpServerProvider(server_name, client)
+    return _build_adapter_server_provider(server_name, sse_connection)
 
 
 def _build_websocket_server_provider(
@@ -645,8 +669,7 @@ def _build_websocket_server_provider(
         "transport": "websocket",
         "url": server_config.url,
     }
-    client = MultiServerMCPClient({server_name: websocket_connection})
-    return _AdapterMcpServerProvider(server_name, client)
+    return _build_adapter_server_provider(server_name, websocket_connection)
 
 
 def _build_stdio_server_provider(
@@ -688,8 +711,7 @@ def _build_stdio_server_provider(
             server_config.encoding_error_handler
         )
 
-    client = MultiServerMCPClient({server_name: stdio_connection})
-    return _AdapterMcpServerProvider(server_name, client)
+    return _build_adapter_server_provider(server_name, stdio_connection)
 
 
 _MCP_PROVIDER_BUILDERS: dict[str, _McpProviderBuilder] = {
@@ -3,15 +3,18 @@
 
 from __future__ import annotations
 
-from collections.abc import Callable
+import asyncio
+import threading
+from collections.abc import AsyncIterator, Callable
 from pathlib import Path
-from typing import ClassVar, Protocol
+from typing import ClassVar, Protocol, cast
 
 from textual.app import App
 from textual.binding import Binding
 
 from lily.agents.lily_supervisor import LilySupervisor
-from lily.runtime.agent_runtime import AgentRunResult
+from lily.runtime.agent_run_result import AgentRunResult, AgentStreamEvent
+from lily.runtime.run_cancellation import RunCancellation
 from lily.ui.screens.chat import ChatScreen
 
 
@@ -31,6 +34,36 @@ class _SupervisorProtocol(Protocol):
         """
 
 
+class _StreamingSupervisorProtocol(_SupervisorProtocol, Protocol):
+    """Supervisor that can stream reply tokens on the caller's event loop."""
+
+    def astream_prompt(
+        self,
+        prompt: str,
+        conversation_id: str | None = None,
+        *,
+        cancellation: RunCancellation | None = None,
+    ) -> AsyncIterator[AgentStreamEvent]:
+        """Stream reply events for one prompt.
+
+        Args:
+            prompt: Prompt text to execute.
+            conversation_id: Optional conversation/thread id for resume continuity.
+            cancellation: Optional handle that interrupts the run when cancelled.
+        """
+
+
+class _WarmableSupervisorProtocol(_SupervisorProtocol, Protocol):
+    """Supervisor that can build its runtime ahead of the first prompt."""
+
+    async def awarmup(self, *, preload_models: bool = False) -> None:
+        """Build runtime resources on the caller's event loop.
+
+        Args:
+            preload_models: Also preload resident-weight model profiles (Ollama).
+        """
+
+
 type SupervisorFactory = Callable[
     [Path, Path | None, bool, Path | None], _SupervisorProtocol
 ]
@@ -82,6 +115,8 @@ class LilyTuiApp(App[None]):
         supervisor_factory: SupervisorFactory = _default_supervisor_factory,
         skill_telemetry_echo: bool = False,
         agent_workspace_dir: Path | None = None,
+        warmup: bool = False,
+        preload_models: bool = False,
     ) -> None:
         """Initialize TUI app with config-driven supervisor factory.
 
@@ -93,6 +128,8 @@ class LilyTuiApp(App[None]):
             skill_telemetry_echo: Passed through when constructing the supervisor.
             agent_workspace_dir: Optional named-agent workspace directory used for
                 identity context middleware injection.
+            warmup: Build the supervisor and its runtime in a worker at startup.
+            preload_models: Also preload Ollama profiles; implies ``warmup``.
         """
         super().__init__()
         self._config_path = config_path
@@ -101,26 +138,50 @@ class LilyTuiApp(App[None]):
         self._supervisor_factory = supervisor_factory
         self._skill_telemetry_echo = skill_telemetry_echo
         self._agent_workspace_dir = agent_workspace_dir
+        self._warmup = warmup or preload_models
+        self._preload_models = preload_models
         self._supervisor: _SupervisorProtocol | None = None
+        self._supervisor_lock = threading.Lock()
+        self._cancellation: RunCancellation | None = None
 
     def on_mount(self) -> None:
-        """Push the chat screen on startup."""
+        """Push the chat screen on startup and start warm-up when enabled."""
         self.push_screen(ChatScreen(conversation_id=self._conversation_id))
+        if self._warmup:
+            self.run_worker(self._warm_up_supervisor(), group="warmup")
 
     def _get_supervisor(self) -> _SupervisorProtocol:
         """Lazily construct and return supervisor runtime object.
 
+        Safe to call from the warm-up thread and the UI loop at once; both get the
+        same supervisor.
+
         Returns:
             Supervisor instance used for prompt execution.
         """
-        if self._supervisor is None:
-            self._supervisor = self._supervisor_factory(
-                self._config_path,
-                self._override_config_path,
-                self._skill_telemetry_echo,
-                self._agent_workspace_dir,
-            )
-        return self._supervisor
+        with self._supervisor_lock:
+            if self._supervisor is None:
+                self._supervisor = self._supervisor_factory(
+                    self._config_path,
+                    self._override_config_path,
+                    self._skill_telemetry_echo,
+                    self._agent_workspace_dir,
+                )
+            return self._supervisor
+
+    async def _warm_up_supervisor(self) -> None:
+        """Build the supervisor off-loop, then its runtime on the Textual loop.
+
+        The runtime binds to the loop that builds it, so warm-up runs on the same
+        loop that later streams replies.
+        """
+        try:
+            supervisor = await asyncio.to_thread(self._get_supervisor)
+            if hasattr(supervisor, "awarmup"):
+                warmable = cast(_WarmableSupervisorProtocol, supervisor)
+                await warmable.awarmup(preload_models=self._preload_models)
+        except Exception as exc:  # pragma: no cover - defensive UI surface
+            self.notify(str(exc), title="Warm-up failed", severity="error")
 
     def run_prompt_for_ui(self, prompt: str) -> str:
         """Execute prompt through same supervisor path used by CLI.
@@ -136,3 +197,49 @@ class LilyTuiApp(App[None]):
             conversation_id=self._conversation_id,
         )
         return result.final_output
+
+    async def stream_prompt_for_ui(self, prompt: str) -> AsyncIterator[str]:
+        """Stream reply tokens for one prompt on the Textual event loop.
+
+        Supervisors without ``astream_prompt`` run the blocking path in a worker
+        thread and yield the whole reply as one token. Streamed prompts can be
+        interrupted with ``cancel_prompt_for_ui``.
+
+        Args:
+            prompt: Prompt text from UI input.
+
+        Yields:
+            Reply tokens in arrival order.
+        """
+        supervisor = self._get_supervisor()
+        if not hasattr(supervisor, "astream_prompt"):
+            yield await asyncio.to_thread(self.run_prompt_for_ui, prompt)
+            return
+        streaming = cast(_StreamingSupervisorProtocol, supervisor)
+        cancellation = RunCancellation()
+        self._cancellation = cancellation
+        try:
+            async for event in streaming.astream_prompt(
+                prompt,
+                conversation_id=self._conversation_id,
+                cancellation=cancellation,
+            ):
+                if event.kind == "token":
+                    yield event.text
+        finally:
+            self._cancellation = None
+
+    def cancel_prompt_for_ui(self) -> bool:
+        """Cancel the prompt currently streaming, if any.
+
+        The reply streamed so far stays in the transcript and the conversation
+        keeps its last checkpoint.
+
+        Returns:
+            True when a streaming prompt was asked to stop.
+        """
+        cancellation = self._cancellation
+        if cancellation is None or cancellation.cancelled:
+            return False
+        cancellation.cancel()
+        return True
@@ -2,18 +2,25 @@
 
 from __future__ import annotations
 
+from typing import ClassVar
+
 from textual import on
 from textual.app import ComposeResult
+from textual.binding import Binding
 from textual.containers import Vertical
 from textual.screen import Screen
 from textual.widgets import Input
 
-from lily.ui.widgets.transcript import TranscriptLog
+from lily.ui.widgets.transcript import StreamingReply, TranscriptLog
 
 
 class ChatScreen(Screen[None]):
     """Single-screen chat UI with transcript and prompt input."""
 
+    BINDINGS: ClassVar[list[Binding | tuple[str, str] | tuple[str, str, str]]] = [
+        ("escape", "cancel_prompt", "Cancel prompt / Quit"),
+    ]
+
     def __init__(self, conversation_id: str | None = None) -> None:
         """Initialize chat screen with optional active conversation id.
 
@@ -22,15 +29,17 @@ class ChatScreen(Screen[None]):
         """
         super().__init__()
         self._conversation_id = conversation_id
+        self._cancel_requested = False
 
     def compose(self) -> ComposeResult:
         """Build screen widget tree.
 
         Yields:
-            Vertical layout containing transcript and input widgets.
+            Vertical layout containing transcript, streaming reply, and input.
         """
         yield Vertical(
             TranscriptLog(id="transcript", wrap=True, highlight=False, markup=False),
+            StreamingReply(id="streaming_reply", markup=False),
             Input(id="prompt_input", placeholder="Ask Lily something..."),
         )
 
@@ -41,7 +50,7 @@ class ChatScreen(Screen[None]):
         transcript = self.query_one("#transcript", TranscriptLog)
         transcript.append_entry(
             "system",
-            "Lily TUI ready. Press Enter to send.",
+            "Lily TUI ready. Press Enter to send, Escape to cancel a reply.",
         )
         if self._conversation_id is not None:
             transcript.append_entry(
@@ -65,6 +74,10 @@ class ChatScreen(Screen[None]):
         transcript.append_entry("you", prompt)
 
         app_runner = self.app
+        if hasattr(app_runner, "stream_prompt_for_ui"):
+            event.input.disabled = True
+            self.run_worker(self._stream_reply(prompt, event.input), group="prompt")
+            return
         if not hasattr(app_runner, "run_prompt_for_ui"):
             transcript.append_entry("error", "App does not implement prompt runner.")
             return
@@ -76,3 +89,47 @@ class ChatScreen(Screen[None]):
             return
 
         transcript.append_entry("lily", response)
+
+    def action_cancel_prompt(self) -> None:
+        """Cancel the streaming reply, or quit when no prompt is running.
+
+        The cancellation is noted in the transcript after the partial reply,
+        once the stream has ended.
+        """
+        app_runner = self.app
+        if (
+            hasattr(app_runner, "cancel_prompt_for_ui")
+            and app_runner.cancel_prompt_for_ui()
+        ):
+            self._cancel_requested = True
+            return
+        app_runner.exit()
+
+    async def _stream_reply(self, prompt: str, prompt_input: Input) -> None:
+        """Stream one reply below the transcript, then append it once.
+
+        The prompt input stays disabled until the reply completes so one
+        conversation never runs two turns at once.
+
+        Args:
+            prompt: Submitted prompt text.
+            prompt_input: Input widget to re-enable once streaming ends.
+        """
+        transcript = self.query_one("#transcript", TranscriptLog)
+        streaming = self.query_one("#streaming_reply", StreamingReply)
+        streaming.begin("lily")
+        error: Exception | None = None
+        try:
+            async for token in self.app.stream_prompt_for_ui(prompt):  # type: ignore[attr-defined]
+                streaming.append(token)
+        except Exception as exc:  # pragma: no cover - defensive UI surface
+            error = exc
+        finally:
+            transcript.append_entry("lily", streaming.finish())
+            if error is not None:
+                transcript.append_entry("error", str(error))
+            if self._cancel_requested:
+                self._cancel_requested = False
+                transcript.append_entry("system", "Prompt cancelled.")
+            prompt_input.disabled = False
+            prompt_input.focus()
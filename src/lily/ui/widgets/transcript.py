@@ -2,7 +2,7 @@
 
 from __future__ import annotations
 
-from textual.widgets import RichLog
+from textual.widgets import RichLog, Static
 
 
 class TranscriptLog(RichLog):
@@ -10,12 +10,15 @@ class TranscriptLog(RichLog):
 
     history: list[str]
 
-    def append_entry(self, speaker: str, message: str) -> None:
+    def append_entry(self, speaker: str, message: str) -> int:
         """Append one transcript line and retain plain-text history.
 
         Args:
             speaker: Label for the message speaker.
             message: Message text to append.
+
+        Returns:
+            History index of the new entry.
         """
         normalized = message.strip()
         rendered = f"[{speaker}] {normalized}"
@@ -23,3 +26,45 @@ class TranscriptLog(RichLog):
             self.history = []
         self.history.append(rendered)
         self.write(rendered)
+        return len(self.history) - 1
+
+
+class StreamingReply(Static):
+    """Reply being streamed, shown below the transcript until it completes.
+
+    Each token re-renders only this widget, so streaming cost does not grow
+    with the transcript; the finished reply is appended to the log once.
+    """
+
+    speaker = ""
+    text = ""
+
+    def begin(self, speaker: str) -> None:
+        """Show an empty reply for ``speaker``.
+
+        Args:
+            speaker: Label for the message speaker.
+        """
+        self.speaker = speaker
+        self.text = ""
+        self.display = True
+        self.update(f"[{speaker}]")
+
+    def append(self, token: str) -> None:
+        """Add one streamed token to the visible reply.
+
+        Args:
+            token: Token text in arrival order.
+        """
+        self.text += token
+        self.update(f"[{self.speaker}] {self.text.strip()}")
+
+    def finish(self) -> str:
+        """Hide the reply and return its full text.
+
+        Returns:
+            Every token received since ``begin``.
+        """
+        self.display = False
+        self.update("")
+        return self.text
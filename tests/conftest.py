@@ -4,15 +4,20 @@ from __future__ import annotations
 
 import os
 import socket
-from collections.abc import Iterator
+from collections.abc import Callable, Iterator
+from pathlib import Path
 
 import pytest
 from langchain_core.language_models import BaseChatModel
 from langchain_core.language_models.fake_chat_models import FakeMessagesListChatModel
 from langchain_core.messages import AIMessage
+from langchain_core.tools import tool
 
-from lily.runtime.config_schema import ModelProfileConfig, ModelProvider
-from lily.runtime.model_factory import ModelBuilder, ModelFactory
+from lily.runtime.agent_runtime import AgentRuntime
+from lily.runtime.config_schema import ModelProfileConfig, ModelProvider, RuntimeConfig
+from lily.runtime.model_factory import ModelBuilder, ModelFactory, ModelPreloader
+
+type FakeRuntimeFactory = Callable[..., AgentRuntime]
 
 _LIVE_PROVIDER_ENV_VARS = (
     "OPENAI_API_KEY",
@@ -130,3 +135,101 @@ def fake_model_factory() -> ModelFactory:
         ModelProvider.OLLAMA: _builder,
     }
     return ModelFactory(builders=builders)
+
+
+class ToolCapableFakeModel(FakeMessagesListChatModel):
+    """Fake model that supports `bind_tools` for LangChain agent tests."""
+
+    def bind_tools(
+        self,
+        _tools: object,
+        *,
+        _tool_choice: object | None = None,
+        **_kwargs: object,
+    ) -> ToolCapableFakeModel:
+        """Return self so create_agent can execute tool-call loop."""
+        return self
+
+
+@tool
+def ping_tool() -> str:
+    """Return pong."""
+    return "pong"
+
+
+@pytest.fixture
+def runtime_config() -> RuntimeConfig:
+    """Return minimal runtime config with routing disabled and `ping_tool`."""
+    profile = {
+        "provider": "openai",
+        "model": "default-model",
+        "temperature": 0.1,
+        "timeout_seconds": 30,
+    }
+    return RuntimeConfig.model_validate(
+        {
+            "schema_version": 1,
+            "agent": {"name": "lily", "system_prompt": "You are Lily."},
+            "models": {
+                "profiles": {"default": profile, "long_context": profile},
+                "routing": {
+                    "enabled": False,
+                    "default_profile": "default",
+                    "long_context_profile": "long_context",
+                    "complexity_threshold": 50,
+                },
+            },
+            "tools": {"allowlist": ["ping_tool"]},
+            "policies": {
+                "max_iterations": 10,
+                "max_model_calls": 10,
+                "max_tool_calls": 10,
+            },
+            "logging": {"level": "INFO"},
+        }
+    )
+
+
+@pytest.fixture
+def make_fake_runtime(
+    tmp_path: Path,
+    runtime_config: RuntimeConfig,
+) -> FakeRuntimeFactory:
+    """Return a factory building runtimes over one shared fake chat model.
+
+    The factory accepts either ``responses`` (wrapped in a tool-capable fake
+    model) or an explicit ``model``, an optional ``config``, optional model
+    ``preloaders`` (none by default), and any extra ``AgentRuntime`` keyword
+    arguments. Checkpoints go to ``tmp_path``.
+    """
+
+    def _make(
+        responses: list[AIMessage] | None = None,
+        *,
+        model: BaseChatModel | None = None,
+        config: RuntimeConfig | None = None,
+        preloaders: dict[ModelProvider, ModelPreloader] | None = None,
+        **kwargs: object,
+    ) -> AgentRuntime:
+        chat_model = model or ToolCapableFakeModel(
+            responses=responses or [AIMessage(content="fake")]
+        )
+
+        def _builder(_profile: ModelProfileConfig) -> BaseChatModel:
+            return chat_model
+
+        kwargs.setdefault("checkpoint_db_path", tmp_path / "checkpoints.sqlite3")
+        return AgentRuntime(
+            config=config or runtime_config,
+            tools=[ping_tool],
+            model_factory=ModelFactory(
+                builders={
+                    ModelProvider.OPENAI: _builder,
+                    ModelProvider.OLLAMA: _builder,
+                },
+                preloaders=preloaders or {},
+            ),
+            **kwargs,
+        )
+
+    return _make
@@ -3,6 +3,8 @@
 from __future__ import annotations
 
 import shutil
+import threading
+from collections.abc import Callable
 from pathlib import Path
 from typing import ClassVar
 from uuid import UUID
@@ -11,12 +13,18 @@ import pytest
 from typer.testing import CliRunner
 
 from lily.cli import app
+from lily.daemon.protocol import DaemonSupervisorKey
+from lily.daemon.server import LilyDaemon, create_daemon_server, write_daemon_token
 from lily.runtime.agent_runtime import AgentRunResult
+from lily.runtime.run_cancellation import RunCancellation
+from lily.runtime.run_timings import ModelCallTiming, RunTimings, ToolCallTiming
 
 pytestmark = pytest.mark.e2e
 
 _REPO_ROOT = Path(__file__).resolve().parents[2]
 _SKILLS_FIXTURE_AGENT = _REPO_ROOT / "tests/fixtures/config/skills_retrieval/agent.toml"
+# `lily run` imports the supervisor lazily, so patch it at its defining module.
+_SUPERVISOR_TARGET = "lily.agents.lily_supervisor.LilySupervisor"
 
 
 def _create_named_agent_workspace(root: Path, name: str) -> Path:
@@ -36,6 +44,7 @@ class _FakeSupervisor:
     """Test double supervisor used to avoid external model calls in e2e tests."""
 
     captured_conversation_ids: ClassVar[list[str | None]] = []
+    captured_timeouts: ClassVar[list[float | None]] = []
 
     @classmethod
     def from_config_paths(
@@ -59,13 +68,48 @@ class _FakeSupervisor:
         self,
         prompt: str,
         conversation_id: str | None = None,
+        *,
+        timeout: float | None = None,
+        cancellation: RunCancellation | None = None,
     ) -> AgentRunResult:
-        """Return deterministic response payload for CLI assertions."""
+        """Return deterministic response payload for CLI assertions.
+
+        A run with a deadline reports ``timed_out``, like one whose model hung.
+        """
+        del cancellation
         self.captured_conversation_ids.append(conversation_id)
+        self.captured_timeouts.append(timeout)
         return AgentRunResult(
-            final_output=f"fake: {prompt}",
+            final_output="" if timeout is not None else f"fake: {prompt}",
             message_count=2,
             conversation_id=conversation_id,
+            status="completed" if timeout is None else "timed_out",
+            timings=RunTimings(
+                total_seconds=1.5,
+                model_calls=(ModelCallTiming(profile="default", seconds=1.25),),
+                tool_calls=(ToolCallTiming(name="echo_tool", seconds=0.125),),
+                checkpoint_put_seconds=0.01,
+                checkpoint_puts=3,
+            ),
+        )
+
+    def run_prompt_stream(
+        self,
+        prompt: str,
+        conversation_id: str | None = None,
+        *,
+        on_token: Callable[[str], None],
+        timeout: float | None = None,
+        cancellation: RunCancellation | None = None,
+    ) -> AgentRunResult:
+        """Emit the deterministic reply word by word before returning it."""
+        for token in ("streamed ", "fake: ", prompt):
+            on_token(token)
+        return self.run_prompt(
+            f"streamed {prompt}",
+            conversation_id,
+            timeout=timeout,
+            cancellation=cancellation,
         )
 
 
@@ -75,7 +119,7 @@ def test_cli_run_command_smoke_with_config(
 ) -> None:
     """Runs CLI command with config and verifies visible output contract."""
     # Arrange - substitute runtime supervisor to avoid real provider calls.
-    monkeypatch.setattr("lily.cli.LilySupervisor", _FakeSupervisor)
+    monkeypatch.setattr(_SUPERVISOR_TARGET, _FakeSupervisor)
     config_file = tmp_path / "agent.yaml"
     config_file.write_text("schema_version: 1\n", encoding="utf-8")
     _FakeSupervisor.captured_conversation_ids = []
@@ -103,13 +147,69 @@ def test_cli_run_command_smoke_with_config(
     assert len(_FakeSupervisor.captured_conversation_ids) == 1
 
 
+def test_cli_run_command_timings_flag_prints_latency_breakdown(
+    monkeypatch: pytest.MonkeyPatch,
+    tmp_path: Path,
+) -> None:
+    """``--timings`` adds model, tool and checkpoint rows to the Run Summary."""
+    # Arrange - fake supervisor returning a fixed latency breakdown.
+    monkeypatch.setattr(_SUPERVISOR_TARGET, _FakeSupervisor)
+    config_file = tmp_path / "agent.yaml"
+    config_file.write_text("schema_version: 1\n", encoding="utf-8")
+    runner = CliRunner()
+
+    # Act - run once with and once without the timings flag.
+    with monkeypatch.context() as context:
+        context.chdir(tmp_path)
+        base_args = ["run", "--config", str(config_file), "--prompt", "hello"]
+        with_timings = runner.invoke(app, [*base_args, "--timings"])
+        without_timings = runner.invoke(app, base_args)
+
+    # Assert - breakdown rows appear only when requested.
+    assert with_timings.exit_code == 0
+    assert "Total time" in with_timings.stdout
+    assert "Model (default)" in with_timings.stdout
+    assert "1.250s in 1 call(s)" in with_timings.stdout
+    assert "Tool (echo_tool)" in with_timings.stdout
+    assert "0.010s in 3 call(s)" in with_timings.stdout
+    assert without_timings.exit_code == 0
+    assert "Total time" not in without_timings.stdout
+
+
+def test_cli_run_command_timeout_reports_interrupted_status(
+    monkeypatch: pytest.MonkeyPatch,
+    tmp_path: Path,
+) -> None:
+    """``--timeout`` reaches the supervisor; a timed-out run shows its status."""
+    # Arrange - fake supervisor that times out whenever a deadline is set.
+    monkeypatch.setattr(_SUPERVISOR_TARGET, _FakeSupervisor)
+    config_file = tmp_path / "agent.yaml"
+    config_file.write_text("schema_version: 1\n", encoding="utf-8")
+    _FakeSupervisor.captured_timeouts = []
+    runner = CliRunner()
+
+    # Act - run once with a two-and-a-half second deadline.
+    with monkeypatch.context() as context:
+        context.chdir(tmp_path)
+        result = runner.invoke(
+            app,
+            ["run", "--config", str(config_file), "--prompt", "hi", "--timeout", "2.5"],
+        )
+
+    # Assert - deadline forwarded and the summary flags the interruption.
+    assert result.exit_code == 0
+    assert _FakeSupervisor.captured_timeouts == [2.5]
+    assert "Status" in result.stdout
+    assert "timed out" in result.stdout
+
+
 def test_cli_run_smoke_with_skills_fixture_config(
     monkeypatch: pytest.MonkeyPatch,
     tmp_path: Path,
 ) -> None:
     """CLI run accepts the checked-in skills fixture config (fake supervisor)."""
     # Arrange - fake supervisor and isolated temp fixture copy.
-    monkeypatch.setattr("lily.cli.LilySupervisor", _FakeSupervisor)
+    monkeypatch.setattr(_SUPERVISOR_TARGET, _FakeSupervisor)
     _FakeSupervisor.captured_conversation_ids = []
     runner = CliRunner()
     fixture_dir = _SKILLS_FIXTURE_AGENT.parent
@@ -148,7 +248,7 @@ def test_cli_run_command_attach_explicit_and_last(
 ) -> None:
     """Supports explicit attach and attach-last resolution modes."""
     # Arrange - patch fake supervisor and isolate cwd session DB.
-    monkeypatch.setattr("lily.cli.LilySupervisor", _FakeSupervisor)
+    monkeypatch.setattr(_SUPERVISOR_TARGET, _FakeSupervisor)
     _FakeSupervisor.captured_conversation_ids = []
     config_file = tmp_path / "agent.yaml"
     config_file.write_text("schema_version: 1\n", encoding="utf-8")
@@ -222,7 +322,7 @@ def test_cli_run_command_rejects_ambiguous_attach_flags(
 ) -> None:
     """Rejects simultaneous explicit and last attach mode flags."""
     # Arrange - patch fake supervisor and isolate cwd session DB.
-    monkeypatch.setattr("lily.cli.LilySupervisor", _FakeSupervisor)
+    monkeypatch.setattr(_SUPERVISOR_TARGET, _FakeSupervisor)
     _FakeSupervisor.captured_conversation_ids = []
     config_file = tmp_path / "agent.yaml"
     config_file.write_text("schema_version: 1\n", encoding="utf-8")
@@ -257,7 +357,7 @@ def test_cli_run_command_defaults_to_named_default_agent(
 ) -> None:
     """Uses `.lily/agents/default` when no --config/--agent is provided."""
     # Arrange - create default agent workspace and patch fake supervisor.
-    monkeypatch.setattr("lily.cli.LilySupervisor", _FakeSupervisor)
+    monkeypatch.setattr(_SUPERVISOR_TARGET, _FakeSupervisor)
     _FakeSupervisor.captured_conversation_ids = []
     _create_named_agent_workspace(tmp_path, "default")
     runner = CliRunner()
@@ -286,7 +386,7 @@ def test_cli_run_command_accepts_named_agent(
 ) -> None:
     """Resolves selected named-agent workspace via --agent flag."""
     # Arrange - create two named-agent workspaces and patch fake supervisor.
-    monkeypatch.setattr("lily.cli.LilySupervisor", _FakeSupervisor)
+    monkeypatch.setattr(_SUPERVISOR_TARGET, _FakeSupervisor)
     _FakeSupervisor.captured_conversation_ids = []
     _create_named_agent_workspace(tmp_path, "default")
     _create_named_agent_workspace(tmp_path, "pepper-potts")
@@ -318,7 +418,7 @@ def test_cli_run_command_rejects_unknown_named_agent(
 ) -> None:
     """Fails deterministically when --agent directory is missing."""
     # Arrange - patch fake supervisor and create only default workspace.
-    monkeypatch.setattr("lily.cli.LilySupervisor", _FakeSupervisor)
+    monkeypatch.setattr(_SUPERVISOR_TARGET, _FakeSupervisor)
     _create_named_agent_workspace(tmp_path, "default")
     runner = CliRunner()
 
@@ -347,7 +447,7 @@ def test_cli_run_command_rejects_ambiguous_agent_and_config_modes(
 ) -> None:
     """Rejects simultaneous --agent and --config runtime modes."""
     # Arrange - patch fake supervisor and create valid local config + workspace.
-    monkeypatch.setattr("lily.cli.LilySupervisor", _FakeSupervisor)
+    monkeypatch.setattr(_SUPERVISOR_TARGET, _FakeSupervisor)
     config_file = tmp_path / "agent.yaml"
     config_file.write_text("schema_version: 1\n", encoding="utf-8")
     _create_named_agent_workspace(tmp_path, "default")
@@ -380,7 +480,7 @@ def test_cli_run_attach_last_is_isolated_per_agent(
 ) -> None:
     """Ensures attach-last resolves within selected agent session scope only."""
     # Arrange - create two named workspaces and patch fake supervisor.
-    monkeypatch.setattr("lily.cli.LilySupervisor", _FakeSupervisor)
+    monkeypatch.setattr(_SUPERVISOR_TARGET, _FakeSupervisor)
     _FakeSupervisor.captured_conversation_ids = []
     _create_named_agent_workspace(tmp_path, "default")
     _create_named_agent_workspace(tmp_path, "pepper-potts")
@@ -427,3 +527,156 @@ def test_cli_run_attach_last_is_isolated_per_agent(
     assert default_last_id == default_seed_id
     assert pepper_last_id == pepper_seed_id
     assert default_seed_id != pepper_seed_id
+
+
+def test_cli_run_command_stream_prints_tokens_then_summary(
+    monkeypatch: pytest.MonkeyPatch,
+    tmp_path: Path,
+) -> None:
+    """`--stream` writes reply tokens directly instead of the final panel."""
+    # Arrange - substitute runtime supervisor to avoid real provider calls.
+    monkeypatch.setattr(_SUPERVISOR_TARGET, _FakeSupervisor)
+    config_file = tmp_path / "agent.yaml"
+    config_file.write_text("schema_version: 1\n", encoding="utf-8")
+    _FakeSupervisor.captured_conversation_ids = []
+    runner = CliRunner()
+
+    # Act - invoke CLI run command in streaming mode.
+    with monkeypatch.context() as context:
+        context.chdir(tmp_path)
+        result = runner.invoke(
+            app,
+            ["run", "--config", str(config_file), "--prompt", "hi", "--stream"],
+        )
+
+    # Assert - streamed text precedes the summary and no reply panel is drawn.
+    head = result.stdout.split("Run Summary")[0]
+    assert result.exit_code == 0
+    assert "streamed fake: hi" in head
+    assert "╭" not in head
+    assert len(_FakeSupervisor.captured_conversation_ids) == 1
+
+
+class _LocalSupervisorForbidden:
+    """Supervisor stand-in that fails if the CLI builds a local runtime."""
+
+    @classmethod
+    def from_config_paths(cls, *_args: object, **_kwargs: object) -> None:
+        """Fail because `--via-daemon` must not build a local supervisor."""
+        raise AssertionError("--via-daemon built a local supervisor")
+
+
+def test_cli_run_via_daemon_uses_warm_daemon_supervisor(
+    monkeypatch: pytest.MonkeyPatch,
+    tmp_path: Path,
+) -> None:
+    """`--via-daemon` sends resolved config paths to the daemon and prints output."""
+    # Arrange - in-process daemon on an ephemeral port with a fake supervisor.
+    monkeypatch.setattr(_SUPERVISOR_TARGET, _LocalSupervisorForbidden)
+    config_file = tmp_path / "agent.yaml"
+    config_file.write_text("schema_version: 1\n", encoding="utf-8")
+    supervisor_key = DaemonSupervisorKey(config_path=str(config_file.resolve()))
+    keys: list[DaemonSupervisorKey] = []
+
+    def _factory(key: DaemonSupervisorKey) -> _FakeSupervisor:
+        keys.append(key)
+        return _FakeSupervisor()
+
+    daemon = LilyDaemon(
+        allowed_keys=[supervisor_key],
+        max_in_flight=1,
+        max_queue=1,
+        supervisor_factory=_factory,  # type: ignore[arg-type]
+    )
+    server = create_daemon_server(daemon, host="127.0.0.1", port=0)
+    write_daemon_token(tmp_path / ".lily" / "daemon.token", server.token)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    _FakeSupervisor.captured_conversation_ids = []
+    runner = CliRunner()
+
+    # Act - run twice through the daemon, once streaming.
+    try:
+        with monkeypatch.context() as context:
+            context.chdir(tmp_path)
+            plain = runner.invoke(
+                app,
+                [
+                    "run",
+                    "--config",
+                    "agent.yaml",
+                    "--prompt",
+                    "hi",
+                    "--via-daemon",
+                    "--daemon-url",
+                    server.url,
+                ],
+            )
+            streamed = runner.invoke(
+                app,
+                [
+                    "run",
+                    "--config",
+                    "agent.yaml",
+                    "--prompt",
+                    "again",
+                    "--stream",
+                    "--via-daemon",
+                    "--daemon-url",
+                    server.url,
+                ],
+            )
+    finally:
+        server.shutdown()
+        server.server_close()
+        thread.join(timeout=5)
+
+    # Assert - one warm supervisor keyed on the absolute config path served both.
+    assert plain.exit_code == 0
+    assert "fake: hi" in plain.stdout
+    assert streamed.exit_code == 0
+    assert "streamed fake: again" in streamed.stdout.split("Run Summary")[0]
+    assert keys == [supervisor_key]
+    assert len(_FakeSupervisor.captured_conversation_ids) == 2
+
+
+def test_cli_run_via_daemon_reports_unreachable_daemon(
+    monkeypatch: pytest.MonkeyPatch,
+    tmp_path: Path,
+) -> None:
+    """`--via-daemon` exits non-zero with a readable error when no daemon runs."""
+    # Arrange - reserve and close one local port.
+    monkeypatch.setattr(_SUPERVISOR_TARGET, _LocalSupervisorForbidden)
+    config_file = tmp_path / "agent.yaml"
+    config_file.write_text("schema_version: 1\n", encoding="utf-8")
+    server = create_daemon_server(
+        LilyDaemon(allowed_keys=[], max_in_flight=1, max_queue=0),
+        host="127.0.0.1",
+        port=0,
+    )
+    url = server.url
+    write_daemon_token(tmp_path / ".lily" / "daemon.token", server.token)
+    server.server_close()
+    runner = CliRunner()
+
+    # Act - run against the closed port.
+    with monkeypatch.context() as context:
+        context.chdir(tmp_path)
+        result = runner.invoke(
+            app,
+            [
+                "run",
+                "--config",
+                str(config_file),
+                "--prompt",
+                "hi",
+                "--via-daemon",
+                "--daemon-url",
+                url,
+            ],
+        )
+
+    # Assert - CLI renders the daemon error panel.
+    assert result.exit_code == 1
+    assert "Lily Error" in result.stdout
+    assert "not reachable" in result.stdout
@@ -0,0 +1,100 @@
+"""Import-time regression tests for the Lily CLI entry points."""
+
+from __future__ import annotations
+
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+pytestmark = pytest.mark.e2e
+
+_SRC_ROOT = Path(__file__).resolve().parents[2] / "src"
+_AGENT_STACK_PACKAGES = (
+    "textual",
+    "langchain",
+    "langchain_core",
+    "langgraph",
+    "langchain_mcp_adapters",
+    "langchain_openai",
+    "langchain_ollama",
+    "openai",
+    "ollama",
+    "tiktoken",
+)
+
+
+def _import_times(module: str) -> dict[str, float]:
+    """Import one module in a fresh interpreter under ``-X importtime``.
+
+    Args:
+        module: Dotted module path to import.
+
+    Returns:
+        Mapping of imported module name to cumulative import seconds.
+    """
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(
+        path for path in (str(_SRC_ROOT), env.get("PYTHONPATH", "")) if path
+    )
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        check=True,
+        env=env,
+        text=True,
+    )
+    times: dict[str, float] = {}
+    for line in completed.stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        _, cumulative, name = line.removeprefix("import time:").split("|")
+        if cumulative.strip().isdigit():
+            times[name.strip()] = int(cumulative) / 1_000_000
+    return times
+
+
+def _agent_stack_modules(times: dict[str, float]) -> list[str]:
+    """Return imported modules that belong to the heavy agent stack.
+
+    Args:
+        times: Import-time mapping from ``_import_times``.
+
+    Returns:
+        Sorted agent-stack module names that were imported.
+    """
+    return sorted(
+        name
+        for name in times
+        if any(
+            name == package or name.startswith(f"{package}.")
+            for package in _AGENT_STACK_PACKAGES
+        )
+    )
+
+
+def test_cli_import_skips_agent_stack() -> None:
+    """`import lily.cli` loads neither Textual, LangChain nor MCP adapters."""
+    # Arrange - measure the CLI entry module in a fresh interpreter.
+    module = "lily.cli"
+
+    # Act - collect the modules a cold start imports.
+    times = _import_times(module)
+
+    # Assert - the CLI loaded, and no heavy agent-stack package with it.
+    assert module in times
+    assert _agent_stack_modules(times) == []
+
+
+def test_tool_resolvers_import_skips_mcp_adapters() -> None:
+    """Tool resolvers import MCP adapters only when a real server is built."""
+    # Arrange - measure the resolver module in a fresh interpreter.
+    module = "lily.runtime.tool_resolvers"
+
+    # Act - collect imported module names.
+    times = _import_times(module)
+
+    # Assert - no MCP adapter module was imported.
+    assert not any(name.startswith("langchain_mcp_adapters") for name in times)
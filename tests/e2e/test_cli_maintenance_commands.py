@@ -0,0 +1,115 @@
+"""End-to-end tests for ``lily maintenance`` CLI commands."""
+
+from __future__ import annotations
+
+import sqlite3
+from contextlib import closing
+from pathlib import Path
+
+import pytest
+from langgraph.checkpoint.base.id import uuid6
+from typer.testing import CliRunner
+
+from lily.cli import app
+from lily.runtime.conversation_sessions import (
+    ConversationSessionStore,
+    default_sessions_db_path,
+)
+
+pytestmark = pytest.mark.e2e
+
+
+def _write_checkpoints(db_path: Path, thread_id: str, count: int) -> None:
+    """Create a LangGraph-shaped checkpoint database with one thread."""
+    with closing(sqlite3.connect(db_path)) as conn:
+        conn.executescript(
+            """
+            CREATE TABLE checkpoints (
+                thread_id TEXT NOT NULL,
+                checkpoint_ns TEXT NOT NULL DEFAULT '',
+                checkpoint_id TEXT NOT NULL,
+                parent_checkpoint_id TEXT,
+                type TEXT,
+                checkpoint BLOB,
+                metadata BLOB,
+                PRIMARY KEY (thread_id, checkpoint_ns, checkpoint_id)
+            );
+            CREATE TABLE writes (
+                thread_id TEXT NOT NULL,
+                checkpoint_ns TEXT NOT NULL DEFAULT '',
+                checkpoint_id TEXT NOT NULL,
+                task_id TEXT NOT NULL,
+                task_path TEXT NOT NULL DEFAULT '',
+                idx INTEGER NOT NULL,
+                channel TEXT NOT NULL,
+                type TEXT,
+                value BLOB,
+                PRIMARY KEY (thread_id, checkpoint_ns, checkpoint_id, task_id, idx)
+            );
+            """
+        )
+        conn.executemany(
+            "INSERT INTO checkpoints(thread_id, checkpoint_id) VALUES(?, ?)",
+            [(thread_id, str(uuid6())) for _ in range(count)],
+        )
+        conn.commit()
+
+
+def test_cli_maintenance_compact_trims_live_thread(tmp_path: Path) -> None:
+    """Compact keeps the newest checkpoints of a session-backed thread."""
+    # Arrange - one live conversation with four checkpoints.
+    conversation_id = ConversationSessionStore(
+        default_sessions_db_path(tmp_path)
+    ).start_new()
+    checkpoint_db = tmp_path / ".lily" / "runtime-checkpoints.sqlite3"
+    _write_checkpoints(checkpoint_db, conversation_id, count=4)
+    runner = CliRunner()
+
+    # Act - compact the workspace database down to one checkpoint per thread.
+    result = runner.invoke(
+        app,
+        [
+            "maintenance",
+            "compact",
+            "--checkpoint-db",
+            str(checkpoint_db),
+            "--workspace",
+            str(tmp_path),
+            "--keep-last",
+            "1",
+        ],
+    )
+
+    # Assert - summary is printed and three checkpoints were removed.
+    assert result.exit_code == 0
+    assert "Checkpoint Compaction" in result.stdout
+    with closing(sqlite3.connect(checkpoint_db)) as conn:
+        remaining = conn.execute(
+            "SELECT thread_id, COUNT(*) FROM checkpoints GROUP BY thread_id"
+        ).fetchall()
+    assert remaining == [(conversation_id, 1)]
+
+
+def test_cli_maintenance_compact_reports_invalid_config(tmp_path: Path) -> None:
+    """Compact exits 1 when the policy config cannot be loaded."""
+    # Arrange - a config file that fails schema validation.
+    config = tmp_path / "agent.toml"
+    config.write_text("schema_version = 1\n", encoding="utf-8")
+    runner = CliRunner()
+
+    # Act - compact using the invalid config for policy defaults.
+    result = runner.invoke(
+        app,
+        [
+            "maintenance",
+            "compact",
+            "--checkpoint-db",
+            str(tmp_path / "missing.sqlite3"),
+            "--config",
+            str(config),
+        ],
+    )
+
+    # Assert - error panel and failing exit code.
+    assert result.exit_code == 1
+    assert "Lily Error" in result.stdout
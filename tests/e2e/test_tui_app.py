@@ -3,6 +3,8 @@
 
 from __future__ import annotations
 
+import asyncio
+from collections.abc import AsyncIterator
 from pathlib import Path
 from typing import ClassVar
 
@@ -12,9 +14,10 @@ from textual.widgets import Input
 from typer.testing import CliRunner
 
 from lily.cli import app
-from lily.runtime.agent_runtime import AgentRunResult
+from lily.runtime.agent_runtime import AgentRunResult, AgentStreamEvent
+from lily.runtime.run_cancellation import RunCancellation, interruptible
 from lily.ui.app import LilyTuiApp
-from lily.ui.widgets.transcript import TranscriptLog
+from lily.ui.widgets.transcript import StreamingReply, TranscriptLog
 
 pytestmark = pytest.mark.e2e
 
@@ -43,6 +46,35 @@ class _FakeSupervisor:
         )
 
 
+class _FakeStreamingSupervisor(_FakeSupervisor):
+    """Test double supervisor streaming its reply token by token."""
+
+    async def astream_prompt(
+        self,
+        prompt: str,
+        conversation_id: str | None = None,
+        *,
+        cancellation: RunCancellation | None = None,
+    ) -> AsyncIterator[AgentStreamEvent]:
+        """Yield deterministic tokens and a final result event.
+
+        Args:
+            prompt: Prompt text entered in TUI.
+            conversation_id: Optional active conversation id for runtime thread.
+            cancellation: Cancellation handle passed by the TUI (unused by fake).
+
+        Yields:
+            Token events followed by one result event.
+        """
+        del cancellation
+        for token in ("streamed ", "fake: ", prompt):
+            yield AgentStreamEvent(kind="token", text=token)
+        yield AgentStreamEvent(
+            kind="result",
+            result=self.run_prompt(f"streamed {prompt}", conversation_id),
+        )
+
+
 def _fake_supervisor_factory(
     config_path: Path,
     override_config_path: Path | None,
@@ -87,6 +119,7 @@ def test_textual_tui_startup_and_prompt_cycle(tmp_path: Path) -> None:
             await pilot.click("#prompt_input")
             pilot.app.screen.query_one("#prompt_input", Input).value = "hello tui"
             await pilot.press("enter")
+            await pilot.app.workers.wait_for_complete()
             await pilot.pause()
             transcript = pilot.app.screen.query_one("#transcript", TranscriptLog)
             return list(transcript.history)
@@ -100,11 +133,193 @@ def test_textual_tui_startup_and_prompt_cycle(tmp_path: Path) -> None:
     assert any(line == "[lily] fake: hello tui" for line in history)
 
 
+def test_textual_tui_streams_reply_into_one_transcript_entry(tmp_path: Path) -> None:
+    """Streamed tokens render apart from the log, then land in one entry.
+
+    Args:
+        tmp_path: Temporary path fixture for isolated config file.
+    """
+    # Arrange - create app whose supervisor streams three tokens.
+    config_file = tmp_path / "agent.yaml"
+    config_file.write_text("schema_version: 1\n", encoding="utf-8")
+    app = LilyTuiApp(
+        config_path=config_file,
+        conversation_id="conv-tui-stream",
+        supervisor_factory=lambda *_args: _FakeStreamingSupervisor(),
+    )
+
+    async def _exercise_ui() -> tuple[list[str], bool, bool]:
+        """Submit one prompt and wait for the streaming worker to finish."""
+        # Act - submit prompt and let the reply stream complete.
+        async with app.run_test() as pilot:
+            await pilot.pause()
+            prompt_input = pilot.app.screen.query_one("#prompt_input", Input)
+            prompt_input.value = "hello stream"
+            await pilot.press("enter")
+            await pilot.app.workers.wait_for_complete()
+            await pilot.pause()
+            transcript = pilot.app.screen.query_one("#transcript", TranscriptLog)
+            streaming = pilot.app.screen.query_one("#streaming_reply", StreamingReply)
+            return list(transcript.history), prompt_input.disabled, streaming.display
+
+    history, input_disabled, streaming_shown = anyio.run(_exercise_ui)
+
+    # Assert - exactly one assistant entry with the full streamed reply.
+    lily_lines = [line for line in history if line.startswith("[lily]")]
+    assert lily_lines == ["[lily] streamed fake: hello stream"]
+    assert history[-1] == "[lily] streamed fake: hello stream"
+    assert not input_disabled
+    assert not streaming_shown
+
+
+class _HangingStreamingSupervisor(_FakeSupervisor):
+    """Streaming supervisor double that hangs after its first token."""
+
+    def __init__(self) -> None:
+        """Initialize the first-token signal."""
+        self.first_token = asyncio.Event()
+
+    async def astream_prompt(
+        self,
+        prompt: str,
+        conversation_id: str | None = None,
+        *,
+        cancellation: RunCancellation | None = None,
+    ) -> AsyncIterator[AgentStreamEvent]:
+        """Stream one token, then wait until the handle interrupts the run.
+
+        Args:
+            prompt: Prompt text entered in TUI.
+            conversation_id: Optional active conversation id for runtime thread.
+            cancellation: Cancellation handle passed by the TUI.
+
+        Yields:
+            One token event, then one result event with the interruption status.
+        """
+        async with interruptible(None, cancellation) as outcome:
+            yield AgentStreamEvent(kind="token", text=f"partial {prompt}")
+            self.first_token.set()
+            await asyncio.Event().wait()
+        yield AgentStreamEvent(
+            kind="result",
+            result=AgentRunResult(
+                final_output=f"partial {prompt}",
+                message_count=1,
+                conversation_id=conversation_id,
+                status=outcome.status,
+            ),
+        )
+
+
+def test_textual_tui_escape_cancels_streaming_reply(tmp_path: Path) -> None:
+    """Escape stops a hung reply, keeps its partial text, and re-enables input.
+
+    Args:
+        tmp_path: Temporary path fixture for isolated config file.
+    """
+    # Arrange - app whose supervisor never finishes on its own.
+    config_file = tmp_path / "agent.yaml"
+    config_file.write_text("schema_version: 1\n", encoding="utf-8")
+    supervisor = _HangingStreamingSupervisor()
+    app = LilyTuiApp(
+        config_path=config_file,
+        supervisor_factory=lambda *_args: supervisor,
+    )
+
+    async def _exercise_ui() -> tuple[list[str], bool, bool]:
+        """Submit one prompt, press escape once it hangs, then inspect the UI."""
+        # Act - cancel the streaming prompt with the escape key.
+        async with app.run_test() as pilot:
+            await pilot.pause()
+            prompt_input = pilot.app.screen.query_one("#prompt_input", Input)
+            prompt_input.value = "hang"
+            await pilot.press("enter")
+            await asyncio.wait_for(supervisor.first_token.wait(), timeout=5)
+            await pilot.press("escape")
+            await pilot.app.workers.wait_for_complete()
+            await pilot.pause()
+            transcript = pilot.app.screen.query_one("#transcript", TranscriptLog)
+            return list(transcript.history), prompt_input.disabled, pilot.app.is_running
+
+    history, input_disabled, still_running = anyio.run(_exercise_ui)
+
+    # Assert - partial reply kept, cancellation noted, app still usable.
+    assert "[lily] partial hang" in history
+    assert history[-1] == "[system] Prompt cancelled."
+    assert not input_disabled
+    assert still_running
+
+
+class _WarmableStreamingSupervisor(_FakeStreamingSupervisor):
+    """Streaming supervisor double that records warm-up calls."""
+
+    def __init__(self) -> None:
+        """Initialize warm-up call log."""
+        self.warmups: list[bool] = []
+
+    async def awarmup(self, *, preload_models: bool = False) -> None:
+        """Record one warm-up request.
+
+        Args:
+            preload_models: Whether model preloading was requested.
+        """
+        self.warmups.append(preload_models)
+
+
+def test_textual_tui_warmup_builds_supervisor_before_first_prompt(
+    tmp_path: Path,
+) -> None:
+    """With warm-up on, the supervisor is built and warmed at mount.
+
+    Args:
+        tmp_path: Temporary path fixture for isolated config file.
+    """
+    # Arrange - app with preload enabled over a counting supervisor factory.
+    config_file = tmp_path / "agent.yaml"
+    config_file.write_text("schema_version: 1\n", encoding="utf-8")
+    supervisor = _WarmableStreamingSupervisor()
+    factory_calls: list[Path] = []
+
+    def _factory(config_path: Path, *_args: object) -> _WarmableStreamingSupervisor:
+        factory_calls.append(config_path)
+        return supervisor
+
+    app = LilyTuiApp(
+        config_path=config_file,
+        supervisor_factory=_factory,
+        preload_models=True,
+    )
+
+    async def _exercise_ui() -> tuple[list[bool], int, list[str]]:
+        """Mount the app, wait for warm-up, then submit one prompt."""
+        # Act - let the warm-up worker finish before prompting.
+        async with app.run_test() as pilot:
+            await pilot.app.workers.wait_for_complete()
+            warmups_at_mount = list(supervisor.warmups)
+            builds_at_mount = len(factory_calls)
+            prompt_input = pilot.app.screen.query_one("#prompt_input", Input)
+            prompt_input.value = "after warmup"
+            await pilot.press("enter")
+            await pilot.app.workers.wait_for_complete()
+            await pilot.pause()
+            transcript = pilot.app.screen.query_one("#transcript", TranscriptLog)
+            return warmups_at_mount, builds_at_mount, list(transcript.history)
+
+    warmups, builds, history = anyio.run(_exercise_ui)
+
+    # Assert - one build and one preloading warm-up ran before the prompt.
+    assert warmups == [True]
+    assert builds == 1
+    assert len(factory_calls) == 1
+    assert history[-1] == "[lily] streamed fake: after warmup"
+
+
 class _FakeTuiApp:
     """Fake TUI app class used to validate CLI tui command wiring."""
 
     created_conversation_ids: ClassVar[list[str | None]] = []
     created_config_paths: ClassVar[list[Path]] = []
+    created_warmup_flags: ClassVar[list[tuple[bool, bool]]] = []
 
     def __init__(
         self,
@@ -114,6 +329,8 @@ class _FakeTuiApp:
         supervisor_factory: object | None = None,
         skill_telemetry_echo: bool = False,
         agent_workspace_dir: Path | None = None,
+        warmup: bool = False,
+        preload_models: bool = False,
     ) -> None:
         """Capture constructor arguments for assertions."""
         _ = (
@@ -122,6 +339,7 @@ class _FakeTuiApp:
             skill_telemetry_echo,
             agent_workspace_dir,
         )
+        self.created_warmup_flags.append((warmup, preload_models))
         self._conversation_id = conversation_id
         self.created_conversation_ids.append(conversation_id)
         self.created_config_paths.append(config_path)
@@ -136,7 +354,7 @@ def test_cli_tui_command_supports_default_explicit_and_last_attach(
 ) -> None:
     """Verifies attach-mode resolution and exit output for `lily tui`."""
     # Arrange - patch TUI app class and isolate cwd for session DB.
-    monkeypatch.setattr("lily.cli.LilyTuiApp", _FakeTuiApp)
+    monkeypatch.setattr("lily.ui.app.LilyTuiApp", _FakeTuiApp)
     _FakeTuiApp.created_conversation_ids = []
     _FakeTuiApp.created_config_paths = []
     config_file = tmp_path / "agent.yaml"
@@ -200,11 +418,12 @@ def test_cli_tui_command_accepts_named_agent_without_config(
     monkeypatch: pytest.MonkeyPatch,
     tmp_path: Path,
 ) -> None:
-    """Resolves `.lily/agents/<name>` config path for --agent mode."""
+    """Resolves `.lily/agents/<name>` config path and passes --warmup through."""
     # Arrange - patch fake TUI app and create named-agent workspace.
-    monkeypatch.setattr("lily.cli.LilyTuiApp", _FakeTuiApp)
+    monkeypatch.setattr("lily.ui.app.LilyTuiApp", _FakeTuiApp)
     _FakeTuiApp.created_conversation_ids = []
     _FakeTuiApp.created_config_paths = []
+    _FakeTuiApp.created_warmup_flags = []
     agent_dir = tmp_path / ".lily" / "agents" / "pepper-potts"
     agent_dir.mkdir(parents=True)
     (agent_dir / "agent.toml").write_text("schema_version = 1\n", encoding="utf-8")
@@ -220,11 +439,12 @@ def test_cli_tui_command_accepts_named_agent_without_config(
         context.chdir(tmp_path)
         result = runner.invoke(
             app,
-            ["tui", "--agent", "pepper-potts"],
+            ["tui", "--agent", "pepper-potts", "--warmup"],
         )
 
     # Assert - resolved config path points at selected agent workspace.
     assert result.exit_code == 0
+    assert _FakeTuiApp.created_warmup_flags == [(True, False)]
     assert len(_FakeTuiApp.created_config_paths) == 1
     assert (
         _FakeTuiApp.created_config_paths[0]
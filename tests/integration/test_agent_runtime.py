@@ -2,19 +2,24 @@
 
 from __future__ import annotations
 
+import asyncio
+import threading
 from contextlib import closing
 from pathlib import Path
 
+import aiosqlite
 import pytest
+from langchain.agents import create_agent
 from langchain_core.language_models import BaseChatModel
 from langchain_core.language_models.fake_chat_models import FakeMessagesListChatModel
 from langchain_core.messages import AIMessage
 from langchain_core.tools import tool
 
-from lily.runtime.agent_identity_injection_middleware import (
-    SystemPromptAgentIdentityMiddleware,
+from lily.runtime.agent_runtime import (
+    AgentRunResult,
+    AgentRuntime,
+    AgentRuntimeError,
 )
-from lily.runtime.agent_runtime import AgentRuntime
 from lily.runtime.config_schema import (
     ConversationCompressionConfig,
     ConversationCompressionKeepConfig,
@@ -25,10 +30,9 @@ from lily.runtime.config_schema import (
     SkillsConfig,
 )
 from lily.runtime.model_factory import ModelBuilder, ModelFactory
-from lily.runtime.skill_catalog_injection_middleware import (
-    SystemPromptSkillCatalogMiddleware,
-)
 from lily.runtime.skill_loader import build_skill_bundle
+from lily.runtime.skill_retrieve_tool import skill_retrieve
+from lily.runtime.system_prompt_prefix import SystemPromptPrefixMiddleware
 from lily.runtime.tool_registry import ToolRegistryError
 
 pytestmark = pytest.mark.integration
@@ -88,6 +92,44 @@ class _SpyAsyncInvokableAgent:
         return {"messages": [AIMessage(content="ASYNC-SPY")]}
 
 
+class _LoopCapturingAgent:
+    """Async spy agent recording the thread each invoke ran on."""
+
+    def __init__(self) -> None:
+        """Initialize empty capture fields."""
+        self.thread_ids: list[int] = []
+        self.thread_configs: list[object] = []
+
+    async def ainvoke(
+        self,
+        request: dict[str, object],
+        *,
+        config: dict[str, object],
+    ) -> dict[str, object]:
+        """Capture invoke thread and echo the prompt back."""
+        self.thread_ids.append(threading.get_ident())
+        self.thread_configs.append(config["configurable"])
+        await asyncio.sleep(0)
+        messages = request["messages"]
+        assert isinstance(messages, list)
+        return {"messages": [AIMessage(content=f"echo:{messages[0]['content']}")]}
+
+
+class _SkillRetrievingSyncAgent:
+    """Sync-only spy agent that calls ``skill_retrieve`` inside ``invoke``."""
+
+    def invoke(
+        self,
+        request: dict[str, object],
+        *,
+        config: dict[str, object],
+    ) -> dict[str, object]:
+        """Retrieve one skill through the bound loader and return its body."""
+        _ = (request, config)
+        body = skill_retrieve.invoke({"name": "listed-skill"})
+        return {"messages": [AIMessage(content=str(body))]}
+
+
 def _runtime_config(
     *,
     allowlist: list[str],
@@ -538,9 +580,12 @@ def test_agent_runtime_skill_catalog_injection_uses_middleware(
 
     middleware_list = captured.get("middleware")
     assert isinstance(middleware_list, list)
-    assert any(
-        isinstance(m, SystemPromptSkillCatalogMiddleware) for m in middleware_list
-    )
+    [prefix_stage] = [
+        m for m in middleware_list if isinstance(m, SystemPromptPrefixMiddleware)
+    ]
+    prefix_text = str(prefix_stage.prefix.message.content)
+    assert prefix_text.startswith("You are Lily.")
+    assert "listed-skill" in prefix_text
     assert result.final_output == "SPY"
 
 
@@ -584,12 +629,229 @@ def test_agent_runtime_identity_context_injection_uses_middleware() -> None:
     with closing(runtime):
         result = runtime.run("hello")
 
-    # Assert - base prompt remains stable and identity middleware is registered.
+    # Assert - base prompt remains stable; identity follows it in the prefix.
     assert captured.get("system_prompt") is not None
     assert "You are Lily." in str(captured["system_prompt"])
+    assert "Pepper Potts" not in str(captured["system_prompt"])
     middleware_list = captured.get("middleware")
     assert isinstance(middleware_list, list)
-    assert any(
-        isinstance(m, SystemPromptAgentIdentityMiddleware) for m in middleware_list
+    [prefix_stage] = [
+        m for m in middleware_list if isinstance(m, SystemPromptPrefixMiddleware)
+    ]
+    assert prefix_stage.prefix.message.content == (
+        "You are Lily.\n\n## Agent identity context\n\n"
+        "### IDENTITY.md\nName: Pepper Potts\n"
     )
     assert result.final_output == "SPY"
+
+
+def _fake_runtime(
+    tmp_path: Path,
+    responses: list[AIMessage],
+    **kwargs: object,
+) -> AgentRuntime:
+    """Build a runtime over one shared tool-capable fake model."""
+
+    @tool
+    def ping_tool() -> str:
+        """Return pong."""
+        return "pong"
+
+    fake_model = ToolCapableFakeModel(responses=responses)
+    return AgentRuntime(
+        config=_runtime_config(allowlist=["ping_tool"], routing_enabled=False),
+        tools=[ping_tool],
+        model_factory=_model_factory(
+            {"default-model": fake_model, "long-model": fake_model}
+        ),
+        checkpoint_db_path=tmp_path / "checkpoints.sqlite3",
+        **kwargs,
+    )
+
+
+def test_agent_runtime_arun_awaits_agent_on_caller_loop(tmp_path: Path) -> None:
+    """`arun` invokes the agent on the caller's loop, not a background thread."""
+    # Arrange - runtime with loop-capturing spy agent.
+    spy_agent = _LoopCapturingAgent()
+    runtime = _fake_runtime(
+        tmp_path,
+        [AIMessage(content="ignored")],
+        agent_builder=lambda **_kwargs: spy_agent,
+    )
+
+    async def _exercise() -> tuple[int, list[str]]:
+        caller_thread = threading.get_ident()
+        results = await asyncio.gather(
+            runtime.arun("one", conversation_id="conv-1"),
+            runtime.arun("two", conversation_id="conv-2"),
+        )
+        await runtime.aclose()
+        return caller_thread, [result.final_output for result in results]
+
+    # Act - run two concurrent prompts from one event loop.
+    caller_thread, outputs = asyncio.run(_exercise())
+
+    # Assert - both invokes ran on the caller thread with distinct thread ids.
+    assert outputs == ["echo:one", "echo:two"]
+    assert spy_agent.thread_ids == [caller_thread, caller_thread]
+    assert spy_agent.thread_configs == [
+        {"thread_id": "conv-1"},
+        {"thread_id": "conv-2"},
+    ]
+
+
+def test_agent_runtime_concurrent_first_arun_builds_one_agent_and_connection(
+    monkeypatch: pytest.MonkeyPatch,
+    tmp_path: Path,
+) -> None:
+    """Concurrent first calls share one checkpointer connection and one graph."""
+    # Arrange - count connection opens and agent builds on the real agent path.
+    connect_calls: list[str] = []
+    original_connect = aiosqlite.connect
+
+    def _counting_connect(database: str) -> aiosqlite.Connection:
+        connect_calls.append(database)
+        return original_connect(database)
+
+    monkeypatch.setattr(aiosqlite, "connect", _counting_connect)
+    build_calls: list[object] = []
+
+    def _counting_builder(**kwargs: object) -> object:
+        build_calls.append(kwargs["checkpointer"])
+        return create_agent(**kwargs)
+
+    runtime = _fake_runtime(
+        tmp_path,
+        [AIMessage(content="OK")],
+        agent_builder=_counting_builder,
+    )
+
+    async def _exercise() -> list[int]:
+        results = await asyncio.gather(
+            *(runtime.arun("hi", conversation_id=f"conv-{i}") for i in range(8))
+        )
+        await runtime.aclose()
+        return [result.message_count for result in results]
+
+    # Act - fire eight first-turn prompts at once on a fresh runtime.
+    message_counts = asyncio.run(_exercise())
+
+    # Assert - every turn completed against a single shared build.
+    assert message_counts == [2] * 8
+    assert len(connect_calls) == 1
+    assert len(build_calls) == 1
+
+
+def test_agent_runtime_repeated_asyncio_run_rebinds_and_resumes(
+    tmp_path: Path,
+) -> None:
+    """Each new `asyncio.run` rebuilds resources while keeping checkpoint history."""
+    # Arrange - fake runtime with on-disk checkpoint database.
+    runtime = _fake_runtime(
+        tmp_path,
+        [AIMessage(content="FIRST"), AIMessage(content="SECOND")],
+    )
+
+    async def _turn(prompt: str, *, close: bool) -> tuple[str, int]:
+        result = await runtime.arun(prompt, conversation_id="conv-loops")
+        if close:
+            await runtime.aclose()
+        return result.final_output, result.message_count
+
+    # Act - run two turns on two separate event loops.
+    first = asyncio.run(_turn("my name is Jeff", close=False))
+    second = asyncio.run(_turn("what is my name", close=True))
+
+    # Assert - the second loop sees history persisted by the first.
+    assert first == ("FIRST", 2)
+    assert second == ("SECOND", 4)
+
+
+def test_agent_runtime_run_after_arun_rebinds_to_owned_loop(tmp_path: Path) -> None:
+    """Sync `run` works after `arun` finished on a caller loop."""
+    # Arrange - fake runtime with on-disk checkpoint database.
+    runtime = _fake_runtime(
+        tmp_path,
+        [AIMessage(content="ASYNC"), AIMessage(content="SYNC")],
+    )
+
+    # Act - first turn on a caller loop, second through the blocking wrapper.
+    first = asyncio.run(runtime.arun("one", conversation_id="conv-mixed"))
+    with closing(runtime):
+        second = runtime.run("two", conversation_id="conv-mixed")
+
+    # Assert - both turns completed on the same persisted thread.
+    assert first.final_output == "ASYNC"
+    assert second.final_output == "SYNC"
+    assert second.message_count > first.message_count
+
+
+def test_agent_runtime_arun_rejects_switch_while_owned_loop_runs(
+    tmp_path: Path,
+) -> None:
+    """`arun` on a new loop fails fast while `run` still owns the resources."""
+    # Arrange - bind runtime resources to the runtime-owned loop via `run`.
+    runtime = _fake_runtime(
+        tmp_path,
+        [AIMessage(content="SYNC"), AIMessage(content="ASYNC")],
+    )
+    first = runtime.run("one", conversation_id="conv-switch")
+
+    # Act - switch to a caller loop, then again after closing the runtime.
+    with pytest.raises(AgentRuntimeError) as err:
+        asyncio.run(runtime.arun("two", conversation_id="conv-switch"))
+    runtime.close()
+
+    async def _after_close() -> str:
+        result = await runtime.arun("two", conversation_id="conv-switch")
+        await runtime.aclose()
+        return result.final_output
+
+    after_close = asyncio.run(_after_close())
+
+    # Assert - switch is rejected until close() releases the owned loop.
+    assert first.final_output == "SYNC"
+    assert "another running event loop" in str(err.value)
+    assert after_close == "ASYNC"
+
+
+def test_agent_runtime_sync_only_agent_sees_skill_context_in_run_and_arun(
+    tmp_path: Path,
+) -> None:
+    """Sync-only builders keep skill loader and trace context in both entrypoints."""
+    # Arrange - skill bundle with one listed skill and a sync-only spy agent.
+    skills_root = tmp_path / "skills"
+    pkg = skills_root / "pkg"
+    pkg.mkdir(parents=True)
+    (pkg / "SKILL.md").write_text(
+        '---\nname: listed-skill\ndescription: "Listed."\n---\n# Skill body\n',
+        encoding="utf-8",
+    )
+    cfg = SkillsConfig(
+        enabled=True,
+        roots={"repository": [str(skills_root.relative_to(tmp_path))]},
+        scopes_precedence=["repository", "user", "system"],
+    )
+    bundle = build_skill_bundle(cfg, tmp_path)
+    runtime = _fake_runtime(
+        tmp_path,
+        [AIMessage(content="ignored")],
+        agent_builder=lambda **_kwargs: _SkillRetrievingSyncAgent(),
+        skill_bundle=bundle,
+    )
+
+    # Act - run once through the sync wrapper and once on a caller loop.
+    with closing(runtime):
+        sync_result = runtime.run("hello")
+
+    async def _arun_and_close() -> AgentRunResult:
+        result = await runtime.arun("hello")
+        await runtime.aclose()
+        return result
+
+    async_result = asyncio.run(_arun_and_close())
+
+    # Assert - invoke saw the bound loader and recorded one trace entry each time.
+    for result in (sync_result, async_result):
+        assert "Skill body" in result.final_output
+        assert [entry.outcome for entry in result.skill_trace.retrievals] == ["success"]
@@ -0,0 +1,292 @@
+"""Integration tests for per-run and per-conversation resource budgets."""
+
+from __future__ import annotations
+
+import asyncio
+import time
+from collections.abc import Callable
+from contextlib import closing
+
+import pytest
+from langchain_core.callbacks import AsyncCallbackManagerForLLMRun
+from langchain_core.language_models.fake_chat_models import FakeMessagesListChatModel
+from langchain_core.messages import AIMessage, BaseMessage
+from langchain_core.outputs import ChatResult
+
+from lily.runtime.agent_runtime import AgentRuntime
+from lily.runtime.config_schema import (
+    ConversationCompressionConfig,
+    ConversationCompressionKeepConfig,
+    ConversationCompressionTriggerConfig,
+    ModelPricingConfig,
+    ResourceBudgetsConfig,
+    RuntimeConfig,
+)
+
+pytestmark = pytest.mark.integration
+
+
+def _budgeted_config(runtime_config: RuntimeConfig) -> RuntimeConfig:
+    """Return config pricing the default profile and limiting spend."""
+    raw = runtime_config.model_dump(mode="json")
+    raw["policies"]["max_iterations"] = 25
+    raw["models"]["profiles"]["default"]["pricing"] = ModelPricingConfig(
+        input_per_million_tokens=2.0, output_per_million_tokens=10.0
+    ).model_dump()
+    raw["policies"]["budgets"] = ResourceBudgetsConfig.model_validate(
+        {
+            "run": {"output_tokens": 15, "wall_clock_seconds": 60},
+            "conversation": {"input_tokens": 1000},
+        }
+    ).model_dump()
+    return RuntimeConfig.model_validate(raw)
+
+
+def test_agent_runtime_budget_stops_run_and_tracks_conversation_spend(
+    make_fake_runtime: Callable[..., AgentRuntime],
+    runtime_config: RuntimeConfig,
+) -> None:
+    """An exhausted run budget ends the run; conversation spend persists."""
+    # Arrange - every reply reports 100 input / 10 output tokens.
+    usage = {"input_tokens": 100, "output_tokens": 10, "total_tokens": 110}
+    call = {"name": "ping_tool", "args": {}, "type": "tool_call"}
+    runtime = make_fake_runtime(
+        [
+            AIMessage(
+                content="", tool_calls=[{**call, "id": "c1"}], usage_metadata=usage
+            ),
+            AIMessage(
+                content="", tool_calls=[{**call, "id": "c2"}], usage_metadata=usage
+            ),
+            AIMessage(content="done", usage_metadata=usage),
+        ],
+        config=_budgeted_config(runtime_config),
+    )
+
+    # Act - a tool loop that overruns the run budget, then a follow-up prompt.
+    with closing(runtime):
+        stopped = runtime.run("loop", conversation_id="conv-budget")
+        follow_up = runtime.run("finish", conversation_id="conv-budget")
+
+    # Assert - the first run stopped cleanly; the second saw the earlier spend.
+    assert stopped.budget is not None
+    assert stopped.budget.exhausted == ("run.output_tokens",)
+    assert stopped.final_output.startswith("Run stopped: budget exhausted")
+    assert stopped.budget.run_spent.output_tokens == 20
+    assert stopped.budget.run_remaining.output_tokens == 0
+    assert follow_up.final_output == "done"
+    assert follow_up.budget is not None
+    assert follow_up.budget.exhausted == ()
+    assert follow_up.budget.run_spent.input_tokens == 100
+    assert follow_up.budget.conversation_spent.input_tokens == 300
+    assert follow_up.budget.conversation_remaining.input_tokens == 700
+    assert follow_up.budget.conversation_spent.cost == pytest.approx(9e-4)
+    assert follow_up.budget.run_remaining.input_tokens is None
+
+
+def test_agent_runtime_without_budgets_reports_none(
+    make_fake_runtime: Callable[..., AgentRuntime],
+) -> None:
+    """Runs without configured budgets skip accounting entirely."""
+    # Arrange - default config, no budgets.
+    runtime = make_fake_runtime([AIMessage(content="hi")])
+
+    # Act - run one prompt.
+    with closing(runtime):
+        result = runtime.run("hello")
+
+    # Assert - no budget report is attached.
+    assert result.budget is None
+
+
+class _HangingModel(FakeMessagesListChatModel):
+    """Tool-capable fake model whose async calls never answer in time."""
+
+    def bind_tools(self, *_args: object, **_kwargs: object) -> _HangingModel:
+        """Return self so create_agent can bind the allowlisted tools."""
+        return self
+
+    async def _agenerate(
+        self,
+        messages: list[BaseMessage],
+        stop: list[str] | None = None,
+        run_manager: AsyncCallbackManagerForLLMRun | None = None,
+        **kwargs: object,
+    ) -> ChatResult:
+        """Sleep far past any test deadline."""
+        del messages, stop, run_manager, kwargs
+        await asyncio.sleep(30)
+        msg = "unreachable"
+        raise AssertionError(msg)
+
+
+def test_agent_runtime_wall_clock_budget_cuts_a_hanging_model_call(
+    make_fake_runtime: Callable[..., AgentRuntime],
+    runtime_config: RuntimeConfig,
+) -> None:
+    """A model call outliving the run's wall-clock budget is cancelled."""
+    # Arrange - a 0.3 s wall-clock budget and a model that never answers.
+    budgets = ResourceBudgetsConfig.model_validate({"run": {"wall_clock_seconds": 0.3}})
+    config = runtime_config.model_copy(
+        update={
+            "policies": runtime_config.policies.model_copy(update={"budgets": budgets})
+        }
+    )
+    runtime = make_fake_runtime(
+        model=_HangingModel(responses=[AIMessage(content="late")]), config=config
+    )
+
+    # Act - run one prompt and time it.
+    started = time.perf_counter()
+    with closing(runtime):
+        result = runtime.run("hello")
+    elapsed = time.perf_counter() - started
+
+    # Assert - the run ended at its deadline with a budget notice.
+    assert elapsed < 10
+    assert result.status == "completed"
+    assert result.final_output.startswith("Run stopped: budget exhausted")
+    assert result.budget is not None
+    assert result.budget.exhausted == ("run.wall_clock_seconds",)
+    assert result.budget.run_remaining.wall_clock_seconds == 0.0
+
+
+class _TimingOutOnceModel(FakeMessagesListChatModel):
+    """Tool-capable fake model whose first async call hits a provider timeout."""
+
+    calls: int = 0
+
+    def bind_tools(self, *_args: object, **_kwargs: object) -> _TimingOutOnceModel:
+        """Return self so create_agent can bind the allowlisted tools."""
+        return self
+
+    async def _agenerate(
+        self,
+        messages: list[BaseMessage],
+        stop: list[str] | None = None,
+        run_manager: AsyncCallbackManagerForLLMRun | None = None,
+        **kwargs: object,
+    ) -> ChatResult:
+        """Raise a read timeout once, then reply from the scripted list."""
+        self.calls += 1
+        if self.calls == 1:
+            msg = "provider read timed out"
+            raise TimeoutError(msg)
+        return await super()._agenerate(messages, stop, run_manager, **kwargs)
+
+
+@pytest.mark.parametrize("wall_clock_seconds", [None, 60.0])
+def test_agent_runtime_budget_leaves_provider_timeouts_to_failover(
+    make_fake_runtime: Callable[..., AgentRuntime],
+    runtime_config: RuntimeConfig,
+    wall_clock_seconds: float | None,
+) -> None:
+    """A provider timeout fails over to the fallback, not a budget notice."""
+    # Arrange - budgets on, and ``default`` falling back to ``long_context``.
+    raw = runtime_config.model_dump(mode="json")
+    raw["models"]["routing"]["fallbacks"] = {"default": ["long_context"]}
+    raw["policies"]["budgets"] = ResourceBudgetsConfig.model_validate(
+        {"run": {"output_tokens": 1000, "wall_clock_seconds": wall_clock_seconds}}
+    ).model_dump()
+    model = _TimingOutOnceModel(responses=[AIMessage(content="from fallback")])
+    runtime = make_fake_runtime(model=model, config=RuntimeConfig.model_validate(raw))
+
+    # Act - run one prompt whose first model attempt times out.
+    with closing(runtime):
+        result = runtime.run("hello")
+
+    # Assert - the fallback answered and no budget was reported exhausted.
+    assert model.calls == 2
+    assert result.final_output == "from fallback"
+    assert result.budget is not None
+    assert result.budget.exhausted == ()
+
+
+def test_agent_runtime_charges_summary_calls_to_budgets(
+    make_fake_runtime: Callable[..., AgentRuntime],
+    runtime_config: RuntimeConfig,
+) -> None:
+    """Inline summary model usage counts toward run and conversation spend."""
+    # Arrange - priced budgets and inline compression past two messages.
+    raw = _budgeted_config(runtime_config).model_dump(mode="json")
+    raw["policies"]["budgets"] = ResourceBudgetsConfig.model_validate(
+        {"run": {"input_tokens": 10_000}}
+    ).model_dump()
+    raw["policies"]["conversation_compression"] = ConversationCompressionConfig(
+        enabled=True,
+        trigger=ConversationCompressionTriggerConfig(kind="messages", threshold=3),
+        keep=ConversationCompressionKeepConfig(kind="messages", value=1),
+    ).model_dump()
+    reply = {"input_tokens": 100, "output_tokens": 10, "total_tokens": 110}
+    summary = {"input_tokens": 40, "output_tokens": 5, "total_tokens": 45}
+    runtime = make_fake_runtime(
+        [
+            AIMessage(content="first", usage_metadata=reply),
+            AIMessage(content="SUMMARY", usage_metadata=summary),
+            AIMessage(content="second", usage_metadata=reply),
+        ],
+        config=RuntimeConfig.model_validate(raw),
+    )
+
+    # Act - the second turn summarizes the first before answering.
+    with closing(runtime):
+        runtime.run("turn 1", conversation_id="conv-summary")
+        second = runtime.run("turn 2", conversation_id="conv-summary")
+
+    # Assert - the summary call is charged to both scopes and priced.
+    assert second.final_output == "second"
+    assert second.budget is not None
+    assert second.budget.run_spent.input_tokens == 140
+    assert second.budget.run_spent.output_tokens == 15
+    assert second.budget.conversation_spent.input_tokens == 240
+    assert second.budget.conversation_spent.cost == pytest.approx(7.3e-4)
+
+
+def test_agent_runtime_charges_background_summaries_to_the_conversation(
+    make_fake_runtime: Callable[..., AgentRuntime],
+    runtime_config: RuntimeConfig,
+) -> None:
+    """Between-turn summaries belong to no run but count toward the thread."""
+    # Arrange - priced budgets and background compression past three messages.
+    raw = _budgeted_config(runtime_config).model_dump(mode="json")
+    raw["policies"]["budgets"] = ResourceBudgetsConfig.model_validate(
+        {"conversation": {"input_tokens": 10_000}}
+    ).model_dump()
+    raw["policies"]["conversation_compression"] = ConversationCompressionConfig(
+        enabled=True,
+        mode="background",
+        trigger=ConversationCompressionTriggerConfig(kind="messages", threshold=3),
+        keep=ConversationCompressionKeepConfig(kind="messages", value=1),
+    ).model_dump()
+    reply = {"input_tokens": 100, "output_tokens": 10, "total_tokens": 110}
+    summary = {"input_tokens": 40, "output_tokens": 5, "total_tokens": 45}
+    runtime = make_fake_runtime(
+        [
+            AIMessage(content="first", usage_metadata=reply),
+            AIMessage(content="second", usage_metadata=reply),
+            AIMessage(content="SUMMARY", usage_metadata=summary),
+            AIMessage(content="third", usage_metadata=reply),
+        ],
+        config=RuntimeConfig.model_validate(raw),
+    )
+
+    async def _turns() -> tuple[int, int]:
+        try:
+            await runtime.arun("turn 1", conversation_id="conv-bg")
+            await runtime.arun("turn 2", conversation_id="conv-bg")
+            await runtime.adrain_background_compression()
+            third = await runtime.arun("turn 3", conversation_id="conv-bg")
+        finally:
+            await runtime.aclose()
+        assert third.budget is not None
+        return (
+            third.budget.run_spent.input_tokens,
+            third.budget.conversation_spent.input_tokens,
+        )
+
+    # Act - compact after the second turn, then run a third.
+    run_input, conversation_input = asyncio.run(_turns())
+
+    # Assert - the summary is in the thread's spend, not the third run's.
+    assert run_input == 100
+    assert conversation_input == 340
@@ -0,0 +1,114 @@
+"""Integration tests for run timeouts and cancellation handles."""
+
+from __future__ import annotations
+
+import asyncio
+import threading
+from collections.abc import Callable
+from contextlib import closing
+
+import pytest
+from langchain_core.callbacks import AsyncCallbackManagerForLLMRun
+from langchain_core.language_models.fake_chat_models import FakeMessagesListChatModel
+from langchain_core.messages import AIMessage, BaseMessage, ToolMessage
+from langchain_core.outputs import ChatResult
+from pydantic import Field
+
+from lily.runtime.agent_run_result import AgentRunResult
+from lily.runtime.agent_runtime import AgentRuntime
+from lily.runtime.run_cancellation import RunCancellation
+
+pytestmark = pytest.mark.integration
+
+
+class _StallingModel(FakeMessagesListChatModel):
+    """Fake model that hangs on the call after a tool result, like a stuck API."""
+
+    stalled: threading.Event = Field(default_factory=threading.Event)
+
+    def bind_tools(self, *_args: object, **_kwargs: object) -> _StallingModel:
+        """Return self so create_agent can execute the tool-call loop."""
+        return self
+
+    async def _agenerate(
+        self,
+        messages: list[BaseMessage],
+        stop: list[str] | None = None,
+        run_manager: AsyncCallbackManagerForLLMRun | None = None,
+        **kwargs: object,
+    ) -> ChatResult:
+        """Hang when answering a tool result; otherwise reply from the list."""
+        if isinstance(messages[-1], ToolMessage):
+            self.stalled.set()
+            await asyncio.sleep(30)
+        return await super()._agenerate(messages, stop, run_manager, **kwargs)
+
+
+def _stalling_model() -> _StallingModel:
+    """Return a model that calls ``ping_tool``, stalls, then answers ``done``."""
+    return _StallingModel(
+        responses=[
+            AIMessage(
+                content="",
+                tool_calls=[
+                    {"name": "ping_tool", "args": {}, "id": "c1", "type": "tool_call"}
+                ],
+            ),
+            AIMessage(content="done"),
+        ]
+    )
+
+
+def test_agent_runtime_timeout_returns_typed_result_and_frees_conversation(
+    make_fake_runtime: Callable[..., AgentRuntime],
+) -> None:
+    """A hung model call times out; the next turn on the thread runs normally."""
+    # Arrange - a model that stalls after its first tool round trip.
+    runtime = make_fake_runtime(model=_stalling_model())
+
+    # Act - time out the stalled run, then send a follow-up on the same thread.
+    with closing(runtime):
+        timed_out = runtime.run("loop", conversation_id="conv-hung", timeout=0.5)
+        follow_up = runtime.run("finish", conversation_id="conv-hung", timeout=5)
+        stats = runtime.scheduler_stats()
+
+    # Assert - typed interruption, released lock, and resumable checkpoint.
+    assert timed_out.status == "timed_out"
+    assert timed_out.final_output == ""
+    assert timed_out.message_count == 3
+    assert timed_out.conversation_id == "conv-hung"
+    assert follow_up.status == "completed"
+    assert follow_up.final_output == "done"
+    assert follow_up.message_count == timed_out.message_count + 2
+    assert stats.in_flight == 0
+    assert stats.completed == 2
+
+
+def test_agent_runtime_cancellation_handle_interrupts_from_another_thread(
+    make_fake_runtime: Callable[..., AgentRuntime],
+) -> None:
+    """``cancel`` from a caller thread stops a blocking ``run`` promptly."""
+    # Arrange - a stalling model and a run executing on a worker thread.
+    model = _stalling_model()
+    runtime = make_fake_runtime(model=model)
+    cancellation = RunCancellation()
+    results: list[AgentRunResult] = []
+
+    def _run() -> None:
+        result = runtime.run("loop", conversation_id="c1", cancellation=cancellation)
+        results.append(result)
+
+    worker = threading.Thread(target=_run)
+
+    # Act - cancel once the model call hangs.
+    with closing(runtime):
+        worker.start()
+        assert model.stalled.wait(timeout=5)
+        cancellation.cancel()
+        worker.join(timeout=5)
+
+    # Assert - the run returned a cancelled result instead of blocking.
+    assert not worker.is_alive()
+    [result] = results
+    assert result.status == "cancelled"
+    assert cancellation.cancelled
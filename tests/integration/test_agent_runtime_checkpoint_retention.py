@@ -0,0 +1,134 @@
+"""Integration tests for checkpoint retention and durability in the agent runtime."""
+
+from __future__ import annotations
+
+import sqlite3
+import threading
+from collections.abc import Callable
+from contextlib import closing
+from pathlib import Path
+
+import pytest
+from langchain_core.messages import AIMessage
+
+from lily.runtime.agent_runtime import AgentRuntime
+from lily.runtime.config_schema import (
+    CheckpointDurability,
+    CheckpointRetentionConfig,
+    RuntimeConfig,
+)
+
+pytestmark = pytest.mark.integration
+
+
+def _with_retention(
+    config: RuntimeConfig,
+    retention: CheckpointRetentionConfig,
+) -> RuntimeConfig:
+    """Return runtime config with one checkpoint retention policy."""
+    policies = config.policies.model_copy(update={"checkpoint_retention": retention})
+    return config.model_copy(update={"policies": policies})
+
+
+def _thread_ids(db_path: Path) -> set[str]:
+    """Return thread ids that still own checkpoints."""
+    with closing(sqlite3.connect(db_path)) as conn:
+        rows = conn.execute("SELECT DISTINCT thread_id FROM checkpoints").fetchall()
+    return {str(row[0]) for row in rows}
+
+
+def test_agent_runtime_ephemeral_runs_skip_sqlite_checkpoints(
+    make_fake_runtime: Callable[..., AgentRuntime],
+    tmp_path: Path,
+) -> None:
+    """Ephemeral runs store nothing; named conversations keep their thread."""
+    # Arrange - fake runtime over an on-disk checkpoint database.
+    checkpoint_db = tmp_path / "retention.sqlite3"
+    runtime = make_fake_runtime(
+        [AIMessage(content="one"), AIMessage(content="two"), AIMessage(content="3")],
+        checkpoint_db_path=checkpoint_db,
+    )
+
+    # Act - one blocking and one streamed ephemeral run, then a named run.
+    with closing(runtime):
+        runtime.run("hello")
+        runtime.run_stream("hello again", on_token=lambda _token: None)
+        ephemeral_only_size = checkpoint_db.stat().st_size
+        runtime.run("remember me", conversation_id="conv-keep")
+
+    # Assert - SQLite was untouched until the named run, which persisted alone.
+    assert ephemeral_only_size == 0
+    assert _thread_ids(checkpoint_db) == {"conv-keep"}
+
+
+def test_agent_runtime_background_compactor_stops_on_close(
+    make_fake_runtime: Callable[..., AgentRuntime],
+    runtime_config: RuntimeConfig,
+    tmp_path: Path,
+) -> None:
+    """A compaction interval starts one background thread that ``close`` stops."""
+    # Arrange - retention policy with background compaction enabled.
+    runtime = make_fake_runtime(
+        [AIMessage(content="one")],
+        config=_with_retention(
+            runtime_config, CheckpointRetentionConfig(compact_interval_minutes=60.0)
+        ),
+        checkpoint_db_path=tmp_path / "retention.sqlite3",
+    )
+
+    def _compactor_threads() -> list[threading.Thread]:
+        return [
+            thread
+            for thread in threading.enumerate()
+            if thread.name == "lily-checkpoint-compactor"
+        ]
+
+    # Act - run once, observe the compactor, then close the runtime.
+    runtime.run("hello")
+    running = _compactor_threads()
+    runtime.close()
+
+    # Assert - the compactor ran while open and exited on close.
+    assert len(running) == 1
+    assert not running[0].is_alive()
+
+
+@pytest.mark.parametrize(
+    ("durability", "expect_single_checkpoint"),
+    [
+        (CheckpointDurability.SYNC, False),
+        (CheckpointDurability.ASYNC, False),
+        (CheckpointDurability.EXIT, True),
+    ],
+)
+def test_agent_runtime_checkpoint_durability_controls_persisted_steps(
+    make_fake_runtime: Callable[..., AgentRuntime],
+    runtime_config: RuntimeConfig,
+    tmp_path: Path,
+    durability: CheckpointDurability,
+    expect_single_checkpoint: bool,
+) -> None:
+    """``exit`` persists one checkpoint per run; step modes persist every step."""
+    # Arrange - runtime configured with one durability mode.
+    checkpoint_db = tmp_path / "durability.sqlite3"
+    policies = runtime_config.policies.model_copy(
+        update={"checkpoint_durability": durability}
+    )
+    runtime = make_fake_runtime(
+        [AIMessage(content="first"), AIMessage(content="second")],
+        config=runtime_config.model_copy(update={"policies": policies}),
+        checkpoint_db_path=checkpoint_db,
+    )
+
+    # Act - two turns on one attached conversation.
+    with closing(runtime):
+        runtime.run("hello", conversation_id="conv-durable")
+        second = runtime.run("again", conversation_id="conv-durable")
+    with closing(sqlite3.connect(checkpoint_db)) as conn:
+        stored = conn.execute("SELECT COUNT(*) FROM checkpoints").fetchone()[0]
+
+    # Assert - history resumes in every mode; exit mode stores one per run.
+    assert second.final_output == "second"
+    assert second.message_count == 4
+    assert (stored == 2) is expect_single_checkpoint
+    assert stored >= 2
@@ -0,0 +1,204 @@
+"""Integration tests for conversation compression in the agent runtime."""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+from collections.abc import Callable
+from contextlib import closing
+from pathlib import Path
+
+import pytest
+from langchain_core.callbacks import CallbackManagerForLLMRun
+from langchain_core.language_models import BaseChatModel
+from langchain_core.language_models.fake_chat_models import FakeMessagesListChatModel
+from langchain_core.messages import AIMessage, BaseMessage
+from langchain_core.outputs import ChatResult
+from langchain_core.tools import tool
+
+from lily.runtime.agent_run_result import AgentRunResult
+from lily.runtime.agent_runtime import AgentRuntime
+from lily.runtime.config_schema import (
+    ConversationCompressionConfig,
+    ConversationCompressionKeepConfig,
+    ConversationCompressionTriggerConfig,
+    ModelProfileConfig,
+    ModelProvider,
+    RuntimeConfig,
+)
+from lily.runtime.model_factory import ModelFactory
+
+pytestmark = pytest.mark.integration
+
+
+@tool
+def ping_tool() -> str:
+    """Return pong."""
+    return "pong"
+
+
+class _CountingModel(FakeMessagesListChatModel):
+    """Tool-capable fake model counting its calls."""
+
+    calls: int = 0
+
+    def bind_tools(self, *_args: object, **_kwargs: object) -> _CountingModel:
+        """Return self so create_agent can execute the tool-call loop."""
+        return self
+
+    def _generate(
+        self,
+        messages: list[BaseMessage],
+        stop: list[str] | None = None,
+        run_manager: CallbackManagerForLLMRun | None = None,
+        **kwargs: object,
+    ) -> ChatResult:
+        """Count the call, then reply from the scripted list."""
+        self.calls += 1
+        return super()._generate(messages, stop, run_manager, **kwargs)
+
+
+def _background_config(runtime_config: RuntimeConfig) -> RuntimeConfig:
+    """Return config compressing in the background past three messages."""
+    compression = ConversationCompressionConfig(
+        enabled=True,
+        mode="background",
+        trigger=ConversationCompressionTriggerConfig(kind="messages", threshold=3),
+        keep=ConversationCompressionKeepConfig(kind="messages", value=1),
+    )
+    policies = runtime_config.policies.model_copy(
+        update={"conversation_compression": compression}
+    )
+    return runtime_config.model_copy(update={"policies": policies})
+
+
+def test_agent_runtime_background_compression_compacts_between_turns(
+    make_fake_runtime: Callable[..., AgentRuntime],
+    runtime_config: RuntimeConfig,
+    caplog: pytest.LogCaptureFixture,
+) -> None:
+    """A turn crossing the trigger is compacted before the next turn starts."""
+    # Arrange - background mode; one reply object per call keeps message ids unique.
+    replies = [AIMessage(content="OK") for _ in range(4)]
+    runtime = make_fake_runtime(replies, config=_background_config(runtime_config))
+
+    async def _turns() -> list[AgentRunResult]:
+        try:
+            first = await runtime.arun("turn 1", conversation_id="conv-bg")
+            second = await runtime.arun("turn 2", conversation_id="conv-bg")
+            await runtime.adrain_background_compression()
+            third = await runtime.arun("turn 3", conversation_id="conv-bg")
+        finally:
+            await runtime.aclose()
+        return [first, second, third]
+
+    # Act - three turns on one thread, draining compaction after the second.
+    with caplog.at_level(logging.INFO, logger="lily.compression"):
+        first, second, third = asyncio.run(_turns())
+    events = [
+        json.loads(record.getMessage())
+        for record in caplog.records
+        if record.name == "lily.compression"
+    ]
+
+    # Assert - turn 3 starts from summary + kept tail; no turn paid for it.
+    assert [first.message_count, second.message_count] == [2, 4]
+    assert third.message_count == 4
+    assert third.final_output == "OK"
+    assert all(
+        result.timings.summarization_seconds == 0.0 for result in (first, second, third)
+    )
+    [event] = [e for e in events if e["event"] == "conversation_compressed"]
+    assert event["mode"] == "background"
+    assert event["conversation_id"] == "conv-bg"
+    assert event["messages_before"] == 4
+    assert event["messages_after"] == 2
+
+
+def test_agent_runtime_background_compression_skips_threadless_runs(
+    make_fake_runtime: Callable[..., AgentRuntime],
+    runtime_config: RuntimeConfig,
+) -> None:
+    """Runs without a conversation id have no checkpoint to compact."""
+    # Arrange - background mode runtime.
+    runtime = make_fake_runtime(
+        [AIMessage(content="OK")], config=_background_config(runtime_config)
+    )
+
+    async def _run() -> tuple[AgentRunResult, int]:
+        try:
+            result = await runtime.arun("turn 1")
+            pending = len(runtime._compression_tasks)
+        finally:
+            await runtime.aclose()
+        return result, pending
+
+    # Act - one ephemeral run.
+    result, pending = asyncio.run(_run())
+
+    # Assert - nothing was scheduled.
+    assert result.final_output == "OK"
+    assert pending == 0
+
+
+def test_agent_runtime_compression_uses_its_own_profile(
+    runtime_config: RuntimeConfig,
+    tmp_path: Path,
+) -> None:
+    """Summaries come from ``conversation_compression.profile``, not the router."""
+    # Arrange - a dedicated summarizer profile with its own model.
+    agent_model = _CountingModel(
+        responses=[AIMessage(content="FIRST"), AIMessage(content="SECOND")]
+    )
+    summary_model = _CountingModel(responses=[AIMessage(content="CHEAP SUMMARY")])
+    summarizer = ModelProfileConfig(
+        provider=ModelProvider.OPENAI,
+        model="summary-model",
+        temperature=0.0,
+        timeout_seconds=30,
+    )
+    compression = ConversationCompressionConfig(
+        enabled=True,
+        profile="summarizer",
+        trigger=ConversationCompressionTriggerConfig(kind="messages", threshold=3),
+        keep=ConversationCompressionKeepConfig(kind="messages", value=1),
+    )
+    config = runtime_config.model_copy(
+        update={
+            "models": runtime_config.models.model_copy(
+                update={
+                    "profiles": {
+                        **runtime_config.models.profiles,
+                        "summarizer": summarizer,
+                    }
+                }
+            ),
+            "policies": runtime_config.policies.model_copy(
+                update={"conversation_compression": compression}
+            ),
+        }
+    )
+
+    def _builder(profile: ModelProfileConfig) -> BaseChatModel:
+        return summary_model if profile.model == "summary-model" else agent_model
+
+    runtime = AgentRuntime(
+        config=config,
+        tools=[ping_tool],
+        model_factory=ModelFactory(
+            builders={ModelProvider.OPENAI: _builder}, preloaders={}
+        ),
+        checkpoint_db_path=tmp_path / "checkpoints.sqlite3",
+    )
+
+    # Act - the second turn crosses the trigger and summarizes inline.
+    with closing(runtime):
+        runtime.run("turn 1", conversation_id="conv-profile")
+        second = runtime.run("turn 2", conversation_id="conv-profile")
+
+    # Assert - the agent answered both turns; only the summarizer summarized.
+    assert second.final_output == "SECOND"
+    assert second.message_count == 3
+    assert agent_model.calls == 2
+    assert summary_model.calls == 1
@@ -0,0 +1,169 @@
+"""Integration tests for concurrent runs sharing one agent runtime."""
+
+from __future__ import annotations
+
+import asyncio
+import threading
+from collections.abc import Callable
+
+import pytest
+from langchain_core.messages import AIMessage
+
+from lily.runtime.agent_runtime import AgentRuntime
+from lily.runtime.config_schema import RuntimeConfig
+
+pytestmark = pytest.mark.integration
+
+
+class _SleepingAgent:
+    """Async agent double that records overlap and per-conversation order."""
+
+    def __init__(self, delay: float) -> None:
+        """Store delay and initialize observation state."""
+        self._delay = delay
+        self.active = 0
+        self.peak = 0
+        self.events: list[str] = []
+
+    async def ainvoke(
+        self,
+        request: dict[str, object],
+        *,
+        config: dict[str, object],
+    ) -> dict[str, object]:
+        """Sleep while counting concurrently active invocations."""
+        messages = request["messages"]
+        assert isinstance(messages, list)
+        prompt = str(messages[-1]["content"])
+        thread_id = config["configurable"]["thread_id"]  # type: ignore[index]
+        self.active += 1
+        self.peak = max(self.peak, self.active)
+        self.events.append(f"start:{thread_id}:{prompt}")
+        await asyncio.sleep(self._delay)
+        self.events.append(f"end:{thread_id}:{prompt}")
+        self.active -= 1
+        return {"messages": [AIMessage(content=f"done {prompt}")]}
+
+
+def _config_with_limit(config: RuntimeConfig, limit: int) -> RuntimeConfig:
+    """Return runtime config with a different concurrent-run limit."""
+    policies = config.policies.model_copy(update={"max_concurrent_runs": limit})
+    return config.model_copy(update={"policies": policies})
+
+
+def test_agent_runtime_arun_caps_parallel_conversations(
+    make_fake_runtime: Callable[..., AgentRuntime],
+    runtime_config: RuntimeConfig,
+) -> None:
+    """Parallel prompts across conversations never exceed the configured limit."""
+    # Arrange - limit of two and a spy agent that sleeps per run.
+    agent = _SleepingAgent(delay=0.02)
+    runtime = make_fake_runtime(
+        config=_config_with_limit(runtime_config, 2),
+        agent_builder=lambda **_kwargs: agent,
+    )
+
+    async def _exercise() -> list[float]:
+        results = await asyncio.gather(
+            *(
+                runtime.arun(f"p{index}", conversation_id=f"conv-{index}")
+                for index in range(6)
+            )
+        )
+        await runtime.aclose()
+        return [result.queue_wait_seconds for result in results]
+
+    # Act - submit six independent conversations at once.
+    waits = asyncio.run(_exercise())
+
+    # Assert - at most two overlap and later runs report queue wait.
+    assert agent.peak == 2
+    assert max(waits) >= 0.02
+
+
+def test_agent_runtime_arun_keeps_turn_order_within_conversation(
+    make_fake_runtime: Callable[..., AgentRuntime],
+) -> None:
+    """Turns for one conversation run sequentially while others overlap."""
+    # Arrange - default limit with a spy agent.
+    agent = _SleepingAgent(delay=0.01)
+    runtime = make_fake_runtime(agent_builder=lambda **_kwargs: agent)
+
+    async def _exercise() -> None:
+        await asyncio.gather(
+            runtime.arun("t1", conversation_id="conv-a"),
+            runtime.arun("t2", conversation_id="conv-a"),
+            runtime.arun("other", conversation_id="conv-b"),
+            runtime.arun("t3", conversation_id="conv-a"),
+        )
+        await runtime.aclose()
+
+    # Act - interleave turns for two conversations.
+    asyncio.run(_exercise())
+
+    # Assert - conv-a turns never overlap and keep submission order.
+    conv_a = [event for event in agent.events if ":conv-a:" in event]
+    assert conv_a == [
+        "start:conv-a:t1",
+        "end:conv-a:t1",
+        "start:conv-a:t2",
+        "end:conv-a:t2",
+        "start:conv-a:t3",
+        "end:conv-a:t3",
+    ]
+    assert agent.peak == 2
+
+
+def test_agent_runtime_run_shares_scheduler_across_threads(
+    make_fake_runtime: Callable[..., AgentRuntime],
+    runtime_config: RuntimeConfig,
+) -> None:
+    """Blocking `run` calls from many threads are admitted by one scheduler."""
+    # Arrange - single-slot runtime driven from four caller threads.
+    agent = _SleepingAgent(delay=0.01)
+    runtime = make_fake_runtime(
+        config=_config_with_limit(runtime_config, 1),
+        agent_builder=lambda **_kwargs: agent,
+    )
+    outputs: list[str] = []
+
+    def _call(index: int) -> None:
+        result = runtime.run(f"p{index}", conversation_id=f"conv-{index}")
+        outputs.append(result.final_output)
+
+    threads = [threading.Thread(target=_call, args=(index,)) for index in range(4)]
+
+    # Act - run all threads against the shared runtime.
+    try:
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join(timeout=5)
+        stats = runtime.scheduler_stats()
+    finally:
+        runtime.close()
+
+    # Assert - one run at a time, all completed, queue metrics recorded.
+    assert sorted(outputs) == [f"done p{index}" for index in range(4)]
+    assert agent.peak == 1
+    assert stats.max_concurrent_runs == 1
+    assert stats.completed == 4
+    assert stats.in_flight == 0
+    assert stats.max_wait_seconds > 0.0
+
+
+def test_agent_runtime_scheduler_stats_default_before_first_run(
+    make_fake_runtime: Callable[..., AgentRuntime],
+) -> None:
+    """Scheduler stats are an empty snapshot before any run binds a loop."""
+    # Arrange - fresh runtime.
+    runtime = make_fake_runtime()
+
+    # Act - read stats without running.
+    stats = runtime.scheduler_stats()
+
+    # Assert - configured limit with zeroed counters.
+    assert stats.max_concurrent_runs == 8
+    assert stats.completed == 0
+    assert stats.queued == 0
+    runtime.close()
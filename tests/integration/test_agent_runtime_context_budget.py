@@ -0,0 +1,94 @@
+"""Integration tests for the per-call context-window budget planner."""
+
+from __future__ import annotations
+
+from collections.abc import Callable
+from contextlib import closing
+
+import pytest
+from langchain_core.callbacks import CallbackManagerForLLMRun
+from langchain_core.language_models.fake_chat_models import FakeMessagesListChatModel
+from langchain_core.messages import AIMessage, BaseMessage, SystemMessage
+from langchain_core.outputs import ChatResult
+from pydantic import Field
+
+from lily.runtime.agent_runtime import AgentRuntime
+from lily.runtime.config_schema import ContextBudgetConfig, RuntimeConfig
+
+pytestmark = pytest.mark.integration
+
+_FILES = ("AGENTS.md", "IDENTITY.md", "SOUL.md", "USER.md", "TOOLS.md")
+_IDENTITY = "## Agent identity context\n\n" + "\n\n".join(
+    f"### {name}\n" + "\n".join(f"- {name} guidance line {i}." for i in range(200))
+    for name in _FILES
+)
+
+
+class _RecordingModel(FakeMessagesListChatModel):
+    """Tool-capable fake model recording the system prompt it is sent."""
+
+    system_prompts: list[str] = Field(default_factory=list)
+
+    def bind_tools(self, *_args: object, **_kwargs: object) -> _RecordingModel:
+        """Return self so create_agent can execute the tool-call loop."""
+        return self
+
+    def _generate(
+        self,
+        messages: list[BaseMessage],
+        stop: list[str] | None = None,
+        run_manager: CallbackManagerForLLMRun | None = None,
+        **kwargs: object,
+    ) -> ChatResult:
+        """Record the system prompt, then reply from the scripted list."""
+        self.system_prompts.extend(
+            str(m.content) for m in messages if isinstance(m, SystemMessage)
+        )
+        return super()._generate(messages, stop, run_manager, **kwargs)
+
+
+def _with_window(config: RuntimeConfig, window: int) -> RuntimeConfig:
+    """Return ``config`` planning every call against a ``window``-token window."""
+    budget = ContextBudgetConfig(
+        enabled=True,
+        context_window_tokens=window,
+        reserve_output_tokens=0,
+        shrink_order=["identity", "history"],
+    )
+    policies = config.policies.model_copy(update={"context_budget": budget})
+    return config.model_copy(update={"policies": policies})
+
+
+def test_agent_runtime_truncates_identity_to_fit_the_context_window(
+    make_fake_runtime: Callable[..., AgentRuntime],
+    runtime_config: RuntimeConfig,
+) -> None:
+    """Oversize identity is cut per file; an unfittable call is never sent."""
+    # Arrange - a 2000-token window, and a 20-token one nothing fits into.
+    fitting = _RecordingModel(responses=[AIMessage(content="done")])
+    refusing = _RecordingModel(responses=[AIMessage(content="unreachable")])
+    runtime = make_fake_runtime(
+        model=fitting,
+        config=_with_window(runtime_config, 2000),
+        agent_identity_context_markdown=_IDENTITY,
+    )
+    tiny = make_fake_runtime(
+        model=refusing,
+        config=_with_window(runtime_config, 20),
+        agent_identity_context_markdown=_IDENTITY,
+    )
+
+    # Act - one prompt on each runtime.
+    with closing(runtime), closing(tiny):
+        result = runtime.run("hello")
+        refused = tiny.run("hello")
+
+    # Assert - every identity file survives in a shorter prompt; no oversize call.
+    assert result.final_output == "done"
+    assert result.timings.context_reduced_calls == 1
+    [system_prompt] = fitting.system_prompts
+    assert system_prompt.startswith("You are Lily.")
+    assert len(system_prompt) < len(_IDENTITY) // 2
+    assert all(f"### {name}" in system_prompt for name in _FILES)
+    assert refused.final_output.startswith("Run stopped: context window exceeded")
+    assert refusing.system_prompts == []
@@ -0,0 +1,203 @@
+"""Integration tests for token streaming through the agent runtime."""
+
+from __future__ import annotations
+
+import asyncio
+from collections.abc import AsyncIterator, Callable
+from contextlib import closing
+
+import pytest
+from langchain_core.callbacks import AsyncCallbackManagerForLLMRun
+from langchain_core.language_models.fake_chat_models import GenericFakeChatModel
+from langchain_core.messages import AIMessage, BaseMessage
+from langchain_core.outputs import ChatGenerationChunk
+
+from lily.runtime.agent_runtime import AgentRuntime, AgentStreamEvent
+
+pytestmark = pytest.mark.integration
+
+
+class _StreamingFakeModel(GenericFakeChatModel):
+    """Fake model that streams whitespace-split chunks and accepts tool binding."""
+
+    def bind_tools(
+        self,
+        _tools: object,
+        *,
+        _tool_choice: object | None = None,
+        **_kwargs: object,
+    ) -> _StreamingFakeModel:
+        """Return self so create_agent can bind the allowlisted tools."""
+        return self
+
+
+class _StallingStreamingModel(_StreamingFakeModel):
+    """Streaming fake model whose first reply hangs after its first chunk."""
+
+    stalled: bool = False
+
+    async def _astream(
+        self,
+        messages: list[BaseMessage],
+        stop: list[str] | None = None,
+        run_manager: AsyncCallbackManagerForLLMRun | None = None,
+        **kwargs: object,
+    ) -> AsyncIterator[ChatGenerationChunk]:
+        """Stream chunks, waiting forever after the very first one."""
+        async for chunk in super()._astream(messages, stop, run_manager, **kwargs):
+            yield chunk
+            if not self.stalled:
+                self.stalled = True
+                await asyncio.Event().wait()
+
+
+class _SkewedClockLoop(asyncio.SelectorEventLoop):
+    """Event loop whose clock a test can jump forward past pending deadlines."""
+
+    skew = 0.0
+
+    def time(self) -> float:
+        """Return the loop clock plus the test-controlled skew."""
+        return super().time() + self.skew
+
+
+class _AsyncOnlyAgent:
+    """Agent double without an `astream` surface."""
+
+    async def ainvoke(
+        self,
+        request: dict[str, object],
+        *,
+        config: dict[str, object],
+    ) -> dict[str, object]:
+        """Return one deterministic reply."""
+        _ = (request, config)
+        return {"messages": [AIMessage(content="whole reply")]}
+
+
+def test_agent_runtime_astream_yields_tokens_before_result(
+    make_fake_runtime: Callable[..., AgentRuntime],
+) -> None:
+    """`astream` emits several reply tokens and then one final result."""
+    # Arrange - runtime over a model that streams word-level chunks.
+    model = _StreamingFakeModel(
+        messages=iter([AIMessage(content="Hello there, streaming friend")])
+    )
+    runtime = make_fake_runtime(model=model)
+
+    async def _exercise() -> list[AgentStreamEvent]:
+        events = [
+            event async for event in runtime.astream("hi", conversation_id="conv-s")
+        ]
+        await runtime.aclose()
+        return events
+
+    # Act - drain the stream on the caller's loop.
+    events = asyncio.run(_exercise())
+
+    # Assert - tokens arrive incrementally and concatenate to the final output.
+    tokens = [event.text for event in events if event.kind == "token"]
+    assert len(tokens) > 1
+    assert "".join(tokens) == "Hello there, streaming friend"
+    assert [event.kind for event in events].count("result") == 1
+    final = events[-1].result
+    assert final is not None
+    assert final.final_output == "Hello there, streaming friend"
+    assert final.conversation_id == "conv-s"
+
+
+def test_agent_runtime_run_stream_skips_tool_call_and_tool_output(
+    make_fake_runtime: Callable[..., AgentRuntime],
+) -> None:
+    """Only model reply text reaches `on_token`; tool traffic is not streamed."""
+    # Arrange - model calls `ping_tool` once, then answers.
+    runtime = make_fake_runtime(
+        [
+            AIMessage(
+                content="",
+                tool_calls=[
+                    {
+                        "name": "ping_tool",
+                        "args": {},
+                        "id": "call_1",
+                        "type": "tool_call",
+                    }
+                ],
+            ),
+            AIMessage(content="All done."),
+        ]
+    )
+    tokens: list[str] = []
+
+    # Act - run through the blocking streaming wrapper.
+    with closing(runtime):
+        result = runtime.run_stream("ping please", on_token=tokens.append)
+
+    # Assert - the tool result text never appears among streamed tokens.
+    assert "".join(tokens) == "All done."
+    assert "pong" not in tokens
+    assert result.final_output == "All done."
+    assert result.message_count == 4
+
+
+def test_agent_runtime_astream_falls_back_for_agents_without_astream(
+    make_fake_runtime: Callable[..., AgentRuntime],
+) -> None:
+    """Agents lacking `astream` yield the whole reply as a single token."""
+    # Arrange - runtime over an invoke-only agent double.
+    runtime = make_fake_runtime(agent_builder=lambda **_kwargs: _AsyncOnlyAgent())
+    tokens: list[str] = []
+
+    # Act - stream one prompt through the blocking wrapper.
+    with closing(runtime):
+        result = runtime.run_stream("hello", on_token=tokens.append)
+
+    # Assert - one token carrying the full reply, matching the final output.
+    assert tokens == ["whole reply"]
+    assert result.final_output == "whole reply"
+
+
+def test_agent_runtime_astream_deadline_never_interrupts_the_consumer(
+    make_fake_runtime: Callable[..., AgentRuntime],
+) -> None:
+    """A deadline passing while a token is handled never lands in caller code."""
+    # Arrange - a reply that stalls after one chunk, on a loop with a movable clock.
+    model = _StallingStreamingModel(
+        messages=iter(
+            [
+                AIMessage(content="stalled reply"),
+                AIMessage(content="abandoned reply"),
+                AIMessage(content="follow-up"),
+            ]
+        )
+    )
+    runtime = make_fake_runtime(model=model)
+    consumer_finished: list[str] = []
+
+    async def _exercise() -> tuple[list[AgentStreamEvent], str]:
+        loop = asyncio.get_running_loop()
+        assert isinstance(loop, _SkewedClockLoop)
+        events: list[AgentStreamEvent] = []
+        async for event in runtime.astream("hi", conversation_id="c", timeout=60):
+            events.append(event)
+            if event.kind == "token":
+                # Jump past the deadline; it fires while this handler awaits.
+                loop.skew += 120
+                await asyncio.sleep(0.05)
+                consumer_finished.append(event.text)
+        stream = runtime.astream("hi again", conversation_id="c", timeout=60)
+        first = await anext(stream)
+        await stream.aclose()
+        follow_up = await runtime.arun("last", conversation_id="c", timeout=60)
+        await runtime.aclose()
+        return events, first.text + "|" + follow_up.status
+
+    # Act - hold the first token past the deadline, then abandon a second stream.
+    events, abandoned = asyncio.run(_exercise(), loop_factory=_SkewedClockLoop)
+
+    # Assert - the run timed out, the consumer never did; the conversation is free.
+    assert consumer_finished == ["stalled"]
+    final = events[-1].result
+    assert final is not None
+    assert final.status == "timed_out"
+    assert abandoned.endswith("|completed")
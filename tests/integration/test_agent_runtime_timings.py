@@ -0,0 +1,91 @@
+"""Integration tests for the per-run latency breakdown on run results."""
+
+from __future__ import annotations
+
+from collections.abc import Callable
+from contextlib import closing
+
+import pytest
+from langchain_core.messages import AIMessage
+
+from lily.runtime.agent_runtime import AgentRuntime
+from lily.runtime.config_schema import ConversationCompressionConfig, RuntimeConfig
+
+pytestmark = pytest.mark.integration
+
+
+def _tool_turn() -> list[AIMessage]:
+    """Return scripted replies: one ping tool call, then a final answer."""
+    return [
+        AIMessage(
+            content="",
+            tool_calls=[{"name": "ping_tool", "args": {}, "id": "call-1"}],
+        ),
+        AIMessage(content="done"),
+    ]
+
+
+def test_agent_runtime_run_reports_model_tool_and_checkpoint_timings(
+    make_fake_runtime: Callable[..., AgentRuntime],
+) -> None:
+    """Attached runs record routed model calls, tool calls and checkpoint I/O."""
+    # Arrange - runtime whose model calls one tool before answering.
+    runtime = make_fake_runtime(_tool_turn())
+
+    # Act - run one attached conversation turn.
+    with closing(runtime):
+        result = runtime.run("ping please", conversation_id="conv-timed")
+
+    # Assert - every bucket is populated and fits inside total wall time.
+    timings = result.timings
+    assert [call.profile for call in timings.model_calls] == ["default", "default"]
+    assert [call.name for call in timings.tool_calls] == ["ping_tool"]
+    assert timings.checkpoint_gets >= 1
+    assert timings.checkpoint_puts >= 1
+    assert timings.summarization_seconds == 0.0
+    assert timings.total_seconds >= timings.model_seconds + timings.tool_seconds
+
+
+def test_agent_runtime_stream_and_ephemeral_runs_report_timings(
+    make_fake_runtime: Callable[..., AgentRuntime],
+) -> None:
+    """Streamed runs carry timings; ephemeral runs do no checkpoint I/O."""
+    # Arrange - runtime over two scripted tool turns.
+    runtime = make_fake_runtime([*_tool_turn(), *_tool_turn()])
+
+    # Act - one streamed attached run and one blocking ephemeral run.
+    with closing(runtime):
+        streamed = runtime.run_stream(
+            "ping", conversation_id="conv-stream", on_token=lambda _token: None
+        )
+        ephemeral = runtime.run("ping")
+
+    # Assert - both results carry model/tool timings; only one touched SQLite.
+    assert len(streamed.timings.model_calls) == 2
+    assert len(streamed.timings.tool_calls) == 1
+    assert streamed.timings.checkpoint_puts >= 1
+    assert len(ephemeral.timings.tool_calls) == 1
+    assert ephemeral.timings.checkpoint_gets == 0
+    assert ephemeral.timings.checkpoint_puts == 0
+
+
+def test_agent_runtime_timings_include_summarization_hook(
+    make_fake_runtime: Callable[..., AgentRuntime],
+    runtime_config: RuntimeConfig,
+) -> None:
+    """Enabled conversation compression reports time spent in its hook."""
+    # Arrange - runtime with compression middleware enabled.
+    policies = runtime_config.policies.model_copy(
+        update={"conversation_compression": ConversationCompressionConfig(enabled=True)}
+    )
+    runtime = make_fake_runtime(
+        [AIMessage(content="compressed")],
+        config=runtime_config.model_copy(update={"policies": policies}),
+    )
+
+    # Act - run one prompt.
+    with closing(runtime):
+        result = runtime.run("hello", conversation_id="conv-compress")
+
+    # Assert - the compression hook ran and was timed.
+    assert result.timings.summarization_seconds > 0.0
@@ -0,0 +1,127 @@
+"""Integration tests for offloading large tool results from the conversation."""
+
+from __future__ import annotations
+
+import hashlib
+from contextlib import closing
+from pathlib import Path
+
+import pytest
+from langchain_core.callbacks import CallbackManagerForLLMRun
+from langchain_core.language_models import BaseChatModel
+from langchain_core.language_models.fake_chat_models import FakeMessagesListChatModel
+from langchain_core.messages import AIMessage, BaseMessage, ToolMessage
+from langchain_core.outputs import ChatResult
+from langchain_core.tools import tool
+from pydantic import Field
+
+from lily.runtime.agent_runtime import AgentRuntime
+from lily.runtime.config_schema import (
+    ModelProfileConfig,
+    ModelProvider,
+    RuntimeConfig,
+    ToolOutputOffloadConfig,
+)
+from lily.runtime.model_factory import ModelFactory
+
+pytestmark = pytest.mark.integration
+
+_DUMP = "".join(f"row {index:04d}\n" for index in range(500))
+
+
+@tool
+def dump_tool() -> str:
+    """Return a large dump."""
+    return _DUMP
+
+
+class _RecordingModel(FakeMessagesListChatModel):
+    """Tool-capable fake model recording the tool results it is sent."""
+
+    tool_results: list[list[str]] = Field(default_factory=list)
+
+    def bind_tools(self, *_args: object, **_kwargs: object) -> _RecordingModel:
+        """Return self so create_agent can execute the tool-call loop."""
+        return self
+
+    def _generate(
+        self,
+        messages: list[BaseMessage],
+        stop: list[str] | None = None,
+        run_manager: CallbackManagerForLLMRun | None = None,
+        **kwargs: object,
+    ) -> ChatResult:
+        """Record tool result contents, then reply from the scripted list."""
+        self.tool_results.append(
+            [str(m.content) for m in messages if isinstance(m, ToolMessage)]
+        )
+        return super()._generate(messages, stop, run_manager, **kwargs)
+
+
+def _call(name: str, args: dict[str, object], call_id: str) -> AIMessage:
+    """Return a model turn calling one tool."""
+    return AIMessage(
+        content="",
+        tool_calls=[{"name": name, "args": args, "id": call_id, "type": "tool_call"}],
+    )
+
+
+def test_agent_runtime_offloads_large_tool_output_and_pages_it_back(
+    runtime_config: RuntimeConfig,
+    tmp_path: Path,
+) -> None:
+    """History keeps a preview; ``fetch_tool_output`` returns the stored text."""
+    # Arrange - offloading above 1000 characters; the model pages the dump.
+    handle = f"sha256:{hashlib.sha256(_DUMP.encode('utf-8')).hexdigest()}"
+    model = _RecordingModel(
+        responses=[
+            _call("dump_tool", {}, "c1"),
+            _call("fetch_tool_output", {"handle": handle, "offset": 100}, "c2"),
+            AIMessage(content="done"),
+        ]
+    )
+    tools = runtime_config.tools.model_copy(
+        update={
+            "allowlist": ["dump_tool"],
+            "output_offload": ToolOutputOffloadConfig(
+                enabled=True, threshold_chars=1000, preview_chars=100
+            ),
+        }
+    )
+
+    config = runtime_config.model_copy(
+        update={
+            "tools": tools,
+            # Two tool round trips need more graph steps than the fixture allows.
+            "policies": runtime_config.policies.model_copy(
+                update={"max_iterations": 25}
+            ),
+        }
+    )
+
+    def _builder(_profile: ModelProfileConfig) -> BaseChatModel:
+        return model
+
+    runtime = AgentRuntime(
+        config=config,
+        tools=[dump_tool],
+        model_factory=ModelFactory(
+            builders={ModelProvider.OPENAI: _builder}, preloaders={}
+        ),
+        checkpoint_db_path=tmp_path / "checkpoints.sqlite3",
+        tool_output_dir=tmp_path / "blobs",
+    )
+
+    # Act - run one prompt on an attached conversation.
+    with closing(runtime):
+        result = runtime.run("dump it", conversation_id="conv-offload")
+
+    # Assert - the model saw a preview, then a bounded page of the dump.
+    assert result.final_output == "done"
+    preview, page = model.tool_results[2]
+    assert preview.startswith(_DUMP[:100])
+    assert handle in preview
+    assert len(preview) < 1000
+    assert page.startswith(_DUMP[100:1100])
+    assert "call again with offset=1100" in page
+    assert len(list((tmp_path / "blobs").rglob("*.txt"))) == 1
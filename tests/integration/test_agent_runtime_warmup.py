@@ -0,0 +1,140 @@
+"""Integration tests for eager agent runtime warm-up."""
+
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Callable
+from pathlib import Path
+
+import pytest
+from langchain.agents import create_agent
+from langchain_core.messages import AIMessage
+
+from lily.runtime.agent_runtime import AgentRuntime
+from lily.runtime.config_schema import ModelProfileConfig, ModelProvider, RuntimeConfig
+from lily.runtime.model_factory import ModelFactoryError, ModelPreloader
+
+pytestmark = pytest.mark.integration
+
+
+class _CountingBuilder:
+    """Agent builder spy that delegates to ``create_agent``."""
+
+    def __init__(self) -> None:
+        """Initialize build counter."""
+        self.calls = 0
+
+    def __call__(self, **kwargs: object) -> object:
+        """Count one build and compile the real agent."""
+        self.calls += 1
+        return create_agent(**kwargs)  # type: ignore[arg-type]
+
+
+def _config_with_ollama_profiles(config: RuntimeConfig) -> RuntimeConfig:
+    """Return runtime config with two profiles sharing one Ollama model."""
+    ollama = {
+        "provider": "ollama",
+        "model": "llama3.2",
+        "temperature": 0.0,
+        "timeout_seconds": 5,
+    }
+    profiles = {
+        "default": ModelProfileConfig.model_validate(ollama),
+        "long_context": ModelProfileConfig.model_validate(ollama),
+        "cloud": config.models.profiles["default"],
+    }
+    models = config.models.model_copy(update={"profiles": profiles})
+    return config.model_copy(update={"models": models})
+
+
+def _ollama_preloader(
+    preloaded: list[str],
+    *,
+    fail: bool = False,
+) -> dict[ModelProvider, ModelPreloader]:
+    """Return an Ollama preloader map that records requested model names."""
+
+    async def _preload(profile: ModelProfileConfig) -> None:
+        preloaded.append(profile.model)
+        if fail:
+            msg = "ollama is not running"
+            raise ConnectionError(msg)
+
+    return {ModelProvider.OLLAMA: _preload}
+
+
+def test_agent_runtime_warmup_compiles_once_before_first_run(
+    make_fake_runtime: Callable[..., AgentRuntime],
+    tmp_path: Path,
+) -> None:
+    """``warmup`` builds agent and checkpointer; the first run reuses both."""
+    # Arrange - runtime with a counting agent builder.
+    builder = _CountingBuilder()
+    checkpoint_db = tmp_path / "warm.sqlite3"
+    runtime = make_fake_runtime(
+        [AIMessage(content="hello")],
+        agent_builder=builder,
+        checkpoint_db_path=checkpoint_db,
+    )
+
+    # Act - warm up, then run one prompt on the same runtime loop.
+    runtime.warmup()
+    builds_after_warmup = builder.calls
+    checkpoint_ready = checkpoint_db.exists()
+    result = runtime.run("hi", conversation_id="conv-warm")
+    runtime.close()
+
+    # Assert - one compile happened during warm-up and none on the first run.
+    assert builds_after_warmup == 1
+    assert checkpoint_ready
+    assert builder.calls == 1
+    assert result.final_output == "hello"
+
+
+def test_agent_runtime_awarmup_preloads_each_ollama_model_once(
+    make_fake_runtime: Callable[..., AgentRuntime],
+    runtime_config: RuntimeConfig,
+) -> None:
+    """Preloading skips providers without a preloader and dedupes models."""
+    # Arrange - two profiles on one Ollama model plus one OpenAI profile.
+    preloaded: list[str] = []
+    runtime = make_fake_runtime(
+        [AIMessage(content="warm")],
+        config=_config_with_ollama_profiles(runtime_config),
+        preloaders=_ollama_preloader(preloaded),
+    )
+
+    async def _exercise() -> str:
+        await runtime.awarmup(preload_models=True)
+        result = await runtime.arun("hi")
+        await runtime.aclose()
+        return result.final_output
+
+    # Act - warm up with preload on the caller loop, then run.
+    output = asyncio.run(_exercise())
+
+    # Assert - the shared Ollama model was loaded exactly once.
+    assert preloaded == ["llama3.2"]
+    assert output == "warm"
+
+
+def test_agent_runtime_warmup_reports_preload_failure(
+    make_fake_runtime: Callable[..., AgentRuntime],
+    runtime_config: RuntimeConfig,
+) -> None:
+    """A failing preload surfaces as ``ModelFactoryError`` naming the model."""
+    # Arrange - Ollama preloader that cannot reach its server.
+    preloaded: list[str] = []
+    runtime = make_fake_runtime(
+        config=_config_with_ollama_profiles(runtime_config),
+        preloaders=_ollama_preloader(preloaded, fail=True),
+    )
+
+    # Act - warm up with preload enabled.
+    with pytest.raises(ModelFactoryError, match=r"llama3\.2") as exc_info:
+        runtime.warmup(preload_models=True)
+    runtime.close()
+
+    # Assert - the preload was attempted and the cause is kept.
+    assert preloaded == ["llama3.2"]
+    assert isinstance(exc_info.value.__cause__, ConnectionError)
@@ -0,0 +1,430 @@
+"""Integration tests for the resident Lily daemon and its HTTP client."""
+
+from __future__ import annotations
+
+import os
+import stat
+import threading
+import time
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from http import HTTPStatus
+from http.client import HTTPConnection
+from pathlib import Path
+
+import pytest
+from langchain.agents import create_agent
+from langchain_core.messages import AIMessage
+
+from lily.agents.lily_supervisor import LilySupervisor
+from lily.daemon.client import DaemonBusyResponseError, DaemonClient, DaemonClientError
+from lily.daemon.protocol import DaemonRunRequest, DaemonSupervisorKey
+from lily.daemon.server import (
+    LilyDaemon,
+    LilyDaemonHttpServer,
+    create_daemon_server,
+    write_daemon_token,
+)
+from lily.runtime.agent_runtime import AgentRunResult, AgentRuntime
+from lily.runtime.run_cancellation import RunCancellation
+
+pytestmark = pytest.mark.integration
+
+_KEY = DaemonSupervisorKey(config_path="/virtual/agent.toml")
+
+
+class _BlockingSupervisor:
+    """Supervisor double that holds its run until the test releases it."""
+
+    def __init__(self) -> None:
+        """Initialize coordination events."""
+        self.started = threading.Event()
+        self.release = threading.Event()
+
+    def run_prompt(
+        self,
+        prompt: str,
+        conversation_id: str | None = None,
+        *,
+        timeout: float | None = None,
+        cancellation: RunCancellation | None = None,
+    ) -> AgentRunResult:
+        """Block until released, then echo the prompt."""
+        del timeout, cancellation
+        self.started.set()
+        self.release.wait(timeout=5)
+        return AgentRunResult(
+            final_output=prompt,
+            message_count=2,
+            conversation_id=conversation_id,
+        )
+
+    def close(self) -> None:
+        """Release any blocked run."""
+        self.release.set()
+
+
+class _CancellableStreamSupervisor:
+    """Supervisor double streaming one token, then waiting to be cancelled."""
+
+    def __init__(self) -> None:
+        """Initialize the recorded cancellation outcome."""
+        self.finished = threading.Event()
+        self.cancelled = False
+
+    def run_prompt_stream(
+        self,
+        prompt: str,
+        conversation_id: str | None = None,
+        *,
+        on_token: Callable[[str], None],
+        timeout: float | None = None,
+        cancellation: RunCancellation | None = None,
+    ) -> AgentRunResult:
+        """Stream one token, then wait up to five seconds for cancellation."""
+        del timeout
+        assert cancellation is not None
+        on_token("partial")
+        deadline = time.monotonic() + 5
+        while not cancellation.cancelled and time.monotonic() < deadline:
+            time.sleep(0.01)
+        self.cancelled = cancellation.cancelled
+        self.finished.set()
+        return AgentRunResult(
+            final_output=prompt,
+            message_count=2,
+            conversation_id=conversation_id,
+            status="cancelled",
+        )
+
+    def close(self) -> None:
+        """Release nothing; runs end on their own."""
+
+
+@contextmanager
+def _serve(daemon: LilyDaemon) -> Iterator[LilyDaemonHttpServer]:
+    """Run one daemon server on an ephemeral port for the duration of a test."""
+    server = create_daemon_server(daemon, host="127.0.0.1", port=0)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield server
+    finally:
+        server.shutdown()
+        server.server_close()
+        daemon.close()
+        thread.join(timeout=5)
+
+
+def _client(server: LilyDaemonHttpServer) -> DaemonClient:
+    """Return a client holding ``server``'s access token."""
+    return DaemonClient(server.url, token=server.token, timeout_seconds=10)
+
+
+def test_daemon_reuses_one_warm_supervisor_across_prompts(
+    make_fake_runtime: Callable[..., AgentRuntime],
+) -> None:
+    """Builds the supervisor once and keeps checkpoint history between requests."""
+    # Arrange - daemon whose factory counts supervisor builds.
+    builds: list[DaemonSupervisorKey] = []
+
+    def _factory(key: DaemonSupervisorKey) -> LilySupervisor:
+        builds.append(key)
+        runtime = make_fake_runtime(
+            [AIMessage(content="first"), AIMessage(content="second")]
+        )
+        return LilySupervisor(runtime=runtime)
+
+    daemon = LilyDaemon(
+        allowed_keys=[_KEY],
+        max_in_flight=2,
+        max_queue=2,
+        supervisor_factory=_factory,
+    )
+
+    # Act - send two prompts for the same conversation through the client.
+    with _serve(daemon) as server:
+        client = _client(server)
+        first = client.run_prompt(
+            DaemonRunRequest(prompt="one", conversation_id="conv-d", supervisor=_KEY)
+        )
+        second = client.run_prompt(
+            DaemonRunRequest(prompt="two", conversation_id="conv-d", supervisor=_KEY)
+        )
+        health = client.health()
+
+    # Assert - one build, resumed history, counters reflect both runs.
+    assert builds == [_KEY]
+    assert (first.final_output, first.message_count) == ("first", 2)
+    assert (second.final_output, second.message_count) == ("second", 4)
+    assert second.conversation_id == "conv-d"
+    assert health.status == "ok"
+    assert health.completed == 2
+    assert health.supervisors == 1
+
+
+def test_daemon_start_warmup_compiles_agent_before_first_prompt(
+    make_fake_runtime: Callable[..., AgentRuntime],
+) -> None:
+    """Background warm-up compiles the agent; the first prompt reuses it."""
+    # Arrange - daemon over a runtime whose agent builder counts compiles.
+    compiles: list[str] = []
+
+    def _agent_builder(**kwargs: object) -> object:
+        compiles.append(str(kwargs["name"]))
+        return create_agent(**kwargs)  # type: ignore[arg-type]
+
+    daemon = LilyDaemon(
+        allowed_keys=[_KEY],
+        max_in_flight=1,
+        max_queue=0,
+        supervisor_factory=lambda _key: LilySupervisor(
+            runtime=make_fake_runtime(
+                [AIMessage(content="warm reply")],
+                agent_builder=_agent_builder,
+            )
+        ),
+    )
+
+    # Act - warm up in the background, then send one prompt.
+    daemon.start_warmup(_KEY).join(timeout=10)
+    compiles_before_prompt = list(compiles)
+    with _serve(daemon) as server:
+        client = _client(server)
+        result = client.run_prompt(DaemonRunRequest(prompt="hi", supervisor=_KEY))
+
+    # Assert - exactly one compile, done before the prompt arrived.
+    assert compiles_before_prompt == ["lily"]
+    assert compiles == ["lily"]
+    assert result.final_output == "warm reply"
+
+
+def test_daemon_streams_tokens_to_client(
+    make_fake_runtime: Callable[..., AgentRuntime],
+) -> None:
+    """Streaming requests forward reply tokens before the final result."""
+    # Arrange - daemon over a fake runtime and a token sink.
+    daemon = LilyDaemon(
+        allowed_keys=[_KEY],
+        max_in_flight=1,
+        max_queue=0,
+        supervisor_factory=lambda _key: LilySupervisor(
+            runtime=make_fake_runtime([AIMessage(content="streamed reply")])
+        ),
+    )
+    tokens: list[str] = []
+
+    # Act - stream one prompt.
+    with _serve(daemon) as server:
+        client = _client(server)
+        result = client.run_prompt(
+            DaemonRunRequest(prompt="hi", supervisor=_KEY, stream=True),
+            on_token=tokens.append,
+        )
+
+    # Assert - tokens reassemble into the final output.
+    assert tokens
+    assert "".join(tokens) == result.final_output == "streamed reply"
+
+
+def test_daemon_cancels_a_streamed_run_when_the_client_disconnects() -> None:
+    """A client hanging up mid-stream cancels its run and frees the slot."""
+    # Arrange - one slot and a supervisor that streams, then awaits cancellation.
+    supervisor = _CancellableStreamSupervisor()
+    daemon = LilyDaemon(
+        allowed_keys=[_KEY],
+        max_in_flight=1,
+        max_queue=0,
+        supervisor_factory=lambda _key: supervisor,  # type: ignore[arg-type,return-value]
+    )
+    body = DaemonRunRequest(prompt="hi", supervisor=_KEY, stream=True)
+
+    # Act - read the first token, hang up, then wait for the slot to free.
+    with _serve(daemon) as server:
+        connection = HTTPConnection(server.server_address[0], server.server_port)
+        connection.request(
+            "POST",
+            "/v1/run",
+            body=body.model_dump_json(),
+            headers={
+                "Content-Type": "application/json",
+                "Authorization": f"Bearer {server.token}",
+            },
+        )
+        response = connection.getresponse()
+        first_line = response.readline()
+        response.close()
+        connection.close()
+        finished = supervisor.finished.wait(timeout=10)
+        client = _client(server)
+        deadline = time.monotonic() + 5
+        while client.health().in_flight and time.monotonic() < deadline:
+            time.sleep(0.01)
+        health = client.health()
+
+    # Assert - the token streamed, the run saw cancellation, the slot is free.
+    assert b'"partial"' in first_line
+    assert finished
+    assert supervisor.cancelled
+    assert (health.in_flight, health.completed) == (0, 1)
+
+
+def test_daemon_rejects_prompts_beyond_queue_capacity() -> None:
+    """A saturated daemon answers 503 and reports not-ready until it drains."""
+    # Arrange - one slot, no queue, and a supervisor that blocks.
+    supervisor = _BlockingSupervisor()
+    daemon = LilyDaemon(
+        allowed_keys=[_KEY],
+        max_in_flight=1,
+        max_queue=0,
+        supervisor_factory=lambda _key: supervisor,  # type: ignore[arg-type,return-value]
+    )
+    request = DaemonRunRequest(prompt="held", supervisor=_KEY)
+    outputs: list[str] = []
+
+    # Act - occupy the only slot, then probe and submit a second prompt.
+    with _serve(daemon) as server:
+        client = _client(server)
+        holder = threading.Thread(
+            target=lambda: outputs.append(client.run_prompt(request).final_output)
+        )
+        holder.start()
+        assert supervisor.started.wait(timeout=5)
+        ready_while_busy = client.is_ready()
+        with pytest.raises(DaemonBusyResponseError, match="busy"):
+            client.run_prompt(request)
+        supervisor.release.set()
+        holder.join(timeout=5)
+        ready_after = client.is_ready()
+        health = client.health()
+
+    # Assert - rejection is counted and readiness recovers.
+    assert not ready_while_busy
+    assert ready_after
+    assert outputs == ["held"]
+    assert health.rejected == 1
+    assert health.completed == 1
+
+
+def test_daemon_client_reports_unreachable_daemon() -> None:
+    """Client raises a typed error when nothing listens on the daemon URL."""
+    # Arrange - bind and release a port so it is very likely closed.
+    server = create_daemon_server(
+        LilyDaemon(allowed_keys=[], max_in_flight=1, max_queue=0),
+        host="127.0.0.1",
+        port=0,
+    )
+    url = server.url
+    server.server_close()
+
+    # Act - probe the closed port.
+    with pytest.raises(DaemonClientError, match="not reachable") as exc_info:
+        DaemonClient(url, timeout_seconds=2).health()
+
+    # Assert - the error names the daemon URL.
+    assert url in str(exc_info.value)
+
+
+def test_daemon_refuses_unauthenticated_and_unlisted_run_requests(
+    make_fake_runtime: Callable[..., AgentRuntime],
+) -> None:
+    """Runs need JSON, the daemon token, and a config allow-listed at startup."""
+    # Arrange - daemon allowing only ``_KEY`` and recording supervisor builds.
+    builds: list[DaemonSupervisorKey] = []
+
+    def _factory(key: DaemonSupervisorKey) -> LilySupervisor:
+        builds.append(key)
+        return LilySupervisor(runtime=make_fake_runtime([AIMessage(content="ok")]))
+
+    daemon = LilyDaemon(
+        allowed_keys=[_KEY],
+        max_in_flight=1,
+        max_queue=0,
+        supervisor_factory=_factory,
+    )
+    other = DaemonSupervisorKey(config_path="/etc/elsewhere/agent.toml")
+    body = DaemonRunRequest(prompt="hi", supervisor=_KEY).model_dump_json()
+
+    # Act - a text/plain post, an anonymous client, and an unlisted config.
+    with _serve(daemon) as server:
+        connection = HTTPConnection(server.server_address[0], server.server_port)
+        connection.request(
+            "POST",
+            "/v1/run",
+            body=body,
+            headers={
+                "Content-Type": "text/plain",
+                "Authorization": f"Bearer {server.token}",
+            },
+        )
+        simple_post = connection.getresponse().status
+        connection.close()
+        with pytest.raises(DaemonClientError, match="daemon token"):
+            DaemonClient(server.url, timeout_seconds=10).run_prompt(
+                DaemonRunRequest(prompt="hi", supervisor=_KEY)
+            )
+        with pytest.raises(DaemonClientError, match="not served"):
+            _client(server).run_prompt(DaemonRunRequest(prompt="hi", supervisor=other))
+
+    # Assert - nothing was built or run for any refused request.
+    assert simple_post == HTTPStatus.UNSUPPORTED_MEDIA_TYPE
+    assert builds == []
+    assert not daemon.allows(other)
+
+
+def test_daemon_answers_malformed_and_oversized_content_lengths(
+    make_fake_runtime: Callable[..., AgentRuntime],
+) -> None:
+    """Bad ``Content-Length`` headers get ``400``; oversized bodies get ``413``."""
+    # Arrange - daemon that would answer any prompt that got through.
+    daemon = LilyDaemon(
+        allowed_keys=[_KEY],
+        max_in_flight=1,
+        max_queue=0,
+        supervisor_factory=lambda _key: LilySupervisor(
+            runtime=make_fake_runtime([AIMessage(content="ok")])
+        ),
+    )
+
+    def _post_status(server: LilyDaemonHttpServer, length: str) -> int:
+        connection = HTTPConnection(server.server_address[0], server.server_port)
+        try:
+            connection.putrequest("POST", "/v1/run")
+            connection.putheader("Content-Type", "application/json")
+            connection.putheader("Authorization", f"Bearer {server.token}")
+            connection.putheader("Content-Length", length)
+            connection.endheaders()
+            return connection.getresponse().status
+        finally:
+            connection.close()
+
+    # Act - non-numeric, negative, and oversized declared lengths.
+    with _serve(daemon) as server:
+        statuses = [
+            _post_status(server, length) for length in ("abc", "-1", str(2**21))
+        ]
+
+    # Assert - each was refused before any body was read or run started.
+    assert statuses == [
+        HTTPStatus.BAD_REQUEST,
+        HTTPStatus.BAD_REQUEST,
+        HTTPStatus.REQUEST_ENTITY_TOO_LARGE,
+    ]
+    assert daemon.status().completed == 0
+
+
+@pytest.mark.skipif(os.name == "nt", reason="POSIX permission bits")
+def test_write_daemon_token_replaces_file_with_owner_only_copy(tmp_path: Path) -> None:
+    """The token file is recreated ``0600`` even over a world-readable file."""
+    # Arrange - a stale world-readable token file.
+    path = tmp_path / ".lily" / "daemon.token"
+    path.parent.mkdir()
+    path.write_text("stale", encoding="utf-8")
+    path.chmod(0o644)
+
+    # Act - write a fresh token.
+    write_daemon_token(path, "fresh-token")
+
+    # Assert - owner-only file holding only the new token.
+    assert stat.S_IMODE(path.stat().st_mode) == 0o600
+    assert path.read_text(encoding="utf-8") == "fresh-token"
@@ -2,12 +2,16 @@
 
 from __future__ import annotations
 
+import asyncio
 from pathlib import Path
+from typing import cast
 
 import pytest
 from langchain_core.tools import BaseTool
 
 from lily.agents.lily_supervisor import LilySupervisor
+from lily.runtime.agent_runtime import AgentRunResult, AgentRuntime
+from lily.runtime.run_cancellation import RunCancellation
 from lily.runtime.tool_registry import ToolRegistry
 
 pytestmark = pytest.mark.integration
@@ -323,3 +327,45 @@ target = "lily.runtime.skill_retrieve_tool:skill_retrieve"
     # Assert - runtime skill bundle contains the local agent skill.
     assert runtime._skill_bundle is not None
     assert "math-skill" in runtime._skill_bundle.registry.canonical_keys()
+
+
+class _AsyncOnlyRuntime:
+    """Runtime double exposing only the async run surface."""
+
+    def __init__(self) -> None:
+        """Initialize empty capture list."""
+        self.calls: list[tuple[str, str | None, float | None]] = []
+
+    async def arun(
+        self,
+        user_prompt: str,
+        conversation_id: str | None = None,
+        *,
+        timeout: float | None = None,
+        cancellation: RunCancellation | None = None,
+    ) -> AgentRunResult:
+        """Record the call and return a deterministic result."""
+        del cancellation
+        self.calls.append((user_prompt, conversation_id, timeout))
+        return AgentRunResult(
+            final_output=f"async: {user_prompt}",
+            message_count=2,
+            conversation_id=conversation_id,
+        )
+
+
+def test_supervisor_arun_prompt_awaits_runtime_arun() -> None:
+    """`arun_prompt` delegates to the runtime's native async entrypoint."""
+    # Arrange - supervisor over an async-only runtime double.
+    runtime = _AsyncOnlyRuntime()
+    supervisor = LilySupervisor(runtime=cast(AgentRuntime, runtime))
+
+    # Act - await one prompt from a caller-owned event loop.
+    result = asyncio.run(
+        supervisor.arun_prompt("hello", conversation_id="conv-1", timeout=30.0)
+    )
+
+    # Assert - runtime arun received prompt, conversation id and deadline.
+    assert runtime.calls == [("hello", "conv-1", 30.0)]
+    assert result.final_output == "async: hello"
+    assert result.conversation_id == "conv-1"
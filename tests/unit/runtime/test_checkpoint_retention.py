@@ -0,0 +1,290 @@
+"""Unit tests for checkpoint retention and compaction."""
+
+from __future__ import annotations
+
+import sqlite3
+import time
+from contextlib import closing
+from datetime import UTC, datetime, timedelta
+from pathlib import Path
+from uuid import UUID
+
+import pytest
+
+from lily.runtime.checkpoint_retention import (
+    CheckpointCompactionReport,
+    CheckpointCompactor,
+    checkpoint_created_at,
+    compact_checkpoints,
+    discover_session_databases,
+    load_live_thread_ids,
+)
+from lily.runtime.config_schema import CheckpointRetentionConfig
+from lily.runtime.conversation_sessions import ConversationSessionStore
+
+pytestmark = pytest.mark.unit
+
+_NOW = datetime(2026, 3, 1, 12, 0, tzinfo=UTC)
+_UUID_GREGORIAN_EPOCH_OFFSET = 0x01B21DD213814000
+
+
+def _checkpoint_id(at: datetime, sequence: int = 0) -> str:
+    """Build a UUIDv6 checkpoint id encoding ``at`` like the LangGraph saver.
+
+    Args:
+        at: Creation time to encode.
+        sequence: Low bits distinguishing ids created at the same instant.
+
+    Returns:
+        Canonical UUID string.
+    """
+    ticks = round(at.timestamp() * 10_000_000) + _UUID_GREGORIAN_EPOCH_OFFSET
+    value = (
+        ((ticks >> 12) << 80)
+        | (6 << 76)
+        | ((ticks & 0x0FFF) << 64)
+        | (0b10 << 62)
+        | sequence
+    )
+    return str(UUID(int=value))
+
+
+def _create_checkpoint_db(path: Path) -> None:
+    """Create the LangGraph SQLite checkpoint schema.
+
+    Args:
+        path: Database file to create.
+    """
+    with closing(sqlite3.connect(path)) as conn:
+        conn.executescript(
+            """
+            CREATE TABLE checkpoints (
+                thread_id TEXT NOT NULL,
+                checkpoint_ns TEXT NOT NULL DEFAULT '',
+                checkpoint_id TEXT NOT NULL,
+                parent_checkpoint_id TEXT,
+                type TEXT,
+                checkpoint BLOB,
+                metadata BLOB,
+                PRIMARY KEY (thread_id, checkpoint_ns, checkpoint_id)
+            );
+            CREATE TABLE writes (
+                thread_id TEXT NOT NULL,
+                checkpoint_ns TEXT NOT NULL DEFAULT '',
+                checkpoint_id TEXT NOT NULL,
+                task_id TEXT NOT NULL,
+                task_path TEXT NOT NULL DEFAULT '',
+                idx INTEGER NOT NULL,
+                channel TEXT NOT NULL,
+                type TEXT,
+                value BLOB,
+                PRIMARY KEY (thread_id, checkpoint_ns, checkpoint_id, task_id, idx)
+            );
+            """
+        )
+
+
+def _add_thread(path: Path, thread_id: str, *, count: int, last: datetime) -> None:
+    """Insert ``count`` checkpoints, one write each, ending at ``last``.
+
+    Args:
+        path: Checkpoint database file.
+        thread_id: Thread id to populate.
+        count: Number of checkpoints to insert.
+        last: Creation time of the newest checkpoint.
+    """
+    with closing(sqlite3.connect(path)) as conn:
+        for offset in range(count):
+            checkpoint_id = _checkpoint_id(last - timedelta(seconds=count - 1 - offset))
+            conn.execute(
+                "INSERT INTO checkpoints(thread_id, checkpoint_id, checkpoint) "
+                "VALUES(?, ?, ?)",
+                (thread_id, checkpoint_id, b"x" * 2048),
+            )
+            conn.execute(
+                "INSERT INTO writes(thread_id, checkpoint_id, task_id, idx, channel) "
+                "VALUES(?, ?, 'task', 0, 'messages')",
+                (thread_id, checkpoint_id),
+            )
+        conn.commit()
+
+
+def _thread_counts(path: Path) -> dict[str, int]:
+    """Return checkpoint row counts per thread id.
+
+    Args:
+        path: Checkpoint database file.
+
+    Returns:
+        Mapping of thread id to checkpoint count.
+    """
+    with closing(sqlite3.connect(path)) as conn:
+        rows = conn.execute(
+            "SELECT thread_id, COUNT(*) FROM checkpoints GROUP BY thread_id"
+        ).fetchall()
+    return {str(thread_id): int(count) for thread_id, count in rows}
+
+
+def test_checkpoint_created_at_decodes_uuid6_and_rejects_other_ids() -> None:
+    """Reads creation time from UUIDv6 ids and ignores other formats."""
+    # Arrange - encode a known instant and pick a non-v6 id.
+    checkpoint_id = _checkpoint_id(_NOW)
+
+    # Act - decode both ids.
+    decoded = checkpoint_created_at(checkpoint_id)
+    rejected = checkpoint_created_at("00000000-0000-4000-8000-000000000000")
+
+    # Assert - v6 round-trips and other ids carry no timestamp.
+    assert decoded == _NOW
+    assert rejected is None
+
+
+def test_compact_trims_each_thread_to_keep_last(tmp_path: Path) -> None:
+    """Keeps only the newest checkpoints per thread and drops their writes."""
+    # Arrange - one live thread with more checkpoints than the policy keeps.
+    db_path = tmp_path / "checkpoints.sqlite3"
+    _create_checkpoint_db(db_path)
+    _add_thread(db_path, "live", count=5, last=_NOW)
+    policy = CheckpointRetentionConfig(keep_last=2, vacuum_pages=0)
+
+    # Act - compact with the thread marked live.
+    report = compact_checkpoints(
+        db_path, policy, live_thread_ids=frozenset({"live"}), now=_NOW
+    )
+
+    # Assert - three checkpoints and their writes are gone.
+    assert report == CheckpointCompactionReport(
+        threads_deleted=0, checkpoints_deleted=3, writes_deleted=3, freed_pages=0
+    )
+    assert _thread_counts(db_path) == {"live": 2}
+
+
+def test_compact_expires_orphans_and_finished_ephemeral_threads(
+    tmp_path: Path,
+) -> None:
+    """Deletes idle orphans and ephemeral threads but keeps fresh ones."""
+    # Arrange - live, stale orphan, fresh orphan, old and in-flight ephemeral.
+    db_path = tmp_path / "checkpoints.sqlite3"
+    _create_checkpoint_db(db_path)
+    _add_thread(db_path, "live", count=1, last=_NOW - timedelta(days=90))
+    _add_thread(db_path, "stale-orphan", count=1, last=_NOW - timedelta(hours=48))
+    _add_thread(db_path, "fresh-orphan", count=1, last=_NOW - timedelta(hours=1))
+    _add_thread(db_path, "ephemeral-old", count=2, last=_NOW - timedelta(hours=1))
+    _add_thread(db_path, "ephemeral-new", count=1, last=_NOW - timedelta(seconds=5))
+    policy = CheckpointRetentionConfig(orphan_ttl_hours=24.0, vacuum_pages=0)
+
+    # Act - compact with only the live thread referenced by sessions.
+    report = compact_checkpoints(
+        db_path, policy, live_thread_ids=frozenset({"live"}), now=_NOW
+    )
+
+    # Assert - stale orphan and finished ephemeral thread are removed.
+    assert report.threads_deleted == 2
+    assert report.checkpoints_deleted == 3
+    assert report.writes_deleted == 3
+    assert _thread_counts(db_path) == {
+        "live": 1,
+        "fresh-orphan": 1,
+        "ephemeral-new": 1,
+    }
+
+
+def test_compact_keeps_orphans_when_ttl_disabled(tmp_path: Path) -> None:
+    """Leaves unreferenced threads alone when orphan expiry is off."""
+    # Arrange - one very old orphan thread.
+    db_path = tmp_path / "checkpoints.sqlite3"
+    _create_checkpoint_db(db_path)
+    _add_thread(db_path, "orphan", count=1, last=_NOW - timedelta(days=365))
+    policy = CheckpointRetentionConfig(orphan_ttl_hours=None, vacuum_pages=0)
+
+    # Act - compact without any live ids.
+    report = compact_checkpoints(db_path, policy, live_thread_ids=frozenset(), now=_NOW)
+
+    # Assert - nothing was deleted.
+    assert report == CheckpointCompactionReport()
+    assert _thread_counts(db_path) == {"orphan": 1}
+
+
+def test_compact_vacuums_freed_pages(tmp_path: Path) -> None:
+    """Returns pages freed by deletions to the filesystem."""
+    # Arrange - a thread large enough to leave free pages once trimmed.
+    db_path = tmp_path / "checkpoints.sqlite3"
+    _create_checkpoint_db(db_path)
+    _add_thread(db_path, "live", count=200, last=_NOW)
+    size_before = db_path.stat().st_size
+    policy = CheckpointRetentionConfig(keep_last=1)
+
+    # Act - compact twice; the first pass enables incremental vacuum.
+    first = compact_checkpoints(
+        db_path, policy, live_thread_ids=frozenset({"live"}), now=_NOW
+    )
+    _add_thread(db_path, "live", count=200, last=_NOW + timedelta(hours=1))
+    second = compact_checkpoints(
+        db_path, policy, live_thread_ids=frozenset({"live"}), now=_NOW
+    )
+
+    # Assert - both passes freed pages and the file shrank.
+    assert first.freed_pages > 0
+    assert second.freed_pages > 0
+    assert db_path.stat().st_size < size_before
+    with closing(sqlite3.connect(db_path)) as conn:
+        assert conn.execute("PRAGMA auto_vacuum").fetchone()[0] == 2
+
+
+def test_compact_missing_database_is_a_no_op(tmp_path: Path) -> None:
+    """Does not create a database that does not exist yet."""
+    # Arrange - point at a missing file.
+    db_path = tmp_path / "missing.sqlite3"
+
+    # Act - compact the missing database.
+    report = compact_checkpoints(
+        db_path,
+        CheckpointRetentionConfig(),
+        live_thread_ids=frozenset(),
+        now=_NOW,
+    )
+
+    # Assert - empty report and no file created.
+    assert report == CheckpointCompactionReport()
+    assert not db_path.exists()
+
+
+def test_live_thread_ids_cover_workspace_and_named_agents(tmp_path: Path) -> None:
+    """Reads conversation ids from workspace and per-agent session stores."""
+    # Arrange - one workspace session and one named-agent session.
+    workspace_id = ConversationSessionStore(
+        tmp_path / ".lily" / "sessions.sqlite3"
+    ).start_new()
+    agent_id = ConversationSessionStore(
+        tmp_path / ".lily" / "agents" / "helper" / ".lily" / "sessions.sqlite3"
+    ).start_new()
+
+    # Act - discover stores and load their ids.
+    live = load_live_thread_ids(discover_session_databases(tmp_path))
+
+    # Assert - both conversations are live.
+    assert live == frozenset({workspace_id, agent_id})
+
+
+def test_compactor_runs_in_background_until_stopped(tmp_path: Path) -> None:
+    """Compacts periodically on its own thread and stops cleanly."""
+    # Arrange - an oversized thread and a fast interval.
+    db_path = tmp_path / "checkpoints.sqlite3"
+    _create_checkpoint_db(db_path)
+    _add_thread(db_path, "live", count=3, last=datetime.now(tz=UTC))
+    compactor = CheckpointCompactor(
+        db_path,
+        CheckpointRetentionConfig(keep_last=1, vacuum_pages=0),
+        interval_seconds=0.01,
+        live_thread_ids=lambda: frozenset({"live"}),
+    )
+
+    # Act - let at least one pass run, then stop.
+    compactor.start()
+    deadline = time.monotonic() + 5.0
+    while _thread_counts(db_path) != {"live": 1} and time.monotonic() < deadline:
+        time.sleep(0.01)
+    compactor.stop()
+
+    # Assert - the background pass trimmed the thread.
+    assert _thread_counts(db_path) == {"live": 1}
@@ -751,6 +751,36 @@ policies:
     assert config.policies.conversation_compression.keep.value == 1
 
 
+def test_load_runtime_config_rejects_unknown_compression_profile(
+    tmp_path: Path,
+) -> None:
+    """Rejects a summarization profile missing from ``models.profiles``."""
+    # Arrange - compression names an undefined profile.
+    config_file = tmp_path / "agent.yaml"
+    _write(
+        config_file,
+        _minimal_runtime_yaml_with_skills(
+            "",
+            policies_block="""
+policies:
+  max_iterations: 12
+  max_model_calls: 20
+  max_tool_calls: 20
+  conversation_compression:
+    enabled: true
+    profile: summarizer
+""",
+        ),
+    )
+
+    # Act - attempt to validate the profile reference.
+    with pytest.raises(ConfigLoadError) as err:
+        load_runtime_config(config_file)
+
+    # Assert - error cites the compression profile field.
+    assert "conversation_compression.profile" in str(err.value)
+
+
 def test_load_runtime_config_rejects_skills_tools_unknown_default_pack(
     tmp_path: Path,
 ) -> None:
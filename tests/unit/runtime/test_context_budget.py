@@ -0,0 +1,257 @@
+"""Unit tests for the per-call context-window budget planner."""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+from typing import Any
+
+import pytest
+from langchain.agents.middleware import ModelRequest, ModelResponse
+from langchain_core.language_models.fake_chat_models import FakeMessagesListChatModel
+from langchain_core.messages import (
+    AIMessage,
+    AnyMessage,
+    HumanMessage,
+    SystemMessage,
+    ToolMessage,
+)
+
+from lily.runtime.config_schema import ContextBudgetConfig
+from lily.runtime.context_budget import (
+    ContextBudgetMiddleware,
+    plan_context,
+    trim_history,
+    truncate_identity,
+)
+from lily.runtime.run_timings import bind_run_timings, reset_run_timings
+from lily.runtime.token_accounting import TokenAccountant
+
+pytestmark = pytest.mark.unit
+
+_MEASURED = {
+    "system": 100,
+    "identity": 1000,
+    "catalog": 600,
+    "tools": 200,
+    "history": 3000,
+}
+
+
+def test_plan_context_applies_caps_then_shrinks_in_priority_order() -> None:
+    """Caps apply first; overflow is cut in ``shrink_order`` down to floors."""
+    # Arrange - identity capped at 800; catalog shrinks before history.
+    config = ContextBudgetConfig(
+        enabled=True,
+        reserve_output_tokens=1000,
+        identity_max_tokens=800,
+        shrink_order=["catalog", "history", "identity"],
+    )
+
+    # Act - plan against a roomy, a tight, an impossible, and no window.
+    roomy = plan_context(_MEASURED, config, window=6000, history_floor=50)
+    tight = plan_context(_MEASURED, config, window=5000, history_floor=50)
+    stepped = plan_context(
+        {**_MEASURED, "identity": 700}, config, window=5400, history_floor=50
+    )
+    impossible = plan_context(_MEASURED, config, window=1200, history_floor=50)
+    unknown = plan_context(_MEASURED, config, window=None, history_floor=50)
+
+    # Assert - only the cap under a roomy window; catalog, then history, else refuse.
+    assert roomy.fits
+    assert roomy.reduced == ("identity",)
+    assert tight.budget == 4000
+    assert tight.planned == {
+        **_MEASURED,
+        "identity": 800,
+        "catalog": 0,
+        "history": 2900,
+    }
+    assert tight.reduced == ("identity", "catalog", "history")
+    assert stepped.planned["catalog"] == 600 - 256
+    assert not impossible.fits
+    assert impossible.planned == {
+        **_MEASURED,
+        "identity": 0,
+        "catalog": 0,
+        "history": 50,
+    }
+    assert unknown.fits
+    assert unknown.budget is None
+
+
+def test_truncation_keeps_identity_files_and_newest_history() -> None:
+    """Every identity file keeps its heading; history restarts at a human turn."""
+    # Arrange - five long identity files and a history with a tool round trip.
+    files = ("AGENTS.md", "IDENTITY.md", "SOUL.md", "USER.md", "TOOLS.md")
+    identity = "## Agent identity context\n\n" + "\n\n".join(
+        f"### {name}\n" + "\n".join(f"{name} rule {i}" for i in range(40))
+        for name in files
+    )
+    messages: list[AnyMessage] = [
+        HumanMessage(content="first question"),
+        AIMessage(
+            content="",
+            tool_calls=[{"name": "ping", "args": {}, "id": "c1", "type": "tool_call"}],
+        ),
+        ToolMessage(content="pong", tool_call_id="c1"),
+        AIMessage(content="first answer"),
+        HumanMessage(content="second question"),
+        AIMessage(content="second answer"),
+        HumanMessage(content="third question"),
+    ]
+    counts = [100, 100, 100, 100, 100, 100, 100]
+
+    # Act - fit identity into 1000 characters and history into 450 tokens.
+    truncated = truncate_identity(identity, 1000, len)
+    kept = trim_history(messages, counts, 450)
+    tail = trim_history(messages, counts, 50)
+
+    # Assert - bounded identity with all headings; spans start on human turns.
+    assert len(truncated) <= 1000
+    assert truncated.startswith("## Agent identity context")
+    assert all(f"### {name}" in truncated for name in files)
+    assert "truncated to fit the model context window" in truncated
+    assert truncate_identity(identity, len(identity), len) == identity
+    assert kept == messages[4:]
+    assert tail == messages[-1:]
+
+
+def _call(*call_ids: str) -> AIMessage:
+    """Return an AI turn calling ``ping`` once per call id."""
+    return AIMessage(
+        content="",
+        tool_calls=[
+            {"name": "ping", "args": {}, "id": call_id, "type": "tool_call"}
+            for call_id in call_ids
+        ],
+    )
+
+
+def test_trim_history_keeps_current_turn_and_trailing_tool_results() -> None:
+    """Mid tool loop, the task and the last call with its results always stay."""
+    # Arrange - an earlier turn, then a turn with two tool rounds (one parallel).
+    messages: list[AnyMessage] = [
+        HumanMessage(content="earlier question"),
+        AIMessage(content="earlier answer"),
+        HumanMessage(content="current task"),
+        _call("c1"),
+        ToolMessage(content="pong", tool_call_id="c1"),
+        _call("c2", "c3"),
+        ToolMessage(content="pong", tool_call_id="c2"),
+        ToolMessage(content="pong", tool_call_id="c3"),
+    ]
+    short: list[AnyMessage] = [messages[2], messages[3], messages[4]]
+
+    # Act - trim both histories far below their pinned messages.
+    kept = trim_history(messages, [100] * len(messages), 500)
+    floor = trim_history(short, [10, 10, 1000], 1000)
+
+    # Assert - no orphaned tool results; the current task is never dropped.
+    assert kept == [messages[2], *messages[5:]]
+    assert floor == short
+
+
+def _request(history: list[AnyMessage]) -> ModelRequest[None]:
+    """Return a model request with ``history`` and the base system prompt."""
+    return ModelRequest(
+        model=FakeMessagesListChatModel(responses=[AIMessage(content="unused")]),
+        messages=history,
+        system_message=SystemMessage(content="You are Lily."),
+    )
+
+
+def test_middleware_trims_history_and_refuses_requests_that_cannot_fit(
+    caplog: pytest.LogCaptureFixture,
+) -> None:
+    """Oversize history is cut before the call; unfittable calls never run."""
+    # Arrange - a 600-token window with a reserve of 100 and a long history.
+    config = ContextBudgetConfig(
+        enabled=True, context_window_tokens=600, reserve_output_tokens=100
+    )
+    middleware = ContextBudgetMiddleware(
+        config,
+        system_prompt="You are Lily.",
+        identity_markdown="",
+        catalog_markdown="",
+        default_profile="default",
+        token_accountant=TokenAccountant({}),
+    )
+    history: list[AnyMessage] = []
+    for index in range(10):
+        history.append(HumanMessage(content=f"question {index} " + "x" * 400))
+        history.append(AIMessage(content=f"answer {index} " + "y" * 400))
+    history.append(HumanMessage(content="latest question"))
+    sent: list[list[AnyMessage]] = []
+
+    def _handler(updated: ModelRequest[None]) -> ModelResponse[Any]:
+        sent.append(updated.messages)
+        return ModelResponse(result=[AIMessage(content="ok")])
+
+    async def _ahandler(updated: ModelRequest[None]) -> ModelResponse[Any]:
+        return _handler(updated)
+
+    huge = [HumanMessage(content="z" * 10_000)]
+    token, recorder = bind_run_timings()
+
+    # Act - one trimmed async call and one sync call that cannot fit.
+    try:
+        with caplog.at_level(logging.DEBUG, logger="lily.context"):
+            reply = asyncio.run(
+                middleware.awrap_model_call(_request(history), _ahandler)
+            )
+            refused = middleware.wrap_model_call(_request(huge), _handler)
+        timings = recorder.snapshot(total_seconds=1.0)
+    finally:
+        reset_run_timings(token)
+
+    # Assert - newest turns sent, refusal without a call, and plan telemetry.
+    [trimmed] = sent
+    assert reply.result[0].content == "ok"
+    assert 1 < len(trimmed) < len(history)
+    assert trimmed[-1] is history[-1]
+    assert isinstance(trimmed[0], HumanMessage)
+    assert str(refused.result[0].content).startswith(
+        "Run stopped: context window exceeded"
+    )
+    events = [json.loads(r.getMessage()) for r in caplog.records]
+    assert [event["reduced"] for event in events] == [["history"], []]
+    assert [event["fits"] for event in events] == [True, False]
+    assert events[0]["planned"]["history"] <= 500 - events[0]["planned"]["system"]
+    assert timings.context_reduced_calls == 1
+
+
+def test_middleware_refuses_when_pinned_tool_results_exceed_the_window() -> None:
+    """A tool result too large for the window is refused, never sent alone."""
+    # Arrange - a current turn whose tool result alone overflows the window.
+    config = ContextBudgetConfig(
+        enabled=True, context_window_tokens=600, reserve_output_tokens=100
+    )
+    middleware = ContextBudgetMiddleware(
+        config,
+        system_prompt="You are Lily.",
+        identity_markdown="",
+        catalog_markdown="",
+        default_profile="default",
+        token_accountant=TokenAccountant({}),
+    )
+    history: list[AnyMessage] = [
+        HumanMessage(content="dump it"),
+        _call("c1"),
+        ToolMessage(content="r" * 4000, tool_call_id="c1"),
+    ]
+    sent: list[list[AnyMessage]] = []
+
+    def _handler(updated: ModelRequest[None]) -> ModelResponse[Any]:
+        sent.append(updated.messages)
+        return ModelResponse(result=[AIMessage(content="ok")])
+
+    # Act - plan the request.
+    refused = middleware.wrap_model_call(_request(history), _handler)
+
+    # Assert - refused with a notice; the model was never called.
+    assert sent == []
+    assert str(refused.result[0].content).startswith(
+        "Run stopped: context window exceeded"
+    )
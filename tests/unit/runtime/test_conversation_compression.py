@@ -2,11 +2,16 @@
 
 from __future__ import annotations
 
+import asyncio
+from collections.abc import Iterable
 from typing import Any
 
 import pytest
+from langchain_core.callbacks import CallbackManagerForLLMRun
 from langchain_core.language_models.fake_chat_models import FakeMessagesListChatModel
-from langchain_core.messages import AIMessage, HumanMessage, RemoveMessage
+from langchain_core.messages import AIMessage, BaseMessage, HumanMessage, RemoveMessage
+from langchain_core.outputs import ChatResult
+from pydantic import Field
 
 from lily.runtime.config_schema import (
     ConversationCompressionConfig,
@@ -14,6 +19,8 @@ from lily.runtime.config_schema import (
     ConversationCompressionTriggerConfig,
 )
 from lily.runtime.conversation_compression import (
+    TimedSummarizationMiddleware,
+    build_background_compressor,
     build_conversation_compression_middleware,
 )
 
@@ -24,6 +31,40 @@ def _state(messages: list[Any]) -> dict[str, Any]:
     return {"messages": messages}
 
 
+class _RecordingModel(FakeMessagesListChatModel):
+    """Fake summary model recording the prompt text of every call."""
+
+    prompts: list[str] = Field(default_factory=list)
+
+    def _generate(
+        self,
+        messages: list[BaseMessage],
+        stop: list[str] | None = None,
+        run_manager: CallbackManagerForLLMRun | None = None,
+        **kwargs: object,
+    ) -> ChatResult:
+        """Record the prompt, then reply from the scripted list."""
+        self.prompts.append("\n".join(str(message.content) for message in messages))
+        return super()._generate(messages, stop, run_manager, **kwargs)
+
+
+def _fold_config() -> ConversationCompressionConfig:
+    """Return config summarizing past four messages and keeping one."""
+    return ConversationCompressionConfig(
+        enabled=True,
+        trigger=ConversationCompressionTriggerConfig(kind="messages", threshold=4),
+        keep=ConversationCompressionKeepConfig(kind="messages", value=1),
+    )
+
+
+def _turns(*contents: str) -> list[Any]:
+    """Return alternating human/AI messages with the given contents."""
+    return [
+        HumanMessage(content=text) if index % 2 == 0 else AIMessage(content=text)
+        for index, text in enumerate(contents)
+    ]
+
+
 def test_conversation_compression_no_trigger_returns_none() -> None:
     """When below the configured threshold, middleware does not mutate state."""
     # Arrange - build config, model, and middleware.
@@ -100,3 +141,158 @@ def test_conversation_compression_trigger_replaces_old_messages_preserves_tail()
     tail_msg = updated_messages[2]
     assert isinstance(tail_msg, HumanMessage)
     assert tail_msg.content == "h3"
+
+
+def test_background_mode_compresses_inline_only_at_hard_limit() -> None:
+    """Background mode keeps the soft trigger between turns, hard limit inline."""
+    # Arrange - background config with soft trigger 4 and hard limit 8 messages.
+    soft = ConversationCompressionConfig(
+        enabled=True,
+        mode="background",
+        trigger=ConversationCompressionTriggerConfig(kind="messages", threshold=4),
+        keep=ConversationCompressionKeepConfig(kind="messages", value=1),
+    )
+    hard = soft.model_copy(
+        update={
+            "hard_limit": ConversationCompressionTriggerConfig(
+                kind="messages", threshold=8
+            )
+        }
+    )
+    model = FakeMessagesListChatModel(responses=[AIMessage(content="SUMMARY")])
+    messages: list[Any] = [HumanMessage(content=f"h{i}") for i in range(5)]
+
+    # Act - build inline and between-turn stages for each config.
+    no_window = build_conversation_compression_middleware(soft, model=model)
+    inline = build_conversation_compression_middleware(hard, model=model)
+    compressor = build_background_compressor(hard, model=model)
+    inline_mode = build_background_compressor(
+        soft.model_copy(update={"mode": "inline"}), model=model
+    )
+
+    # Assert - five messages cross the soft trigger but not the hard limit.
+    assert no_window is None
+    assert isinstance(inline, TimedSummarizationMiddleware)
+    assert not inline.should_compress(messages)
+    assert compressor is not None
+    assert compressor.should_compress(messages)
+    assert inline_mode is None
+
+
+def test_compression_folds_only_messages_after_the_summary_watermark() -> None:
+    """A second pass extends the running summary instead of re-reading history."""
+    # Arrange - one pass already folded h1..a2 into summary S1.
+    model = _RecordingModel(
+        responses=[AIMessage(content="S1"), AIMessage(content="S2")]
+    )
+    middleware = build_conversation_compression_middleware(_fold_config(), model=model)
+    assert middleware is not None
+    first = middleware.before_model(
+        _state(_turns("h1", "a1", "h2", "a2", "h3")), runtime=object()
+    )
+    assert first is not None
+    summary_message, kept = first["messages"][1:]
+    history = [summary_message, kept, *_turns("h4", "a4", "h5")]
+
+    # Act - trigger again on the compacted history plus new turns.
+    second = middleware.before_model(_state(history), runtime=object())
+
+    # Assert - the model saw S1 and the new span only; the watermark advanced.
+    assert second is not None
+    folded = second["messages"][1]
+    assert len(model.prompts) == 2
+    assert "S1" in model.prompts[1]
+    assert "h4" in model.prompts[1]
+    assert "h1" not in model.prompts[1]
+    assert folded.additional_kwargs["lily_summary"] == "S2"
+    assert folded.additional_kwargs["lily_summary_watermark"] == history[-2].id
+    assert second["messages"][2:] == [history[-1]]
+
+
+def test_compression_memoizes_summaries_of_identical_spans() -> None:
+    """Identical spans (ids aside) reuse the first summary without a model call."""
+    # Arrange - middleware and two threads with the same content.
+    model = _RecordingModel(
+        responses=[AIMessage(content="S1"), AIMessage(content="S2")]
+    )
+    middleware = build_conversation_compression_middleware(_fold_config(), model=model)
+    assert middleware is not None
+    contents = ("h1", "a1", "h2", "a2", "h3")
+
+    # Act - summarize both threads.
+    first = middleware.before_model(_state(_turns(*contents)), runtime=object())
+    second = middleware.before_model(_state(_turns(*contents)), runtime=object())
+
+    # Assert - one model call; both summaries carry its text.
+    assert first is not None
+    assert second is not None
+    assert len(model.prompts) == 1
+    assert second["messages"][1].additional_kwargs["lily_summary"] == "S1"
+
+
+def test_compression_map_reduces_spans_larger_than_chunk_tokens() -> None:
+    """Chunks are summarized separately, then one call merges their summaries."""
+    # Arrange - ten tokens per message and two messages per chunk.
+    cfg = _fold_config().model_copy(update={"chunk_tokens": 20})
+    model = _RecordingModel(
+        responses=[
+            AIMessage(content="P1"),
+            AIMessage(content="P2"),
+            AIMessage(content="MERGED"),
+        ]
+    )
+
+    def _ten_per_message(messages: Iterable[Any]) -> int:
+        return 10 * len(list(messages))
+
+    middleware = build_conversation_compression_middleware(
+        cfg, model=model, token_counter=_ten_per_message
+    )
+    assert middleware is not None
+
+    # Act - fold four older messages (h1..a2) in two chunks.
+    update = asyncio.run(middleware.acompressed(_turns("h1", "a1", "h2", "a2", "h3")))
+
+    # Assert - two chunk calls, then a merge over both partial summaries.
+    assert update is not None
+    assert update[1].additional_kwargs["lily_summary"] == "MERGED"
+    assert len(model.prompts) == 3
+    chunk_prompts = sorted(model.prompts[:2])
+    assert "h1" in chunk_prompts[0]
+    assert "h2" not in chunk_prompts[0]
+    assert "h2" in chunk_prompts[1]
+    merge_prompt = model.prompts[2]
+    assert "part 1 of 2" in merge_prompt
+    assert "part 2 of 2" in merge_prompt
+    assert "P1" in merge_prompt
+    assert "P2" in merge_prompt
+
+
+def test_compression_truncates_oversize_inputs_only_when_chunking() -> None:
+    """Unset ``chunk_tokens`` keeps upstream trimming; set, no input exceeds it."""
+    # Arrange - a model reporting its window, and a one-character-per-token count.
+    model = _RecordingModel(
+        responses=[AIMessage(content=f"P{index}") for index in range(6)],
+        profile={"max_input_tokens": 100_000},
+    )
+
+    def _characters(messages: Iterable[Any]) -> int:
+        return sum(len(str(message.content)) for message in messages)
+
+    default = build_conversation_compression_middleware(_fold_config(), model=model)
+    chunked = build_conversation_compression_middleware(
+        _fold_config().model_copy(update={"chunk_tokens": 50}),
+        model=model,
+        token_counter=_characters,
+    )
+    assert isinstance(default, TimedSummarizationMiddleware)
+    assert chunked is not None
+
+    # Act - fold a history holding one message ten times the chunk size.
+    update = asyncio.run(chunked.acompressed(_turns("h1", "x" * 500, "h2", "a2", "h3")))
+
+    # Assert - default trim kept; the oversize message reached the model cut down.
+    assert default.trim_tokens_to_summarize is not None
+    assert update is not None
+    assert not any("x" * 60 in prompt for prompt in model.prompts)
+    assert any("truncated for summarization" in prompt for prompt in model.prompts)
@@ -0,0 +1,176 @@
+"""Unit tests for model call admission, rate limits, and backoff."""
+
+from __future__ import annotations
+
+import asyncio
+import threading
+from types import SimpleNamespace
+from typing import Literal
+
+import pytest
+
+from lily.runtime.config_schema import (
+    ModelCallLimitConfig,
+    ModelCallSchedulingConfig,
+    ModelProvider,
+)
+from lily.runtime.model_call_governor import (
+    ModelCallGovernor,
+    ModelCallPriority,
+    model_call_priority,
+)
+
+pytestmark = pytest.mark.unit
+
+
+class RateLimitError(Exception):
+    """Stand-in for ``openai.RateLimitError`` carrying an HTTP response."""
+
+    def __init__(self, retry_after: str | None = None) -> None:
+        """Attach a response with optional ``retry-after`` header."""
+        super().__init__("rate limited")
+        headers = {"retry-after": retry_after} if retry_after is not None else {}
+        self.response = SimpleNamespace(status_code=429, headers=headers)
+
+
+def _governor(
+    *,
+    queue: Literal["fifo", "priority"] = "fifo",
+    **limits: float,
+) -> ModelCallGovernor:
+    """Build a governor limiting the Ollama provider of profile ``local``."""
+    scheduling = ModelCallSchedulingConfig(
+        providers={ModelProvider.OLLAMA: ModelCallLimitConfig.model_validate(limits)},
+        queue=queue,
+    )
+    return ModelCallGovernor(scheduling, {"local": ModelProvider.OLLAMA})
+
+
+@pytest.mark.parametrize(
+    ("queue", "expected_order"),
+    [
+        ("fifo", ["holder", "normal", "interactive"]),
+        ("priority", ["holder", "interactive", "normal"]),
+    ],
+)
+def test_governor_admits_queued_calls_in_configured_order(
+    queue: Literal["fifo", "priority"],
+    expected_order: list[str],
+) -> None:
+    """One in-flight slot serializes calls; priority queues admit streams first."""
+    # Arrange - a single-slot provider and three calls arriving in order.
+    governor = _governor(queue=queue, max_in_flight=1)
+    admitted: list[str] = []
+
+    async def _call(name: str, priority: ModelCallPriority) -> None:
+        with model_call_priority(priority):
+            async with governor.permit("local"):
+                admitted.append(name)
+                await asyncio.sleep(0.01)
+
+    async def _exercise() -> None:
+        holder = asyncio.create_task(_call("holder", ModelCallPriority.NORMAL))
+        await asyncio.sleep(0)
+        normal = asyncio.create_task(_call("normal", ModelCallPriority.NORMAL))
+        await asyncio.sleep(0)
+        interactive = asyncio.create_task(
+            _call("interactive", ModelCallPriority.INTERACTIVE)
+        )
+        await asyncio.gather(holder, normal, interactive)
+
+    # Act - run the three calls concurrently.
+    asyncio.run(_exercise())
+
+    # Assert - admission order follows the queue discipline.
+    assert admitted == expected_order
+
+
+def test_governor_token_bucket_delays_calls_over_budget() -> None:
+    """A drained tokens-per-minute bucket makes the next call wait for refill."""
+    # Arrange - 1,000 tokens per second of budget.
+    governor = _governor(tokens_per_minute=60_000)
+    assert governor.limits_tokens("local") is True
+    assert governor.limits_tokens("unlimited") is False
+
+    async def _exercise() -> tuple[float, float]:
+        async with governor.permit("local", estimated_tokens=60_000) as first:
+            pass
+        async with governor.permit("local", estimated_tokens=100) as second:
+            pass
+        return first.waited_seconds, second.waited_seconds
+
+    # Act - drain the bucket, then ask for 100 more tokens.
+    first_wait, second_wait = asyncio.run(_exercise())
+
+    # Assert - the first call ran at once; the second waited about 0.1 s.
+    assert first_wait < 0.05
+    assert 0.05 < second_wait < 1.0
+
+
+def test_governor_backoff_only_for_rate_limits_within_retry_budget() -> None:
+    """Rate limits back off (honoring retry-after); other failures do not."""
+    # Arrange - two retries with a 1-2 s first window.
+    governor = ModelCallGovernor(
+        ModelCallSchedulingConfig(rate_limit_retries=2, backoff_base_seconds=2.0),
+        {},
+    )
+
+    # Act - classify several failures at several attempts.
+    jittered = governor.backoff_seconds(RateLimitError(), 0)
+    hinted = governor.backoff_seconds(RateLimitError(retry_after="7"), 1)
+    exhausted = governor.backoff_seconds(RateLimitError(), 2)
+    other = governor.backoff_seconds(TimeoutError(), 0)
+
+    # Assert - jitter stays in the upper half of the window; hints win.
+    assert jittered is not None
+    assert 1.0 <= jittered <= 2.0
+    assert hinted == pytest.approx(7.0)
+    assert exhausted is None
+    assert other is None
+
+
+def test_shared_provider_limits_span_governors_on_other_event_loops() -> None:
+    """Shared governors on two loops queue for one provider slot."""
+    # Arrange - limits unique to this test keep the process-wide limiter private.
+    scheduling = ModelCallSchedulingConfig(
+        providers={
+            ModelProvider.OLLAMA: ModelCallLimitConfig(
+                max_in_flight=1, requests_per_minute=987_654
+            )
+        }
+    )
+    holder = ModelCallGovernor(scheduling, {"local": ModelProvider.OLLAMA}, shared=True)
+    waiter = ModelCallGovernor(scheduling, {"other": ModelProvider.OLLAMA}, shared=True)
+    held = threading.Event()
+    done = threading.Event()
+
+    async def _hold() -> None:
+        async with holder.permit("local"):
+            held.set()
+            await asyncio.to_thread(done.wait, 5)
+
+    thread = threading.Thread(target=asyncio.run, args=(_hold(),))
+    thread.start()
+    assert held.wait(5)
+
+    async def _wait_for_slot() -> tuple[bool, float]:
+        async def _enter() -> float:
+            async with waiter.permit("other") as permit:
+                return permit.waited_seconds
+
+        task = asyncio.create_task(_enter())
+        await asyncio.sleep(0.05)
+        blocked = not task.done()
+        done.set()
+        return blocked, await asyncio.wait_for(task, timeout=5)
+
+    # Act - ask for the provider slot from this thread's own loop.
+    try:
+        blocked, waited = asyncio.run(_wait_for_slot())
+    finally:
+        done.set()
+        thread.join(timeout=5)
+
+    # Assert - the second governor waited for the first one's release.
+    assert blocked
+    assert waited >= 0.04
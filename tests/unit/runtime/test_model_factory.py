@@ -0,0 +1,102 @@
+"""Unit tests for lazy model construction and shared provider connection pools."""
+
+from __future__ import annotations
+
+import asyncio
+
+import httpx
+import pytest
+from langchain_core.language_models import BaseChatModel
+from langchain_core.language_models.fake_chat_models import (
+    FakeMessagesListChatModel,
+    GenericFakeChatModel,
+)
+from langchain_core.messages import AIMessage, HumanMessage
+
+from lily.runtime.config_schema import ModelProfileConfig, ModelProvider
+from lily.runtime.model_clients import shared_http_transports
+from lily.runtime.model_factory import (
+    LazyChatModel,
+    ModelFactory,
+    resolve_chat_model,
+)
+
+pytestmark = pytest.mark.unit
+
+
+def _profile(model: str) -> ModelProfileConfig:
+    """Return an Ollama profile for one model name."""
+    return ModelProfileConfig(
+        provider=ModelProvider.OLLAMA,
+        model=model,
+        temperature=0.0,
+        timeout_seconds=5,
+    )
+
+
+def test_create_models_builds_each_profile_on_first_use() -> None:
+    """Profiles are built only when first called, and only once."""
+    # Arrange - a factory counting builder calls per model name.
+    built: list[str] = []
+
+    def _builder(profile: ModelProfileConfig) -> BaseChatModel:
+        built.append(profile.model)
+        return FakeMessagesListChatModel(responses=[AIMessage(content=profile.model)])
+
+    factory = ModelFactory(builders={ModelProvider.OLLAMA: _builder}, preloaders={})
+
+    # Act - create three profiles, then call one of them twice.
+    models = factory.create_models(
+        {"small": _profile("small"), "large": _profile("large")}
+    )
+    before = list(built)
+    first = models["small"].invoke([HumanMessage(content="hi")])
+    models["small"].invoke([HumanMessage(content="again")])
+
+    # Assert - nothing was built up front; the called profile was built once.
+    assert before == []
+    assert built == ["small"]
+    assert first.content == "small"
+    lazy = models["large"]
+    assert isinstance(lazy, LazyChatModel)
+    assert lazy.is_loaded is False
+    assert resolve_chat_model(lazy) is resolve_chat_model(lazy)
+
+
+def test_shared_http_transports_pool_per_endpoint() -> None:
+    """Each endpoint gets one pool, reused by later clients of that endpoint."""
+    # Arrange - transports for two Ollama endpoints.
+    local = shared_http_transports(ModelProvider.OLLAMA, "http://localhost:11434")
+    remote = shared_http_transports(ModelProvider.OLLAMA, "http://gpu-box:11434")
+
+    # Act - close one client built on the pool, then look the endpoint up again.
+    httpx.Client(transport=local.sync).close()
+    again = shared_http_transports(ModelProvider.OLLAMA, "http://localhost:11434")
+
+    # Assert - same endpoint, same pool; other endpoints get their own.
+    assert again is local
+    assert remote is not local
+
+
+def test_lazy_model_streams_through_the_real_model() -> None:
+    """A lazily built model yields the real model's chunks, not one reply."""
+    # Arrange - a lazy proxy over a model streaming word by word.
+    lazy = LazyChatModel(
+        profile_name="default",
+        loader=lambda: GenericFakeChatModel(
+            messages=iter([AIMessage(content="one two three")] * 2)
+        ),
+    )
+
+    async def _astream() -> list[str]:
+        return [str(chunk.content) async for chunk in lazy.astream("hi")]
+
+    # Act - stream one reply synchronously and one asynchronously.
+    chunks = [str(chunk.content) for chunk in lazy.stream("hi")]
+    async_chunks = asyncio.run(_astream())
+
+    # Assert - several chunks that join into the full reply.
+    assert len(chunks) > 1
+    assert "".join(chunks) == "one two three"
+    assert "".join(async_chunks) == "one two three"
+    assert len(async_chunks) > 1
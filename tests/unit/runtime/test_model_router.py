@@ -0,0 +1,409 @@
+"""Unit tests for dynamic model routing and tool-binding memoization."""
+
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Awaitable, Callable, Sequence
+from typing import Any, Literal
+
+import pytest
+from langchain.agents.middleware import ModelRequest, ModelResponse
+from langchain_core.language_models import BaseChatModel
+from langchain_core.language_models.fake_chat_models import FakeMessagesListChatModel
+from langchain_core.messages import AIMessage, HumanMessage
+from langchain_core.tools import BaseTool, StructuredTool, tool
+from pydantic import Field
+
+from lily.runtime.config_schema import (
+    DynamicModelRoutingConfig,
+    ModelCallSchedulingConfig,
+    ModelHedgeConfig,
+)
+from lily.runtime.model_call_governor import ModelCallGovernor
+from lily.runtime.model_router import (
+    RESPONSE_CACHE_METADATA_KEY,
+    DynamicModelRouter,
+)
+from lily.runtime.routing_health import hedging_disabled
+from lily.runtime.run_timings import bind_run_timings, reset_run_timings
+
+pytestmark = pytest.mark.unit
+
+
+class _CountingBindModel(FakeMessagesListChatModel):
+    """Fake model recording every ``bind_tools`` call."""
+
+    bind_calls: list[tuple[str, ...]] = Field(default_factory=list)
+
+    def bind_tools(
+        self, tools: Sequence[BaseTool], **_kwargs: object
+    ) -> _CountingBindModel:
+        """Record bound tool names and return self."""
+        self.bind_calls.append(tuple(item.name for item in tools))
+        return self
+
+
+@tool
+def alpha_tool() -> str:
+    """Return alpha."""
+    return "alpha"
+
+
+@tool
+def beta_tool() -> str:
+    """Return beta."""
+    return "beta"
+
+
+def _router(
+    models: dict[str, BaseChatModel],
+    *,
+    threshold: int = 20,
+    unit: Literal["characters", "tokens"] = "characters",
+) -> DynamicModelRouter:
+    """Build a router sending long prompts to ``long_context``."""
+    return DynamicModelRouter(
+        models=models,
+        routing=DynamicModelRoutingConfig(
+            enabled=True,
+            default_profile="default",
+            long_context_profile="long_context",
+            complexity_threshold=threshold,
+            complexity_unit=unit,
+        ),
+    )
+
+
+def _call(
+    router: DynamicModelRouter,
+    prompt: str,
+    tools: list[BaseTool],
+    *,
+    tool_choice: str | None = None,
+) -> None:
+    """Run one routed model call whose handler binds tools like create_agent."""
+    request = ModelRequest(
+        model=FakeMessagesListChatModel(responses=[AIMessage(content="unused")]),
+        messages=[HumanMessage(content=prompt)],
+        tools=list(tools),
+        tool_choice=tool_choice,
+    )
+
+    def _handler(routed: ModelRequest[None]) -> ModelResponse[Any]:
+        routed.model.bind_tools(routed.tools, tool_choice=routed.tool_choice)
+        return ModelResponse(result=[AIMessage(content="ok")])
+
+    handler: Callable[[ModelRequest[None]], ModelResponse[Any]] = _handler
+    router.build_middleware().wrap_model_call(request, handler)
+
+
+def test_router_binds_each_profile_toolset_once() -> None:
+    """Repeated calls reuse bindings; new toolsets and options bind again."""
+    # Arrange - one counting model per profile.
+    default = _CountingBindModel(responses=[AIMessage(content="d")])
+    long_context = _CountingBindModel(responses=[AIMessage(content="l")])
+    router = _router({"default": default, "long_context": long_context})
+
+    # Act - repeat short calls, switch toolset and tool_choice, then go long.
+    _call(router, "hi", [alpha_tool, beta_tool])
+    _call(router, "hey", [alpha_tool, beta_tool])
+    _call(router, "hi", [alpha_tool])
+    _call(router, "hi", [alpha_tool], tool_choice="any")
+    _call(router, "hi", [alpha_tool])
+    _call(router, "a much longer prompt past the threshold", [alpha_tool, beta_tool])
+    _call(router, "another long prompt past the threshold", [alpha_tool, beta_tool])
+
+    # Assert - one bind per distinct (profile, toolset, tool_choice).
+    assert default.bind_calls == [
+        ("alpha_tool", "beta_tool"),
+        ("alpha_tool",),
+        ("alpha_tool",),
+    ]
+    assert long_context.bind_calls == [("alpha_tool", "beta_tool")]
+
+
+def test_router_bindings_are_per_router_instance() -> None:
+    """A new router (new config or profile set) starts with an empty cache."""
+    # Arrange - one model shared by two routers.
+    model = _CountingBindModel(responses=[AIMessage(content="d")])
+    models: dict[str, BaseChatModel] = {"default": model, "long_context": model}
+
+    # Act - the same call through two router instances.
+    _call(_router(models), "hi", [alpha_tool])
+    _call(_router(models), "hi", [alpha_tool])
+
+    # Assert - each router bound once.
+    assert model.bind_calls == [("alpha_tool",), ("alpha_tool",)]
+
+
+def _gamma_tool(description: str) -> BaseTool:
+    """Build a fresh ``gamma_tool`` object, as per-request toolsets do."""
+
+    def gamma_tool() -> str:
+        return "gamma"
+
+    return StructuredTool.from_function(gamma_tool, description=description)
+
+
+def test_router_bindings_key_on_tool_schemas_not_objects() -> None:
+    """Rebuilt tools with equal schemas hit the cache; changed schemas rebind."""
+    # Arrange - one counting model per profile.
+    default = _CountingBindModel(responses=[AIMessage(content="d")])
+    long_context = _CountingBindModel(responses=[AIMessage(content="l")])
+    router = _router({"default": default, "long_context": long_context})
+
+    # Act - bind freshly built tools, twice alike and once with a new schema.
+    _call(router, "hi", [_gamma_tool("Return gamma.")])
+    _call(router, "hi", [_gamma_tool("Return gamma.")])
+    _call(router, "hi", [_gamma_tool("Return gamma, loudly.")])
+
+    # Assert - equal schemas shared one binding; the changed one bound again.
+    assert default.bind_calls == [("gamma_tool",), ("gamma_tool",)]
+
+
+@pytest.mark.parametrize(
+    ("unit", "expected_profile"),
+    [("characters", "long_context"), ("tokens", "default")],
+)
+def test_router_complexity_threshold_unit(
+    unit: Literal["characters", "tokens"],
+    expected_profile: str,
+) -> None:
+    """The same threshold counts characters or tokens depending on its unit."""
+    # Arrange - a 120-character prompt (about 30 approximate tokens).
+    default = _CountingBindModel(responses=[AIMessage(content="d")])
+    long_context = _CountingBindModel(responses=[AIMessage(content="l")])
+    router = _router(
+        {"default": default, "long_context": long_context}, threshold=60, unit=unit
+    )
+
+    # Act - route one call.
+    _call(router, "word " * 24, [alpha_tool])
+
+    # Assert - only the expected profile was bound.
+    bound = {"default": default.bind_calls, "long_context": long_context.bind_calls}
+    assert bound[expected_profile] == [("alpha_tool",)]
+    assert sum(len(calls) for calls in bound.values()) == 1
+
+
+def _failover_router(
+    models: dict[str, BaseChatModel],
+    **routing: object,
+) -> DynamicModelRouter:
+    """Build a router whose ``default`` profile falls back to ``backup``."""
+    return DynamicModelRouter(
+        models=models,
+        routing=DynamicModelRoutingConfig.model_validate(
+            {
+                "enabled": False,
+                "default_profile": "default",
+                "long_context_profile": "default",
+                "complexity_threshold": 1,
+                "fallbacks": {"default": ["backup"]},
+                **routing,
+            }
+        ),
+    )
+
+
+def _request() -> ModelRequest[None]:
+    """Return a minimal model request."""
+    return ModelRequest(
+        model=FakeMessagesListChatModel(responses=[AIMessage(content="unused")]),
+        messages=[HumanMessage(content="hi")],
+        tools=[alpha_tool],
+    )
+
+
+def _bound(routed: ModelRequest[None]) -> BaseChatModel:
+    """Return the profile model behind the routed request's binding proxy."""
+    return routed.model.bind_tools(routed.tools)  # type: ignore[return-value]
+
+
+def test_router_fails_over_on_timeout_and_records_attempts() -> None:
+    """A timeout moves on to the fallback; other errors propagate unchanged."""
+    # Arrange - a default profile that times out, then raises a value error.
+    default = _CountingBindModel(responses=[AIMessage(content="d")])
+    backup = _CountingBindModel(responses=[AIMessage(content="b")])
+    router = _failover_router({"default": default, "backup": backup})
+    failures: list[Exception] = [TimeoutError("slow"), ValueError("bad request")]
+
+    def _handler(routed: ModelRequest[None]) -> ModelResponse[Any]:
+        model = _bound(routed)
+        if model is default:
+            raise failures.pop(0)
+        return ModelResponse(result=[AIMessage(content="from backup")])
+
+    middleware = router.build_middleware()
+    token, recorder = bind_run_timings()
+
+    # Act - one call that fails over, one that fails for good.
+    try:
+        response = middleware.wrap_model_call(_request(), _handler)
+        with pytest.raises(ValueError, match="bad request"):
+            middleware.wrap_model_call(_request(), _handler)
+    finally:
+        reset_run_timings(token)
+
+    # Assert - the backup answered; every attempt was recorded with its outcome.
+    assert response.result[0].content == "from backup"
+    assert [(c.profile, c.outcome) for c in recorder.model_calls] == [
+        ("default", "error"),
+        ("backup", "ok"),
+        ("default", "error"),
+    ]
+    assert router.health_snapshot()["default"].error_rate_ewma > 0.0
+
+
+def test_router_tries_unhealthy_primary_last() -> None:
+    """A profile over the error-rate threshold yields to its fallback."""
+    # Arrange - a threshold low enough that one failure marks default unhealthy.
+    default = _CountingBindModel(responses=[AIMessage(content="d")])
+    backup = _CountingBindModel(responses=[AIMessage(content="b")])
+    router = _failover_router(
+        {"default": default, "backup": backup}, unhealthy_error_rate=0.1
+    )
+    served: list[BaseChatModel] = []
+
+    def _handler(routed: ModelRequest[None]) -> ModelResponse[Any]:
+        model = _bound(routed)
+        served.append(model)
+        if model is default and len(served) == 1:
+            raise ConnectionError("refused")
+        return ModelResponse(result=[AIMessage(content="ok")])
+
+    middleware = router.build_middleware()
+
+    # Act - a failing call followed by a healthy one.
+    middleware.wrap_model_call(_request(), _handler)
+    middleware.wrap_model_call(_request(), _handler)
+
+    # Assert - the second call went straight to the fallback.
+    assert served == [default, backup, backup]
+
+
+def test_router_hedges_slow_primary_on_async_calls() -> None:
+    """A slow primary is raced by its fallback unless hedging is disabled."""
+    # Arrange - a primary slower than the hedge delay.
+    default = _CountingBindModel(responses=[AIMessage(content="d")])
+    backup = _CountingBindModel(responses=[AIMessage(content="b")])
+    router = _failover_router(
+        {"default": default, "backup": backup},
+        hedge=ModelHedgeConfig(enabled=True, min_delay_seconds=0.02),
+    )
+
+    async def _handler(routed: ModelRequest[None]) -> ModelResponse[Any]:
+        model = _bound(routed)
+        if model is default:
+            await asyncio.sleep(0.2)
+            return ModelResponse(result=[AIMessage(content="from default")])
+        return ModelResponse(result=[AIMessage(content="from backup")])
+
+    handler: Callable[[ModelRequest[None]], Awaitable[ModelResponse[Any]]] = _handler
+    middleware = router.build_middleware()
+
+    async def _exercise() -> tuple[ModelResponse[Any], ModelResponse[Any]]:
+        hedged = await middleware.awrap_model_call(_request(), handler)
+        with hedging_disabled():
+            unhedged = await middleware.awrap_model_call(_request(), handler)
+        return hedged, unhedged
+
+    token, recorder = bind_run_timings()
+
+    # Act - one hedged call, then one with hedging disabled.
+    try:
+        hedged, unhedged = asyncio.run(_exercise())
+    finally:
+        reset_run_timings(token)
+
+    # Assert - the fallback won the race and the primary was cancelled.
+    assert hedged.result[0].content == "from backup"
+    assert unhedged.result[0].content == "from default"
+    assert sorted((c.profile, c.outcome) for c in recorder.model_calls) == [
+        ("backup", "ok"),
+        ("default", "cancelled"),
+        ("default", "ok"),
+    ]
+
+
+def test_router_keeps_response_cache_hits_out_of_health_stats() -> None:
+    """Replayed replies are timed per call but never sampled as provider latency."""
+    # Arrange - a handler replaying a cached reply, then answering for real.
+    default = _CountingBindModel(responses=[AIMessage(content="d")])
+    router = _failover_router({"default": default, "backup": default})
+    hit = AIMessage(
+        content="cached", response_metadata={RESPONSE_CACHE_METADATA_KEY: "hit"}
+    )
+    replies = [hit, hit, AIMessage(content="live")]
+
+    def _handler(_routed: ModelRequest[None]) -> ModelResponse[Any]:
+        return ModelResponse(result=[replies.pop(0)])
+
+    async def _ahandler(routed: ModelRequest[None]) -> ModelResponse[Any]:
+        return _handler(routed)
+
+    middleware = router.build_middleware()
+    token, recorder = bind_run_timings()
+
+    # Act - a sync and an async cache hit, then one provider call.
+    try:
+        middleware.wrap_model_call(_request(), _handler)
+        asyncio.run(middleware.awrap_model_call(_request(), _ahandler))
+        after_hits = router.health_snapshot()
+        middleware.wrap_model_call(_request(), _handler)
+    finally:
+        reset_run_timings(token)
+
+    # Assert - every attempt is timed; only the live one feeds health state.
+    assert [c.outcome for c in recorder.model_calls] == ["ok", "ok", "ok"]
+    assert "default" not in after_hits
+    assert router.health_snapshot()["default"].samples == 1
+
+
+class _RateLimitError(Exception):
+    """Provider error carrying an HTTP 429 status."""
+
+    status_code = 429
+
+
+def test_router_retries_rate_limited_async_calls_with_backoff() -> None:
+    """A 429 is retried on the same profile and its backoff counts as queue wait."""
+    # Arrange - a governor with fast backoff and a handler limited once.
+    default = _CountingBindModel(responses=[AIMessage(content="d")])
+    router = DynamicModelRouter(
+        models={"default": default},
+        routing=DynamicModelRoutingConfig(
+            enabled=False,
+            default_profile="default",
+            long_context_profile="default",
+            complexity_threshold=1,
+        ),
+        governor=ModelCallGovernor(
+            ModelCallSchedulingConfig(
+                backoff_base_seconds=0.02, backoff_max_seconds=0.02
+            ),
+            {},
+        ),
+    )
+    limited = [True]
+
+    async def _handler(_routed: ModelRequest[None]) -> ModelResponse[Any]:
+        if limited:
+            limited.pop()
+            raise _RateLimitError
+        return ModelResponse(result=[AIMessage(content="ok")])
+
+    token, recorder = bind_run_timings()
+
+    # Act - one async call through the middleware.
+    try:
+        response = asyncio.run(
+            router.build_middleware().awrap_model_call(_request(), _handler)
+        )
+    finally:
+        reset_run_timings(token)
+
+    # Assert - the retry succeeded after a recorded backoff.
+    assert response.result[0].content == "ok"
+    assert [c.outcome for c in recorder.model_calls] == ["error", "ok"]
+    assert recorder.model_queue_seconds >= 0.01
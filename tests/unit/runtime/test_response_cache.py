@@ -0,0 +1,245 @@
+"""Unit tests for the exact-match model response cache."""
+
+from __future__ import annotations
+
+import asyncio
+from pathlib import Path
+from typing import Any
+
+import pytest
+from langchain.agents.middleware import ModelRequest, ModelResponse
+from langchain_core.language_models.fake_chat_models import FakeMessagesListChatModel
+from langchain_core.messages import AIMessage, HumanMessage, ToolMessage
+
+from lily.runtime.config_schema import (
+    DynamicModelRoutingConfig,
+    ModelCallLimitConfig,
+    ModelCallSchedulingConfig,
+    ModelProfileConfig,
+    ModelProvider,
+    ModelResponseCacheConfig,
+)
+from lily.runtime.model_call_governor import ModelCallGovernor
+from lily.runtime.model_router import DynamicModelRouter
+from lily.runtime.response_cache import (
+    ModelResponseCacheMiddleware,
+    ModelResponseStore,
+)
+from lily.runtime.run_timings import bind_run_timings, reset_run_timings
+
+pytestmark = pytest.mark.unit
+
+
+def _profile(temperature: float) -> ModelProfileConfig:
+    """Return an Ollama profile at one temperature."""
+    return ModelProfileConfig(
+        provider=ModelProvider.OLLAMA,
+        model="llama3.2",
+        temperature=temperature,
+        timeout_seconds=5,
+    )
+
+
+class _Clock:
+    """Manually advanced wall clock."""
+
+    def __init__(self) -> None:
+        """Start at time zero."""
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        """Return the current time."""
+        return self.now
+
+
+def test_store_expires_by_ttl_and_evicts_least_recently_used(tmp_path: Path) -> None:
+    """Entries expire after the TTL; over capacity the coldest entry goes."""
+    # Arrange - a two-entry store with a 100 s TTL.
+    clock = _Clock()
+    store = ModelResponseStore(
+        tmp_path / "cache.sqlite3",
+        ModelResponseCacheConfig(enabled=True, max_entries=2, ttl_seconds=100.0),
+        clock=clock,
+    )
+
+    # Act - store a and b, touch a, then add c; later let a expire.
+    store.put("a", "default", AIMessage(content="A"))
+    clock.now = 1.0
+    store.put("b", "default", AIMessage(content="B"))
+    clock.now = 2.0
+    touched = store.get("a")
+    clock.now = 3.0
+    store.put("c", "default", AIMessage(content="C"))
+    evicted = store.get("b")
+    size = len(store)
+    clock.now = 150.0
+    expired = store.get("a")
+    store.close()
+
+    # Assert - b was least recently used; a aged out of its TTL.
+    assert touched is not None
+    assert touched.content == "A"
+    assert evicted is None
+    assert size == 2
+    assert expired is None
+
+
+def test_cache_middleware_replays_hits_with_fresh_tool_call_ids(
+    tmp_path: Path,
+) -> None:
+    """Repeated requests replay the stored reply; ids differ but hits are counted."""
+    # Arrange - a zero-temperature default profile behind the router.
+    reply = AIMessage(
+        content="",
+        tool_calls=[{"name": "alpha_tool", "args": {}, "id": "call_1"}],
+    )
+    model = FakeMessagesListChatModel(responses=[reply])
+    router = DynamicModelRouter(
+        models={"default": model},
+        routing=DynamicModelRoutingConfig(
+            enabled=False,
+            default_profile="default",
+            long_context_profile="default",
+            complexity_threshold=1,
+        ),
+    )
+    config = ModelResponseCacheConfig(enabled=True)
+    store = ModelResponseStore(tmp_path / "cache.sqlite3", config)
+    cache = ModelResponseCacheMiddleware(store, {"default": _profile(0.0)}, config)
+    routing = router.build_middleware()
+    calls: list[str] = []
+
+    def _model_call(routed: ModelRequest[None]) -> ModelResponse[Any]:
+        calls.append(type(routed.model).__name__)
+        message = routed.model.invoke(routed.messages)
+        return ModelResponse(result=[message])
+
+    def _call(messages: list[Any]) -> AIMessage:
+        request: ModelRequest[None] = ModelRequest(
+            model=model,
+            messages=messages,
+        )
+        response = routing.wrap_model_call(
+            request, lambda routed: cache.wrap_model_call(routed, _model_call)
+        )
+        [message] = response.result
+        assert isinstance(message, AIMessage)
+        return message
+
+    token, recorder = bind_run_timings()
+
+    # Act - the same prompt twice, then a prior turn with different tool ids.
+    try:
+        first = _call([HumanMessage(content="hi")])
+        second = _call([HumanMessage(content="hi")])
+        _call(
+            [
+                HumanMessage(content="hi"),
+                AIMessage(content="", tool_calls=[{**first.tool_calls[0]}]),
+                ToolMessage(content="alpha", tool_call_id=first.tool_calls[0]["id"]),
+            ]
+        )
+        _call(
+            [
+                HumanMessage(content="hi"),
+                AIMessage(content="", tool_calls=[{**second.tool_calls[0]}]),
+                ToolMessage(content="alpha", tool_call_id=second.tool_calls[0]["id"]),
+            ]
+        )
+        timings = recorder.snapshot(total_seconds=1.0)
+    finally:
+        reset_run_timings(token)
+        store.close()
+
+    # Assert - one provider call per distinct conversation; replays get new ids.
+    assert calls == [
+        "_BindingCachedChatModel",
+        "_ReplayChatModel",
+        "_BindingCachedChatModel",
+        "_ReplayChatModel",
+    ]
+    assert second.tool_calls[0]["id"] != first.tool_calls[0]["id"]
+    assert second.response_metadata["lily_response_cache"] == "hit"
+    assert (timings.response_cache_hits, timings.response_cache_misses) == (2, 2)
+
+
+def test_cache_hits_skip_governor_admission(tmp_path: Path) -> None:
+    """A hit is served while the profile's only slot is taken; a miss waits."""
+    # Arrange - a one-slot profile behind routing, cache, and admission stages.
+    model = FakeMessagesListChatModel(
+        responses=[AIMessage(content="first"), AIMessage(content="second")]
+    )
+    router = DynamicModelRouter(
+        models={"default": model},
+        routing=DynamicModelRoutingConfig(
+            enabled=False,
+            default_profile="default",
+            long_context_profile="default",
+            complexity_threshold=1,
+        ),
+        governor=ModelCallGovernor(
+            ModelCallSchedulingConfig(
+                profiles={"default": ModelCallLimitConfig(max_in_flight=1)}
+            ),
+            {"default": ModelProvider.OLLAMA},
+        ),
+    )
+    config = ModelResponseCacheConfig(enabled=True)
+    store = ModelResponseStore(tmp_path / "cache.sqlite3", config)
+    cache = ModelResponseCacheMiddleware(store, {"default": _profile(0.0)}, config)
+    routing = router.build_middleware()
+    admission = router.build_admission_middleware()
+
+    async def _model_call(routed: ModelRequest[None]) -> ModelResponse[Any]:
+        return ModelResponse(result=[await routed.model.ainvoke(routed.messages)])
+
+    async def _call(prompt: str) -> str:
+        request: ModelRequest[None] = ModelRequest(
+            model=model, messages=[HumanMessage(content=prompt)]
+        )
+        response = await routing.awrap_model_call(
+            request,
+            lambda routed: cache.awrap_model_call(
+                routed, lambda final: admission.awrap_model_call(final, _model_call)
+            ),
+        )
+        return str(response.result[0].content)
+
+    async def _scenario() -> tuple[str, str, bool]:
+        await _call("hi")
+        async with router.governor.permit("default"):
+            hit = await asyncio.wait_for(_call("hi"), timeout=5)
+            miss = asyncio.ensure_future(_call("other"))
+            await asyncio.sleep(0.05)
+            miss_blocked = not miss.done()
+        return hit, await miss, miss_blocked
+
+    # Act - fill the cache, then repeat and vary the prompt with the slot held.
+    try:
+        hit, miss, miss_blocked = asyncio.run(_scenario())
+    finally:
+        store.close()
+
+    # Assert - the hit bypassed the queue; the miss waited for the slot.
+    assert hit == "first"
+    assert miss_blocked
+    assert miss == "second"
+
+
+def test_cache_config_selects_deterministic_profiles_by_default() -> None:
+    """Without an explicit list only zero-temperature profiles are cached."""
+    # Arrange - default and explicit cache policies.
+    implicit = ModelResponseCacheConfig(enabled=True)
+    explicit = ModelResponseCacheConfig(enabled=True, profiles=["creative"])
+
+    # Act - classify a deterministic and a sampling profile.
+    decisions = (
+        implicit.caches_profile("exact", _profile(0.0)),
+        implicit.caches_profile("creative", _profile(0.7)),
+        explicit.caches_profile("exact", _profile(0.0)),
+        explicit.caches_profile("creative", _profile(0.7)),
+        ModelResponseCacheConfig().caches_profile("exact", _profile(0.0)),
+    )
+
+    # Assert - opt-in lists win; a disabled cache caches nothing.
+    assert decisions == (True, False, False, True, False)
@@ -0,0 +1,121 @@
+"""Unit tests for per-profile model health tracking."""
+
+from __future__ import annotations
+
+import logging
+
+import pytest
+
+from lily.runtime.config_schema import DynamicModelRoutingConfig, ModelHedgeConfig
+from lily.runtime.routing_health import (
+    ProfileHealthTracker,
+    RoutingAttempt,
+    emit_routing_decision,
+    is_retryable_model_error,
+)
+
+pytestmark = pytest.mark.unit
+
+
+def _routing(**overrides: object) -> DynamicModelRoutingConfig:
+    """Build a routing policy with health settings overridden."""
+    return DynamicModelRoutingConfig.model_validate(
+        {
+            "enabled": True,
+            "default_profile": "default",
+            "long_context_profile": "default",
+            "complexity_threshold": 1,
+            **overrides,
+        }
+    )
+
+
+def test_health_tracker_unhealthy_until_cooldown_passes() -> None:
+    """Failures mark a profile unhealthy only within the cooldown window."""
+    # Arrange - a tracker on a controllable clock.
+    now = [100.0]
+    tracker = ProfileHealthTracker(
+        _routing(unhealthy_error_rate=0.3, unhealthy_cooldown_seconds=10.0),
+        clock=lambda: now[0],
+    )
+
+    # Act - two failures, then observe before and after the cooldown.
+    tracker.record("default", 1.0, ok=False)
+    tracker.record("default", 1.0, ok=False)
+    during = tracker.is_unhealthy("default")
+    now[0] += 11.0
+    after = tracker.is_unhealthy("default")
+
+    # Assert - unhealthy during the cooldown only; unknown profiles are healthy.
+    assert during is True
+    assert after is False
+    assert tracker.is_unhealthy("other") is False
+
+
+def test_health_tracker_hedge_delay_uses_latency_quantile() -> None:
+    """Hedge delay is the configured quantile once enough samples exist."""
+    # Arrange - p90 hedging needing ten samples, floored at 50 ms.
+    hedge = ModelHedgeConfig(
+        enabled=True, quantile=0.9, min_delay_seconds=0.05, min_samples=10
+    )
+    tracker = ProfileHealthTracker(_routing(hedge=hedge))
+
+    # Act - read the delay cold, then after ten successes of 0.1..1.0 s.
+    cold = tracker.hedge_delay("default")
+    for tenth in range(1, 11):
+        tracker.record("default", tenth / 10, ok=True)
+    warm = tracker.hedge_delay("default")
+
+    # Assert - floor while cold, p90 of the samples once warm.
+    assert cold == pytest.approx(0.05)
+    assert warm == pytest.approx(0.9)
+    assert tracker.snapshot()["default"].samples == 10
+
+
+def test_is_retryable_model_error_matches_transport_failures() -> None:
+    """Timeouts and client transport errors fail over; others do not."""
+
+    # Arrange - an exception named like the OpenAI client's connection error.
+    class APIConnectionError(Exception):
+        """Stand-in for ``openai.APIConnectionError``."""
+
+    # Act - classify sample failures.
+    retryable = [
+        is_retryable_model_error(error)
+        for error in (TimeoutError(), ConnectionResetError(), APIConnectionError())
+    ]
+
+    # Assert - transport failures retry, request errors do not.
+    assert retryable == [True, True, True]
+    assert is_retryable_model_error(ValueError("bad request")) is False
+
+
+def test_routing_decision_warns_only_when_an_attempt_failed(
+    caplog: pytest.LogCaptureFixture,
+) -> None:
+    """Cancelled hedge losers and interrupted calls log at DEBUG; failovers warn."""
+    # Arrange - a won hedge race, an interrupted call, and a failover.
+    ok = RoutingAttempt(profile="backup", outcome="ok", seconds=0.1)
+    cancelled = RoutingAttempt(profile="default", outcome="cancelled", seconds=0.2)
+    failed = RoutingAttempt(
+        profile="default", outcome="error", seconds=0.1, error="TimeoutError"
+    )
+    calls = [([ok, cancelled], True), ([cancelled], False), ([failed, ok], False)]
+
+    # Act - emit one decision per call.
+    with caplog.at_level(logging.DEBUG, logger="lily.routing"):
+        for attempts, hedged in calls:
+            emit_routing_decision(
+                selected="default",
+                reason="size",
+                candidates=["default", "backup"],
+                attempts=attempts,
+                hedged=hedged,
+            )
+
+    # Assert - only the call with a failed attempt was a warning.
+    assert [record.levelno for record in caplog.records] == [
+        logging.DEBUG,
+        logging.DEBUG,
+        logging.WARNING,
+    ]
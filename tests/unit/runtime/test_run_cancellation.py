@@ -0,0 +1,58 @@
+"""Unit tests for run deadlines and cancellation handles."""
+
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+
+from lily.runtime.agent_run_result import RunStatus
+from lily.runtime.run_cancellation import RunCancellation, interruptible
+
+pytestmark = pytest.mark.unit
+
+
+def test_interruptible_classifies_only_its_own_deadline_as_timed_out() -> None:
+    """The deadline yields ``timed_out``; a TimeoutError from the block escapes."""
+    # Arrange - a block that outlives its deadline and one raising its own timeout.
+    statuses: list[RunStatus] = []
+
+    async def _sleep_past(timeout: float) -> None:
+        async with interruptible(timeout, None) as outcome:
+            await asyncio.sleep(5)
+        statuses.append(outcome.status)
+
+    async def _raise_inside(timeout: float | None) -> None:
+        async with interruptible(timeout, None):
+            msg = "provider read timed out"
+            raise TimeoutError(msg)
+
+    # Act - run the expiring block; the raising ones must propagate.
+    asyncio.run(_sleep_past(0.01))
+    with pytest.raises(TimeoutError, match="provider"):
+        asyncio.run(_raise_inside(None))
+    with pytest.raises(TimeoutError, match="provider"):
+        asyncio.run(_raise_inside(60))
+
+    # Assert - only the expired deadline was absorbed.
+    assert statuses == ["timed_out"]
+
+
+def test_interruptible_honours_a_handle_cancelled_before_attach() -> None:
+    """A handle cancelled before the block starts interrupts it once attached."""
+    # Arrange - a handle cancelled before the block attaches it.
+    cancellation = RunCancellation()
+    cancellation.cancel()
+    statuses: list[RunStatus] = []
+
+    async def _run() -> None:
+        async with interruptible(None, cancellation) as outcome:
+            await asyncio.sleep(5)
+        statuses.append(outcome.status)
+
+    # Act - run the block.
+    asyncio.run(_run())
+
+    # Assert - the block ended early, reporting the handle's cancellation.
+    assert statuses == ["cancelled"]
+    assert cancellation.cancelled
@@ -0,0 +1,130 @@
+"""Unit tests for bounded-concurrency run admission."""
+
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+
+from lily.runtime.run_scheduler import RunScheduler, RunSchedulerStats
+
+pytestmark = pytest.mark.unit
+
+
+def test_run_scheduler_caps_concurrent_runs_across_conversations() -> None:
+    """Never admits more distinct-conversation runs than the configured limit."""
+    # Arrange - scheduler with two slots and five independent conversations.
+    scheduler = RunScheduler(max_concurrent_runs=2)
+    active = 0
+    peak = 0
+
+    async def _run(conversation_id: str) -> None:
+        nonlocal active, peak
+        async with scheduler.slot(conversation_id):
+            active += 1
+            peak = max(peak, active)
+            await asyncio.sleep(0.01)
+            active -= 1
+
+    async def _exercise() -> None:
+        await asyncio.gather(*(_run(f"conv-{index}") for index in range(5)))
+
+    # Act - run all conversations at once.
+    asyncio.run(_exercise())
+
+    # Assert - peak concurrency matches the limit and every run completed.
+    assert peak == 2
+    assert scheduler.stats().completed == 5
+    assert scheduler.stats().in_flight == 0
+
+
+def test_run_scheduler_serializes_same_conversation_in_arrival_order() -> None:
+    """Runs sharing one conversation id execute one at a time, first come first."""
+    # Arrange - generous global limit so only the conversation lock orders runs.
+    scheduler = RunScheduler(max_concurrent_runs=4)
+    events: list[str] = []
+
+    async def _run(label: str) -> None:
+        async with scheduler.slot("shared"):
+            events.append(f"start-{label}")
+            await asyncio.sleep(0.01)
+            events.append(f"end-{label}")
+
+    async def _exercise() -> None:
+        await asyncio.gather(*(_run(label) for label in ("a", "b", "c")))
+
+    # Act - submit three turns for the same conversation together.
+    asyncio.run(_exercise())
+
+    # Assert - turns never interleave and keep submission order.
+    assert events == [
+        "start-a",
+        "end-a",
+        "start-b",
+        "end-b",
+        "start-c",
+        "end-c",
+    ]
+
+
+def test_run_scheduler_reports_queue_depth_and_wait_time() -> None:
+    """Stats expose per-conversation queue depth and measured wait time."""
+    # Arrange - single slot so the second run must queue behind the first.
+    scheduler = RunScheduler(max_concurrent_runs=1)
+    snapshots: list[RunSchedulerStats] = []
+    waits: list[float] = []
+
+    async def _exercise() -> None:
+        gate = asyncio.Event()
+
+        async def _first() -> None:
+            async with scheduler.slot("conv-1") as waited:
+                waits.append(waited)
+                await gate.wait()
+
+        async def _second() -> None:
+            async with scheduler.slot("conv-1") as waited:
+                waits.append(waited)
+
+        first = asyncio.create_task(_first())
+        second = asyncio.create_task(_second())
+        await asyncio.sleep(0.02)
+        snapshots.append(scheduler.stats())
+        gate.set()
+        await asyncio.gather(first, second)
+        snapshots.append(scheduler.stats())
+
+    # Act - observe stats while the second run is queued and after both finish.
+    asyncio.run(_exercise())
+
+    # Assert - queued counters while blocked, cumulative wait once drained.
+    blocked, drained = snapshots
+    assert blocked.in_flight == 1
+    assert blocked.queued == 1
+    assert blocked.queued_by_conversation == {"conv-1": 1}
+    assert drained.queued == 0
+    assert drained.queued_by_conversation == {}
+    assert drained.completed == 2
+    assert waits[1] >= 0.02
+    assert drained.max_wait_seconds == pytest.approx(waits[1])
+
+
+def test_run_scheduler_releases_slot_when_run_raises() -> None:
+    """A failing run frees its slot and conversation turn for the next caller."""
+    # Arrange - single-slot scheduler.
+    scheduler = RunScheduler(max_concurrent_runs=1)
+
+    async def _exercise() -> None:
+        with pytest.raises(RuntimeError, match="boom"):
+            async with scheduler.slot("conv-1"):
+                raise RuntimeError("boom")
+        async with scheduler.slot("conv-1") as waited:
+            assert waited < 1.0
+
+    # Act - fail once, then run again on the same conversation.
+    asyncio.run(asyncio.wait_for(_exercise(), timeout=1.0))
+
+    # Assert - nothing remains held or queued.
+    stats = scheduler.stats()
+    assert stats.in_flight == 0
+    assert stats.completed == 2
@@ -0,0 +1,113 @@
+"""Unit tests for per-run timing recording and the run timings JSONL log."""
+
+from __future__ import annotations
+
+import json
+from pathlib import Path
+
+import pytest
+
+from lily.runtime.logging_setup import (
+    configure_run_timings_handler,
+    resolve_run_timings_log_path,
+)
+from lily.runtime.run_timings import (
+    RunTimings,
+    bind_run_timings,
+    emit_run_timings,
+    record_checkpoint,
+    record_model_call,
+    record_summarization,
+    record_tool_call,
+    reset_run_timings,
+)
+
+pytestmark = pytest.mark.unit
+
+
+def test_recorder_collects_bound_events_into_snapshot() -> None:
+    """Events recorded while bound land in the frozen snapshot."""
+    # Arrange - bind a fresh recorder.
+    token, recorder = bind_run_timings()
+
+    # Act - record one of each event kind, then unbind.
+    try:
+        record_model_call("default", 0.5)
+        record_model_call("long_context", 0.25)
+        record_tool_call("ping_tool", 0.125)
+        record_summarization(0.05)
+        record_checkpoint("get", 0.01)
+        record_checkpoint("put", 0.02)
+        record_checkpoint("put", 0.03)
+    finally:
+        reset_run_timings(token)
+    timings = recorder.snapshot(total_seconds=1.0)
+
+    # Assert - buckets, counters and derived totals match.
+    assert [call.profile for call in timings.model_calls] == [
+        "default",
+        "long_context",
+    ]
+    assert timings.model_seconds == pytest.approx(0.75)
+    assert timings.tool_seconds == pytest.approx(0.125)
+    assert timings.summarization_seconds == pytest.approx(0.05)
+    assert timings.checkpoint_gets == 1
+    assert timings.checkpoint_puts == 2
+    assert timings.checkpoint_put_seconds == pytest.approx(0.05)
+    assert timings.total_seconds == 1.0
+
+
+def test_recording_without_bound_recorder_is_a_no_op() -> None:
+    """Instrumentation outside a run neither fails nor leaks into later runs."""
+    # Arrange - record while nothing is bound.
+    record_model_call("default", 1.0)
+    record_tool_call("ping_tool", 1.0)
+
+    # Act - bind a new recorder and snapshot it immediately.
+    token, recorder = bind_run_timings()
+    reset_run_timings(token)
+    timings = recorder.snapshot(total_seconds=0.0)
+
+    # Assert - the new recorder is empty.
+    assert timings == RunTimings()
+
+
+def test_resolve_run_timings_log_path_is_opt_in(tmp_path: Path) -> None:
+    """No configured path disables the log; relative paths follow the config."""
+    # Arrange - runtime config file location.
+    cfg = tmp_path / "config" / "agent.toml"
+
+    # Act - resolve with and without an override.
+    disabled = resolve_run_timings_log_path(cfg, relative_override=None)
+    enabled = resolve_run_timings_log_path(
+        cfg, relative_override="../logs/run-timings.jsonl"
+    )
+
+    # Assert - opt-in path resolves next to the config directory.
+    assert disabled is None
+    assert enabled == (tmp_path / "logs" / "run-timings.jsonl").resolve()
+
+
+def test_emit_run_timings_appends_jsonl_only_when_configured(tmp_path: Path) -> None:
+    """Configured handler writes one JSON object per run."""
+    # Arrange - one run's timings and a log destination.
+    log_path = tmp_path / "run-timings.jsonl"
+    timings = RunTimings(total_seconds=2.0, checkpoint_puts=1)
+
+    # Act - emit before, during and after configuring the handler.
+    emit_run_timings(timings, conversation_id="ignored")
+    configure_run_timings_handler(log_path)
+    try:
+        emit_run_timings(timings, conversation_id="conv-1")
+    finally:
+        configure_run_timings_handler(None)
+    emit_run_timings(timings, conversation_id="ignored-too")
+
+    # Assert - exactly the configured emit was written.
+    lines = log_path.read_text(encoding="utf-8").splitlines()
+    assert len(lines) == 1
+    record = json.loads(lines[0])
+    assert record["conversation_id"] == "conv-1"
+    assert record["total_seconds"] == 2.0
+    assert record["checkpoint_puts"] == 1
+    assert record["model_seconds"] == 0.0
@@ -0,0 +1,107 @@
+"""Unit tests for the precomputed system prompt prefix stage."""
+
+from __future__ import annotations
+
+import asyncio
+from typing import Any
+
+import pytest
+from langchain.agents.middleware import ModelRequest, ModelResponse
+from langchain_core.language_models.fake_chat_models import FakeMessagesListChatModel
+from langchain_core.messages import AIMessage, HumanMessage, SystemMessage
+
+from lily.runtime.run_timings import bind_run_timings, reset_run_timings
+from lily.runtime.system_prompt_prefix import (
+    SystemPromptPrefixMiddleware,
+    build_system_prompt_prefix,
+)
+
+pytestmark = pytest.mark.unit
+
+
+def _characters(message: SystemMessage) -> int:
+    """Count prompt characters as tokens."""
+    return len(str(message.content))
+
+
+def test_prefix_joins_sections_in_fixed_order_and_skips_blank_ones() -> None:
+    """Base prompt, identity, then catalog; identical inputs hash identically."""
+    # Arrange - identity and catalog sections, plus a build without identity.
+    sections = {
+        "identity_markdown": "## Agent identity context\nName: Pepper",
+        "catalog_markdown": "## Skill catalog\n- listed-skill",
+    }
+
+    # Act - assemble twice with both sections, once with blank identity.
+    first = build_system_prompt_prefix(
+        "You are Lily.\n", count_tokens=_characters, **sections
+    )
+    again = build_system_prompt_prefix(
+        "You are Lily.\n", count_tokens=_characters, **sections
+    )
+    catalog_only = build_system_prompt_prefix(
+        "You are Lily.",
+        identity_markdown="  ",
+        catalog_markdown=sections["catalog_markdown"],
+        count_tokens=_characters,
+    )
+
+    # Assert - deterministic content, hash, and length per build.
+    assert first.message.content == (
+        "You are Lily.\n\n## Agent identity context\nName: Pepper"
+        "\n\n## Skill catalog\n- listed-skill"
+    )
+    assert first.sha256 == again.sha256
+    assert first.tokens == len(str(first.message.content))
+    assert catalog_only.message.content == (
+        "You are Lily.\n\n## Skill catalog\n- listed-skill"
+    )
+    assert catalog_only.sha256 != first.sha256
+
+
+def test_prefix_middleware_sends_same_message_and_records_cache_reads() -> None:
+    """Every call carries the prefix object; provider cache reads are summed."""
+    # Arrange - a prefix stage and a handler reporting 90 cached input tokens.
+    prefix = build_system_prompt_prefix(
+        "You are Lily.", identity_markdown="Name: Pepper", count_tokens=_characters
+    )
+    middleware = SystemPromptPrefixMiddleware(prefix)
+    request: ModelRequest[None] = ModelRequest(
+        model=FakeMessagesListChatModel(responses=[AIMessage(content="unused")]),
+        messages=[HumanMessage(content="hi")],
+        system_message=SystemMessage(content="You are Lily."),
+    )
+    sent: list[SystemMessage | None] = []
+    reply = AIMessage(
+        content="ok",
+        usage_metadata={
+            "input_tokens": 100,
+            "output_tokens": 1,
+            "total_tokens": 101,
+            "input_token_details": {"cache_read": 90},
+        },
+    )
+
+    def _handler(updated: ModelRequest[None]) -> ModelResponse[Any]:
+        sent.append(updated.system_message)
+        return ModelResponse(result=[reply])
+
+    async def _ahandler(updated: ModelRequest[None]) -> ModelResponse[Any]:
+        return _handler(updated)
+
+    token, recorder = bind_run_timings()
+
+    # Act - one sync and one async model call.
+    try:
+        middleware.wrap_model_call(request, _handler)
+        asyncio.run(middleware.awrap_model_call(request, _ahandler))
+        timings = recorder.snapshot(total_seconds=1.0)
+    finally:
+        reset_run_timings(token)
+
+    # Assert - both calls sent the prefix object; telemetry carries hash and reads.
+    assert sent == [prefix.message, prefix.message]
+    assert all(message is prefix.message for message in sent)
+    assert timings.system_prompt_sha256 == prefix.sha256
+    assert timings.system_prompt_tokens == prefix.tokens
+    assert timings.cached_input_tokens == 180
@@ -0,0 +1,165 @@
+"""Unit tests for shared token accounting."""
+
+from __future__ import annotations
+
+import pytest
+from langchain_core.messages import AIMessage, BaseMessage, HumanMessage
+from langchain_core.messages.utils import count_tokens_approximately
+
+from lily.runtime import token_accounting
+from lily.runtime.config_schema import ModelProfileConfig
+from lily.runtime.token_accounting import (
+    APPROXIMATE_TOKENIZER,
+    TokenAccountant,
+    tokenizer_name_for_profile,
+)
+
+pytestmark = pytest.mark.unit
+
+
+class _WordEncoding:
+    """Stand-in tiktoken encoding counting whitespace-separated words."""
+
+    def encode(self, text: str, *, disallowed_special: object = ()) -> list[str]:
+        """Split text into word tokens."""
+        del disallowed_special
+        return text.split()
+
+
+def _profile(
+    provider: str, model: str, tokenizer: str | None = None
+) -> ModelProfileConfig:
+    """Build one model profile."""
+    return ModelProfileConfig.model_validate(
+        {
+            "provider": provider,
+            "model": model,
+            "temperature": 0.0,
+            "timeout_seconds": 10,
+            "tokenizer": tokenizer,
+        }
+    )
+
+
+def _history(count: int) -> list[BaseMessage]:
+    """Return ``count`` alternating messages with stable ids."""
+    return [
+        (HumanMessage if index % 2 == 0 else AIMessage)(
+            content="x" * (index + 1), id=f"m{index}"
+        )
+        for index in range(count)
+    ]
+
+
+def test_tokenizer_choice_follows_provider_and_override() -> None:
+    """OpenAI profiles use tiktoken encodings; others count approximately."""
+    # Arrange - one profile per selection rule.
+    openai = _profile("openai", "gpt-4o-mini")
+    unknown_openai = _profile("openai", "not-a-real-model")
+    ollama = _profile("ollama", "llama3.2")
+    explicit = _profile("ollama", "llama3.2", tokenizer="cl100k_base")
+
+    # Act - resolve tokenizer names.
+    names = [
+        tokenizer_name_for_profile(profile)
+        for profile in (openai, unknown_openai, ollama, explicit)
+    ]
+
+    # Assert - model mapping, default encoding, approximate, and override.
+    assert names == ["o200k_base", "o200k_base", APPROXIMATE_TOKENIZER, "cl100k_base"]
+
+
+def test_thread_totals_measure_only_new_messages(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """A growing thread measures each message once across calls."""
+    # Arrange - count how often a message is measured.
+    measured: list[str | None] = []
+    original = token_accounting.message_characters
+
+    def _spy(message: BaseMessage) -> int:
+        measured.append(message.id)
+        return original(message)
+
+    monkeypatch.setattr(token_accounting, "message_characters", _spy)
+    accountant = TokenAccountant({})
+    history = _history(5)
+
+    # Act - count three, then five messages on one thread.
+    first = accountant.thread_characters(history[:3], thread_id="t1")
+    second = accountant.thread_characters(history, thread_id="t1")
+
+    # Assert - totals are exact and every message was measured once.
+    assert (first, second) == (1 + 2 + 3, 1 + 2 + 3 + 4 + 5)
+    assert measured == ["m0", "m1", "m2", "m3", "m4"]
+
+
+def test_thread_totals_recount_rewritten_history() -> None:
+    """Replacing history (for example by summarization) yields a correct total."""
+    # Arrange - a counted thread whose history is then replaced.
+    accountant = TokenAccountant({})
+    accountant.thread_characters(_history(4), thread_id="t1")
+    rewritten = [HumanMessage(content="summary", id="s0"), *_history(4)[3:]]
+
+    # Act - count the rewritten history on the same thread.
+    total = accountant.thread_characters(rewritten, thread_id="t1")
+
+    # Assert - summary plus the kept tail.
+    assert total == len("summary") + 4
+
+
+def test_thread_totals_recount_when_an_earlier_message_changes() -> None:
+    """Removing or replacing a message before the tail invalidates the total."""
+    # Arrange - a counted thread, then the same tail with its middle edited.
+    accountant = TokenAccountant({})
+    history = _history(4)
+    accountant.thread_characters(history, thread_id="t1")
+    replaced = [history[0], HumanMessage(content="edited", id="e1"), *history[2:]]
+    removed = [history[0], *history[2:]]
+
+    # Act - count each edited history on the same thread.
+    after_replace = accountant.thread_characters(replaced, thread_id="t1")
+    after_remove = accountant.thread_characters(removed, thread_id="t1")
+
+    # Assert - both totals reflect the edited history, not the stale prefix.
+    assert after_replace == 1 + len("edited") + 3 + 4
+    assert after_remove == 1 + 3 + 4
+
+
+def test_token_counts_use_profile_tokenizer_with_offline_fallback(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """Encodings count real tokens; unavailable encodings count approximately."""
+    # Arrange - one profile with a loadable encoding and one without.
+    monkeypatch.setattr(
+        token_accounting,
+        "_load_encoding",
+        lambda name: _WordEncoding() if name == "words" else None,
+    )
+    accountant = TokenAccountant(
+        {
+            "exact": _profile("openai", "gpt-4o", tokenizer="words"),
+            "offline": _profile("openai", "gpt-4o", tokenizer="missing"),
+        }
+    )
+    message = HumanMessage(content="one two three", id="m1")
+
+    # Act - count the same message for both profiles.
+    exact = accountant.count_tokens("exact", [message])
+    offline = accountant.count_tokens("offline", [message])
+
+    # Assert - word tokens plus framing overhead, and the approximate count.
+    assert exact == 3 + 3
+    assert offline == count_tokens_approximately([message])
+
+
+def test_summarization_counter_accepts_message_likes() -> None:
+    """The compression counter converts message-like inputs before counting."""
+    # Arrange - approximate-only accountant.
+    counter = TokenAccountant({}).summarization_counter("default")
+
+    # Act - count a tuple-style message.
+    total = counter([("user", "hello there")])
+
+    # Assert - same as the approximate counter.
+    assert total == count_tokens_approximately([("user", "hello there")])
@@ -0,0 +1,107 @@
+"""Unit tests for tool-result offloading to the local blob store."""
+
+from __future__ import annotations
+
+import asyncio
+from pathlib import Path
+from typing import Any, cast
+
+import pytest
+from langchain.agents.middleware import ToolCallRequest
+from langchain.tools import ToolRuntime
+from langchain_core.messages import ToolMessage
+
+from lily.runtime.config_schema import ToolOutputOffloadConfig
+from lily.runtime.tool_output_offload import (
+    ToolOutputOffloadMiddleware,
+    ToolOutputStore,
+    ToolOutputStoreError,
+    build_fetch_tool_output_tool,
+)
+
+pytestmark = pytest.mark.unit
+
+
+def _request(name: str) -> ToolCallRequest:
+    """Return a tool call request for ``name``."""
+    return ToolCallRequest(
+        tool_call={"name": name, "args": {}, "id": "call-1", "type": "tool_call"},
+        tool=None,
+        state={},
+        runtime=cast(ToolRuntime, None),
+    )
+
+
+def test_store_is_content_addressed_and_pages_by_character(tmp_path: Path) -> None:
+    """Identical outputs share one blob; reads page by character offset."""
+    # Arrange - a store and a non-ASCII output.
+    store = ToolOutputStore(tmp_path / "blobs")
+    text = "héllo wörld " * 10
+
+    # Act - store it twice and read a page.
+    handle = store.put(text)
+    again = store.put(text)
+    page, total = store.read(handle, 6, 5)
+
+    # Assert - one blob, character paging, and errors for bad handles.
+    assert handle == again
+    assert handle.startswith("sha256:")
+    assert len(list((tmp_path / "blobs").rglob("*.txt"))) == 1
+    assert (page, total) == ("wörld", len(text))
+    with pytest.raises(ToolOutputStoreError, match="Malformed"):
+        store.read("../etc/passwd", 0, 10)
+    with pytest.raises(ToolOutputStoreError, match="Unknown"):
+        store.read(f"sha256:{'0' * 64}", 0, 10)
+
+
+def test_middleware_offloads_oversized_results_only(tmp_path: Path) -> None:
+    """Results above the threshold become preview plus handle; others pass."""
+    # Arrange - threshold of 50 characters with a 10-character preview.
+    store = ToolOutputStore(tmp_path / "blobs")
+    config = ToolOutputOffloadConfig(enabled=True, threshold_chars=50, preview_chars=10)
+    middleware = ToolOutputOffloadMiddleware(store, config)
+    big = "".join(f"line {index}\n" for index in range(20))
+    results = {
+        "small": ToolMessage(content="short", tool_call_id="call-1"),
+        "big": ToolMessage(content=big, tool_call_id="call-1"),
+    }
+
+    def _handler(request: ToolCallRequest) -> ToolMessage:
+        return results[request.tool_call["name"]]
+
+    async def _ahandler(request: ToolCallRequest) -> ToolMessage:
+        return _handler(request)
+
+    # Act - run small and big results through sync and async hooks.
+    small = middleware.wrap_tool_call(_request("small"), _handler)
+    offloaded = asyncio.run(middleware.awrap_tool_call(_request("big"), _ahandler))
+
+    # Assert - small result untouched; big one stored and previewed.
+    assert small is results["small"]
+    assert isinstance(offloaded, ToolMessage)
+    content = str(offloaded.content)
+    assert content.startswith(big[:10])
+    assert big[10:20] not in content
+    handle = content.split('handle="', 1)[1].split('"', 1)[0]
+    assert store.read(handle, 0, len(big)) == (big, len(big))
+    assert offloaded.tool_call_id == "call-1"
+
+
+def test_fetch_tool_output_pages_through_a_stored_output(tmp_path: Path) -> None:
+    """Pages are capped at ``max_length`` and say where the next one starts."""
+    # Arrange - a stored 30-character output and a fetch tool capped at 12.
+    store = ToolOutputStore(tmp_path / "blobs")
+    handle = store.put("abcdefghij" * 3)
+    fetch = build_fetch_tool_output_tool(store, max_length=12)
+
+    # Act - read a middle page, the tail, and an unknown handle.
+    middle: Any = fetch.invoke({"handle": handle, "offset": 5, "length": 100})
+    tail: Any = fetch.invoke({"handle": handle, "offset": 25})
+    missing: Any = fetch.invoke({"handle": "nope"})
+
+    # Assert - bounded page with continuation, final page, and readable error.
+    assert middle == (
+        "fghijabcdefg\n\n[Characters 5-17 of 30; call again with offset=17 for more.]"
+    )
+    assert tail == "fghij\n\n[Characters 25-30 of 30.]"
+    assert missing.startswith("Malformed tool output handle")